@@ -0,0 +1,322 @@
+# agent_client.py
+
+import asyncio
+import collections
+import importlib
+import json
+import time
+import urllib.parse
+
+from dissemination_engine import run_coroutine_sync
+from incident_records import WIRE_CONTENT_TYPES, content_type, decode, wire_format_for
+from instrumentation import get_logger
+from pubsub_runtime import tool_handler
+
+LOG = get_logger("agent_client")
+
+
+class AgentRequestError(Exception):
+    """Raised when an agent answers with a non-2xx status or an unparseable response."""
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+# --- Connection Pool ---
+
+class _Connection:
+    __slots__ = ("reader", "writer", "last_used", "reused")
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+        self.reused = False
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class _HostPool:
+    """
+    Keep-alive connections to one host: at most 'max_connections' open at once, idle ones
+    reused most-recently-used first and dropped after 'idle_timeout_seconds'.
+    """
+
+    def __init__(self, host: str, port: int, max_connections: int, idle_timeout_seconds: float):
+        self.host = host
+        self.port = port
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle = collections.deque()
+        self.opened = 0
+
+    async def acquire(self) -> _Connection:
+        await self._slots.acquire()
+        try:
+            now = time.monotonic()
+            while self._idle:
+                connection = self._idle.pop()
+                if now - connection.last_used < self.idle_timeout_seconds and not connection.reader.at_eof():
+                    connection.reused = True
+                    return connection
+                connection.close()
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            self.opened += 1
+            return _Connection(reader, writer)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection: _Connection, reusable: bool) -> None:
+        if reusable:
+            connection.last_used = time.monotonic()
+            self._idle.append(connection)
+        else:
+            connection.close()
+        self._slots.release()
+
+    def close(self) -> None:
+        while self._idle:
+            self._idle.pop().close()
+
+
+# --- HTTP/1.1 Framing ---
+
+def _encode_request(host: str, port: int, path: str, payload, accept: str = "application/json") -> bytes:
+    body = json.dumps(payload).encode("utf-8")
+    return (f"POST {path} HTTP/1.1\r\nHost: {host}:{port}\r\nContent-Type: application/json\r\nAccept: {accept}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n").encode("ascii") + body
+
+
+async def _read_response(reader) -> tuple:
+    """
+    Reads one HTTP/1.1 response. Returns (status, body, keep_alive, content_type).
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("Agent closed the connection before responding.")
+    parts = status_line.split(None, 2)
+    if len(parts) < 2 or not parts[1].isdigit():
+        raise AgentRequestError(f"Malformed response status line: {status_line[:80]!r}")
+    status = int(parts[1])
+    keep_alive = parts[0] == b"HTTP/1.1"
+    content_length, chunked, content_type_header = None, False, None
+    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        name, _, value = line.partition(b":")
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == b"content-length":
+            content_length = int(value)
+        elif name == b"transfer-encoding" and b"chunked" in value:
+            chunked = True
+        elif name == b"connection":
+            keep_alive = value == b"keep-alive" or (keep_alive and value != b"close")
+        elif name == b"content-type":
+            content_type_header = value.decode("latin-1")
+
+    if chunked:
+        chunks = []
+        while (size := int((await reader.readline()).split(b";")[0], 16)):
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        await reader.readline()
+        body = b"".join(chunks)
+    elif content_length is not None:
+        body = await reader.readexactly(content_length)
+    else:
+        body, keep_alive = await reader.read(), False # Body runs to connection close
+    return status, body, keep_alive, content_type_header
+
+
+def _decode_body(status: int, body: bytes, content_type_header: str = None):
+    if not 200 <= status < 300:
+        raise AgentRequestError(f"Agent returned HTTP {status}: {body[:200]!r}", status)
+    # Legacy JSON bodies from ADK tools often hold a JSON string; decode() unwraps it so HTTP
+    # and in-process calls look alike. Record formats are decoded once.
+    try:
+        return decode(body, wire_format_for(content_type_header)) if body else None
+    except Exception as e:
+        raise AgentRequestError(f"Agent returned an undecodable body: {e}", status) from None
+
+
+# --- Client ---
+
+class AgentClient:
+    """
+    Async client for driving an agent over HTTP (the ADK server or a Cloud Run service).
+
+    Connections are kept alive and pooled, with at most 'max_connections_per_host' open at
+    once. call() sends one payload; call_many() spreads a batch of reports or scenarios over
+    the pool and pipelines up to 'pipeline_depth' requests per connection, writing them
+    back-to-back before reading the responses in order.
+
+    Every request runs under a deadline ('deadline_seconds', overridable per call). A request
+    that times out or is cancelled closes its connection instead of returning it to the pool,
+    since the response may still be in flight.
+
+    With 'fallback_tool' ('module:function', e.g.
+    'emergency_call_nlp_agent:process_transcript_for_orchestration_and_user_followup') and the
+    module importable, requests that never reach the agent (connection refused) are served by
+    calling the tool in-process instead; 'fallback_argument' names the payload field to pass
+    for tools that take a single argument. Results come back decoded from JSON either way.
+    A missed deadline, or a connection lost after requests were written, raises instead: the
+    agent may have run them, and running an alert twice would disseminate it twice.
+
+    'wire_format' is the response encoding asked for in the Accept header: 'legacy' (plain
+    JSON, with alert results JSON-encoded twice), or 'json' / 'msgpack' for servers that
+    negotiate incident_records formats; the response's Content-Type decides how it is decoded.
+    """
+
+    def __init__(self, url: str, max_connections_per_host: int = 8, pipeline_depth: int = 8,
+                 deadline_seconds: float = 10.0, idle_timeout_seconds: float = 30.0,
+                 fallback_tool: str = None, fallback_argument: str = None, wire_format: str = "legacy"):
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme != "http":
+            raise ValueError(f"Unsupported agent URL scheme: {parsed.scheme!r} (only plain http is supported).")
+        if max_connections_per_host < 1 or pipeline_depth < 1:
+            raise ValueError("max_connections_per_host and pipeline_depth must be at least 1.")
+        if wire_format not in WIRE_CONTENT_TYPES:
+            raise ValueError(f"Unknown wire format: {wire_format!r} (expected one of {', '.join(WIRE_CONTENT_TYPES)}).")
+        self.url = url
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.path = parsed.path or "/"
+        self.max_connections_per_host = max_connections_per_host
+        self.pipeline_depth = pipeline_depth
+        self.deadline_seconds = deadline_seconds
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.wire_format = wire_format
+        self._fallback = _load_fallback(fallback_tool, fallback_argument)
+        self._pools = {} # event loop -> _HostPool; asyncio objects belong to one loop
+        self.counters = {"requests": 0, "fallbacks": 0, "errors": 0}
+
+    def _pool(self) -> _HostPool:
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            pool = self._pools[loop] = _HostPool(self.host, self.port, self.max_connections_per_host,
+                                                 self.idle_timeout_seconds)
+        return pool
+
+    @property
+    def connections_opened(self) -> int:
+        return sum(pool.opened for pool in self._pools.values())
+
+    async def call(self, payload, deadline_seconds: float = None):
+        """
+        Sends one payload to the agent and returns its decoded JSON response.
+        """
+        return (await self._send_pipelined([payload], deadline_seconds))[0]
+
+    async def call_many(self, payloads: list, deadline_seconds: float = None, return_exceptions: bool = False) -> list:
+        """
+        Sends a batch over the pool, pipelining up to 'pipeline_depth' requests per connection,
+        and returns the results in input order. With return_exceptions=True, failed requests
+        yield their exception instead of failing the whole batch.
+        """
+        groups = [payloads[start:start + self.pipeline_depth] for start in range(0, len(payloads), self.pipeline_depth)]
+        group_results = await asyncio.gather(
+            *(self._send_pipelined(group, deadline_seconds, return_exceptions) for group in groups),
+            return_exceptions=return_exceptions,
+        )
+        results = []
+        for group, group_result in zip(groups, group_results):
+            results.extend([group_result] * len(group) if isinstance(group_result, BaseException) else group_result)
+        return results
+
+    def call_sync(self, payload, deadline_seconds: float = None):
+        return run_coroutine_sync(self._call_and_close(self.call(payload, deadline_seconds)))
+
+    def call_many_sync(self, payloads: list, deadline_seconds: float = None, return_exceptions: bool = False) -> list:
+        return run_coroutine_sync(self._call_and_close(self.call_many(payloads, deadline_seconds, return_exceptions)))
+
+    async def _call_and_close(self, coroutine):
+        # The sync wrappers run on a throwaway event loop, so its pool must not outlive it
+        try:
+            return await coroutine
+        finally:
+            self._close_pool(asyncio.get_running_loop())
+
+    async def close(self) -> None:
+        self._close_pool(asyncio.get_running_loop())
+
+    def _close_pool(self, loop) -> None:
+        pool = self._pools.pop(loop, None)
+        if pool is not None:
+            pool.close()
+
+    async def _send_pipelined(self, payloads: list, deadline_seconds: float = None, return_exceptions: bool = False) -> list:
+        self.counters["requests"] += len(payloads)
+        deadline = self.deadline_seconds if deadline_seconds is None else deadline_seconds
+        progress = {"written": 0, "results": []} # Payloads handed to a connection, raw responses read
+        try:
+            return await asyncio.wait_for(self._exchange(payloads, progress), deadline)
+        except asyncio.TimeoutError:
+            # A slow agent may still run the requests, so the deadline is never a reason to run
+            # them again in-process (TimeoutError is an OSError, hence caught first)
+            self.counters["errors"] += len(payloads)
+            raise
+        except (ConnectionError, OSError) as e:
+            answered = len(progress["results"])
+            # Requests written but not answered may have run on the agent: only fall back for
+            # payloads that never reached a connection
+            if self._fallback is None or progress["written"] > answered:
+                self.counters["errors"] += len(payloads)
+                raise
+            unsent = payloads[answered:]
+            self.counters["fallbacks"] += len(unsent)
+            LOG.warning("Agent unreachable; calling the tool in-process", url=self.url, error=e.__class__.__name__, requests=len(unsent))
+            results = [_decode_body(status, body, content_type_header) for status, body, content_type_header in progress["results"]]
+            results.extend(await asyncio.gather(*(asyncio.to_thread(self._fallback, payload) for payload in unsent),
+                                                return_exceptions=return_exceptions))
+            return results
+        except Exception:
+            self.counters["errors"] += len(payloads)
+            raise
+
+    async def _exchange(self, payloads: list, progress: dict) -> list:
+        pool = self._pool()
+        results = progress["results"]
+        while len(results) < len(payloads):
+            pending = payloads[len(results):]
+            connection = await pool.acquire()
+            reusable, answered = False, 0
+            try:
+                # Pipelining: write every request first, then read the responses in order
+                accept = content_type(self.wire_format)
+                progress["written"] = len(payloads)
+                connection.writer.write(b"".join(_encode_request(self.host, self.port, self.path, payload, accept)
+                                                 for payload in pending))
+                await connection.writer.drain()
+                keep_alive = True
+                while answered < len(pending) and keep_alive:
+                    status, body, keep_alive, content_type_header = await _read_response(connection.reader)
+                    results.append((status, body, content_type_header))
+                    answered += 1
+                # A server that answers 'Connection: close' has not processed the requests
+                # pipelined behind it, so those are resent on a fresh connection
+                progress["written"] = len(results)
+                reusable = keep_alive
+            except (ConnectionError, asyncio.IncompleteReadError):
+                if not (connection.reused and not answered):
+                    raise
+                # The agent closed this idle keep-alive connection before reading the requests;
+                # retry on a fresh one
+                progress["written"] = len(results)
+            finally:
+                # Timed out or cancelled requests leave unread responses behind, so never reuse them
+                pool.release(connection, reusable)
+        return [_decode_body(status, body, content_type_header) for status, body, content_type_header in results]
+
+
+def _load_fallback(tool_spec: str, argument: str = None):
+    if not tool_spec:
+        return None
+    module_name, function_name = tool_spec.split(":")
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError:
+        LOG.info("Fallback agent module not importable; HTTP only", module=module_name)
+        return None
+    return tool_handler(getattr(module, function_name), argument)
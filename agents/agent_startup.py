@@ -0,0 +1,166 @@
+# agent_startup.py
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+
+from instrumentation import get_logger
+
+LOG = get_logger("agent_startup")
+
+# 'lazy' (default): agent modules defer google.adk and Agent construction until root_agent is
+# first used, so a Cloud Run instance can answer tool calls while the LLM side is still cold.
+# 'eager': build everything at import, e.g. for instances kept warm with min-instances.
+STARTUP_MODE = os.environ.get("AGENT_STARTUP", "lazy")
+# Directory for precompiled table snapshots (keyword matchers, gazetteer indexes); unset disables them
+TABLE_SNAPSHOT_DIR = os.environ.get("AGENT_TABLE_SNAPSHOT_DIR")
+
+_PROCESS_START = time.monotonic()
+_components = {} # name -> {"ready": bool, "required": bool, "detail": str, "seconds": float}
+_components_lock = threading.Lock()
+
+
+# --- Readiness ---
+
+def register_component(name: str, required: bool = True, detail: str = "pending") -> None:
+    with _components_lock:
+        _components.setdefault(name, {"ready": False, "required": required, "detail": detail, "seconds": None})
+
+
+def mark_ready(name: str, detail: str = "ready", seconds: float = None, required: bool = True) -> None:
+    with _components_lock:
+        component = _components.setdefault(name, {"required": required})
+        component.update(ready=True, detail=detail, seconds=seconds)
+
+
+def readiness_probe() -> dict:
+    """
+    Startup/readiness state of this process: ready once every required component (the tool
+    tables) is loaded. Deferred components such as a not-yet-built root_agent are listed but
+    do not hold readiness back.
+    """
+    with _components_lock:
+        components = {name: dict(component) for name, component in _components.items()}
+    return {
+        "ready": all(component["ready"] for component in components.values() if component["required"]),
+        "startup_mode": STARTUP_MODE,
+        "uptime_seconds": round(time.monotonic() - _PROCESS_START, 3),
+        "components": components,
+    }
+
+
+def start_readiness_server(port: int = None, host: str = "0.0.0.0"):
+    """
+    Serves GET /ready (503 until ready) and /healthz on a daemon thread, for Cloud Run startup
+    and liveness probes, plus /metrics in Prometheus text format. The port defaults to
+    READINESS_PORT, or 8081.
+    """
+    import http.server # Only probe-serving processes pay for it
+
+    class ReadinessHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                from instrumentation import export_prometheus
+                self._reply(200, export_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+                return
+            if self.path not in ("/ready", "/readyz", "/healthz"):
+                self.send_error(404)
+                return
+            state = readiness_probe()
+            # Liveness only needs the process to answer; readiness needs the tables
+            status = 200 if self.path == "/healthz" or state["ready"] else 503
+            self._reply(status, json.dumps(state).encode("utf-8"), "application/json")
+
+        def _reply(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass # Probes hit this every few seconds
+
+    port = int(port or os.environ.get("READINESS_PORT", 8081))
+    server = http.server.ThreadingHTTPServer((host, port), ReadinessHandler)
+    threading.Thread(target=server.serve_forever, name="readiness-probe", daemon=True).start()
+    LOG.info("Readiness probe listening", host=host, port=port)
+    return server
+
+
+# --- Lazy Agents ---
+
+def lazy_agent(module_globals: dict, build, names: tuple = ("basic_agent", "root_agent")):
+    """
+    Returns a module __getattr__ (PEP 562) that builds the module's Agent with build() on first
+    access to any of 'names' and binds it to all of them, so loaders that read
+    module.root_agent get the same object as before. In eager mode the agent is built now.
+    """
+    component = f"{module_globals['__name__']}.root_agent"
+    lock = threading.Lock()
+    register_component(component, required=False, detail="deferred")
+
+    def materialize():
+        with lock:
+            if names[0] not in module_globals:
+                started = time.perf_counter()
+                agent = build()
+                for name in names:
+                    module_globals[name] = agent
+                mark_ready(component, "built", round(time.perf_counter() - started, 4), required=False)
+        return module_globals[names[0]]
+
+    def __getattr__(name):
+        if name in names:
+            return materialize()
+        raise AttributeError(f"module {module_globals['__name__']!r} has no attribute {name!r}")
+
+    if STARTUP_MODE == "eager":
+        materialize()
+    return __getattr__
+
+
+# --- Precompiled Table Snapshots ---
+
+def load_compiled(name: str, source_key, build, snapshot_dir: str = None):
+    """
+    Returns build() for a precompiled table (keyword matcher, gazetteer index), going through a
+    pickle snapshot in 'snapshot_dir' (default AGENT_TABLE_SNAPSHOT_DIR) when one is configured.
+    'source_key' must change whenever the inputs do (e.g. the phrase list, or a file's path,
+    size and mtime); a snapshot with a different key, or one that fails to load, is rebuilt.
+    Only point this at a directory the service itself writes: snapshots are unpickled.
+    """
+    snapshot_dir = snapshot_dir or TABLE_SNAPSHOT_DIR
+    started = time.perf_counter()
+    register_component(name)
+    if not snapshot_dir:
+        table = build()
+        mark_ready(name, "built", round(time.perf_counter() - started, 4))
+        return table
+
+    digest = hashlib.sha256(repr(source_key).encode("utf-8")).hexdigest()[:16]
+    path = os.path.join(snapshot_dir, f"{name}-{digest}.pickle")
+    try:
+        with open(path, "rb") as snapshot_file:
+            table = pickle.load(snapshot_file)
+        mark_ready(name, "loaded from snapshot", round(time.perf_counter() - started, 4))
+        return table
+    except FileNotFoundError:
+        pass
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+        LOG.warning("Ignoring unreadable table snapshot", path=path, error=str(e))
+
+    table = build()
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as snapshot_file:
+            pickle.dump(table, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
+    except OSError as e:
+        LOG.warning("Could not write table snapshot", path=path, error=str(e))
+    mark_ready(name, "built", round(time.perf_counter() - started, 4))
+    return table
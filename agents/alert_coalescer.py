@@ -0,0 +1,191 @@
+# alert_coalescer.py
+
+import collections
+import threading
+import time
+
+# Severity order for escalation; anything else ranks below LOW
+SEVERITY_RANK = {"LOW": 0, "MEDIUM": 1, "HIGH": 2, "CRITICAL": 3}
+# Alerts of the same type for the same geofence within this many seconds of the previous one are merged
+DEFAULT_WINDOW_SECONDS = 300.0
+# (alerts per second, burst) each dissemination channel accepts city-wide; SMS gateways are the scarcest
+DEFAULT_CHANNEL_RATE_LIMITS = {
+    "SMS": (0.2, 5),
+    "Push Notification (Citizen App)": (1.0, 20),
+    "Social Media (Twitter/Facebook)": (0.5, 10),
+    "Public Display Boards": (1.0, 20),
+    "Traffic Management Center Display": (2.0, 20),
+}
+# (alerts per second, burst) per geofence across alert types: three blasts, then one per ten minutes.
+# CRITICAL alerts, and alerts more severe than the last one sent to the geofence, bypass it.
+DEFAULT_GEOFENCE_RATE_LIMIT = (1 / 600, 3)
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to 'capacity' tokens, refilled at 'rate' per second.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("Token bucket rate must be positive and capacity at least 1.")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = now
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def full_at(self) -> float:
+        return self.updated + (self.capacity - self.tokens) / self.rate
+
+
+class _Window:
+    __slots__ = ("last_seen", "severity", "sent_severity", "merged")
+
+    def __init__(self, now: float, severity: str):
+        self.last_seen = now
+        self.severity = severity
+        self.sent_severity = None
+        self.merged = 0
+
+
+class AlertCoalescer:
+    """
+    Decides, before dissemination, whether an alert goes out. Alerts with the same
+    (alert_type, geofence) arriving within 'window_seconds' of the previous one are merged
+    into a sliding window that keeps the highest severity seen:
+
+      - the first alert of a window is sent;
+      - a later one is only sent again when it raises the window's severity (an escalation),
+        and then at that severity;
+      - everything else is coalesced into what was already sent.
+
+    New alerts also need a token from their geofence's bucket, except escalations, CRITICAL
+    alerts and alerts more severe than the last one sent to that geofence; allow_channels() drops channels whose city-wide bucket is empty. Idle windows and full
+    geofence buckets are dropped as decisions are made, so memory follows the active alerts.
+    """
+
+    def __init__(self, window_seconds: float = DEFAULT_WINDOW_SECONDS, channel_rate_limits: dict = None,
+                 geofence_rate_limit: tuple = DEFAULT_GEOFENCE_RATE_LIMIT, clock=time.monotonic):
+        if window_seconds <= 0:
+            raise ValueError("window_seconds must be positive.")
+        self.window_seconds = window_seconds
+        self.geofence_rate_limit = geofence_rate_limit
+        self._clock = clock
+        now = clock()
+        limits = DEFAULT_CHANNEL_RATE_LIMITS if channel_rate_limits is None else channel_rate_limits
+        self._channel_buckets = {channel: TokenBucket(rate, burst, now) for channel, (rate, burst) in limits.items()}
+        self._windows = collections.OrderedDict() # (alert_type, geofence) -> _Window, by last_seen
+        self._geofence_buckets = collections.OrderedDict() # geofence -> TokenBucket, by last use
+        self._geofence_sent = {} # geofence -> severity of the last alert sent there, while its bucket is tracked
+        self._lock = threading.Lock()
+        self._counters = {"admitted": 0, "escalated": 0, "coalesced": 0, "rate_limited_geofence": 0,
+                          "rate_limited_channel": 0, "channels_dropped": 0}
+
+    def admit(self, alert_type: str, severity: str, geofence: str) -> dict:
+        """
+        Returns {'action': 'send' | 'coalesced' | 'rate_limited', 'severity': severity to send
+        at (the window's highest), 'escalated': bool, 'merged': alerts merged into the window}.
+        """
+        key = (alert_type, geofence)
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            window = self._windows.pop(key, None)
+            if window is None:
+                window = _Window(now, severity)
+            elif _rank(severity) > _rank(window.severity):
+                window.severity = severity
+            window.last_seen = now
+            window.merged += 1
+            self._windows[key] = window # Re-inserted at the end: most recently seen
+
+            escalated = window.sent_severity is not None and _rank(window.severity) > _rank(window.sent_severity)
+            if window.sent_severity is not None and not escalated:
+                action = "coalesced"
+            elif not self._take_geofence_token(geofence, now) and not escalated \
+                    and not self._outranks_geofence(window.severity, geofence):
+                action = "rate_limited"
+                self._counters["rate_limited_geofence"] += 1
+            else:
+                action = "send"
+                window.sent_severity = window.severity
+                self._geofence_sent[geofence] = window.severity
+                self._counters["escalated" if escalated else "admitted"] += 1
+            if action == "coalesced":
+                self._counters["coalesced"] += 1
+            return {"action": action, "severity": window.severity, "escalated": escalated, "merged": window.merged}
+
+    def allow_channels(self, channels: list) -> tuple:
+        """
+        Splits channels into (allowed, rate_limited) by their city-wide token buckets. Channels
+        without a configured limit are always allowed.
+        """
+        allowed, limited = [], []
+        with self._lock:
+            now = self._clock()
+            for channel in channels:
+                bucket = self._channel_buckets.get(channel)
+                (allowed if bucket is None or bucket.take(now) else limited).append(channel)
+            self._counters["channels_dropped"] += len(limited)
+            if channels and not allowed:
+                self._counters["rate_limited_channel"] += 1
+        return allowed, limited
+
+    def release(self, alert_type: str, geofence: str) -> None:
+        """
+        Marks the window's last admitted alert as not sent (e.g. every channel was rate
+        limited), so the next alert for it is tried again instead of being coalesced.
+        """
+        with self._lock:
+            window = self._windows.get((alert_type, geofence))
+            if window is not None:
+                window.sent_severity = None
+
+    def _outranks_geofence(self, severity: str, geofence: str) -> bool:
+        if _rank(severity) >= SEVERITY_RANK["CRITICAL"]:
+            return True
+        last_sent = self._geofence_sent.get(geofence)
+        return last_sent is not None and _rank(severity) > _rank(last_sent)
+
+    def _take_geofence_token(self, geofence: str, now: float) -> bool:
+        bucket = self._geofence_buckets.pop(geofence, None)
+        if bucket is None:
+            bucket = TokenBucket(*self.geofence_rate_limit, now)
+        self._geofence_buckets[geofence] = bucket
+        return bucket.take(now)
+
+    def _expire(self, now: float) -> None:
+        while self._windows:
+            key, window = next(iter(self._windows.items()))
+            if window.last_seen + self.window_seconds > now:
+                break
+            del self._windows[key]
+        # A bucket that has refilled completely behaves exactly like a new one
+        while self._geofence_buckets:
+            geofence, bucket = next(iter(self._geofence_buckets.items()))
+            if bucket.full_at() > now:
+                break
+            del self._geofence_buckets[geofence]
+            self._geofence_sent.pop(geofence, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["active_windows"] = len(self._windows)
+            stats["tracked_geofences"] = len(self._geofence_buckets)
+        stats["suppressed"] = stats["coalesced"] + stats["rate_limited_geofence"] + stats["rate_limited_channel"]
+        return stats
+
+
+def _rank(severity: str) -> int:
+    return SEVERITY_RANK.get(str(severity).upper(), -1)
@@ -0,0 +1,226 @@
+# alert_templates.py
+
+import functools
+import string
+
+# --- Channel Formats ---
+# Maximum rendered length per channel format (None: unlimited). SMS is special-cased: a
+# single segment holds 160 GSM-7 septets, or only 70 characters once any character needs UCS-2
+# (Kannada and Hindi always do).
+SMS_GSM7_LIMIT = 160
+SMS_UCS2_LIMIT = 70
+CHANNEL_LIMITS = {
+    "full": None, # The complete message, as returned by format_alert_message
+    "sms": SMS_GSM7_LIMIT,
+    "push_title": 65,
+    "push_body": 240,
+    "display": 64, # Two 32-character lines on a public display board
+    "social": 280,
+}
+# Channel format each dissemination channel renders
+CHANNEL_FORMATS = {
+    "SMS": ("sms",),
+    "Push Notification (Citizen App)": ("push_title", "push_body"),
+    "Social Media (Twitter/Facebook)": ("social",),
+    "Public Display Boards": ("display",),
+    "Traffic Management Center Display": ("display",),
+}
+LANGUAGES = ("en", "kn", "hi")
+# GSM-7 extension characters take two septets
+_GSM7_EXTENDED = frozenset("^{}\\[~]|€")
+_FILTERS = {"": lambda value: value, "upper": str.upper, "capitalize": str.capitalize}
+_ELLIPSIS = "..."
+
+# --- Localized Labels ---
+ALERT_TYPE_LABELS = {
+    "en": {"EMERGENCY": "EMERGENCY", "TRAFFIC ADVISORY": "TRAFFIC ADVISORY", "EVENT UPDATE": "EVENT UPDATE", "CRIME ALERT": "CRIME ALERT"},
+    "kn": {"EMERGENCY": "ತುರ್ತು ಪರಿಸ್ಥಿತಿ", "TRAFFIC ADVISORY": "ಸಂಚಾರ ಸಲಹೆ", "EVENT UPDATE": "ಕಾರ್ಯಕ್ರಮ ಮಾಹಿತಿ", "CRIME ALERT": "ಅಪರಾಧ ಎಚ್ಚರಿಕೆ"},
+    "hi": {"EMERGENCY": "आपातकाल", "TRAFFIC ADVISORY": "यातायात सूचना", "EVENT UPDATE": "कार्यक्रम अपडेट", "CRIME ALERT": "अपराध चेतावनी"},
+}
+SEVERITY_LABELS = {
+    "en": {"CRITICAL": "CRITICAL", "HIGH": "HIGH", "MEDIUM": "MEDIUM", "LOW": "LOW"},
+    "kn": {"CRITICAL": "ಅತಿ ತುರ್ತು", "HIGH": "ಹೆಚ್ಚು", "MEDIUM": "ಮಧ್ಯಮ", "LOW": "ಕಡಿಮೆ"},
+    "hi": {"CRITICAL": "गंभीर", "HIGH": "उच्च", "MEDIUM": "मध्यम", "LOW": "निम्न"},
+}
+ALERT_WORD = {"en": "ALERT", "kn": "ಎಚ್ಚರಿಕೆ", "hi": "चेतावनी"}
+
+# --- Default Templates ---
+# Placeholders are alert fields with an optional filter ({location|upper}); 'alert_label' and
+# 'severity_label' are the localized alert type and severity, 'alert' the word "ALERT".
+# Description and recommended action are shown as received (they are not translated).
+# The English 'full' templates reproduce the original format_alert_message output exactly.
+_HEADLINES = {
+    "en": {
+        "TRAFFIC ADVISORY": "Traffic congestion in {location|upper}.",
+        "EMERGENCY": "Immediate emergency in {location|upper}.",
+        "EVENT UPDATE": "Important update for {location|upper} event.",
+        "CRIME ALERT": "Crime alert in {location|upper}.",
+    },
+    "kn": {
+        "TRAFFIC ADVISORY": "{location} ನಲ್ಲಿ ಸಂಚಾರ ದಟ್ಟಣೆ.",
+        "EMERGENCY": "{location} ನಲ್ಲಿ ತುರ್ತು ಪರಿಸ್ಥಿತಿ.",
+        "EVENT UPDATE": "{location} ಕಾರ್ಯಕ್ರಮದ ಬಗ್ಗೆ ಮುಖ್ಯ ಮಾಹಿತಿ.",
+        "CRIME ALERT": "{location} ನಲ್ಲಿ ಅಪರಾಧ ಎಚ್ಚರಿಕೆ.",
+    },
+    "hi": {
+        "TRAFFIC ADVISORY": "{location} में यातायात जाम।",
+        "EMERGENCY": "{location} में आपात स्थिति।",
+        "EVENT UPDATE": "{location} कार्यक्रम के लिए महत्वपूर्ण सूचना।",
+        "CRIME ALERT": "{location} में अपराध की सूचना।",
+    },
+}
+_GENERIC_HEADLINE = {"en": "{description|capitalize} in {location|upper}.", "kn": "{location}: {description}.",
+                     "hi": "{location}: {description}।"}
+
+
+def _default_templates() -> dict:
+    templates = {}
+    for language in LANGUAGES:
+        prefix = "[{alert_label} - {severity_label} {alert}] "
+        for alert_type in list(_HEADLINES[language]) + [None]:
+            if alert_type is None:
+                # The generic headline already carries the description
+                headline = _GENERIC_HEADLINE[language]
+                body = headline + " {recommended_action|capitalize}."
+            else:
+                headline = _HEADLINES[language][alert_type]
+                body = headline + " {description|capitalize}. {recommended_action|capitalize}."
+            templates[(alert_type, "full", language)] = prefix + body
+            templates[(alert_type, "sms", language)] = prefix + body
+            templates[(alert_type, "social", language)] = prefix + body
+            templates[(alert_type, "push_title", language)] = "{alert_label} - {severity_label}"
+            templates[(alert_type, "push_body", language)] = body
+            templates[(alert_type, "display", language)] = "{alert_label}: {location|upper}. {recommended_action|capitalize}"
+    return templates
+
+
+# --- Compilation ---
+
+def compile_template(template: str):
+    """
+    Parses a template once into a render function taking the field dict. Literal text is kept
+    as-is and each '{field|filter}' becomes a lookup plus filter, so rendering is a single join.
+    """
+    parts = []
+    for literal, field, format_spec, conversion in string.Formatter().parse(template):
+        if literal:
+            parts.append((literal, None, None))
+        if field is not None:
+            if format_spec or conversion:
+                raise ValueError(f"Format specs and conversions are not supported in alert templates: {template!r}")
+            name, _, filter_name = field.partition("|")
+            if filter_name not in _FILTERS:
+                raise ValueError(f"Unknown template filter '{filter_name}' in {template!r}")
+            parts.append((None, name, _FILTERS[filter_name]))
+    parts = tuple(parts)
+
+    def render(fields: dict) -> str:
+        return "".join([literal if name is None else transform(fields[name]) for literal, name, transform in parts])
+
+    return render
+
+
+def sms_units(text: str) -> tuple:
+    """
+    (length, limit) of a text as one SMS segment: GSM-7 septets out of 160 when every
+    character is ASCII, otherwise UCS-2 characters out of 70.
+    """
+    if text.isascii():
+        return len(text) + sum(1 for char in text if char in _GSM7_EXTENDED), SMS_GSM7_LIMIT
+    return len(text), SMS_UCS2_LIMIT
+
+
+def fit_to_limit(text: str, channel: str) -> str:
+    """
+    Shortens a rendered message to its channel's limit, cutting at a word boundary and
+    ending with '...'.
+    """
+    if channel == "sms":
+        length, limit = sms_units(text)
+        overflow = length - limit
+    else:
+        limit = CHANNEL_LIMITS[channel]
+        overflow = len(text) - limit if limit is not None else 0
+    if overflow <= 0:
+        return text
+    budget = len(text) - overflow - len(_ELLIPSIS)
+    while True:
+        cut = text[:budget]
+        if " " in cut:
+            cut = cut[:cut.rindex(" ")]
+        shortened = cut.rstrip(" .,;:-") + _ELLIPSIS
+        # Two-septet SMS characters can leave a cut just over the limit
+        if channel != "sms" or sms_units(shortened)[0] <= sms_units(shortened)[1] or budget <= 0:
+            return shortened
+        budget -= 1
+
+
+# --- Registry ---
+
+class AlertTemplateRegistry:
+    """
+    Compiled alert templates per (alert_type, channel format, language), with renders memoized.
+
+    Lookups fall back from the alert's type to the generic template (alert_type None) and from
+    an unknown language to English. Each distinct (alert, format, language) is rendered once
+    and the same string is then handed to every recipient of that variant; the memo is an LRU
+    of 'max_cached_renders' entries (0 disables it), so it stays bounded under a stream of
+    distinct alerts.
+    """
+
+    def __init__(self, templates: dict = None, max_cached_renders: int = 65_536):
+        self._compiled = {}
+        self._renders = functools.lru_cache(maxsize=max_cached_renders)(self._render)
+        for (alert_type, channel, language), template in (templates or _default_templates()).items():
+            self.register(alert_type, channel, language, template)
+
+    def register(self, alert_type, channel: str, language: str, template: str) -> None:
+        if channel not in CHANNEL_LIMITS:
+            raise ValueError(f"Unknown channel format '{channel}'; expected one of {sorted(CHANNEL_LIMITS)}.")
+        self._compiled[(alert_type, channel, language)] = compile_template(template)
+        self._renders.cache_clear() # Earlier renders may have used the template this replaces
+
+    def _template(self, alert_type: str, channel: str, language: str):
+        for key in ((alert_type, channel, language), (None, channel, language),
+                    (alert_type, channel, "en"), (None, channel, "en")):
+            render = self._compiled.get(key)
+            if render is not None:
+                return render
+        raise ValueError(f"No template for channel format '{channel}'.")
+
+    def render(self, alert_data: dict, channel: str = "full", language: str = "en") -> str:
+        """
+        Renders one alert for one channel format and language, within the channel's length limit.
+        """
+        alert_type = alert_data.get("alert_type", "Public Safety Alert").upper()
+        severity = alert_data.get("severity", "Medium").upper()
+        location = alert_data.get("location", "Bengaluru")
+        description = alert_data.get("description", "An incident has occurred.")
+        recommended_action = alert_data.get("recommended_action", "Please stay informed.")
+        return self._renders(alert_type, severity, location, description, recommended_action, channel, language)
+
+    def _render(self, alert_type, severity, location, description, recommended_action, channel, language) -> str:
+        fields = {
+            "alert_type": alert_type,
+            "severity": severity,
+            "location": location,
+            "description": description,
+            "recommended_action": recommended_action,
+            "alert_label": ALERT_TYPE_LABELS.get(language, {}).get(alert_type, alert_type),
+            "severity_label": SEVERITY_LABELS.get(language, {}).get(severity, severity),
+            "alert": ALERT_WORD.get(language, "ALERT"),
+        }
+        return fit_to_limit(self._template(alert_type, channel, language)(fields), channel)
+
+    def render_variants(self, alert_data: dict, channels: list, languages=("en",)) -> dict:
+        """
+        Renders every format the given dissemination channels need, in every language:
+        {language: {format: text}}.
+        """
+        formats = sorted({channel_format for channel in channels for channel_format in CHANNEL_FORMATS.get(channel, ())})
+        return {language: {channel_format: self.render(alert_data, channel_format, language) for channel_format in formats}
+                for language in languages}
+
+    def stats(self) -> dict:
+        info = self._renders.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "templates": len(self._compiled)}
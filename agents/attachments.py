@@ -0,0 +1,305 @@
+# attachments.py
+
+import binascii
+import collections
+import hashlib
+import io
+import json
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+# Decoded attachments up to this size stay in memory; larger ones are spooled to a file
+SPOOL_THRESHOLD_BYTES = 256 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+# Base64 JSON fields holding attachments -> field the parsed report carries the Attachment in
+ATTACHMENT_FIELDS = {"report_image_b64": "report_image"}
+
+_KEY_PATTERN = re.compile(rb'[{,]\s*"(' + b"|".join(re.escape(field.encode()) for field in ATTACHMENT_FIELDS) + rb')"\s*:\s*"')
+# A key split across two reads is found again if this much of the previous read is rescanned
+_KEY_SPAN = 64 + max(map(len, ATTACHMENT_FIELDS))
+_BASE64_WHITESPACE = b" \t\r\n"
+_JSON_ESCAPE = re.compile(rb"\\(.)", re.DOTALL)
+
+
+# --- Attachments ---
+
+class Attachment:
+    """
+    One stored attachment, identified by the SHA-256 of its decoded bytes. view() gives
+    zero-copy access (a memoryview over the in-memory bytes or over an mmap of the spooled
+    file); open() a binary file handle.
+    """
+
+    __slots__ = ("digest", "size", "path", "_data")
+
+    def __init__(self, digest: str, size: int, path: str = None, data: bytes = None):
+        self.digest = digest
+        self.size = size
+        self.path = path
+        self._data = data
+
+    def view(self) -> memoryview:
+        if self.path is None:
+            return memoryview(self._data)
+        if not self.size:
+            return memoryview(b"") # A zero-length file cannot be mapped
+        with open(self.path, "rb") as attachment_file:
+            return memoryview(mmap.mmap(attachment_file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def open(self):
+        if self.path is None:
+            return io.BytesIO(self._data)
+        return open(self.path, "rb")
+
+    def __repr__(self) -> str:
+        return f"Attachment({self.digest[:12]}, {self.size} bytes{', spooled' if self.path else ''})"
+
+
+class _AttachmentWriter:
+    """
+    Decodes one base64 attachment as it arrives, hashing the decoded bytes and spooling them
+    to a temporary file once they outgrow the store's threshold.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._hash = hashlib.sha256()
+        self._buffer = bytearray()
+        self._file = None
+        self._pending = b"" # Base64 characters not yet forming a complete 4-character group
+        self._escape = b"" # A JSON escape cut in half by the end of a read
+        self.size = 0
+
+    def write_base64(self, chunk) -> None:
+        chunk = self._escape + bytes(chunk)
+        self._escape = b""
+        if b"\\" in chunk:
+            if chunk.endswith(b"\\") and (len(chunk) - len(chunk.rstrip(b"\\"))) % 2:
+                chunk, self._escape = chunk[:-1], b"\\"
+            # '\/' is a slash; other escapes ('\n' line breaks) are not base64 characters
+            chunk = _JSON_ESCAPE.sub(lambda match: match.group(1) if match.group(1) == b"/" else b"", chunk)
+        chunk = self._pending + chunk.translate(None, _BASE64_WHITESPACE)
+        complete = len(chunk) - len(chunk) % 4
+        self._pending = chunk[complete:]
+        if complete:
+            self._write(binascii.a2b_base64(chunk[:complete]))
+
+    def _write(self, data: bytes) -> None:
+        self._hash.update(data)
+        self.size += len(data)
+        if self._file is not None:
+            self._file.write(data)
+            return
+        self._buffer += data
+        if len(self._buffer) > self._store.spool_threshold_bytes:
+            self._file = tempfile.NamedTemporaryFile(dir=self._store.directory, prefix="spool-", delete=False)
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+
+    def finish(self) -> Attachment:
+        try:
+            if self._escape or self._pending:
+                try:
+                    self._write(binascii.a2b_base64(self._pending))
+                except binascii.Error as e:
+                    raise ValueError(f"Invalid base64 attachment: {e}") from e
+            if self._file is not None:
+                self._file.close()
+        except BaseException:
+            self.abort()
+            raise
+        return self._store._register(self._hash.hexdigest(), self.size, self._file.name if self._file else None,
+                                     self._buffer)
+
+    def abort(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            try:
+                os.unlink(self._file.name)
+            except OSError:
+                pass
+            self._file = None
+
+
+class AttachmentStore:
+    """
+    Content-addressed store for report attachments. Identical images uploaded by many
+    reporters are kept once (by SHA-256 of the decoded bytes) and analyze() runs an analyzer
+    once per distinct image. Attachments larger than 'spool_threshold_bytes' live as files
+    in 'directory' (a private temporary directory by default) and are read through mmap.
+
+    At most 'max_entries' attachments are kept; the least recently stored is dropped after
+    that, along with its cached analysis. Views taken before then remain readable.
+    """
+
+    def __init__(self, directory: str = None, spool_threshold_bytes: int = SPOOL_THRESHOLD_BYTES,
+                 max_entries: int = 10_000):
+        if spool_threshold_bytes < 0 or max_entries < 1:
+            raise ValueError("spool_threshold_bytes must not be negative and max_entries must be positive.")
+        self.spool_threshold_bytes = spool_threshold_bytes
+        self.max_entries = max_entries
+        self._owns_directory = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix="report-attachments-")
+        os.makedirs(self.directory, exist_ok=True)
+        self._attachments = collections.OrderedDict() # digest -> Attachment
+        self._analyses = {} # digest -> [lock, result, computed]
+        self._lock = threading.Lock()
+        self._counters = {"stored": 0, "duplicates": 0, "evicted": 0, "bytes_stored": 0, "analyses": 0,
+                          "analysis_hits": 0}
+
+    def __len__(self) -> int:
+        return len(self._attachments)
+
+    def writer(self) -> _AttachmentWriter:
+        return _AttachmentWriter(self)
+
+    def put_base64(self, encoded) -> Attachment:
+        """
+        Stores an attachment given as base64 text or bytes (decoded in chunks, never as a whole).
+        """
+        writer = self.writer()
+        encoded = memoryview(encoded.encode("ascii") if isinstance(encoded, str) else encoded)
+        for start in range(0, len(encoded), READ_CHUNK_BYTES):
+            writer.write_base64(encoded[start:start + READ_CHUNK_BYTES])
+        return writer.finish()
+
+    def get(self, digest: str):
+        with self._lock:
+            return self._attachments.get(digest)
+
+    def analyze(self, attachment: Attachment, analyzer):
+        """
+        Returns analyzer(attachment.view()), computed once per distinct attachment; concurrent
+        callers for the same image wait for the first one's result.
+        """
+        with self._lock:
+            entry = self._analyses.get(attachment.digest)
+            if entry is None:
+                entry = self._analyses[attachment.digest] = [threading.Lock(), None, False]
+        with entry[0]:
+            if not entry[2]:
+                entry[1], entry[2] = analyzer(attachment.view()), True
+                counter = "analyses"
+            else:
+                counter = "analysis_hits"
+        with self._lock:
+            self._counters[counter] += 1
+        return entry[1]
+
+    def _register(self, digest: str, size: int, spooled_path: str, buffer: bytearray) -> Attachment:
+        with self._lock:
+            existing = self._attachments.get(digest)
+            if existing is not None:
+                self._attachments.move_to_end(digest)
+                self._counters["duplicates"] += 1
+            else:
+                path = None
+                if spooled_path is not None:
+                    path = os.path.join(self.directory, digest)
+                    os.replace(spooled_path, path)
+                    spooled_path = None
+                attachment = self._attachments[digest] = Attachment(digest, size, path, None if path else bytes(buffer))
+                self._counters["stored"] += 1
+                self._counters["bytes_stored"] += size
+                while len(self._attachments) > self.max_entries:
+                    self._evict(next(iter(self._attachments)))
+        if spooled_path is not None: # A copy of an image already stored
+            os.unlink(spooled_path)
+        return existing or attachment
+
+    def _evict(self, digest: str) -> None:
+        evicted = self._attachments.pop(digest)
+        self._analyses.pop(digest, None)
+        self._counters["evicted"] += 1
+        self._counters["bytes_stored"] -= evicted.size
+        if evicted.path is not None:
+            try:
+                os.unlink(evicted.path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._attachments)
+        return stats
+
+    def close(self) -> None:
+        """
+        Drops every attachment and, if the store created its directory, removes it.
+        """
+        with self._lock:
+            self._attachments.clear()
+            self._analyses.clear()
+        if self._owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# --- Streaming Report Parsing ---
+
+def parse_report_stream(stream, store: AttachmentStore, length: int = None, chunk_size: int = READ_CHUNK_BYTES) -> dict:
+    """
+    Parses a JSON report from a binary stream (e.g. an HTTP request body of 'length' bytes)
+    without ever holding its attachments as text. The base64 value of every attachment field
+    (see ATTACHMENT_FIELDS) is decoded into 'store' while it is read; at the top level the
+    returned report carries the Attachment under the mapped field ('report_image_b64' ->
+    'report_image'), nested ones are left as the attachment's digest. Only the rest of the
+    body is buffered and parsed with json.
+    """
+    skeleton = bytearray() # The body with each attachment value replaced by its digest
+    attachments = {}
+    writer = None
+    search_from = 0
+    remaining = length
+    try:
+        while remaining is None or remaining > 0:
+            chunk = stream.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            while chunk:
+                if writer is not None:
+                    end = chunk.find(b'"')
+                    if end < 0:
+                        writer.write_base64(chunk)
+                        break
+                    writer.write_base64(chunk[:end])
+                    attachment = writer.finish()
+                    writer = None
+                    attachments[attachment.digest] = attachment
+                    skeleton += attachment.digest.encode("ascii")
+                    chunk = chunk[end:] # Starts with the closing quote, which belongs to the skeleton
+                    search_from = len(skeleton)
+                skeleton += chunk
+                match = _KEY_PATTERN.search(skeleton, search_from)
+                if match is None:
+                    search_from = max(search_from, len(skeleton) - _KEY_SPAN)
+                    break
+                chunk = bytes(skeleton[match.end():]) # The attachment value follows the opening quote
+                del skeleton[match.end():]
+                writer = store.writer()
+        if writer is not None:
+            raise ValueError("Report body ended inside an attachment.")
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+
+    report = json.loads(skeleton)
+    if isinstance(report, dict):
+        for field, attachment_field in ATTACHMENT_FIELDS.items():
+            if isinstance(report.get(field), str) and report[field] in attachments:
+                report[attachment_field] = attachments[report.pop(field)]
+    return report
+
+
+def parse_report(body, store: AttachmentStore) -> dict:
+    """
+    parse_report_stream() for a body already in memory (bytes, e.g. a Pub/Sub message).
+    """
+    return parse_report_stream(io.BytesIO(body), store)
@@ -0,0 +1,110 @@
+# call_sessions.py
+
+import collections
+import threading
+import time
+
+
+class CallSession:
+    """
+    Running analysis state of one emergency call. Each turn only the new utterance is
+    scanned; its keyword hits and gazetteer aliases are merged into the sets collected so far,
+    and a short tail of the text is kept so a phrase split across two turns is still found.
+    'result' is the latest analysis, 'reported' the orchestration JSON last persisted.
+    'model_text' is the opening of the call, kept for a local classifier model, if any.
+    """
+
+    __slots__ = ("call_id", "turns", "hits", "aliases", "keyword_tail", "alias_tail", "model_text", "result",
+                 "reported", "hotspot_recorded", "lock")
+
+    def __init__(self, call_id: str):
+        self.call_id = call_id
+        self.turns = 0
+        self.hits = frozenset()
+        self.aliases = frozenset()
+        self.keyword_tail = ""
+        self.alias_tail = ""
+        self.model_text = ""
+        self.result = None
+        self.reported = None
+        self.hotspot_recorded = False
+        self.lock = threading.Lock() # Turns of one call are applied one at a time, in order
+
+
+class CallSessionStore:
+    """
+    Bounded in-memory table of active call sessions keyed by call id. A session expires
+    'ttl_seconds' after its last turn; when more than 'max_sessions' are active, the least
+    recently updated is evicted. Both are checked as sessions are opened, oldest first, so a
+    lookup never scans the table.
+    """
+
+    def __init__(self, max_sessions: int = 10_000, ttl_seconds: float = 1800.0, clock=time.monotonic):
+        if max_sessions < 1 or ttl_seconds <= 0:
+            raise ValueError("max_sessions and ttl_seconds must be positive.")
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._sessions = collections.OrderedDict() # call id -> (expires_at, CallSession)
+        self._lock = threading.Lock()
+        self._counters = {"opened": 0, "evictions": 0, "expirations": 0, "ended": 0}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get_or_create(self, call_id: str) -> CallSession:
+        """
+        Returns the call's session, opening a new one if it has none (or it expired), and
+        extends its time-to-live.
+        """
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            entry = self._sessions.get(call_id)
+            if entry is None:
+                session = CallSession(call_id)
+                self._counters["opened"] += 1
+            else:
+                session = entry[1]
+                self._sessions.move_to_end(call_id)
+            self._sessions[call_id] = (now + self.ttl_seconds, session)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._counters["evictions"] += 1
+            return session
+
+    def get(self, call_id: str):
+        """
+        Returns the call's session, or None if it has none or it expired.
+        """
+        with self._lock:
+            entry = self._sessions.get(call_id)
+            if entry is None or entry[0] <= self._clock():
+                return None
+            return entry[1]
+
+    def end(self, call_id: str):
+        """
+        Closes the call's session and returns it (None if it had none).
+        """
+        with self._lock:
+            entry = self._sessions.pop(call_id, None)
+            if entry is None:
+                return None
+            self._counters["ended"] += 1
+            return entry[1]
+
+    def _expire(self, now: float) -> None:
+        # Entries are in order of last update, so expired ones are all at the front
+        while self._sessions:
+            call_id, (expires_at, _) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                return
+            del self._sessions[call_id]
+            self._counters["expirations"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["active"] = len(self._sessions)
+        return stats
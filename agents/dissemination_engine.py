@@ -0,0 +1,190 @@
+# dissemination_engine.py
+
+import asyncio
+import concurrent.futures
+import json
+import random
+import threading
+import time
+
+from instrumentation import get_logger
+
+LOG = get_logger("dissemination_engine")
+
+
+class ChannelSendError(Exception):
+    """Raised by a channel sender when a send attempt fails."""
+
+
+# --- Engine ---
+
+class DisseminationEngine:
+    """
+    Sends one alert to all of its channels concurrently, so a CRITICAL alert takes as long
+    as its slowest channel rather than the sum of all of them.
+
+    'senders' maps a channel name to (label, sender), where label is what is reported in
+    'channels_used' and sender is an async callable (formatted_message, audience_criteria)
+    returning a detail string, or raising on failure. Every attempt is bounded by
+    'timeout_seconds'; failed attempts are retried up to 'max_attempts' times with full-jitter
+    exponential backoff. An attempt that timed out may still have been delivered, so it is only
+    retried for channels in 'idempotent_channels' (e.g. display boards showing the latest
+    alert), never for an SMS or push notification.
+
+    Sends run on one long-lived event loop owned by the engine (started on first use), so at
+    most 'max_concurrency' sends are in flight across all alerts, whichever thread or event
+    loop they come from.
+
+    'formatted_message' is either one text for every channel or a dict giving each channel its
+    own text (e.g. the SMS and display-board renderings, within those channels' length limits).
+    """
+
+    def __init__(self, senders: dict, timeout_seconds: float = 5.0, max_concurrency: int = 8,
+                 max_attempts: int = 3, backoff_base_seconds: float = 0.2, backoff_max_seconds: float = 2.0,
+                 idempotent_channels=()):
+        if max_concurrency < 1 or max_attempts < 1:
+            raise ValueError("max_concurrency and max_attempts must be at least 1.")
+        self.senders = senders
+        self.idempotent_channels = frozenset(idempotent_channels)
+        self.timeout_seconds = timeout_seconds
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._loop = None
+        self._semaphore = None # Engine-wide; bound to self._loop
+        self._loop_lock = threading.Lock()
+
+    async def disseminate_async(self, formatted_message, channels: list, audience_criteria: dict) -> dict:
+        """
+        Sends the message to every channel and returns the dissemination status with
+        'status', 'channels_used', 'details' and per-channel 'channel_latency_ms'.
+        """
+        loop = self._get_loop()
+        coroutine = self._disseminate(formatted_message, channels, audience_criteria)
+        if asyncio.get_running_loop() is loop:
+            return await coroutine
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, loop))
+
+    def disseminate(self, formatted_message, channels: list, audience_criteria: dict) -> dict:
+        """
+        Synchronous wrapper around disseminate_async, safe to call from inside a running event loop
+        (other than the engine's own).
+        """
+        coroutine = self._disseminate(formatted_message, channels, audience_criteria)
+        return asyncio.run_coroutine_threadsafe(coroutine, self._get_loop()).result()
+
+    def close(self) -> None:
+        """Stops the engine's event loop; it is started again on the next send."""
+        with self._loop_lock:
+            loop, self._loop, self._semaphore = self._loop, None, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name="dissemination-loop", daemon=True).start()
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    self._loop = loop
+        return self._loop
+
+    async def _disseminate(self, formatted_message, channels: list, audience_criteria: dict) -> dict:
+        outcomes = await asyncio.gather(*(
+            self._send_to_channel(channel, formatted_message[channel] if isinstance(formatted_message, dict) else formatted_message,
+                                  audience_criteria)
+            for channel in channels
+        ))
+
+        dissemination_status = {"status": "success", "channels_used": [], "details": [], "channel_latency_ms": {}}
+        for channel, (label, succeeded, detail, latency_ms) in zip(channels, outcomes):
+            dissemination_status["details"].append(detail)
+            dissemination_status["channel_latency_ms"][channel] = latency_ms
+            if succeeded:
+                dissemination_status["channels_used"].append(label)
+            else:
+                dissemination_status["status"] = "partial_success" if dissemination_status["status"] == "success" else "failure"
+        return dissemination_status
+
+    async def _send_to_channel(self, channel: str, formatted_message: str, audience_criteria: dict) -> tuple:
+        start = time.perf_counter()
+        if channel not in self.senders:
+            LOG.warning("Unknown channel; alert not disseminated via this channel", channel=channel)
+            return channel, False, f"Failed to disseminate via {channel}.", 0.0
+
+        label, sender = self.senders[channel]
+        error = None
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                async with self._semaphore:
+                    detail = await asyncio.wait_for(sender(formatted_message, audience_criteria), self.timeout_seconds)
+                return label, True, detail, _elapsed_ms(start)
+            except asyncio.TimeoutError:
+                error = f"timed out after {self.timeout_seconds}s"
+                if channel not in self.idempotent_channels:
+                    break # May have gone out; sending again could deliver it twice
+            except Exception as e: # Any sender failure is retried
+                error = str(e) or e.__class__.__name__
+            if attempt < self.max_attempts:
+                await asyncio.sleep(self._backoff_seconds(attempt))
+
+        LOG.warning("Failed to disseminate", channel=channel, attempts=attempt, error=error)
+        return label, False, f"Failed to disseminate via {channel} after {attempt} attempt{'s' if attempt > 1 else ''}: {error}.", _elapsed_ms(start)
+
+    def _backoff_seconds(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(cap, base * 2^(attempt - 1))]
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** (attempt - 1)))
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def run_coroutine_sync(coroutine):
+    """
+    Runs a coroutine to completion from synchronous code. If this thread already runs an event
+    loop (e.g. when called as an agent tool), the coroutine runs on a helper thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as helper:
+        return helper.submit(asyncio.run, coroutine).result()
+
+
+# --- HTTP Channel Sender ---
+
+class HttpChannelSender:
+    """
+    Async sender that POSTs the alert as JSON to an HTTP endpoint (an SMS/FCM gateway, or a
+    local stub server in tests). Any non-2xx response raises ChannelSendError.
+    """
+
+    def __init__(self, host: str, port: int, path: str = "/", channel_name: str = "channel"):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.channel_name = channel_name
+
+    async def __call__(self, formatted_message: str, audience_criteria: dict) -> str:
+        body = json.dumps({"message": formatted_message, "audience_criteria": audience_criteria}).encode("utf-8")
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(
+                f"POST {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("ascii")
+                + body
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+        finally:
+            writer.close()
+
+        parts = status_line.decode("latin-1").split()
+        status_code = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+        if not 200 <= status_code < 300:
+            raise ChannelSendError(f"{self.channel_name} endpoint returned HTTP {status_code or 'no response'}")
+        return f"{self.channel_name} delivered (HTTP {status_code})."
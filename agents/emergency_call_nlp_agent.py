@@ -1,5 +1,143 @@
-from google.adk.agents import Agent
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import atexit
+import collections
+import datetime
+import functools
+import itertools
 import json
+import os
+import string
+import sys
+import threading
+import time
+
+from agent_startup import lazy_agent, load_compiled
+from call_sessions import CallSessionStore
+from fast_path import FAST_PATH_CONFIDENCE_THRESHOLD, FastPathRouter, adk_agent_call
+from firestore_writer import WriterBackpressure, get_default_writer
+from gazetteer import ReloadingGazetteer, tokenize
+from incident_archive import get_default_archive
+from incident_clustering import SEVERITY_ORDER, IncidentClusterer, report_from_call_result
+from incident_records import INCIDENT_SOURCE, IncidentRecord
+from instrumentation import METRICS, TRACER, get_logger
+from keyword_matcher import KeywordMatcher
+from local_classifier import classifier_service_from_env
+from result_cache import ResultCache
+
+# --- Declarative Keyword Tables ---
+# Every keyword phrase below is compiled into one shared KeywordMatcher at import time, so a
+# transcript is lowercased and scanned once no matter how many rules are consulted.
+
+# (incident_type, trigger phrases, keyword tag) - later rules override earlier ones
+INCIDENT_TYPE_RULES = (
+    ("Fire", ("fire", "burning"), "fire"),
+    ("Medical Emergency", ("medical", "ambulance", "collapsed"), "medical"),
+    ("Crime", ("crime", "theft", "robbery", "assault"), "crime"),
+)
+
+# Phrases that upgrade a High/Medium urgency to Critical
+CRITICAL_URGENCY_PHRASES = ("critical", "major", "quickly", "trapped", "serious")
+
+# Built-in gazetteer: (id, parent id, aliases, resolved location). Among siblings, the place
+# mentioned by the longest alias wins, then the earlier entry; a child is only considered when
+# its parent is mentioned too.
+# Set GAZETTEER_PATH to a JSON file of entries to serve a larger gazetteer with hot reload.
+DEFAULT_GAZETTEER_ENTRIES = tuple(
+    {"id": entry_id, "parent": parent, "aliases": aliases, "location": location}
+    for entry_id, parent, aliases, location in (
+        ("brigade_road", None, ("brigade road",), "Brigade Road, Bengaluru, Karnataka, India"),
+        ("brigade_road_10th_cross", "brigade_road", ("10th cross",), "Brigade Road, 10th cross, Bengaluru, Karnataka, India"),
+        ("brigade_road_10th_cross_home_36", "brigade_road_10th_cross", ("home no 36", "house no 36"),
+         "Brigade Road, 10th cross, home no 36, Bengaluru, Karnataka, India"),
+        ("mg_road", None, ("mg road",), "MG Road, Bengaluru, Karnataka, India"),
+        ("koramangala", None, ("koramangala",), "Koramangala, Bengaluru, Karnataka, India"),
+        ("indiranagar", None, ("indiranagar",), "Indiranagar, Bengaluru, Karnataka, India"),
+        ("peenya", None, ("peenya",), "Peenya, Bengaluru, Karnataka, India"),
+    )
+)
+DEFAULT_LOCATION = "Location Unknown (within Bengaluru, Karnataka, India)" # Default for Bengaluru context
+
+# (description fragment, trigger phrases) - fragments are joined in this order
+DESCRIPTION_RULES = (
+    ("Friend collapsed", ("collapsed",)),
+    ("breathing heavily", ("breathing heavily",)),
+    ("conscious", ("conscious",)),
+    ("unconscious", ("unconscious",)),
+    ("Car accident", ("car accident",)),
+    ("Traffic blocked", ("traffic blocked",)),
+    ("Fire incident", ("fire",)),
+    ("Blast occurred", ("blast",)),
+    ("Crime/Robbery reported", ("robbed", "theft")),
+)
+
+# (anomaly label, trigger phrases)
+ANOMALY_RULES = (
+    ("caller stressed and unwilling to provide further information",
+     ("not the right time", "right now", "stop asking", "ambulance right now")),
+)
+
+
+def _collect_phrases() -> list:
+    phrases = list(CRITICAL_URGENCY_PHRASES)
+    for _, triggers, _ in INCIDENT_TYPE_RULES:
+        phrases.extend(triggers)
+    for _, triggers in DESCRIPTION_RULES + ANOMALY_RULES:
+        phrases.extend(triggers)
+    return phrases
+
+
+def _compile_rules(rules) -> tuple:
+    """
+    Freezes the trigger phrases of (label, triggers, ...) rules so each rule is a single
+    set-disjointness test against the scanned hits.
+    """
+    return tuple((rule[0], frozenset(rule[1])) + tuple(rule[2:]) for rule in rules)
+
+
+_TRANSCRIPT_PHRASES = _collect_phrases()
+LOG = get_logger("emergency_call_nlp_agent")
+TRANSCRIPT_MATCHER = load_compiled("emergency_call_keyword_matcher", _TRANSCRIPT_PHRASES,
+                                   lambda: KeywordMatcher(_TRANSCRIPT_PHRASES))
+# During a major incident many callers report the same thing; results are shared for a minute.
+TRANSCRIPT_RESULT_CACHE = ResultCache(max_entries=4096, max_bytes=16 * 1024 * 1024, ttl_seconds=60.0)
+# Multi-turn calls: analysis state per call id, dropped 30 minutes after the call's last turn
+CALL_SESSIONS = CallSessionStore(max_sessions=10_000, ttl_seconds=30 * 60.0)
+_MAX_PHRASE_LENGTH = max(map(len, TRANSCRIPT_MATCHER.phrases), default=0)
+# Characters a transcript can start or end with without changing any phrase match or place name
+_FINGERPRINT_STRIP = string.whitespace + "".join(
+    char for char in string.punctuation if not any(char in phrase for phrase in TRANSCRIPT_MATCHER.phrases))
+LOCATION_GAZETTEER = ReloadingGazetteer(os.environ.get("GAZETTEER_PATH"), DEFAULT_GAZETTEER_ENTRIES)
+# Decayed incident counts per cell/type/hour of week, fed by every classified call. Set
+# HOTSPOT_SNAPSHOT_PATH to a directory to come back warm after a restart. Opened on the first
+# incident, since it pulls in NumPy.
+HOTSPOT_SNAPSHOT_PATH = os.environ.get("HOTSPOT_SNAPSHOT_PATH")
+HOTSPOT_MODEL = None
+_hotspot_model_lock = threading.Lock()
+# Optional local transformer classifier behind classify_incident (INCIDENT_CLASSIFIER_MODEL, see
+# local_classifier): concurrent calls share batched forward passes. Unset, only the keyword
+# rules classify. Until the model has loaded (or if it failed to), calls use the rules without
+# waiting, as do predictions less confident than INCIDENT_CLASSIFIER_MIN_CONFIDENCE about the
+# incident type or not back within the timeout.
+LOCAL_CLASSIFIER = classifier_service_from_env()
+LOCAL_CLASSIFIER_MIN_CONFIDENCE = float(os.environ.get("INCIDENT_CLASSIFIER_MIN_CONFIDENCE", 0.5))
+LOCAL_CLASSIFIER_TIMEOUT_SECONDS = 2.0
+# Opening of a transcript (or of a multi-turn call) given to the model; it truncates to far fewer
+# tokens than this anyway, and both paths cut at the same place so they classify alike
+LOCAL_CLASSIFIER_MAX_CALL_CHARS = 2048
+
+_INCIDENT_TYPE_RULES = _compile_rules(INCIDENT_TYPE_RULES)
+_DESCRIPTION_RULES = _compile_rules(DESCRIPTION_RULES)
+_ANOMALY_RULES = _compile_rules(ANOMALY_RULES)
+
+
+@functools.lru_cache(maxsize=64)
+def _scan_transcript(call_transcript: str) -> frozenset:
+    """
+    Scans a transcript once with the shared matcher. Cached so that extract_entities and
+    classify_incident share a single pass over the same transcript.
+    """
+    return TRANSCRIPT_MATCHER.scan(call_transcript)
+
 
 # Define the internal tools as regular Python functions
 def classify_incident(call_transcript: str, current_severity: str = "Medium") -> dict:
@@ -7,30 +145,52 @@ def classify_incident(call_transcript: str, current_severity: str = "Medium") ->
     Classifies the incident type from the call transcript and identifies its urgency/severity.
     Returns a dictionary with 'incident_type', 'urgency', and 'keywords'.
     This tool performs 'Early Classification of Incidents'.
+    With a local classifier model configured, the type and urgency come from the model, and
+    'noise' (whether the text reads as noise rather than an incident) and per-head
+    'confidence' are added.
     """
-    print(f"DEBUG: Classifying incident from transcript: '{call_transcript}' with current_severity: {current_severity}")
+    LOG.debug("Classifying incident", transcript=call_transcript, current_severity=current_severity)
+    result = _classify_hits(_scan_transcript(call_transcript), current_severity)
+    if LOCAL_CLASSIFIER is not None:
+        return _classify_with_model(call_transcript, current_severity, result)
+    return result
+
+
+def _classify_with_model(call_transcript: str, current_severity: str, rules_result: dict) -> dict:
+    if not LOCAL_CLASSIFIER.ready:
+        METRICS.increment("local_classifier_fallbacks_total", reason="load_failed" if LOCAL_CLASSIFIER.load_error else "loading")
+        return rules_result
+    try:
+        prediction = LOCAL_CLASSIFIER(call_transcript, timeout=LOCAL_CLASSIFIER_TIMEOUT_SECONDS)
+    except Exception as e: # Inference error or timeout
+        METRICS.increment("local_classifier_fallbacks_total", reason=e.__class__.__name__)
+        LOG.debug("Local classifier unavailable; using keyword rules", error=repr(e))
+        return rules_result
+    if "incident_type" not in prediction or prediction["confidence"]["incident_type"] < LOCAL_CLASSIFIER_MIN_CONFIDENCE:
+        METRICS.increment("local_classifier_fallbacks_total", reason="low_confidence")
+        return rules_result
+    urgency = prediction.get("severity", rules_result["urgency"])
+    # The severity the caller passed in (e.g. bumped for a stressed caller) is a floor
+    if SEVERITY_ORDER.get(current_severity, -1) > SEVERITY_ORDER.get(urgency, -1):
+        urgency = current_severity
+    return {"incident_type": prediction["incident_type"], "urgency": urgency, "keywords": rules_result["keywords"],
+            "noise": prediction.get("signal") == "noise", "confidence": prediction["confidence"]}
+
+
+def _classify_hits(hits: frozenset, current_severity: str) -> dict:
     incident_type = "Unknown"
     urgency = current_severity # Start with provided severity or default
-
-    lower_transcript = call_transcript.lower()
     keywords = []
 
-    if "fire" in lower_transcript or "burning" in lower_transcript:
-        incident_type = "Fire"
-        urgency = "High"
-        keywords.append("fire")
-    if "medical" in lower_transcript or "ambulance" in lower_transcript or "collapsed" in lower_transcript:
-        incident_type = "Medical Emergency"
-        urgency = "High"
-        keywords.append("medical")
-    if "crime" in lower_transcript or "theft" in lower_transcript or "robbery" in lower_transcript or "assault" in lower_transcript:
-        incident_type = "Crime"
-        urgency = "High"
-        keywords.append("crime")
+    for rule_incident_type, triggers, keyword in _INCIDENT_TYPE_RULES:
+        if not hits.isdisjoint(triggers):
+            incident_type = rule_incident_type
+            urgency = "High"
+            keywords.append(keyword)
 
     # Severity Assessment based on keywords
     # Prioritize 'Critical' if urgency keywords are present or if a specific override is active
-    if "critical" in lower_transcript or "major" in lower_transcript or "quickly" in lower_transcript or "trapped" in lower_transcript or "serious" in lower_transcript:
+    if not hits.isdisjoint(CRITICAL_URGENCY_PHRASES):
         if urgency in ["High", "Medium"]: # Only upgrade if not already Critical
             urgency = "Critical"
 
@@ -44,65 +204,45 @@ def extract_entities(call_transcript: str) -> dict:
     and 'Prediction of Potential Threats or Hotspots'.
     Returns a dictionary of extracted entities.
     """
-    print(f"DEBUG: Extracting entities from transcript: '{call_transcript}'")
-    entities = {
-        "location": "Location Unknown (within Bengaluru, Karnataka, India)", # Default for Bengaluru context
-        "description": "Emergency reported",
-        "anomalies": []
-    }
-    lower_transcript = call_transcript.lower()
+    LOG.debug("Extracting entities", transcript=call_transcript)
+    return _entities_from_hits(_scan_transcript(call_transcript), LOCATION_GAZETTEER.resolve(call_transcript))
+
 
+def _entities_from_hits(hits: frozenset, location: str) -> dict:
     # Location Extraction (Prioritize specific over general)
-    if "brigade road" in lower_transcript:
-        entities["location"] = "Brigade Road, Bengaluru, Karnataka, India"
-        if "10th cross" in lower_transcript:
-            entities["location"] = "Brigade Road, 10th cross, Bengaluru, Karnataka, India"
-            if "home no 36" in lower_transcript or "house no 36" in lower_transcript:
-                entities["location"] = "Brigade Road, 10th cross, home no 36, Bengaluru, Karnataka, India"
-    elif "mg road" in lower_transcript:
-        entities["location"] = "MG Road, Bengaluru, Karnataka, India"
-    elif "koramangala" in lower_transcript:
-        entities["location"] = "Koramangala, Bengaluru, Karnataka, India"
-    elif "indiranagar" in lower_transcript:
-        entities["location"] = "Indiranagar, Bengaluru, Karnataka, India"
-    elif "peenya" in lower_transcript:
-        entities["location"] = "Peenya, Bengaluru, Karnataka, India"
-    elif "bangalore" in lower_transcript or "bengaluru" in lower_transcript:
-         pass # Handled by default or specific sub-locations
+    location = location or DEFAULT_LOCATION
 
     # Description and Anomaly Detection
-    incident_description_parts = []
-    anomalies_detected = []
-
-    if "collapsed" in lower_transcript:
-        incident_description_parts.append("Friend collapsed")
-    if "breathing heavily" in lower_transcript:
-        incident_description_parts.append("breathing heavily")
-    if "conscious" in lower_transcript:
-        incident_description_parts.append("conscious")
-    if "unconscious" in lower_transcript:
-        incident_description_parts.append("unconscious")
-    if "car accident" in lower_transcript:
-        incident_description_parts.append("Car accident")
-    if "traffic blocked" in lower_transcript:
-        incident_description_parts.append("Traffic blocked")
-    if "fire" in lower_transcript:
-        incident_description_parts.append("Fire incident")
-    if "blast" in lower_transcript:
-        incident_description_parts.append("Blast occurred")
-    if "robbed" in lower_transcript or "theft" in lower_transcript:
-        incident_description_parts.append("Crime/Robbery reported")
-
-    entities["description"] = ", ".join(incident_description_parts) if incident_description_parts else "Emergency reported"
+    incident_description_parts = [fragment for fragment, triggers in _DESCRIPTION_RULES if not hits.isdisjoint(triggers)]
 
     # Anomaly Detection for stressed caller / refusal to provide info
-    if "not the right time" in lower_transcript or "right now" in lower_transcript or \
-       "stop asking" in lower_transcript or "ambulance right now" in lower_transcript:
-        anomalies_detected.append("caller stressed and unwilling to provide further information")
-    
-    entities["anomalies"] = anomalies_detected
-    
-    return entities
+    anomalies_detected = [anomaly for anomaly, triggers in _ANOMALY_RULES if not hits.isdisjoint(triggers)]
+
+    return {
+        "location": location,
+        "description": ", ".join(incident_description_parts) if incident_description_parts else "Emergency reported",
+        "anomalies": anomalies_detected
+    }
+
+def triage_severity(call_transcript: str) -> str:
+    """
+    Cheap severity estimate used to schedule a call before its full analysis runs. Applies the
+    same keyword scan and severity rules as the full pipeline, without building the result.
+    The transcript consumer's priority function, e.g.
+    python pubsub_runtime.py emergency_call_nlp_agent:process_transcript_record --argument call_transcript
+    --priority-function emergency_call_nlp_agent:triage_severity
+    """
+    hits = _scan_transcript(call_transcript)
+    severity = "High"
+    for anomaly, triggers in _ANOMALY_RULES:
+        if anomaly == "caller stressed and unwilling to provide further information" and not hits.isdisjoint(triggers):
+            severity = "Critical"
+    for _, triggers, _ in _INCIDENT_TYPE_RULES:
+        if not hits.isdisjoint(triggers):
+            severity = "High"
+    if severity in ("High", "Medium") and not hits.isdisjoint(CRITICAL_URGENCY_PHRASES):
+        severity = "Critical"
+    return severity
 
 def generate_follow_up_questions(incident_type: str, location: str, description: str, current_anomalies: list) -> str:
     """
@@ -134,6 +274,58 @@ def generate_follow_up_questions(incident_type: str, location: str, description:
     return " ".join(questions)
 
 
+def transcript_fingerprint(call_transcript: str) -> str:
+    """
+    Normalizes a transcript for duplicate detection, only as far as the analysis cannot tell
+    the difference: lowercased (the matcher and gazetteer are case-insensitive) and stripped of
+    leading and trailing whitespace and punctuation, so "FIRE AT PEENYA, PEOPLE TRAPPED!!" and
+    "Fire at Peenya, people trapped" share one fingerprint while "right, now" and "right now"
+    do not. With the local classifier configured, the model sees the raw text, so that is the
+    fingerprint.
+    """
+    if LOCAL_CLASSIFIER is not None:
+        return call_transcript
+    return call_transcript.lower().strip(_FINGERPRINT_STRIP)
+
+
+def get_transcript_cache_stats() -> dict:
+    """
+    Returns the hit/miss/eviction counters and current size of the transcript result cache.
+    """
+    return TRANSCRIPT_RESULT_CACHE.stats()
+
+
+def get_current_hotspots(k: int = 10, incident_type: str = None) -> list:
+    """
+    Returns the k grid cells with the most (decayed) incidents reported at this hour of the
+    week, most active first, optionally restricted to one incident type.
+    """
+    return get_hotspot_model().top_cells(k, incident_type=incident_type)
+
+
+def get_hotspot_model():
+    global HOTSPOT_MODEL
+    if HOTSPOT_MODEL is None:
+        with _hotspot_model_lock:
+            if HOTSPOT_MODEL is None:
+                from hotspot_model import HotspotModel
+                HOTSPOT_MODEL = HotspotModel.open(HOTSPOT_SNAPSHOT_PATH)
+    return HOTSPOT_MODEL
+
+
+def save_hotspot_snapshot() -> None:
+    """
+    Writes the hotspot model to HOTSPOT_SNAPSHOT_PATH (also done at interpreter exit).
+    """
+    if HOTSPOT_SNAPSHOT_PATH and HOTSPOT_MODEL is not None:
+        HOTSPOT_MODEL.snapshot(HOTSPOT_SNAPSHOT_PATH)
+
+
+# atexit rather than a multiprocessing finalizer: pool workers hold partial counts and must
+# not overwrite the parent's snapshot when they exit
+atexit.register(save_hotspot_snapshot)
+
+
 def process_transcript_for_orchestration_and_user_followup(call_transcript: str) -> dict:
     """
     Processes a given emergency call transcript to extract and format critical incident information
@@ -141,15 +333,67 @@ def process_transcript_for_orchestration_and_user_followup(call_transcript: str)
     Returns a dictionary with 'orchestration_json' and 'user_followup_message'.
     This function combines 'Early Classification', 'Severity Assessment', and 'Anomaly Detection'
     with 'Augmentation of Call Centers'.
+    Repeated reports of the same incident are served from a result cache keyed on the
+    transcript fingerprint. Every structured incident is also persisted to the
+    'incident_reports' Firestore collection through the shared write-behind writer.
     """
     if not call_transcript:
         return {
-            "orchestration_json": json.dumps({"status": "error", "message": "No transcript provided.", "incident_source": "Emergency Call NLP Agent"}),
+            "orchestration_json": json.dumps({"status": "error", "message": "No transcript provided.", "incident_source": INCIDENT_SOURCE}),
             "user_followup_message": "I didn't hear anything. Can you please state your emergency?"
         }
+    return process_transcript_record(call_transcript).to_legacy()
+
+
+def process_transcript_record(call_transcript: str) -> IncidentRecord:
+    """
+    process_transcript_for_orchestration_and_user_followup for consumers of the record wire
+    formats (see incident_records): returns the shared IncidentRecord instead of its legacy
+    dict with the nested 'orchestration_json' string. Raises ValueError for an empty transcript.
+    """
+    if not call_transcript:
+        raise ValueError("No transcript provided.")
+    with TRACER.trace("emergency_call"):
+        fingerprint = transcript_fingerprint(call_transcript)
+        record = TRANSCRIPT_RESULT_CACHE.get_or_compute(fingerprint, lambda: _analyze_transcript(call_transcript))
+        with TRACER.span("persist"):
+            _persist_incident_report(record)
+    return record
+
+
+def _persist_incident_report(incident: IncidentRecord, call_id: str = None, record_hotspot: bool = True) -> None:
+    record = incident.orchestration_fields()
+    record["timestamp"] = datetime.datetime.now().isoformat()
+    record["incident_source"] = INCIDENT_SOURCE
+    if call_id is not None:
+        record["call_id"] = call_id
+    METRICS.increment("agent_incidents_total", incident_type=incident.incident_type, severity=incident.severity)
+    if record_hotspot:
+        get_hotspot_model().record_incident(record)
+    try:
+        get_default_writer().write("incident_reports", record)
+    except WriterBackpressure as e:
+        LOG.warning("Incident report not persisted", error=str(e))
+    # Local copy for post-event analysis (see incident_archive), when INCIDENT_ARCHIVE_DIR is set
+    archive = get_default_archive()
+    if archive is not None:
+        archive.append(record, "incident", coordinates=get_hotspot_model().locate(incident.location))
+
 
+def _analyze_transcript(call_transcript: str) -> IncidentRecord:
+    LOG.debug("Analyzing transcript", transcript=call_transcript)
+    with TRACER.span("scan"):
+        hits = _scan_transcript(call_transcript)
+        location = LOCATION_GAZETTEER.resolve(call_transcript)
+    return _analyze_hits(hits, location, call_transcript)
+
+
+def _analyze_hits(hits: frozenset, location: str, call_transcript: str = None) -> IncidentRecord:
+    # With a local classifier model configured, 'call_transcript' is classified by the model as
+    # in classify_incident; the keyword rules remain its fallback
     # Step 1: Extract entities and detect anomalies first to determine context
-    entities_result = extract_entities(call_transcript)
+    with TRACER.span("extract"):
+        entities_result = _entities_from_hits(hits, location)
     location = entities_result.get("location", "Location Unknown")
     description = entities_result.get("description", "Emergency reported")
     anomalies = entities_result.get("anomalies", []) # Get detected anomalies
@@ -161,50 +405,280 @@ def process_transcript_for_orchestration_and_user_followup(call_transcript: str)
         initial_severity_for_classification = "Critical"
 
     # Step 2: Classify the incident, potentially using the bumped severity
-    classification_result = classify_incident(call_transcript, current_severity=initial_severity_for_classification)
+    with TRACER.span("classify"):
+        classification_result = _classify_hits(hits, initial_severity_for_classification)
+        if LOCAL_CLASSIFIER is not None and call_transcript:
+            classification_result = _classify_with_model(call_transcript[:LOCAL_CLASSIFIER_MAX_CALL_CHARS],
+                                                         initial_severity_for_classification, classification_result)
     incident_type = classification_result.get("incident_type", "Unknown")
     severity = classification_result.get("urgency", "Medium") # Use 'severity' as per your desired output
 
-    # Construct the output for the Central Orchestration Agent based on your desired format
-    output_for_orchestration_agent = {
-        "incident_type": incident_type,
-        "location": location,
-        "description": description,
-        "severity": severity, # Use the determined severity
-        "anomalies": anomalies # Include anomalies detected
-    }
-    
     # Step 3: Generate follow-up questions for the user, sensitive to anomalies
-    user_followup_message = generate_follow_up_questions(
-        incident_type=incident_type,
-        location=location,
-        description=description,
-        current_anomalies=anomalies
-    )
+    with TRACER.span("follow_up"):
+        user_followup_message = generate_follow_up_questions(
+            incident_type=incident_type,
+            location=location,
+            description=description,
+            current_anomalies=anomalies
+        )
 
-    # Construct the final response structure
-    return {
-        "orchestration_json": json.dumps(output_for_orchestration_agent),
-        "user_followup_message": user_followup_message
-    }
+    # Construct the final response structure; legacy consumers get the orchestration fields as
+    # a JSON string under 'orchestration_json' (see IncidentRecord.to_legacy)
+    return IncidentRecord(incident_type, location, description, severity, anomalies, user_followup_message)
+
+
+# --- Multi-Turn Calls ---
+# Follow-up answers arrive as separate utterances of the same call. Each turn scans only the
+# new utterance (plus a few characters of the previous one, for phrases split across turns)
+# and merges its keyword hits and place names into the call's session, so the result always
+# equals the transcript tool's analysis of the turns so far joined with spaces (raw text, as the
+# tool reads it), at a per-turn cost independent of call length.
+
+def process_call_turn(call_id: str, utterance: str) -> dict:
+    """
+    Processes the next utterance of an ongoing emergency call identified by 'call_id' and
+    returns the updated analysis of the call so far, in the same format as
+    process_transcript_for_orchestration_and_user_followup plus 'call_id' and 'turn'.
+    Only the new utterance is analyzed; entities, location, classification and anomalies
+    accumulate across turns. The incident report is persisted whenever it changes.
+    """
+    if not call_id:
+        return {
+            "orchestration_json": json.dumps({"status": "error", "message": "No call_id provided.", "incident_source": INCIDENT_SOURCE}),
+            "user_followup_message": "Please stay on the line, we are reconnecting your call."
+        }
+    session = CALL_SESSIONS.get_or_create(call_id)
+    with session.lock, TRACER.trace("call_turn"):
+        result = advance_call_session(session, utterance)
+        if result is None: # Nothing said yet
+            return dict(process_transcript_for_orchestration_and_user_followup(""), call_id=call_id, turn=0)
+        if result != session.reported:
+            with TRACER.span("persist"):
+                record_hotspot = not session.hotspot_recorded and result.incident_type != "Unknown"
+                _persist_incident_report(result, call_id=call_id, record_hotspot=record_hotspot)
+            session.reported = result
+            session.hotspot_recorded = session.hotspot_recorded or record_hotspot
+        turn = session.turns
+    return dict(result.to_legacy(), call_id=call_id, turn=turn)
+
+
+def advance_call_session(session, utterance: str) -> IncidentRecord:
+    """
+    Merges one utterance into a CallSession and returns the call's analysis so far (not
+    persisted), or None while the caller has said nothing. Empty utterances do not count as
+    turns. Callers hold session.lock.
+    """
+    if utterance:
+        LOG.debug("Analyzing call turn", call_id=session.call_id, turn=session.turns + 1, utterance=utterance)
+        session.turns += 1
+        with TRACER.span("scan"):
+            # The turns of a call read as one transcript joined with spaces
+            window = session.keyword_tail + " " + utterance if session.turns > 1 else utterance
+            hits = session.hits | TRANSCRIPT_MATCHER.scan(window)
+            session.keyword_tail = window[-(_MAX_PHRASE_LENGTH - 1):] if _MAX_PHRASE_LENGTH > 1 else ""
+            gazetteer = LOCATION_GAZETTEER.gazetteer
+            alias_window = session.alias_tail + " " + utterance
+            aliases = session.aliases | gazetteer.find_aliases(alias_window)
+            tail_tokens = gazetteer.max_alias_tokens - 1
+            session.alias_tail = " ".join(tokenize(alias_window)[-tail_tokens:]) if tail_tokens > 0 else ""
+        model_text = session.model_text
+        if LOCAL_CLASSIFIER is not None and len(model_text) < LOCAL_CLASSIFIER_MAX_CALL_CHARS:
+            model_text = (model_text + " " + utterance if model_text else utterance)[:LOCAL_CLASSIFIER_MAX_CALL_CHARS]
+        # Most answers add nothing the rules (or the model) react to; the previous analysis then still holds
+        if session.result is None or hits != session.hits or aliases != session.aliases or model_text != session.model_text:
+            session.hits, session.aliases, session.model_text = hits, aliases, model_text
+            session.result = _analyze_hits(hits, gazetteer.resolve_aliases(aliases), model_text)
+    return session.result
+
+
+def end_call(call_id: str):
+    """
+    Closes a multi-turn call's session. Returns its final analysis with 'call_id' and 'turn',
+    or None if the call has no active session.
+    """
+    session = CALL_SESSIONS.end(call_id)
+    if session is None or session.result is None:
+        return None
+    with session.lock:
+        return dict(session.result.to_legacy(), call_id=call_id, turn=session.turns)
+
+
+# --- Batch Processing ---
+# Surges (festivals, stampedes) deliver hundreds of calls a minute. The batch entry point fans
+# chunks of transcripts out to an executor while keeping a bounded number of chunks in flight,
+# and yields results in input order, identical to calling the single-transcript tool.
+
+BATCH_EXECUTORS = ("inline", "thread", "process")
+
+
+def _process_transcript_chunk(transcripts: list) -> list:
+    # Module-level so it can be pickled for the process pool
+    return [process_transcript_for_orchestration_and_user_followup(transcript) for transcript in transcripts]
+
+
+def _chunked(iterable, chunk_size: int):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_process_transcripts(transcripts, executor: str = "inline", chunk_size: int = 16,
+                             max_in_flight: int = 8, max_workers: int = None, cluster: bool = False):
+    """
+    Lazily processes an iterable of call transcripts and yields one result per transcript,
+    in input order. 'executor' is one of 'inline', 'thread' or 'process'; at most
+    'max_in_flight' chunks of 'chunk_size' transcripts are submitted at any time, so
+    memory stays bounded even for an unbounded input stream.
+    With 'cluster', each result also names the incident it reports (see
+    cluster_transcript_result); transcripts are clustered here in input order, whatever the executor.
+    """
+    if executor not in BATCH_EXECUTORS:
+        raise ValueError(f"Unknown executor '{executor}'. Expected one of {BATCH_EXECUTORS}.")
+    if chunk_size < 1 or max_in_flight < 1:
+        raise ValueError("chunk_size and max_in_flight must be at least 1.")
+
+    for chunk, results in _iter_chunk_results(_chunked(transcripts, chunk_size), executor, max_in_flight, max_workers):
+        if cluster:
+            results = [cluster_transcript_result(transcript, result) for transcript, result in zip(chunk, results)]
+        yield from results
+
+
+def _iter_chunk_results(chunks, executor: str, max_in_flight: int, max_workers: int):
+    # Yields (chunk, results) in input order
+    if executor == "inline":
+        for chunk in chunks:
+            yield chunk, _process_transcript_chunk(chunk)
+        return
+
+    pool_class = ThreadPoolExecutor if executor == "thread" else ProcessPoolExecutor
+    with pool_class(max_workers=max_workers) as pool:
+        in_flight = collections.deque()
+        for chunk in chunks:
+            if len(in_flight) >= max_in_flight:
+                done_chunk, future = in_flight.popleft()
+                yield done_chunk, future.result()
+            in_flight.append((chunk, pool.submit(_process_transcript_chunk, chunk)))
+        while in_flight:
+            done_chunk, future = in_flight.popleft()
+            yield done_chunk, future.result()
+
+
+def process_transcripts_batch(transcripts, executor: str = "inline", chunk_size: int = 16,
+                              max_in_flight: int = 8, max_workers: int = None, cluster: bool = False) -> list:
+    """
+    Processes a batch of emergency call transcripts and returns the results as a list in the
+    same order as the input. Each result is exactly what
+    process_transcript_for_orchestration_and_user_followup returns for that transcript (plus
+    'incident_cluster' with 'cluster').
+    See iter_process_transcripts for the executor, chunking and in-flight window options.
+    """
+    return list(iter_process_transcripts(transcripts, executor, chunk_size, max_in_flight, max_workers, cluster))
+
+
+# --- Incident Clustering ---
+# During a major incident dozens of callers report the same thing. Transcripts arriving through
+# handle_transcript (the consumer entry point), and batches processed with cluster=True, are
+# grouped into incidents by INCIDENT_CLUSTERER, so the orchestrator can treat repeated reports
+# as one incident. INCIDENT_CLUSTERING=off disables it for handle_transcript.
+
+INCIDENT_CLUSTERING = os.environ.get("INCIDENT_CLUSTERING", "on").lower() != "off"
+INCIDENT_CLUSTERER = IncidentClusterer()
+_incident_clusterer_lock = threading.Lock()
+
+
+def cluster_transcript_result(call_transcript: str, result, timestamp: float = None):
+    """
+    Adds an analyzed transcript to INCIDENT_CLUSTERER and returns the result with
+    'incident_cluster': {'incident_id', 'is_new', 'report_count', 'severity'}, the severity
+    being the highest reported for the incident so far. Anything but a transcript tool result
+    (an error reply, free text from the LLM) is returned unchanged.
+    """
+    if not call_transcript or not isinstance(result, dict) or "orchestration_json" not in result:
+        return result
+    report = report_from_call_result(call_transcript, result, time.time() if timestamp is None else timestamp)
+    with _incident_clusterer_lock:
+        incident, is_new = INCIDENT_CLUSTERER.add_report(report)
+    return dict(result, incident_cluster={"incident_id": incident["incident_id"], "is_new": is_new,
+                                          "report_count": incident["report_count"], "severity": incident["severity"]})
+
+
+# --- Fast Path ---
+# Transcripts the keyword rules classify unambiguously are answered by calling the tool
+# directly; only unknown or conflicting ones go through Gemini (see fast_path.FastPathRouter).
+
+def transcript_confidence(call_transcript: str) -> float:
+    """
+    How unambiguous the rule-based analysis of a transcript is: 0.0 when no incident type rule
+    fires (the result would be 'Unknown'), 0.4 when several conflicting ones do, otherwise 0.6,
+    plus 0.3 when the gazetteer resolves a location and 0.1 when a description rule fires.
+    """
+    if not call_transcript:
+        return 1.0 # The tool's own "state your emergency" reply needs no LLM
+    hits = _scan_transcript(call_transcript)
+    matched = sum(1 for _, triggers, _ in _INCIDENT_TYPE_RULES if not hits.isdisjoint(triggers))
+    if matched != 1:
+        return 0.0 if not matched else 0.4
+    confidence = 0.6
+    if LOCATION_GAZETTEER.resolve(call_transcript):
+        confidence += 0.3
+    if any(not hits.isdisjoint(triggers) for _, triggers in _DESCRIPTION_RULES):
+        confidence += 0.1
+    return round(confidence, 2)
+
+
+def build_fast_path_router(llm_call=None, threshold: float = FAST_PATH_CONFIDENCE_THRESHOLD) -> FastPathRouter:
+    """
+    Router for call transcripts: confident ones go straight to
+    process_transcript_for_orchestration_and_user_followup, the rest to 'llm_call' (default:
+    this module's root_agent through an in-memory ADK runner).
+    """
+    if llm_call is None:
+        llm_call = adk_agent_call(lambda: sys.modules[__name__].root_agent, app_name="emergency_call_nlp_agent")
+    return FastPathRouter("Emergency_Call_NLP_Agent_Transcript_Mode", process_transcript_for_orchestration_and_user_followup,
+                          transcript_confidence, llm_call, threshold)
+
+
+FAST_PATH_ROUTER = build_fast_path_router()
+
+
+def handle_transcript(call_transcript: str) -> dict:
+    """
+    Entry point for transcripts arriving outside a conversation with the agent, e.g.
+    python pubsub_runtime.py emergency_call_nlp_agent:handle_transcript --argument call_transcript.
+    Answers in the format of process_transcript_for_orchestration_and_user_followup, through
+    FAST_PATH_ROUTER: the tool directly when the rules are confident, otherwise the LLM agent.
+    Results name the incident they report under 'incident_cluster' (see cluster_transcript_result).
+    """
+    result = FAST_PATH_ROUTER(call_transcript)
+    return cluster_transcript_result(call_transcript, result) if INCIDENT_CLUSTERING else result
 
 
 # Define the Agent
-basic_agent = Agent(
-    model='gemini-2.0-flash-001',
-    name='Emergency_Call_NLP_Agent_Transcript_Mode',
-    description='An AI agent that processes emergency call transcripts, performs early incident classification, severity assessment, anomaly detection, and provides structured JSON for the Central Orchestration Agent as well as natural language follow-up questions for the user, augmenting call center operations. It also supports the prediction of potential threats or hotspots by analyzing text streams.',
-    instruction=(
-        'You are the Emergency Call NLP Agent, a key component of the Public Safety system in Bengaluru, Karnataka, India.'
-        'Your primary function is to process raw text transcripts of emergency calls. '
-        'For each transcript, you must perform two critical actions: '
-        '1. **Generate Structured Incident Data for Orchestration:** Automatically categorize the incident (e.g., crime, medical, fire), assess its severity (including recognizing caller urgency for "Critical" priority), detect anomalies (like caller stress), and extract key entities like location and a concise description. This data must be formatted as a JSON string for the Central Orchestration Agent to trigger specific emergency responses. '
-        '2. **Provide User Follow-up Questions:** Craft a concise, natural language response with follow-up questions to gather more specific details from the user, directly supporting human operators in augmenting call centers. If the caller indicates extreme urgency or unwillingness to provide more information (e.g., "right now", "stop asking"), prioritize confirming dispatch and ask only absolutely essential, non-blocking questions. '
-        'Your final output MUST be a JSON object containing two keys: "orchestration_json" (holding the stringified JSON for the orchestration agent) '
-        'and "user_followup_message" (holding the natural language questions for the user). '
-        'Do NOT ask for audio data. Prioritize accuracy, speed, and complete, structured output for both parts.'
-    ),
-    tools=[process_transcript_for_orchestration_and_user_followup],
-)
+# Built on first access to root_agent (see agent_startup.STARTUP_MODE): google.adk dominates
+# import time, and the tools above do not need it.
+def build_agent():
+    from google.adk.agents import Agent
+
+    return Agent(
+        model='gemini-2.0-flash-001',
+        name='Emergency_Call_NLP_Agent_Transcript_Mode',
+        description='An AI agent that processes emergency call transcripts, performs early incident classification, severity assessment, anomaly detection, and provides structured JSON for the Central Orchestration Agent as well as natural language follow-up questions for the user, augmenting call center operations. It also supports the prediction of potential threats or hotspots by analyzing text streams.',
+        instruction=(
+            'You are the Emergency Call NLP Agent, a key component of the Public Safety system in Bengaluru, Karnataka, India.'
+            'Your primary function is to process raw text transcripts of emergency calls. '
+            'For each transcript, you must perform two critical actions: '
+            '1. **Generate Structured Incident Data for Orchestration:** Automatically categorize the incident (e.g., crime, medical, fire), assess its severity (including recognizing caller urgency for "Critical" priority), detect anomalies (like caller stress), and extract key entities like location and a concise description. This data must be formatted as a JSON string for the Central Orchestration Agent to trigger specific emergency responses. '
+            '2. **Provide User Follow-up Questions:** Craft a concise, natural language response with follow-up questions to gather more specific details from the user, directly supporting human operators in augmenting call centers. If the caller indicates extreme urgency or unwillingness to provide more information (e.g., "right now", "stop asking"), prioritize confirming dispatch and ask only absolutely essential, non-blocking questions. '
+            'Your final output MUST be a JSON object containing two keys: "orchestration_json" (holding the stringified JSON for the orchestration agent) '
+            'and "user_followup_message" (holding the natural language questions for the user). '
+            'When the caller answers your follow-up questions, pass each new utterance with the call id to process_call_turn instead of re-sending the whole transcript. '
+            'Do NOT ask for audio data. Prioritize accuracy, speed, and complete, structured output for both parts.'
+        ),
+        tools=[process_transcript_for_orchestration_and_user_followup, process_call_turn],
+    )
+
 
-root_agent = basic_agent
+__getattr__ = lazy_agent(globals(), build_agent)
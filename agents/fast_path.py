@@ -0,0 +1,143 @@
+# fast_path.py
+
+import collections
+import json
+import threading
+import time
+import uuid
+
+from dissemination_engine import run_coroutine_sync
+from instrumentation import get_logger
+
+LOG = get_logger("fast_path")
+FAST_PATH_CONFIDENCE_THRESHOLD = 0.8
+_LATENCY_SAMPLES_PER_PATH = 10_000
+PATHS = ("fast", "llm")
+
+
+class FastPathRouter:
+    """
+    Routes each request either straight to the agent's rule-based tool or through the LLM.
+
+    'confidence(payload)' scores how unambiguous the rule engine's answer is (0.0 - 1.0). At or
+    above 'threshold' the router calls 'fast_tool(payload)' directly, which takes milliseconds;
+    below it (unknown incident type, conflicting rules, missing fields) it escalates to
+    'llm_call(payload)', normally adk_agent_call() for the module's root_agent, or a stub
+    such as StubLLM offline. A fast-path tool that raises also escalates.
+
+    stats() reports the fast-path hit ratio and per-path latency percentiles over recent calls.
+    """
+
+    def __init__(self, name: str, fast_tool, confidence, llm_call, threshold: float = FAST_PATH_CONFIDENCE_THRESHOLD):
+        if not 0.0 <= threshold <= 1.0:
+            raise ValueError("threshold must be between 0 and 1.")
+        self.name = name
+        self.fast_tool = fast_tool
+        self.confidence = confidence
+        self.llm_call = llm_call
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._latencies = {path: collections.deque(maxlen=_LATENCY_SAMPLES_PER_PATH) for path in PATHS}
+        self.counters = {"requests": 0, "fast": 0, "llm": 0, "fast_path_errors": 0}
+
+    def route(self, payload) -> tuple:
+        """
+        Serves one request. Returns (result, path), path being 'fast' or 'llm'.
+        """
+        started = time.perf_counter()
+        if self.confidence(payload) >= self.threshold:
+            try:
+                result = self.fast_tool(payload)
+                self._record("fast", started)
+                return result, "fast"
+            except Exception as e:
+                LOG.warning("Fast path failed; escalating to the LLM", router=self.name, error=f"{e.__class__.__name__}: {e}")
+                with self._lock:
+                    self.counters["fast_path_errors"] += 1
+        result = self.llm_call(payload)
+        self._record("llm", started)
+        return result, "llm"
+
+    def __call__(self, payload):
+        return self.route(payload)[0]
+
+    def _record(self, path: str, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.counters["requests"] += 1
+            self.counters[path] += 1
+            self._latencies[path].append(elapsed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+            latencies = {path: sorted(samples) for path, samples in self._latencies.items()}
+        stats = dict(counters, fast_path_ratio=round(counters["fast"] / counters["requests"], 4) if counters["requests"] else 0.0)
+        for path, samples in latencies.items():
+            stats[f"{path}_p50_seconds"] = round(_percentile(samples, 0.50), 6)
+            stats[f"{path}_p99_seconds"] = round(_percentile(samples, 0.99), 6)
+        return stats
+
+
+def _percentile(sorted_samples: list, fraction: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    return sorted_samples[min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))]
+
+
+# --- LLM Paths ---
+
+def adk_agent_call(get_agent, app_name: str, user_id: str = "fast-path-router"):
+    """
+    Returns a callable(payload) that sends the payload (dicts as JSON) to an ADK agent in a
+    fresh in-memory session and returns the final response, JSON-decoded when possible.
+    'get_agent' is called on first use, so lazily built agents stay unbuilt until needed.
+    """
+    state = {}
+    lock = threading.Lock()
+
+    def runner():
+        with lock:
+            if "runner" not in state:
+                from google.adk.runners import InMemoryRunner
+                state["runner"] = InMemoryRunner(agent=get_agent(), app_name=app_name)
+        return state["runner"]
+
+    async def ask(payload):
+        from google.genai import types
+
+        adk_runner = runner()
+        session = await adk_runner.session_service.create_session(app_name=app_name, user_id=user_id,
+                                                                  session_id=uuid.uuid4().hex)
+        text = payload if isinstance(payload, str) else json.dumps(payload)
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        final = None
+        async for event in adk_runner.run_async(user_id=user_id, session_id=session.id, new_message=message):
+            if event.is_final_response() and event.content and event.content.parts:
+                final = "".join(part.text or "" for part in event.content.parts)
+        try:
+            return json.loads(final) if final else final
+        except json.JSONDecodeError:
+            return final
+
+    return lambda payload: run_coroutine_sync(ask(payload))
+
+
+class StubLLM:
+    """
+    Offline stand-in for the LLM path: waits 'latency_seconds' (a typical Gemini round trip
+    with one tool call) and then answers with 'tool(payload)', as the agent would after
+    calling its tool. Counts calls, so routing can be checked without a model.
+    """
+
+    def __init__(self, tool, latency_seconds: float = 1.0):
+        self.tool = tool
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, payload):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency_seconds)
+        return self.tool(payload)
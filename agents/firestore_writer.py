@@ -0,0 +1,297 @@
+# firestore_writer.py
+
+import itertools
+import multiprocessing.util
+import os
+import queue
+import random
+import threading
+import time
+
+from instrumentation import get_logger
+
+LOG = get_logger("firestore_writer")
+FIRESTORE_MAX_BATCH_WRITES = 500 # Hard limit on writes per batched commit
+
+
+class WriterBackpressure(Exception):
+    """Raised when a record cannot be enqueued because the write-behind queue stays full."""
+
+
+# --- In-Process Firestore Fake ---
+
+class InMemoryFirestore:
+    """
+    Minimal stand-in for google.cloud.firestore.Client covering what the writer and the agents
+    use: collection(name).add(data), collection(name).document(), batch().set()/commit().
+    'commit_latency_seconds' simulates the round trip each commit (or single add) costs, so
+    one-by-one and batched writes can be compared without a network. With
+    'max_documents_per_collection' set, only the newest documents of each collection are kept.
+    """
+
+    def __init__(self, commit_latency_seconds: float = 0.0, max_documents_per_collection: int = None):
+        self.commit_latency_seconds = commit_latency_seconds
+        self.max_documents_per_collection = max_documents_per_collection
+        self.collections = {} # collection name -> {document id: data}
+        self.commits = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def collection(self, name: str) -> "_FakeCollection":
+        return _FakeCollection(self, name)
+
+    def batch(self) -> "_FakeWriteBatch":
+        return _FakeWriteBatch(self)
+
+    def _commit(self, writes: list) -> None:
+        if len(writes) > FIRESTORE_MAX_BATCH_WRITES:
+            raise ValueError(f"A batch may contain at most {FIRESTORE_MAX_BATCH_WRITES} writes.")
+        if self.commit_latency_seconds:
+            time.sleep(self.commit_latency_seconds)
+        with self._lock:
+            for collection_name, document_id, data in writes:
+                documents = self.collections.setdefault(collection_name, {})
+                documents[document_id] = dict(data)
+                if self.max_documents_per_collection and len(documents) > self.max_documents_per_collection:
+                    del documents[next(iter(documents))] # Oldest first
+            self.commits += 1
+
+    def _next_id(self) -> str:
+        return f"doc-{next(self._ids)}"
+
+    def count(self, collection_name: str) -> int:
+        return len(self.collections.get(collection_name, {}))
+
+
+class _FakeDocumentReference:
+    def __init__(self, client: InMemoryFirestore, collection_name: str, document_id: str):
+        self._client = client
+        self._collection_name = collection_name
+        self.id = document_id
+
+    def set(self, data: dict) -> None:
+        self._client._commit([(self._collection_name, self.id, data)])
+
+
+class _FakeCollection:
+    def __init__(self, client: InMemoryFirestore, name: str):
+        self._client = client
+        self._name = name
+
+    def document(self, document_id: str = None) -> _FakeDocumentReference:
+        return _FakeDocumentReference(self._client, self._name, document_id or self._client._next_id())
+
+    def add(self, data: dict) -> tuple:
+        reference = self.document()
+        reference.set(data)
+        return time.time(), reference # Same (update_time, reference) shape as the real client
+
+
+class _FakeWriteBatch:
+    def __init__(self, client: InMemoryFirestore):
+        self._client = client
+        self._writes = []
+
+    def set(self, reference: _FakeDocumentReference, data: dict) -> None:
+        self._writes.append((reference._collection_name, reference.id, data))
+
+    def commit(self) -> None:
+        self._client._commit(self._writes)
+
+
+def default_firestore_client(project: str = None):
+    """
+    Returns a real Firestore client when the library is installed and either a project or the
+    local emulator (FIRESTORE_EMULATOR_HOST, picked up by the client itself) is configured;
+    otherwise an in-process InMemoryFirestore.
+    """
+    project = project or os.environ.get("GOOGLE_CLOUD_PROJECT")
+    # Imported here rather than at module load: the client library and gRPC are a large part
+    # of an agent's cold start, and nothing needs them before the first write
+    try:
+        from google.cloud import firestore
+    except ImportError: # Optional: without it (and in tests) records go to the in-process fake
+        firestore = None
+    if firestore is not None and (project or os.environ.get("FIRESTORE_EMULATOR_HOST")):
+        return firestore.Client(project=project)
+    LOG.info("Firestore not configured; persisting records to an in-process store")
+    return InMemoryFirestore(max_documents_per_collection=10_000)
+
+
+# --- Write-Behind Writer ---
+
+class FirestoreBatchWriter:
+    """
+    Write-behind persistence for agent output. write() only enqueues the record on a bounded
+    queue; a background thread groups queued records into batched commits of up to
+    'max_batch_size' writes, flushing when a batch is full or 'flush_interval_seconds' after
+    its first record arrived, whichever comes first.
+
+    When the queue is full, write() blocks for up to 'enqueue_timeout_seconds' and then raises
+    WriterBackpressure, so a surge slows producers down instead of growing memory without bound.
+    Failed commits are retried with full-jitter backoff up to 'max_attempts' times. close()
+    drains everything still queued before returning. The flush thread starts on first write
+    (and again after a fork), so constructing a writer at import time is free.
+    """
+
+    def __init__(self, client=None, max_batch_size: int = FIRESTORE_MAX_BATCH_WRITES,
+                 flush_interval_seconds: float = 0.25, max_queue_size: int = 10_000,
+                 enqueue_timeout_seconds: float = 1.0, max_attempts: int = 3,
+                 backoff_base_seconds: float = 0.1, backoff_max_seconds: float = 2.0):
+        if not 1 <= max_batch_size <= FIRESTORE_MAX_BATCH_WRITES:
+            raise ValueError(f"max_batch_size must be between 1 and {FIRESTORE_MAX_BATCH_WRITES}.")
+        if max_queue_size < 1 or max_attempts < 1:
+            raise ValueError("max_queue_size and max_attempts must be at least 1.")
+        self._client = client
+        self.max_batch_size = max_batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_queue_size = max_queue_size
+        self.enqueue_timeout_seconds = enqueue_timeout_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._owner_pid = None
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._stats = {"enqueued": 0, "written": 0, "batches": 0, "failed": 0, "rejected": 0, "retries": 0}
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = default_firestore_client()
+        return self._client
+
+    def write(self, collection_name: str, data: dict, document_id: str = None) -> None:
+        """
+        Enqueues one document for the given collection. Raises WriterBackpressure if the queue
+        stays full for 'enqueue_timeout_seconds', and RuntimeError after close().
+        """
+        if self._closed:
+            raise RuntimeError("FirestoreBatchWriter is closed.")
+        self._ensure_started()
+        try:
+            self._queue.put((collection_name, document_id, data), timeout=self.enqueue_timeout_seconds)
+        except queue.Full:
+            self._count("rejected")
+            raise WriterBackpressure(
+                f"Write queue full ({self.max_queue_size} records) for {self.enqueue_timeout_seconds}s; "
+                f"write to '{collection_name}' rejected."
+            ) from None
+        self._count("enqueued")
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Blocks until every record enqueued so far has been committed (or has failed).
+        Returns False if 'timeout' elapsed first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 30.0) -> bool:
+        """
+        Stops accepting writes, drains the queue and stops the flush thread. Returns False if
+        the drain did not finish within 'timeout'.
+        """
+        if self._closed:
+            return True
+        self._closed = True
+        if self._thread is None or self._owner_pid != os.getpid():
+            return True # Nothing was written from this process
+        self._queue.put(None) # Sentinel; queued ahead of it is everything that must be drained
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        return stats
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._owner_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._owner_pid == os.getpid():
+                return
+            if self._owner_pid is not None and self._owner_pid != os.getpid():
+                # Forked child: the parent's thread did not survive, and neither should its queue
+                self._queue = queue.Queue(maxsize=self.max_queue_size)
+            self._owner_pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="firestore-batch-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                self._queue.task_done()
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval_seconds
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    # Once time is up, still take whatever is already queued without waiting
+                    record = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(record)
+            self._commit_with_retry(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _commit_with_retry(self, records: list) -> None:
+        error = None
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                batch = self.client.batch()
+                for collection_name, document_id, data in records:
+                    batch.set(self.client.collection(collection_name).document(document_id), data)
+                batch.commit()
+                self._count("written", len(records))
+                self._count("batches")
+                return
+            except Exception as e: # Any commit failure is retried
+                error = str(e) or e.__class__.__name__
+            if attempt < self.max_attempts:
+                self._count("retries")
+                time.sleep(random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** (attempt - 1))))
+        self._count("failed", len(records))
+        LOG.warning("Failed to commit Firestore writes", writes=len(records), attempts=self.max_attempts, error=str(error))
+
+
+# --- Shared Writer ---
+
+_default_writer = None
+_default_writer_lock = threading.Lock()
+
+
+def get_default_writer() -> FirestoreBatchWriter:
+    """
+    Returns the process-wide writer shared by the agents, drained automatically at exit.
+    """
+    global _default_writer
+    with _default_writer_lock:
+        if _default_writer is None:
+            _default_writer = FirestoreBatchWriter()
+            # Unlike atexit, multiprocessing finalizers also run when a pool worker exits
+            multiprocessing.util.Finalize(_default_writer, _default_writer.close, exitpriority=10)
+        return _default_writer
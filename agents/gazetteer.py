@@ -0,0 +1,215 @@
+# gazetteer.py
+
+import json
+import os
+import string
+import threading
+import time
+
+from agent_startup import load_compiled
+from instrumentation import get_logger
+
+LOG = get_logger("gazetteer")
+_SEPARATORS = str.maketrans({char: " " for char in string.punctuation})
+_TERMINAL = None # Trie key holding the normalized alias that ends at this node
+# An alias's last word also matches when followed by a short suffix ('mg roads', "peenya's")
+_MAX_SUFFIX_LETTERS = 3
+_MIN_STEM_LETTERS = 3
+
+
+def tokenize(text: str) -> list:
+    """
+    Splits text into lowercase tokens on whitespace and punctuation ('Home No. 36' -> ['home', 'no', '36']).
+    """
+    return text.lower().translate(_SEPARATORS).split()
+
+
+# --- Gazetteer Index ---
+
+class Gazetteer:
+    """
+    Token-trie index over a hierarchical gazetteer of Bengaluru places.
+
+    Each entry is a dict with:
+      'id'       - unique identifier
+      'location' - the resolved location string returned to callers
+      'aliases'  - phrases that mention the place (e.g. 'house no 36', 'home no 36')
+      'parent'   - id of the enclosing place, or None for a top-level locality
+
+    When several sibling places are mentioned, the one mentioned by the longest alias wins
+    (most tokens, then most characters); entries listed earlier break ties. A lookup walks
+    the trie from every token of the text, so its cost depends on the text length and the
+    longest alias, not on the number of places in the gazetteer.
+    """
+
+    def __init__(self, entries):
+        self.entries = {}
+        self._trie = {}
+        self._max_alias_tokens = 0
+        # (parent id, alias) -> entry ids, so refinement only looks at aliases actually mentioned
+        self._children = {}
+
+        for priority, entry in enumerate(entries):
+            entry_id = entry["id"]
+            if entry_id in self.entries:
+                raise ValueError(f"Duplicate gazetteer id: {entry_id}")
+            parent = entry.get("parent")
+            self.entries[entry_id] = (priority, entry["location"], parent)
+
+            for alias in entry["aliases"]:
+                alias_tokens = tokenize(alias)
+                if not alias_tokens:
+                    continue
+                alias_key = " ".join(alias_tokens)
+                node = self._trie
+                for token in alias_tokens:
+                    node = node.setdefault(token, {})
+                node[_TERMINAL] = alias_key
+                self._children.setdefault((parent, alias_key), []).append(entry_id)
+                self._max_alias_tokens = max(self._max_alias_tokens, len(alias_tokens))
+
+        for entry_id, (_, _, parent) in self.entries.items():
+            if parent is not None and parent not in self.entries:
+                raise ValueError(f"Gazetteer entry '{entry_id}' refers to unknown parent '{parent}'")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def max_alias_tokens(self) -> int:
+        return self._max_alias_tokens
+
+    @classmethod
+    def from_file(cls, path: str) -> "Gazetteer":
+        """
+        Loads a gazetteer from a JSON file holding a list of entries.
+        """
+        with open(path, encoding="utf-8") as gazetteer_file:
+            return cls(json.load(gazetteer_file))
+
+    def find_aliases(self, text: str) -> set:
+        """
+        Returns every alias that appears in the text, in normalized form. Aliases match whole
+        tokens, except that their last word may carry a suffix of up to three letters
+        ('mg roads', 'peenya's'); numbers must match exactly ('house no 36' not in 'house no 365').
+        """
+        tokens = tokenize(text)
+        trie = self._trie
+        aliases = set()
+        for start in range(len(tokens)):
+            node = trie
+            for token in tokens[start:start + self._max_alias_tokens]:
+                child = node.get(token)
+                if child is None:
+                    child = _inflected_terminal(node, token)
+                    if child is not None:
+                        aliases.add(child[_TERMINAL])
+                    break
+                node = child
+                if _TERMINAL in node:
+                    aliases.add(node[_TERMINAL])
+        return aliases
+
+    def resolve(self, text: str):
+        """
+        Returns the most specific location mentioned in the text, or None.
+        Starts from the top-level place mentioned by the longest alias, then keeps refining
+        into the child mentioned by the longest alias (e.g. Brigade Road -> 10th cross ->
+        home no 36), list order breaking ties. A child is only used when its parent was mentioned.
+        """
+        return self.resolve_aliases(self.find_aliases(text))
+
+    def resolve_aliases(self, aliases) -> str:
+        """
+        resolve() for aliases already found with find_aliases(), e.g. collected over several
+        utterances of one call.
+        """
+        current = None
+        while True:
+            candidates = [
+                (-alias.count(" "), -len(alias), self.entries[entry_id][0], entry_id)
+                for alias in aliases
+                for entry_id in self._children.get((current, alias), ())
+            ]
+            if not candidates:
+                break
+            current = min(candidates)[3]
+        return self.entries[current][1] if current is not None else None
+
+
+def _inflected_terminal(node: dict, token: str):
+    # The trie node of an alias ending in a stem of 'token' followed by only letters, or None
+    for cut in range(1, min(_MAX_SUFFIX_LETTERS, len(token) - _MIN_STEM_LETTERS) + 1):
+        if not token[-cut].isalpha():
+            return None
+        stem = token[:-cut]
+        child = node.get(stem)
+        if child is not None and _TERMINAL in child and stem[-1].isalpha():
+            return child
+    return None
+
+
+# --- Hot Reload ---
+
+class ReloadingGazetteer:
+    """
+    Serves lookups from a Gazetteer loaded from a local JSON file and swaps in a freshly
+    built index when the file changes on disk (checked at most every 'check_interval'
+    seconds). Lookups never block on a reload; if the file cannot be parsed, the previous
+    index stays in service. Without a path, the default entries are served as-is.
+    """
+
+    def __init__(self, path: str = None, default_entries=(), check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._gazetteer = Gazetteer(default_entries)
+        self._loaded_mtime = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        if path:
+            self.reload()
+
+    @property
+    def gazetteer(self) -> Gazetteer:
+        self._maybe_reload()
+        return self._gazetteer
+
+    def resolve(self, text: str):
+        return self.gazetteer.resolve(text)
+
+    def _maybe_reload(self) -> None:
+        if not self.path or time.monotonic() < self._next_check:
+            return
+        if not self._reload_lock.acquire(blocking=False):
+            return # Another thread is already reloading
+        try:
+            self._next_check = time.monotonic() + self.check_interval
+            if os.stat(self.path).st_mtime_ns != self._loaded_mtime:
+                self._load()
+        except OSError as e:
+            LOG.warning("Could not check gazetteer file", path=self.path, error=str(e))
+        finally:
+            self._reload_lock.release()
+
+    def reload(self) -> bool:
+        """
+        Forces a reload from the gazetteer file. Returns True if the new index is in service.
+        """
+        with self._reload_lock:
+            self._next_check = time.monotonic() + self.check_interval
+            return self._load()
+
+    def _load(self) -> bool:
+        try:
+            stat = os.stat(self.path)
+            mtime = stat.st_mtime_ns
+            # A precompiled index of this exact file version is reused when snapshots are enabled
+            gazetteer = load_compiled("gazetteer", (os.path.abspath(self.path), stat.st_size, mtime),
+                                      lambda: Gazetteer.from_file(self.path))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            LOG.warning("Failed to load gazetteer; keeping previous index", path=self.path, error=str(e))
+            return False
+        self._gazetteer = gazetteer
+        self._loaded_mtime = mtime
+        LOG.info("Loaded gazetteer", entries=len(gazetteer), path=self.path)
+        return True
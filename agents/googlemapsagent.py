@@ -1,44 +1,53 @@
 # app/agent.py
 
-from google.adk.agents import Agent
+import asyncio
 import json
 import datetime
+import os
+import sys
+import threading
+
+from agent_startup import lazy_agent, load_compiled, register_component
+from alert_coalescer import AlertCoalescer
+from alert_templates import CHANNEL_FORMATS, AlertTemplateRegistry
+from dissemination_engine import DisseminationEngine
+from fast_path import FAST_PATH_CONFIDENCE_THRESHOLD, FastPathRouter, adk_agent_call
+from firestore_writer import WriterBackpressure, get_default_writer
+from incident_archive import get_default_archive
+from incident_records import AlertRecord
+from instrumentation import METRICS, TRACER, get_logger
+from recipient_registry import RecipientRegistry
+
+LOG = get_logger("googlemapsagent")
+# Subscribed Citizen App devices / SMS numbers by location; handles map to device tokens elsewhere
+RECIPIENT_REGISTRY = RecipientRegistry(cell_size_degrees=0.005)
+# Compiled per (alert type, channel format, language); each variant of an alert is rendered once
+ALERT_TEMPLATES = AlertTemplateRegistry()
+# Merges repeated alerts per (alert type, geofence) and rate limits geofences and channels, so
+# hundreds of reports about one incident do not become hundreds of SMS/push blasts.
+# ALERT_COALESCING=off sends every alert as received.
+ALERT_COALESCING = os.environ.get("ALERT_COALESCING", "on").lower() != "off"
+ALERT_COALESCER = AlertCoalescer()
 
 # --- Internal Tools for the Public Communication & Alert Dissemination Agent ---
 
-def format_alert_message(alert_data: dict) -> str:
+def format_alert_message(alert_data: dict, channel: str = "full", language: str = "en") -> str:
     """
     Formats the raw alert data into a human-readable, actionable message for the public.
+    'channel' picks a format ('full', 'sms', 'push_title', 'push_body', 'display', 'social'),
+    trimmed to that channel's length limit, and 'language' one of 'en', 'kn' or 'hi'.
     """
-    print(f"DEBUG: Formatting alert message for type: {alert_data.get('alert_type')}")
-    
-    alert_type = alert_data.get("alert_type", "Public Safety Alert").upper()
-    severity = alert_data.get("severity", "Medium").upper()
-    location = alert_data.get("location", "Bengaluru").upper()
-    description = alert_data.get("description", "An incident has occurred.").capitalize()
-    recommended_action = alert_data.get("recommended_action", "Please stay informed.").capitalize()
-
-    message = f"[{alert_type} - {severity} ALERT] "
-    
-    if alert_type == "TRAFFIC ADVISORY":
-        message += f"Traffic congestion in {location}. {description}. {recommended_action}."
-    elif alert_type == "EMERGENCY":
-        message += f"Immediate emergency in {location}. {description}. {recommended_action}."
-    elif alert_type == "EVENT UPDATE":
-        message += f"Important update for {location} event. {description}. {recommended_action}."
-    elif alert_type == "CRIME ALERT":
-        message += f"Crime alert in {location}. {description}. {recommended_action}."
-    else:
-        message += f"{description} in {location}. {recommended_action}."
+    LOG.debug("Formatting alert message", alert_type=alert_data.get("alert_type"), channel=channel, language=language)
+    return ALERT_TEMPLATES.render(alert_data, channel, language)
 
-    return message
-
-def determine_channels_and_audience(alert_type: str, severity: str, location: str, target_audience_area: str = "") -> dict:
+def determine_channels_and_audience(alert_type: str, severity: str, location: str, target_audience_area: str = "", geofence_area: dict = None) -> dict:
     """
     Determines relevant communication channels and target audience based on alert type, severity, and location.
     This supports 'Targeted Communication' and 'Multi-Channel Dissemination' [cite: none].
+    An optional geofence_area ({"type": "radius", "center": [lat, lon], "radius_m": m} or
+    {"type": "polygon", "vertices": [[lat, lon], ...]}) targets registered recipients inside it.
     """
-    print(f"DEBUG: Determining channels and audience for {alert_type}, {severity}, {location}.")
+    LOG.debug("Determining channels and audience", alert_type=alert_type, severity=severity, location=location)
     channels = []
     audience_criteria = {"geofence": location, "demographics": "all_citizens"} # Default wide audience
 
@@ -55,6 +64,8 @@ def determine_channels_and_audience(alert_type: str, severity: str, location: st
     # Audience refinement based on location or target_audience_area
     if target_audience_area and target_audience_area != location:
         audience_criteria["geofence"] = target_audience_area # More specific targeting
+    if geofence_area:
+        audience_criteria["geofence_area"] = geofence_area
     
     # Specific channels for certain alert types
     if alert_type == "TRAFFIC ADVISORY":
@@ -66,45 +77,87 @@ def determine_channels_and_audience(alert_type: str, severity: str, location: st
 
     return {"channels": channels, "audience_criteria": audience_criteria}
 
-def disseminate_alert(formatted_message: str, channels: list, audience_criteria: dict) -> dict:
+# --- Channel Senders ---
+# Simulated sends; swap in real SMS/FCM/social/display-board clients (or HttpChannelSender)
+# by building a DisseminationEngine with a different sender table.
+
+def _count_geofenced_recipients(audience_criteria: dict, registry: RecipientRegistry = None):
+    """
+    Streams the registered recipients inside audience_criteria['geofence_area'] one grid cell
+    at a time (where a real sender would hand each batch to the SMS/FCM API) and returns how
+    many there were, or None when the audience is not geofenced.
     """
-    Simulates sending the alert via various communication channels.
+    geofence_area = audience_criteria.get("geofence_area")
+    if not geofence_area:
+        return None
+    recipients = 0
+    for batch in (registry or RECIPIENT_REGISTRY).iter_geofence(geofence_area, batches=True):
+        recipients += len(batch)
+    return recipients
+
+async def _simulate_sms(formatted_message: str, audience_criteria: dict) -> str:
+    # Simulate SMS API call
+    LOG.debug("Sending SMS alert", message=formatted_message, area=audience_criteria.get("geofence", "affected area"))
+    # Off the event loop: a large geofence would otherwise stall the other channels' sends
+    recipients = await asyncio.to_thread(_count_geofenced_recipients, audience_criteria)
+    if recipients is not None:
+        return f"SMS simulated successfully to {recipients} geofenced recipients."
+    return "SMS simulated successfully."
+
+async def _simulate_push_notification(formatted_message: str, audience_criteria: dict) -> str:
+    # Simulate Firebase Cloud Messaging (FCM) call
+    LOG.debug("Sending Push Notification via FCM", message=formatted_message, area=audience_criteria.get("geofence", "Bengaluru"))
+    recipients = await asyncio.to_thread(_count_geofenced_recipients, audience_criteria)
+    if recipients is not None:
+        return f"Push Notification simulated successfully to {recipients} geofenced devices."
+    return "Push Notification simulated successfully."
+
+async def _simulate_social_media(formatted_message: str, audience_criteria: dict) -> str:
+    # Simulate Twitter/Facebook API call
+    LOG.debug("Posting to Social Media", message=formatted_message)
+    return "Social Media post simulated successfully."
+
+async def _simulate_display_boards(formatted_message: str, audience_criteria: dict) -> str:
+    # Simulate interface with public display systems
+    LOG.debug("Updating Public Display Boards", message=formatted_message, area=audience_criteria.get("geofence", "Bengaluru"))
+    return "Public Display Boards update simulated successfully."
+
+async def _simulate_tmc_display(formatted_message: str, audience_criteria: dict) -> str:
+    LOG.debug("Sending to Traffic Management Center Display", message=formatted_message)
+    return "TMC Display update simulated successfully."
+
+# channel -> (label reported in 'channels_used', async sender)
+SIMULATED_CHANNEL_SENDERS = {
+    "SMS": ("SMS", _simulate_sms),
+    "Push Notification (Citizen App)": ("Push Notification", _simulate_push_notification),
+    "Social Media (Twitter/Facebook)": ("Social Media", _simulate_social_media),
+    "Public Display Boards": ("Public Display Boards", _simulate_display_boards),
+    "Traffic Management Center Display": ("Traffic Management Center Display", _simulate_tmc_display),
+}
+
+# Display boards show the latest alert, so re-sending after a timeout cannot show it twice
+DISSEMINATION_ENGINE = DisseminationEngine(SIMULATED_CHANNEL_SENDERS, timeout_seconds=5.0, max_concurrency=8, max_attempts=3,
+                                           idempotent_channels={"Public Display Boards", "Traffic Management Center Display"})
+
+def channel_messages(rendered_messages: dict, channels: list, language: str, formatted_message: str) -> dict:
+    """
+    The text each channel sends, from render_variants output: its own formats in 'language'
+    (a push notification's title and body on two lines), or the full message for a channel
+    without a format of its own.
+    """
+    variants = rendered_messages[language]
+    return {channel: "\n".join(variants[channel_format] for channel_format in CHANNEL_FORMATS[channel])
+            if channel in CHANNEL_FORMATS else formatted_message for channel in channels}
+
+def disseminate_alert(formatted_message, channels: list, audience_criteria: dict, engine: DisseminationEngine = None) -> dict:
+    """
+    Sends the alert via all of its communication channels concurrently. 'formatted_message'
+    is one text for every channel, or a dict of per-channel texts (see channel_messages).
     This is where conceptual calls to FCM, SMS API, Twitter API would go.
+    Returns 'status', 'channels_used', 'details' and per-channel 'channel_latency_ms'.
     """
-    print(f"DEBUG: Simulating dissemination of alert via channels: {channels} to audience: {audience_criteria}")
-    dissemination_status = {"status": "success", "channels_used": [], "details": []}
-
-    for channel in channels:
-        if channel == "SMS":
-            # Simulate SMS API call
-            print(f"INFO: Sending SMS alert: '{formatted_message}' to {audience_criteria.get('geofence', 'affected area')}")
-            dissemination_status["channels_used"].append("SMS")
-            dissemination_status["details"].append("SMS simulated successfully.")
-        elif channel == "Push Notification (Citizen App)":
-            # Simulate Firebase Cloud Messaging (FCM) call
-            print(f"INFO: Sending Push Notification via FCM: '{formatted_message}' to Citizen App users in {audience_criteria.get('geofence', 'Bengaluru')}")
-            dissemination_status["channels_used"].append("Push Notification")
-            dissemination_status["details"].append("Push Notification simulated successfully.")
-        elif channel == "Social Media (Twitter/Facebook)":
-            # Simulate Twitter/Facebook API call
-            print(f"INFO: Posting to Social Media: '{formatted_message}'")
-            dissemination_status["channels_used"].append("Social Media")
-            dissemination_status["details"].append("Social Media post simulated successfully.")
-        elif channel == "Public Display Boards":
-            # Simulate interface with public display systems
-            print(f"INFO: Updating Public Display Boards in {audience_criteria.get('geofence', 'Bengaluru')}: '{formatted_message}'")
-            dissemination_status["channels_used"].append("Public Display Boards")
-            dissemination_status["details"].append("Public Display Boards update simulated successfully.")
-        elif channel == "Traffic Management Center Display":
-            print(f"INFO: Sending to Traffic Management Center Display: '{formatted_message}'")
-            dissemination_status["channels_used"].append("Traffic Management Center Display")
-            dissemination_status["details"].append("TMC Display update simulated successfully.")
-        else:
-            print(f"WARNING: Unknown channel: {channel}. Alert not disseminated via this channel.")
-            dissemination_status["details"].append(f"Failed to disseminate via {channel}.")
-            dissemination_status["status"] = "partial_success" if dissemination_status["status"] == "success" else "failure"
-
-    return dissemination_status
+    LOG.debug("Disseminating alert", channels=channels, audience_criteria=audience_criteria)
+    return (engine or DISSEMINATION_ENGINE).disseminate(formatted_message, channels, audience_criteria)
 
 # --- Main Processing Function for the Agent ---
 def disseminate_public_alert(alert_input: dict) -> str:
@@ -112,74 +165,327 @@ def disseminate_public_alert(alert_input: dict) -> str:
     Disseminates public safety alerts and advisories to citizens via multiple channels.
     This agent enables 'Targeted Communication', 'Multi-Channel Dissemination',
     and 'Proactive Public Guidance' [cite: none].
+    Repeats of an alert already sent for the same geofence are coalesced instead of being sent
+    again (unless they raise its severity), and sends are rate limited per geofence and channel;
+    suppressed alerts report dissemination_status 'coalesced' or 'rate_limited'.
     """
-    print(f"DEBUG: Receiving alert input for dissemination: {json.dumps(alert_input)}")
-
     # Validate essential input parameters
-    required_params = ["alert_type", "severity", "location", "description", "recommended_action"]
-    if not all(param in alert_input for param in required_params):
+    if not all(param in alert_input for param in ALERT_REQUIRED_PARAMS):
         return json.dumps({"status": "error", "message": "Missing required alert parameters.", "received_input": alert_input})
+    with TRACER.trace("alert_dissemination"):
+        record = _disseminate_public_alert(alert_input)
+        with TRACER.span("encode"):
+            return record.to_legacy()
+
+
+def disseminate_alert_record(alert_input: dict) -> AlertRecord:
+    """
+    disseminate_public_alert for consumers of the record wire formats (see incident_records):
+    returns the AlertRecord instead of its legacy JSON string. Raises ValueError when required
+    alert parameters are missing.
+    """
+    with TRACER.trace("alert_dissemination"):
+        return _disseminate_public_alert(alert_input)
+
+
+def _disseminate_public_alert(alert_input: dict) -> AlertRecord:
+    LOG.debug("Receiving alert input for dissemination", alert_input=alert_input) # Serialized only if emitted
+    missing = [param for param in ALERT_REQUIRED_PARAMS if param not in alert_input]
+    if missing:
+        raise ValueError(f"Missing required alert parameters: {', '.join(missing)}.")
+
+    # Merge with alerts already sent for this geofence, escalating to the highest severity seen
+    geofence = geofence_key(alert_input)
+    if ALERT_COALESCING:
+        with TRACER.span("coalesce"):
+            decision = ALERT_COALESCER.admit(alert_input["alert_type"], alert_input["severity"], geofence)
+    else:
+        decision = {"action": "send", "severity": alert_input["severity"], "escalated": False, "merged": 1}
+    if decision["action"] != "send":
+        return _suppressed_alert_output(alert_input, decision["action"], decision)
+    received_input = alert_input
+    if decision["severity"] != alert_input["severity"]:
+        alert_input = dict(alert_input, severity=decision["severity"])
 
     # 1. Format the alert message
-    formatted_message = format_alert_message(alert_input)
+    with TRACER.span("format"):
+        formatted_message = format_alert_message(alert_input)
 
     # 2. Determine appropriate channels and audience
-    channels_audience = determine_channels_and_audience(
-        alert_input["alert_type"],
-        alert_input["severity"],
-        alert_input["location"],
-        alert_input.get("target_audience_area", "")
-    )
-    channels = channels_audience["channels"]
+    with TRACER.span("channels"):
+        channels_audience = determine_channels_and_audience(
+            alert_input["alert_type"],
+            alert_input["severity"],
+            alert_input["location"],
+            alert_input.get("target_audience_area", ""),
+            alert_input.get("geofence_area")
+        )
+    channels, rate_limited_channels = channels_audience["channels"], []
+    if ALERT_COALESCING:
+        channels, rate_limited_channels = ALERT_COALESCER.allow_channels(channels)
     audience_criteria = channels_audience["audience_criteria"]
+    if not channels:
+        ALERT_COALESCER.release(alert_input["alert_type"], geofence)
+        return _suppressed_alert_output(alert_input, "rate_limited", decision, rate_limited_channels)
 
-    # 3. Disseminate the alert
-    dissemination_result = disseminate_alert(formatted_message, channels, audience_criteria)
+    # 3. Render each channel's format (within its length limit), then disseminate the alert
+    languages = alert_input.get("languages") or ("en",)
+    with TRACER.span("render_variants"):
+        rendered_messages = ALERT_TEMPLATES.render_variants(alert_input, channels, languages)
+    with TRACER.span("send"):
+        dissemination_result = disseminate_alert(channel_messages(rendered_messages, channels, languages[0], formatted_message),
+                                                 channels, audience_criteria)
+    METRICS.increment("agent_alerts_total", severity=alert_input["severity"], status=dissemination_result["status"])
 
     # Construct the final output for confirmation/logging
-    final_output = {
-        "timestamp": datetime.datetime.now().isoformat(),
-        "original_alert_input": alert_input,
-        "formatted_alert_message": formatted_message,
-        "dissemination_status": dissemination_result["status"],
-        "channels_used": dissemination_result["channels_used"],
-        "dissemination_details": dissemination_result["details"],
-        "target_audience_criteria": audience_criteria,
-        "source_agent": "Public Communication & Alert Dissemination Agent"
-    }
-
-    # --- Conceptual Firestore Write (for Audit/Logging) ---
-    # This agent would log its dissemination actions to a 'dissemination_logs' collection.
-    # db = firestore.Client(project="YOUR_GCP_PROJECT_ID")
-    # doc_ref = db.collection("dissemination_logs").add(final_output)
-    # print(f"INFO: Wrote dissemination log to Firestore: {doc_ref.id}")
-    print(f"DEBUG: Simulating Firestore write to 'dissemination_logs' collection: {json.dumps(final_output)}")
-
-    return json.dumps(final_output)
+    record = AlertRecord(
+        timestamp=datetime.datetime.now().isoformat(),
+        alert_input=received_input,
+        dissemination_status=dissemination_result["status"],
+        channels_used=dissemination_result["channels_used"],
+        rate_limited_channels=rate_limited_channels,
+        formatted_alert_message=formatted_message,
+        rendered_messages=rendered_messages,
+        dissemination_details=dissemination_result["details"],
+        channel_latency_ms=dissemination_result["channel_latency_ms"],
+        escalated=decision["escalated"],
+        target_audience_criteria=audience_criteria
+    )
+
+    # --- Firestore Write (for Audit/Logging) ---
+    # Dissemination actions are logged to the 'dissemination_logs' collection. The write-behind
+    # writer batches them into commits in the background, so the alert path never waits on Firestore.
+    with TRACER.span("persist"):
+        _persist_dissemination_log(record)
+    return record
+
+
+def _persist_dissemination_log(record: AlertRecord) -> None:
+    log_record = record.to_dict()
+    try:
+        get_default_writer().write("dissemination_logs", log_record)
+        LOG.debug("Queued Firestore write", collection="dissemination_logs", record=log_record)
+    except WriterBackpressure as e:
+        LOG.warning("Dissemination log not persisted", error=str(e))
+    # Local copy for post-event analysis (see incident_archive), when INCIDENT_ARCHIVE_DIR is set
+    archive = get_default_archive()
+    if archive is not None:
+        archive.append(log_record, "alert", coordinates=_alert_coordinates(record.alert_input))
+
+
+def _alert_coordinates(alert_input: dict):
+    geofence_area = alert_input.get("geofence_area") or {}
+    if geofence_area.get("type") == "radius":
+        return tuple(geofence_area["center"])
+    if geofence_area.get("type") == "polygon" and geofence_area.get("vertices"):
+        vertices = geofence_area["vertices"]
+        return sum(lat for lat, _ in vertices) / len(vertices), sum(lon for _, lon in vertices) / len(vertices)
+    return None
+
+
+def geofence_key(alert_input: dict) -> str:
+    """
+    The area an alert targets, as used for coalescing: its geofence_area, else its
+    target_audience_area, else its location.
+    """
+    geofence_area = alert_input.get("geofence_area")
+    if geofence_area:
+        return json.dumps(geofence_area, sort_keys=True)
+    return (alert_input.get("target_audience_area") or alert_input["location"]).strip().lower()
+
+
+def _suppressed_alert_output(alert_input: dict, status: str, decision: dict, rate_limited_channels: list = ()) -> AlertRecord:
+    METRICS.increment("agent_alerts_suppressed_total", reason=status)
+    LOG.debug("Alert suppressed", status=status, alert_type=alert_input["alert_type"], merged=decision["merged"])
+    record = AlertRecord(
+        timestamp=datetime.datetime.now().isoformat(),
+        alert_input=alert_input,
+        dissemination_status=status,
+        channels_used=[],
+        rate_limited_channels=list(rate_limited_channels),
+        coalesced_alert_count=decision["merged"], # Alerts merged into this (alert type, geofence) window
+        window_severity=decision["severity"]
+    )
+    _persist_dissemination_log(record)
+    return record
+
+
+def get_alert_coalescing_stats() -> dict:
+    """
+    Returns how many alerts were sent, escalated, coalesced and rate limited.
+    """
+    return ALERT_COALESCER.stats()
+
+
+# --- Vehicle Routing ---
+# Drive times come from a local road graph (road_router) built from the OSM extract at
+# ROAD_GRAPH_PATH, so choosing among hundreds of candidate units needs no directions API call.
+# The graph is built (or loaded from its AGENT_TABLE_SNAPSHOT_DIR snapshot) on a background
+# thread at startup and gates readiness; without ROAD_GRAPH_PATH the agent has no routing tools.
+
+ROAD_GRAPH_PATH = os.environ.get("ROAD_GRAPH_PATH")
+ROUTING_ENGINE = None
+_routing_engine_ready = threading.Event()
+_routing_engine_error = None
+
+
+def _build_routing_engine() -> None:
+    global ROUTING_ENGINE, _routing_engine_error
+    try:
+        from road_router import RoadGraph, RoutingEngine
+
+        extract = os.stat(ROAD_GRAPH_PATH)
+        graph = load_compiled("road_graph", (ROAD_GRAPH_PATH, extract.st_size, extract.st_mtime),
+                              lambda: RoadGraph.from_osm(ROAD_GRAPH_PATH))
+        ROUTING_ENGINE = RoutingEngine(graph)
+    except Exception as e: # Reported by every routing tool call rather than failing the import
+        _routing_engine_error = e
+        LOG.warning("Road graph unavailable; vehicle routing disabled", path=ROAD_GRAPH_PATH, error=str(e))
+    finally:
+        _routing_engine_ready.set()
+
+
+if ROAD_GRAPH_PATH:
+    register_component("road_graph")
+    threading.Thread(target=_build_routing_engine, name="road-graph", daemon=True).start()
+
+
+def get_routing_engine():
+    """
+    The shared RoutingEngine, built at startup; waits for the build if it is still running.
+    Raises ValueError if ROAD_GRAPH_PATH is not set or the graph could not be built.
+    """
+    if not ROAD_GRAPH_PATH:
+        raise ValueError("Vehicle routing needs ROAD_GRAPH_PATH (an OSM extract of the road network).")
+    _routing_engine_ready.wait()
+    if ROUTING_ENGINE is None:
+        raise ValueError(f"Road graph at ROAD_GRAPH_PATH could not be built: {_routing_engine_error}")
+    return ROUTING_ENGINE
+
+
+def update_unit_position(unit_id: str, lat: float, lon: float, available: bool = True, kind: str = None) -> bool:
+    """
+    Records a response unit's position and availability (from its GPS feed or dispatch status).
+    """
+    return get_routing_engine().update_unit(unit_id, lat, lon, available, kind)
+
+
+def find_nearest_units(lat: float, lon: float, k: int = 3, kind: str = None) -> list:
+    """
+    The k available units (optionally only of one kind, e.g. 'ambulance') that can reach the
+    incident at (lat, lon) soonest under current road conditions, with their drive times.
+    """
+    with TRACER.span("nearest_units"):
+        return get_routing_engine().nearest_units(lat, lon, k, kind)
+
+
+def plan_route(from_lat: float, from_lon: float, to_lat: float, to_lon: float) -> dict:
+    """
+    Fastest route between two points as {'eta_seconds', 'distance_meters', 'path'} for
+    plotting, or None when blockages cut the destination off.
+    """
+    return get_routing_engine().route(from_lat, from_lon, to_lat, to_lon)
+
+
+def report_road_blockage(lat: float, lon: float, radius_meters: float = 50.0, factor: float = None) -> int:
+    """
+    Closes the roads around a reported blockage (or slows them by 'factor', e.g. 3.0 for heavy
+    congestion; 1.0 reopens them) for all subsequent routing. Returns the number of road
+    segments changed.
+    """
+    changed = get_routing_engine().block_area(lat, lon, radius_meters, float("inf") if factor is None else factor)
+    METRICS.increment("road_blockage_updates_total")
+    LOG.info("Road conditions updated", lat=lat, lon=lon, radius_meters=radius_meters, factor=factor, edges=changed)
+    return changed
+
+
+# --- Fast Path ---
+# Well-formed alerts are disseminated by calling the tool directly; only malformed or unusual
+# ones go through Gemini (see fast_path.FastPathRouter).
+
+ALERT_TYPES = ("TRAFFIC ADVISORY", "EMERGENCY", "EVENT UPDATE", "CRIME ALERT")
+ALERT_SEVERITIES = ("CRITICAL", "HIGH", "MEDIUM", "LOW")
+ALERT_REQUIRED_PARAMS = ("alert_type", "severity", "location", "description", "recommended_action")
+
+
+def alert_confidence(alert_input) -> float:
+    """
+    How safely disseminate_public_alert can handle an alert without the LLM: 0.0 when it is not
+    a dict or misses required parameters, otherwise 0.6, plus 0.3 when the severity is one
+    the channel rules recognise exactly and 0.1 when the alert type has its own message format.
+    """
+    if not isinstance(alert_input, dict) or not all(alert_input.get(param) for param in ALERT_REQUIRED_PARAMS):
+        return 0.0
+    confidence = 0.6
+    if alert_input["severity"] in ALERT_SEVERITIES:
+        confidence += 0.3
+    if alert_input["alert_type"] in ALERT_TYPES:
+        confidence += 0.1
+    return round(confidence, 2)
+
+
+def build_fast_path_router(llm_call=None, threshold: float = FAST_PATH_CONFIDENCE_THRESHOLD) -> FastPathRouter:
+    """
+    Router for alert inputs: confident ones go straight to disseminate_public_alert, the rest to
+    'llm_call' (default: this module's root_agent through an in-memory ADK runner).
+    """
+    if llm_call is None:
+        llm_call = adk_agent_call(lambda: sys.modules[__name__].root_agent, app_name="googlemapsagent")
+    return FastPathRouter("Public_Communication_Alert_Dissemination_Agent", disseminate_public_alert,
+                          alert_confidence, llm_call, threshold)
+
+
+FAST_PATH_ROUTER = build_fast_path_router()
+
+
+def handle_alert(alert_input):
+    """
+    Entry point for alerts arriving outside a conversation with the agent, e.g.
+    python pubsub_runtime.py googlemapsagent:handle_alert. Answers like disseminate_public_alert,
+    through FAST_PATH_ROUTER: the tool directly for well-formed alerts, otherwise the LLM agent.
+    """
+    return FAST_PATH_ROUTER(alert_input)
 
 
 # --- Agent Definition ---
-basic_agent = Agent(
-    model='gemini-2.0-flash-001',
-    name='Public_Communication_Alert_Dissemination_Agent',
-    description=(
-        'An AI agent responsible for disseminating public safety alerts and advisories to citizens '
-        'via multiple channels. It ensures **Targeted Communication**, **Multi-Channel Dissemination**, '
-        'and **Proactive Public Guidance** [cite: none]. It receives critical alerts and advisories '
-        'from other Public Safety Agents (e.g., Central Orchestration Agent, Traffic Management Agent) '
-        'and translates them into actionable public messages, simulating delivery via SMS, push notifications '
-        '(Firebase Cloud Messaging), social media, and public displays.'
-    ),
-    instruction=(
-        'You are the Public Communication & Alert Dissemination Agent. Your role is to receive structured '
-        'alert inputs (e.g., incident type, severity, location, description, recommended action) from other agents. '
-        'You must format this information into a clear, concise public alert message. '
-        'Then, determine the most effective communication channels and target audience based on the alert\'s '
-        'severity and location. Finally, simulate the dissemination of this alert through the identified channels. '
-        'Your final output MUST be a structured JSON string confirming the alert dissemination status, '
-        'the message sent, and the channels used. Do NOT ask for additional information; your processing is based on the given input.'
-    ),
-    tools=[disseminate_public_alert], # The main tool for this agent
+# Built on first access to root_agent, so google.adk stays out of the cold start (see agent_startup)
+ROUTING_INSTRUCTION = (
+    'When asked which response units should go to an incident, use find_nearest_units (drive times under current road conditions) '
+    'and plan_route for the route to plot; record unit positions with update_unit_position and reported blockages or '
+    'congestion with report_road_blockage so later answers account for them.'
 )
 
-root_agent = basic_agent
+
+def build_agent():
+    from google.adk.agents import Agent
+
+    # Routing tools only when a road graph is configured; otherwise every call would fail
+    routing_tools = [find_nearest_units, plan_route, update_unit_position, report_road_blockage] if ROAD_GRAPH_PATH else []
+
+    return Agent(
+        model='gemini-2.0-flash-001',
+        name='Public_Communication_Alert_Dissemination_Agent',
+        description=(
+            'An AI agent responsible for disseminating public safety alerts and advisories to citizens '
+            'via multiple channels. It ensures **Targeted Communication**, **Multi-Channel Dissemination**, '
+            'and **Proactive Public Guidance** [cite: none]. It receives critical alerts and advisories '
+            'from other Public Safety Agents (e.g., Central Orchestration Agent, Traffic Management Agent) '
+            'and translates them into actionable public messages, simulating delivery via SMS, push notifications '
+            '(Firebase Cloud Messaging), social media, and public displays.'
+        ),
+        instruction=(
+            'You are the Public Communication & Alert Dissemination Agent. Your role is to receive structured '
+            'alert inputs (e.g., incident type, severity, location, description, recommended action) from other agents. '
+            'You must format this information into a clear, concise public alert message. '
+            'Then, determine the most effective communication channels and target audience based on the alert\'s '
+            'severity and location. Finally, simulate the dissemination of this alert through the identified channels. '
+            'Your final output MUST be a structured JSON string confirming the alert dissemination status, '
+            'the message sent, and the channels used. Do NOT ask for additional information; your processing is based on the given input. '
+            + (ROUTING_INSTRUCTION if routing_tools else '')
+        ),
+        tools=[disseminate_public_alert, # The main tool for this agent
+               *routing_tools],
+    )
+
+
+__getattr__ = lazy_agent(globals(), build_agent)
@@ -0,0 +1,258 @@
+# hotspot_model.py
+
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+from instrumentation import get_logger
+from risk_grid import DEFAULT_LOCATIONS
+
+LOG = get_logger("hotspot_model")
+HOURS_PER_WEEK = 168
+INCIDENT_TYPES = ("Fire", "Medical Emergency", "Crime", "Unknown")
+# Bengaluru urban area, (south, west, north, east)
+DEFAULT_BOUNDS = (12.80, 77.40, 13.20, 77.85)
+IST_UTC_OFFSET_SECONDS = 5.5 * 3600
+_RESCALE_HALF_LIVES = 40 # Fold the decay into the arrays once weights reach 2**40
+_SNAPSHOT_FILES = ("counts.npy", "totals.npy", "meta.json")
+
+
+def hour_of_week(timestamp: float, utc_offset_seconds: float = IST_UTC_OFFSET_SECONDS) -> int:
+    """
+    Hour of the week (0 = Monday 00:00-01:00 local time) of a Unix timestamp.
+    """
+    hours = int((timestamp + utc_offset_seconds) // 3600)
+    return ((hours // 24 + 3) % 7) * 24 + hours % 24 # 1970-01-01 was a Thursday
+
+
+class HotspotModel:
+    """
+    Online hotspot model fed by the incidents the agents classify.
+
+    Keeps exponentially decayed incident counts per (grid cell, incident type, hour of week)
+    in a float32 array, plus per (hour of week, cell) totals across types, so that
+    "where is risk highest right now" is a partial sort of one contiguous row rather than a
+    rescan of past incidents. An incident's weight halves every 'half_life_seconds'.
+
+    Decay is never applied on update: each incident adds 2**((t - epoch) / half_life) and
+    queries scale the result back by 2**(-(now - epoch) / half_life), so an update is O(1).
+    When weights grow too large the scale is folded into the arrays and the epoch moves.
+
+    snapshot() writes the arrays as .npy files and load() memory-maps them copy-on-write,
+    so a restarted agent answers from the saved counts at once while pages fault in lazily.
+    """
+
+    def __init__(self, bounds: tuple = DEFAULT_BOUNDS, cell_size_degrees: float = 0.005,
+                 incident_types: tuple = INCIDENT_TYPES, half_life_seconds: float = 14 * 86400.0,
+                 utc_offset_seconds: float = IST_UTC_OFFSET_SECONDS, epoch: float = None,
+                 _counts=None, _totals=None):
+        south, west, north, east = bounds
+        if north <= south or east <= west or cell_size_degrees <= 0 or half_life_seconds <= 0:
+            raise ValueError("bounds must be (south, west, north, east) with positive extent; "
+                             "cell_size_degrees and half_life_seconds must be positive.")
+        self.bounds = tuple(bounds)
+        self.cell_size_degrees = cell_size_degrees
+        self.rows = math.ceil((north - south) / cell_size_degrees)
+        self.cols = math.ceil((east - west) / cell_size_degrees)
+        self.incident_types = tuple(incident_types)
+        self.half_life_seconds = half_life_seconds
+        self.utc_offset_seconds = utc_offset_seconds
+        self.epoch = time.time() if epoch is None else epoch
+        self._type_index = {incident_type: index for index, incident_type in enumerate(self.incident_types)}
+        self._fallback_type = self._type_index.get("Unknown", len(self.incident_types) - 1)
+        cells = self.rows * self.cols
+        self._counts = np.zeros((cells, len(self.incident_types), HOURS_PER_WEEK), dtype=np.float32) if _counts is None else _counts
+        self._totals = np.zeros((HOURS_PER_WEEK, cells), dtype=np.float32) if _totals is None else _totals
+        self._location_cache = {}
+        self._lock = threading.Lock()
+        self.updates = 0
+        self.skipped = 0
+
+    # --- Updates ---
+
+    def cell_of(self, lat: float, lon: float) -> int:
+        """
+        Grid cell index of a coordinate, or -1 outside the model's bounds.
+        """
+        row = int((lat - self.bounds[0]) // self.cell_size_degrees)
+        col = int((lon - self.bounds[1]) // self.cell_size_degrees)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row * self.cols + col
+        return -1
+
+    def cell_center(self, cell: int) -> tuple:
+        row, col = divmod(int(cell), self.cols)
+        return (self.bounds[0] + (row + 0.5) * self.cell_size_degrees,
+                self.bounds[1] + (col + 0.5) * self.cell_size_degrees)
+
+    def update(self, lat: float, lon: float, incident_type: str, timestamp: float = None) -> bool:
+        """
+        Counts one incident. Returns False (and counts it as skipped) when it lies outside the bounds.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        cell = self.cell_of(lat, lon)
+        if cell < 0:
+            self.skipped += 1
+            return False
+        type_index = self._type_index.get(incident_type, self._fallback_type)
+        how = hour_of_week(timestamp, self.utc_offset_seconds)
+        with self._lock:
+            if timestamp - self.epoch > _RESCALE_HALF_LIVES * self.half_life_seconds:
+                self._rescale(timestamp)
+            weight = 2.0 ** ((timestamp - self.epoch) / self.half_life_seconds)
+            self._counts[cell, type_index, how] += weight
+            self._totals[how, cell] += weight
+            self.updates += 1
+        return True
+
+    def update_batch(self, lats, lons, incident_types, timestamps) -> int:
+        """
+        Counts a batch of incidents given as equal-length sequences (incident_types as names or
+        type indices). Returns how many fell inside the bounds.
+        """
+        lats, lons = np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        types = np.asarray(incident_types)
+        if types.dtype.kind in ("U", "S", "O"):
+            types = np.array([self._type_index.get(name, self._fallback_type) for name in types.tolist()], dtype=np.intp)
+        rows = np.floor((lats - self.bounds[0]) / self.cell_size_degrees).astype(np.intp)
+        cols = np.floor((lons - self.bounds[1]) / self.cell_size_degrees).astype(np.intp)
+        inside = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+        cells = (rows * self.cols + cols)[inside]
+        types, timestamps = types[inside].astype(np.intp), timestamps[inside]
+        hours = np.floor((timestamps + self.utc_offset_seconds) / 3600).astype(np.int64)
+        hows = ((hours // 24 + 3) % 7) * 24 + hours % 24
+        with self._lock:
+            if len(timestamps) and timestamps.max() - self.epoch > _RESCALE_HALF_LIVES * self.half_life_seconds:
+                self._rescale(float(timestamps.max()))
+            weights = np.exp2((timestamps - self.epoch) / self.half_life_seconds).astype(np.float32)
+            np.add.at(self._counts, (cells, types, hows), weights)
+            np.add.at(self._totals, (hows, cells), weights)
+            self.updates += len(cells)
+        self.skipped += int(len(inside) - len(cells))
+        return len(cells)
+
+    def record_incident(self, incident: dict, timestamp: float = None) -> bool:
+        """
+        Counts a structured incident from the Emergency Call NLP Agent ('incident_type' plus
+        'coordinates' or a resolved 'location' string matching a known locality).
+        """
+        coordinates = incident.get("coordinates") or self.locate(incident.get("location") or "")
+        if coordinates is None:
+            self.skipped += 1
+            return False
+        return self.update(coordinates[0], coordinates[1], incident.get("incident_type", "Unknown"), timestamp)
+
+    def locate(self, location: str):
+        """
+        Coordinates of a resolved location string ('MG Road, Bengaluru, Karnataka, India'), or None.
+        """
+        coordinates = self._location_cache.get(location, False)
+        if coordinates is False:
+            text = location.casefold()
+            coordinates = next(((known["lat"], known["lon"]) for known in DEFAULT_LOCATIONS
+                                if known["name"].split(",")[0].casefold() in text), None)
+            self._location_cache[location] = coordinates
+        return coordinates
+
+    def _rescale(self, new_epoch: float) -> None:
+        # Folds the decay up to new_epoch into the stored weights
+        factor = np.float32(2.0 ** (-(new_epoch - self.epoch) / self.half_life_seconds))
+        self._counts *= factor
+        self._totals *= factor
+        self.epoch = new_epoch
+
+    # --- Queries ---
+
+    def top_cells(self, k: int = 10, at: float = None, incident_type: str = None) -> list:
+        """
+        The k cells with the highest decayed incident counts for the hour of week of 'at'
+        (default now), optionally for one incident type, most risky first. Each result has the
+        cell index, its center 'lat'/'lon', the decayed 'score' and a per-type breakdown.
+        """
+        at = time.time() if at is None else at
+        how = hour_of_week(at, self.utc_offset_seconds)
+        scale = 2.0 ** (-(at - self.epoch) / self.half_life_seconds)
+        row = self._totals[how] if incident_type is None else self._counts[:, self._type_index[incident_type], how]
+        k = min(k, row.size)
+        if k < 1:
+            return []
+        candidates = np.argpartition(row, -k)[-k:]
+        ordered = candidates[np.argsort(row[candidates])[::-1]]
+        results = []
+        for cell in ordered:
+            if row[cell] <= 0:
+                break
+            lat, lon = self.cell_center(cell)
+            breakdown = self._counts[cell, :, how]
+            results.append({
+                "cell": int(cell),
+                "lat": round(lat, 6),
+                "lon": round(lon, 6),
+                "score": float(row[cell]) * scale,
+                "by_type": {name: float(value) * scale for name, value in zip(self.incident_types, breakdown) if value > 0},
+            })
+        return results
+
+    def cell_score(self, lat: float, lon: float, at: float = None, incident_type: str = None) -> float:
+        at = time.time() if at is None else at
+        cell = self.cell_of(lat, lon)
+        if cell < 0:
+            return 0.0
+        how = hour_of_week(at, self.utc_offset_seconds)
+        value = self._totals[how, cell] if incident_type is None else self._counts[cell, self._type_index[incident_type], how]
+        return float(value) * 2.0 ** (-(at - self.epoch) / self.half_life_seconds)
+
+    # --- Snapshots ---
+
+    def snapshot(self, directory: str) -> None:
+        """
+        Writes the model to 'directory' (counts.npy, totals.npy, meta.json). Files are written
+        under temporary names and renamed, so a crash mid-snapshot leaves the previous one intact.
+        """
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            meta = {
+                "bounds": self.bounds, "cell_size_degrees": self.cell_size_degrees,
+                "incident_types": self.incident_types, "half_life_seconds": self.half_life_seconds,
+                "utc_offset_seconds": self.utc_offset_seconds, "epoch": self.epoch, "updates": self.updates,
+            }
+            for name, array in (("counts.npy", self._counts), ("totals.npy", self._totals)):
+                with open(os.path.join(directory, name + ".tmp"), "wb") as f:
+                    np.save(f, array)
+        with open(os.path.join(directory, "meta.json.tmp"), "w") as f:
+            json.dump(meta, f)
+        for name in _SNAPSHOT_FILES:
+            os.replace(os.path.join(directory, name + ".tmp"), os.path.join(directory, name))
+
+    @classmethod
+    def load(cls, directory: str) -> "HotspotModel":
+        """
+        Opens a snapshot written by snapshot(). The arrays are memory-mapped copy-on-write:
+        updates stay in this process until the next snapshot() and never touch the files.
+        """
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        model = cls(bounds=tuple(meta["bounds"]), cell_size_degrees=meta["cell_size_degrees"],
+                    incident_types=tuple(meta["incident_types"]), half_life_seconds=meta["half_life_seconds"],
+                    utc_offset_seconds=meta["utc_offset_seconds"], epoch=meta["epoch"],
+                    _counts=np.load(os.path.join(directory, "counts.npy"), mmap_mode="c"),
+                    _totals=np.load(os.path.join(directory, "totals.npy"), mmap_mode="c"))
+        if model._counts.shape != (model.rows * model.cols, len(model.incident_types), HOURS_PER_WEEK):
+            raise ValueError(f"Hotspot snapshot in {directory} does not match its metadata.")
+        model.updates = meta["updates"]
+        return model
+
+    @classmethod
+    def open(cls, directory: str = None, **options) -> "HotspotModel":
+        """
+        Loads the snapshot in 'directory' if there is one, otherwise starts an empty model.
+        """
+        if directory and os.path.exists(os.path.join(directory, "meta.json")):
+            LOG.info("Loading hotspot model snapshot", directory=directory)
+            return cls.load(directory)
+        return cls(**options)
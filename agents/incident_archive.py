@@ -0,0 +1,700 @@
+# incident_archive.py
+
+import contextlib
+import datetime
+import fcntl
+import importlib
+import json
+import math
+import mmap
+import multiprocessing.util
+import os
+import struct
+import threading
+import time
+
+from incident_clustering import SEVERITY_ORDER
+from instrumentation import METRICS, get_logger
+
+LOG = get_logger("incident_archive")
+
+KINDS = ("incident", "alert")
+COLUMNAR_FORMATS = ("mmap", "parquet")
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+DEFAULT_COMPACTION_BYTES = 512 * 1024 * 1024 # Log bytes folded into columnar parts per batch
+PARTITION_CELL_DEGREES = 0.05 # ~5.5 km location cells
+PARTITION_UTC_OFFSET_SECONDS = 5.5 * 3600 # Day partitions follow IST days
+_EARTH_RADIUS_METERS = 6_371_000.0
+# Record header: payload bytes, tag bytes (incident/alert type), kind, severity code,
+# timestamp (Unix seconds), lat, lon (NaN when unknown). The tag and the JSON payload follow.
+_HEADER = struct.Struct("<IHBBdff")
+_OPEN_SUFFIX = ".open" # Segment a live writer is appending to
+_SEALED_SUFFIX = ".log"
+_MANIFEST = "manifest.json"
+_MANIFEST_LOCK = "manifest.lock" # Shared by readers, exclusive while the manifest changes
+_COMPACTION_LOCK = "compaction.lock" # One compaction per directory at a time
+_COLUMNS = ("timestamp", "lat", "lon", "kind", "severity", "incident_type")
+_COLUMN_DTYPES = {"timestamp": "<f8", "lat": "<f4", "lon": "<f4", "kind": "u1", "severity": "u1",
+                  "incident_type": "<u2", "payload_offsets": "<u8"}
+_PART_SUFFIXES = {"mmap": ".cols", "parquet": ".parquet"}
+
+
+def severity_code(severity) -> int:
+    """
+    0 for a missing or unknown severity, then 1 (Low) to 4 (Critical); alert severities
+    ('CRITICAL') count the same as incident ones ('Critical').
+    """
+    return SEVERITY_ORDER.get(str(severity or "").title(), -1) + 1
+
+
+def _timestamp(value) -> float:
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+def partition_of(timestamp: float, lat: float, lon: float) -> tuple:
+    """
+    (IST day number since 1970-01-01, location cell (row, col) or None) a record is compacted into.
+    """
+    day = int((timestamp + PARTITION_UTC_OFFSET_SECONDS) // 86400)
+    if lat != lat or lon != lon: # NaN: no coordinates
+        return day, None
+    return day, (math.floor(lat / PARTITION_CELL_DEGREES), math.floor(lon / PARTITION_CELL_DEGREES))
+
+
+def day_name(day: int) -> str:
+    return (datetime.date(1970, 1, 1) + datetime.timedelta(days=day)).isoformat()
+
+
+def _optional_import(module_name: str, needed_by: str):
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise ImportError(f"{needed_by} needs the {module_name} package.") from e
+
+
+def _write_json(path: str, data) -> None:
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as json_file:
+        json.dump(data, json_file, separators=(",", ":"))
+    os.replace(temporary_path, path)
+
+
+@contextlib.contextmanager
+def _file_lock(path: str, operation: int):
+    # flock locks belong to the open file, so they also exclude other archives in this process
+    with open(path, "a+b") as lock_file:
+        fcntl.flock(lock_file.fileno(), operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# --- Log Segments ---
+
+def iter_segment(path: str):
+    """
+    Yields (kind, severity code, timestamp, lat, lon, tag bytes, payload bytes) for every
+    complete record of a log segment, reading it sequentially through mmap. A record torn by
+    a crash at the end of the segment is skipped.
+    """
+    with open(path, "rb") as segment_file:
+        yield from _iter_segment_file(segment_file)
+
+
+def _iter_segment_file(segment_file):
+    size = os.fstat(segment_file.fileno()).st_size
+    if not size:
+        return
+    with mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        unpack_from, header_size = _HEADER.unpack_from, _HEADER.size
+        offset = 0
+        while offset + header_size <= size:
+            length, tag_length, kind, severity, timestamp, lat, lon = unpack_from(view, offset)
+            tag_end = offset + header_size + tag_length
+            end = tag_end + length
+            if end > size:
+                return
+            yield kind, severity, timestamp, lat, lon, view[offset + header_size:tag_end], view[tag_end:end]
+            offset = end
+
+
+def _complete_length(path: str) -> int:
+    # Bytes up to the end of the last complete record
+    complete = 0
+    for _, _, _, _, _, tag, payload in iter_segment(path):
+        complete += _HEADER.size + len(tag) + len(payload)
+    return complete
+
+
+# --- Archive ---
+
+class IncidentArchive:
+    """
+    Local append-only archive of incident reports and dissemination logs for post-event
+    analysis ("all Critical incidents near Chinnaswamy during the match").
+
+    append() writes each record to a segmented log: a fixed binary header (kind, severity,
+    timestamp, coordinates, incident/alert type) followed by the record's JSON, so appends
+    are a single buffered write and replay reads segments sequentially through mmap without
+    decoding records it filters out. Segments are sealed once they reach 'segment_bytes'.
+
+    compact() folds sealed segments into columnar parts partitioned by IST day and
+    PARTITION_CELL_DEGREES location cell: one file per part holding each column as a
+    contiguous block followed by the JSON payloads, memory-mapped and read in place ('mmap'),
+    or a Parquet file ('parquet', needs pyarrow). The manifest keeps
+    each part's time range, severities, kinds and types, so query() and scan() skip whole
+    parts that cannot match the time range, severity, incident type or area, and filter the
+    rest column-wise. Records not compacted yet are read from the log.
+
+    Several processes (both agents, pool workers) may share one directory: each writes its
+    own segments, and the manifest is only changed under an exclusive file lock after
+    re-reading it, so compactions from any of them merge. Queries re-read the manifest when
+    it has changed and open the log segments under a shared lock, so every record is seen
+    exactly once, in a part or in the log. compact() also seals the open segments of crashed
+    writers (dropping a torn last record).
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+                 columnar_format: str = "mmap", flush_every: int = 256):
+        if columnar_format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unknown columnar format: {columnar_format!r} (expected one of {', '.join(COLUMNAR_FORMATS)}).")
+        if segment_bytes < 4096 or flush_every < 1:
+            raise ValueError("segment_bytes must be at least 4096 and flush_every at least 1.")
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.columnar_format = columnar_format
+        self.flush_every = flush_every
+        self._segments_dir = os.path.join(directory, "segments")
+        self._columns_dir = os.path.join(directory, "columns")
+        os.makedirs(self._segments_dir, exist_ok=True)
+        os.makedirs(self._columns_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._compaction_lock = threading.Lock()
+        self._segment = None # (path, file)
+        self._segment_size = 0
+        self._unflushed = 0
+        self._counters = {"appended": 0, "segments_sealed": 0, "compacted": 0, "parts_written": 0}
+        self._manifest = {"version": 1, "parts": [], "compacted_segments": []}
+        self._manifest_stamp = None # (inode, mtime, size) of the manifest file last read
+
+    # --- Appending ---
+
+    def append(self, record: dict, kind: str = "incident", timestamp=None, coordinates=None) -> None:
+        """
+        Appends an incident report ('incident_type', 'severity', ...) or a dissemination log
+        ('original_alert_input' with 'alert_type' and 'severity'). 'timestamp' (Unix seconds, datetime or
+        ISO string) defaults to the record's 'timestamp', else now; 'coordinates' is (lat, lon).
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown record kind: {kind!r} (expected one of {', '.join(KINDS)}).")
+        source = record if kind == "incident" else (record.get("original_alert_input") or {})
+        tag = str(source.get("incident_type" if kind == "incident" else "alert_type") or "Unknown").encode("utf-8")[:255]
+        timestamp = _timestamp(timestamp if timestamp is not None else record.get("timestamp"))
+        lat, lon = coordinates if coordinates is not None else (math.nan, math.nan)
+        payload = json.dumps(record, separators=(",", ":"), default=str).encode("utf-8")
+        header = _HEADER.pack(len(payload), len(tag), KINDS.index(kind), severity_code(source.get("severity")),
+                              time.time() if timestamp is None else timestamp, lat, lon)
+        with self._lock:
+            if self._segment is None:
+                self._open_segment()
+            segment_file = self._segment[1]
+            segment_file.write(b"".join((header, tag, payload)))
+            self._segment_size += len(header) + len(tag) + len(payload)
+            self._counters["appended"] += 1
+            self._unflushed += 1
+            if self._segment_size >= self.segment_bytes:
+                self._seal_segment()
+            elif self._unflushed >= self.flush_every:
+                segment_file.flush()
+                self._unflushed = 0
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._segment is not None:
+                self._segment[1].flush()
+                self._unflushed = 0
+
+    def roll(self) -> None:
+        """
+        Seals the current segment so that the next compact() includes its records.
+        """
+        with self._lock:
+            self._seal_segment()
+
+    def close(self) -> None:
+        self.roll()
+
+    def _open_segment(self) -> None:
+        name = f"{time.time_ns():020d}-{os.getpid()}"
+        path = os.path.join(self._segments_dir, name + _OPEN_SUFFIX)
+        self._segment = (path, open(path, "ab", buffering=1024 * 1024))
+        self._segment_size = 0
+
+    def _seal_segment(self) -> None:
+        if self._segment is None:
+            return
+        path, segment_file = self._segment
+        segment_file.close()
+        os.replace(path, path[:-len(_OPEN_SUFFIX)] + _SEALED_SUFFIX)
+        self._segment = None
+        self._unflushed = 0
+        self._counters["segments_sealed"] += 1
+
+    def _recover(self) -> None:
+        # Segments of writers that died without closing: drop any torn record and seal them.
+        # Segments a finished compaction had not deleted yet are already in the columns.
+        # Callers hold both file locks.
+        for name in os.listdir(self._segments_dir):
+            path = os.path.join(self._segments_dir, name)
+            if name in self._manifest["compacted_segments"]:
+                os.remove(path)
+            elif name.endswith(_OPEN_SUFFIX) and not _pid_alive(int(name[:-len(_OPEN_SUFFIX)].rsplit("-", 1)[1])):
+                with open(path, "r+b") as segment_file:
+                    segment_file.truncate(_complete_length(path))
+                os.replace(path, path[:-len(_OPEN_SUFFIX)] + _SEALED_SUFFIX)
+                LOG.info("Recovered archive segment", segment=name)
+        if self._manifest["compacted_segments"]:
+            self._manifest["compacted_segments"] = []
+            self._save_manifest()
+
+    def _log_segments(self, sealed_only: bool = False) -> list:
+        suffixes = (_SEALED_SUFFIX,) if sealed_only else (_SEALED_SUFFIX, _OPEN_SUFFIX)
+        return sorted(os.path.join(self._segments_dir, name) for name in os.listdir(self._segments_dir)
+                      if name.endswith(suffixes))
+
+    # --- Replay ---
+
+    def replay(self, start=None, end=None, kinds=None):
+        """
+        Yields (kind, record dict) for every record still in the log, in append order per
+        segment, between 'start' and 'end' (Unix seconds, datetime or ISO string) if given.
+        """
+        start, end = _timestamp(start), _timestamp(end)
+        wanted_kinds = {KINDS.index(kind) for kind in kinds} if kinds else None
+        _, segment_files = self._snapshot()
+        try:
+            for segment_file in segment_files:
+                for kind, _, timestamp, _, _, _, payload in _iter_segment_file(segment_file):
+                    if (start is not None and timestamp < start) or (end is not None and timestamp >= end):
+                        continue
+                    if wanted_kinds is None or kind in wanted_kinds:
+                        yield KINDS[kind], json.loads(payload)
+        finally:
+            for segment_file in segment_files:
+                segment_file.close()
+
+    def _snapshot(self) -> tuple:
+        """
+        (compacted parts, open log segment files) as of one moment: taken under the shared
+        manifest lock, so no compaction moves records between the two meanwhile. Open files
+        stay readable after a later compaction deletes them.
+        """
+        self.flush()
+        with _file_lock(os.path.join(self.directory, _MANIFEST_LOCK), fcntl.LOCK_SH):
+            self._refresh_manifest()
+            parts = list(self._manifest["parts"])
+            compacted = set(self._manifest["compacted_segments"])
+            segment_files = []
+            for path in self._log_segments():
+                if os.path.basename(path) in compacted:
+                    continue # Already in the parts; a crashed compaction left it behind
+                for candidate in (path, path[:-len(_OPEN_SUFFIX)] + _SEALED_SUFFIX):
+                    try:
+                        segment_files.append(open(candidate, "rb"))
+                        break
+                    except FileNotFoundError:
+                        continue # An open segment sealed (renamed) meanwhile
+        return parts, segment_files
+
+    # --- Compaction ---
+
+    def compact(self, max_batch_bytes: int = DEFAULT_COMPACTION_BYTES) -> int:
+        """
+        Moves the records of all sealed segments into columnar parts, 'max_batch_bytes' of log
+        at a time, and deletes the segments; crashed writers' open segments are sealed first.
+        Returns the number of records compacted.
+        """
+        with self._compaction_lock, _file_lock(os.path.join(self.directory, _COMPACTION_LOCK), fcntl.LOCK_EX):
+            with _file_lock(os.path.join(self.directory, _MANIFEST_LOCK), fcntl.LOCK_EX):
+                self._refresh_manifest()
+                self._recover()
+            segments = self._log_segments(sealed_only=True)
+            compacted = 0
+            while segments:
+                batch, batch_bytes = [], 0
+                while segments and (not batch or batch_bytes + os.path.getsize(segments[0]) <= max_batch_bytes):
+                    batch_bytes += os.path.getsize(segments[0])
+                    batch.append(segments.pop(0))
+                compacted += self._compact_batch(batch)
+            return compacted
+
+    def _compact_batch(self, segments: list) -> int:
+        started = time.perf_counter()
+        partitions = {} # (day, cell) -> column lists
+        records = 0
+        for path in segments:
+            for kind, severity, timestamp, lat, lon, tag, payload in iter_segment(path):
+                key = partition_of(timestamp, lat, lon)
+                columns = partitions.get(key)
+                if columns is None:
+                    columns = partitions[key] = ([], [], [], [], [], [], [])
+                columns[0].append(timestamp)
+                columns[1].append(lat)
+                columns[2].append(lon)
+                columns[3].append(kind)
+                columns[4].append(severity)
+                columns[5].append(tag)
+                columns[6].append(payload)
+                records += 1
+        part_id = f"part-{time.time_ns():020d}"
+        parts = []
+        for (day, cell), columns in sorted(partitions.items(), key=lambda item: (item[0][0], item[0][1] or ())):
+            relative = os.path.join(f"day={day_name(day)}", f"cell={cell[0]}_{cell[1]}" if cell else "cell=none",
+                                    part_id + _PART_SUFFIXES[self.columnar_format])
+            parts.append(self._write_part(relative, day_name(day), cell, columns))
+        with _file_lock(os.path.join(self.directory, _MANIFEST_LOCK), fcntl.LOCK_EX):
+            # Merge into the manifest as it is on disk now, never a copy read earlier
+            self._refresh_manifest()
+            self._manifest["parts"].extend(parts)
+            # The manifest names the compacted segments until they are deleted, so a crash in
+            # between never replays their records a second time
+            self._manifest["compacted_segments"] = [os.path.basename(path) for path in segments]
+            self._save_manifest()
+            for path in segments:
+                os.remove(path)
+            self._manifest["compacted_segments"] = []
+            self._save_manifest()
+        self._counters["compacted"] += records
+        self._counters["parts_written"] += len(partitions)
+        METRICS.increment("incident_archive_compacted_records_total", records)
+        LOG.info("Compacted archive segments", segments=len(segments), records=records, parts=len(partitions),
+                 seconds=round(time.perf_counter() - started, 3))
+        return records
+
+    def _write_part(self, relative: str, day: str, cell, columns: tuple) -> dict:
+        import numpy as np
+
+        timestamps, lats, lons, kinds, severities, tags, payloads = columns
+        types = sorted(set(tags))
+        type_codes = {tag: code for code, tag in enumerate(types)}
+        path = os.path.join(self._columns_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        part = {
+            "path": relative, "format": self.columnar_format, "day": day, "cell": list(cell) if cell else None,
+            "rows": len(timestamps), "min_timestamp": min(timestamps), "max_timestamp": max(timestamps),
+            "kinds": sorted(set(kinds)), "severities": sorted(set(severities)),
+            "types": [tag.decode("utf-8") for tag in types],
+        }
+        if self.columnar_format == "parquet":
+            pyarrow = _optional_import("pyarrow", "The 'parquet' archive format")
+            parquet = _optional_import("pyarrow.parquet", "The 'parquet' archive format")
+            table = pyarrow.table({
+                "timestamp": pyarrow.array(timestamps, pyarrow.float64()),
+                "lat": pyarrow.array(lats, pyarrow.float32()),
+                "lon": pyarrow.array(lons, pyarrow.float32()),
+                "kind": pyarrow.array(kinds, pyarrow.uint8()),
+                "severity": pyarrow.array(severities, pyarrow.uint8()),
+                "incident_type": pyarrow.array([tag.decode("utf-8") for tag in tags]).dictionary_encode(),
+                "payload": pyarrow.array(payloads, pyarrow.binary()),
+            })
+            parquet.write_table(table, path)
+            return part
+        payload_offsets = np.zeros(len(payloads) + 1, dtype=np.uint64)
+        np.cumsum([len(payload) for payload in payloads], out=payload_offsets[1:])
+        arrays = {
+            "timestamp": np.array(timestamps, dtype=_COLUMN_DTYPES["timestamp"]),
+            "lat": np.array(lats, dtype=_COLUMN_DTYPES["lat"]),
+            "lon": np.array(lons, dtype=_COLUMN_DTYPES["lon"]),
+            "kind": np.array(kinds, dtype=_COLUMN_DTYPES["kind"]),
+            "severity": np.array(severities, dtype=_COLUMN_DTYPES["severity"]),
+            "incident_type": np.array([type_codes[tag] for tag in tags], dtype=_COLUMN_DTYPES["incident_type"]),
+            "payload_offsets": payload_offsets,
+        }
+        # One file per part: each column as a contiguous, 8-byte aligned block, then the payloads
+        part["offsets"] = {}
+        with open(path, "wb") as part_file:
+            position = 0
+            for name, values in arrays.items():
+                padding = -position % 8
+                part_file.write(b"\0" * padding)
+                part["offsets"][name] = position = position + padding
+                part_file.write(values.tobytes())
+                position += values.nbytes
+            part["offsets"]["payload"] = position
+            part_file.write(b"".join(payloads))
+        return part
+
+    def _refresh_manifest(self) -> None:
+        # Re-reads the manifest if another archive (or process) replaced it; callers hold the manifest lock
+        path = os.path.join(self.directory, _MANIFEST)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stamp != self._manifest_stamp:
+            with open(path, encoding="utf-8") as manifest_file:
+                self._manifest = json.load(manifest_file)
+            self._manifest_stamp = stamp
+
+    def _save_manifest(self) -> None:
+        path = os.path.join(self.directory, _MANIFEST)
+        _write_json(path, self._manifest)
+        stat = os.stat(path)
+        self._manifest_stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    # --- Queries ---
+
+    def query(self, start=None, end=None, severities=None, incident_types=None, kinds=None, near=None,
+              limit: int = None) -> list:
+        """
+        Archived records (decoded dicts) matching every given condition: 'start' <= timestamp <
+        'end', severity in 'severities' ('Critical', ...), incident or alert type in
+        'incident_types', kind in 'kinds' ('incident', 'alert') and within 'near' = (lat, lon,
+        radius in meters). Compacted records come first, by partition; at most 'limit' records.
+        """
+        found = []
+        parts, segment_files = self._snapshot()
+        try:
+            for part, rows, columns in self._matching_parts(parts, start, end, severities, incident_types, kinds, near):
+                for payload in self._payloads(part, rows, columns):
+                    found.append(json.loads(payload))
+                    if limit is not None and len(found) >= limit:
+                        return found
+            for _, _, payload in self._matching_log_records(segment_files, start, end, severities, incident_types, kinds, near):
+                found.append(json.loads(payload))
+                if limit is not None and len(found) >= limit:
+                    break
+            return found
+        finally:
+            for segment_file in segment_files:
+                segment_file.close()
+
+    def scan(self, start=None, end=None, severities=None, incident_types=None, kinds=None, near=None) -> dict:
+        """
+        The matching records' columns as numpy arrays ('timestamp', 'lat', 'lon', 'kind',
+        'severity', and 'incident_type' as strings) without decoding any payloads, for
+        counting and aggregation. Same conditions as query().
+        """
+        import numpy as np
+
+        pieces = {name: [] for name in _COLUMNS}
+        parts, segment_files = self._snapshot()
+        try:
+            for part, rows, columns in self._matching_parts(parts, start, end, severities, incident_types, kinds, near):
+                for name in _COLUMNS[:-1]:
+                    pieces[name].append(columns[name][rows])
+                # Type strings are only built for the matching rows
+                pieces["incident_type"].append(np.array(part["types"], dtype=object)[columns["incident_type"][rows]])
+            log_records = list(self._matching_log_records(segment_files, start, end, severities, incident_types, kinds, near))
+        finally:
+            for segment_file in segment_files:
+                segment_file.close()
+        if log_records:
+            fields = list(zip(*(header for header, _, _ in log_records)))
+            for name, values in zip(("kind", "severity", "timestamp", "lat", "lon"), fields):
+                pieces[name].append(np.array(values))
+            pieces["incident_type"].append(np.array([tag for _, tag, _ in log_records], dtype=object))
+        dtypes = {"timestamp": np.float64, "lat": np.float32, "lon": np.float32, "kind": np.uint8,
+                  "severity": np.uint8, "incident_type": object}
+        return {name: np.concatenate(values).astype(dtypes[name], copy=False) if values else np.empty(0, dtypes[name])
+                for name, values in pieces.items()}
+
+    def count(self, **conditions) -> int:
+        return len(self.scan(**conditions)["timestamp"])
+
+    def _conditions(self, start, end, severities, incident_types, kinds, near) -> tuple:
+        start, end = _timestamp(start), _timestamp(end)
+        severity_codes = {severity_code(severity) for severity in severities} if severities else None
+        types = set(incident_types) if incident_types else None
+        kind_codes = {KINDS.index(kind) for kind in kinds} if kinds else None
+        return start, end, severity_codes, types, kind_codes, near
+
+    def _part_may_match(self, part: dict, start, end, severity_codes, types, kind_codes, near) -> bool:
+        if (start is not None and part["max_timestamp"] < start) or (end is not None and part["min_timestamp"] >= end):
+            return False
+        if severity_codes is not None and severity_codes.isdisjoint(part["severities"]):
+            return False
+        if types is not None and types.isdisjoint(part["types"]):
+            return False
+        if kind_codes is not None and kind_codes.isdisjoint(part["kinds"]):
+            return False
+        if near is not None:
+            if part["cell"] is None:
+                return False
+            lat, lon, radius_meters = near
+            lat_margin = math.degrees(radius_meters / _EARTH_RADIUS_METERS)
+            lon_margin = lat_margin / max(math.cos(math.radians(lat)), 1e-6)
+            row, col = part["cell"]
+            if not (row * PARTITION_CELL_DEGREES - lat_margin <= lat < (row + 1) * PARTITION_CELL_DEGREES + lat_margin and
+                    col * PARTITION_CELL_DEGREES - lon_margin <= lon < (col + 1) * PARTITION_CELL_DEGREES + lon_margin):
+                return False
+        return True
+
+    def _matching_parts(self, parts: list, start, end, severities, incident_types, kinds, near):
+        """
+        Yields (part, matching row indices, columns) for the parts the manifest cannot rule
+        out. Only the columns a condition needs are read, and conditions every row of a part
+        meets (by the manifest) are not evaluated per row.
+        """
+        import numpy as np
+
+        conditions = self._conditions(start, end, severities, incident_types, kinds, near)
+        start, end, severity_codes, types, kind_codes, near = conditions
+        for part in parts:
+            if not self._part_may_match(part, *conditions):
+                continue
+            columns = self._read_part(part, start, end, severity_codes, types, kind_codes)
+            checks = []
+            if start is not None and part["min_timestamp"] < start:
+                checks.append(lambda: columns["timestamp"] >= start)
+            if end is not None and part["max_timestamp"] >= end:
+                checks.append(lambda: columns["timestamp"] < end)
+            if severity_codes is not None and not severity_codes.issuperset(part["severities"]):
+                checks.append(lambda: np.isin(columns["severity"], list(severity_codes)))
+            if types is not None and not types.issuperset(part["types"]):
+                type_codes = [code for code, incident_type in enumerate(part["types"]) if incident_type in types]
+                checks.append(lambda: np.isin(columns["incident_type"], type_codes))
+            if kind_codes is not None and not kind_codes.issuperset(part["kinds"]):
+                checks.append(lambda: np.isin(columns["kind"], list(kind_codes)))
+            if near is not None:
+                def within_radius():
+                    lat, lon, radius_meters = near
+                    x = np.radians(columns["lon"] - lon) * math.cos(math.radians(lat))
+                    return np.hypot(x, np.radians(columns["lat"] - lat)) * _EARTH_RADIUS_METERS <= radius_meters
+                checks.append(within_radius)
+            mask = None
+            for check in checks:
+                mask = check() if mask is None else mask & check()
+            # Parquet parts come back already filtered, so count rows from the columns read
+            rows = np.arange(len(columns["timestamp"])) if mask is None else np.flatnonzero(mask)
+            if len(rows):
+                yield part, rows, columns
+
+    def _read_part(self, part: dict, start, end, severity_codes, types, kind_codes) -> dict:
+        import numpy as np
+
+        path = os.path.join(self._columns_dir, part["path"])
+        if part["format"] == "parquet":
+            parquet = _optional_import("pyarrow.parquet", "Reading 'parquet' archive parts")
+            # Row-group statistics let Parquet skip what the conditions rule out
+            filters = []
+            if start is not None:
+                filters.append(("timestamp", ">=", start))
+            if end is not None:
+                filters.append(("timestamp", "<", end))
+            if severity_codes is not None:
+                filters.append(("severity", "in", sorted(severity_codes)))
+            if types is not None:
+                filters.append(("incident_type", "in", sorted(types)))
+            if kind_codes is not None:
+                filters.append(("kind", "in", sorted(kind_codes)))
+            table = parquet.read_table(path, filters=filters or None)
+            columns = {name: table.column(name).to_numpy() for name in ("timestamp", "lat", "lon", "kind", "severity")}
+            type_codes = {incident_type: code for code, incident_type in enumerate(part["types"])}
+            columns["incident_type"] = np.array([type_codes[incident_type] for incident_type in
+                                                 table.column("incident_type").to_pylist()], dtype=np.uint16)
+            columns["payload"] = table.column("payload")
+            return columns
+        return _PartColumns(path, part)
+
+    def _payloads(self, part: dict, rows, columns):
+        if "payload" in columns:
+            for row in rows:
+                yield columns["payload"][int(row)].as_py()
+            return
+        payload_offsets, view, base = columns["payload_offsets"], columns.view, part["offsets"]["payload"]
+        for row in rows:
+            yield view[base + int(payload_offsets[row]):base + int(payload_offsets[row + 1])]
+
+    def _matching_log_records(self, segment_files: list, start, end, severities, incident_types, kinds, near):
+        """
+        Yields ((kind, severity, timestamp, lat, lon), type, payload bytes) for matching
+        records in the given log segments; payloads are only decoded by the caller.
+        """
+        start, end, severity_codes, types, kind_codes, near = self._conditions(start, end, severities, incident_types, kinds, near)
+        for segment_file in segment_files:
+            for kind, severity, timestamp, lat, lon, tag, payload in _iter_segment_file(segment_file):
+                if (start is not None and timestamp < start) or (end is not None and timestamp >= end):
+                    continue
+                if (severity_codes is not None and severity not in severity_codes) or (
+                        kind_codes is not None and kind not in kind_codes):
+                    continue
+                tag = tag.decode("utf-8")
+                if types is not None and tag not in types:
+                    continue
+                if near is not None:
+                    x = math.radians(lon - near[1]) * math.cos(math.radians(near[0]))
+                    if math.isnan(lat) or math.hypot(x, math.radians(lat - near[0])) * _EARTH_RADIUS_METERS > near[2]:
+                        continue
+                yield (kind, severity, timestamp, lat, lon), tag, payload
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["open_segment_bytes"] = self._segment_size if self._segment else 0
+        with _file_lock(os.path.join(self.directory, _MANIFEST_LOCK), fcntl.LOCK_SH):
+            self._refresh_manifest()
+            parts = self._manifest["parts"]
+            stats["log_segments"] = len(self._log_segments())
+        stats["parts"] = len(parts)
+        stats["compacted_rows"] = sum(part["rows"] for part in parts)
+        return stats
+
+
+class _PartColumns(dict):
+    """
+    The columns of an 'mmap' part, as numpy arrays over one memory mapping of its file, each
+    created when first used. 'incident_type' holds codes into the part's 'types' list.
+    """
+
+    def __init__(self, path: str, part: dict):
+        super().__init__()
+        self.part = part
+        with open(path, "rb") as part_file:
+            self.view = mmap.mmap(part_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __missing__(self, name: str):
+        import numpy as np
+
+        count = self.part["rows"] + (name == "payload_offsets")
+        column = self[name] = np.frombuffer(self.view, _COLUMN_DTYPES[name], count, self.part["offsets"][name])
+        return column
+
+
+# --- Shared Archive ---
+
+_default_archive = None
+_default_archive_lock = threading.Lock()
+
+
+def get_default_archive():
+    """
+    The process-wide archive in INCIDENT_ARCHIVE_DIR (None when that is not set), sealed
+    automatically at exit. INCIDENT_ARCHIVE_FORMAT picks the columnar format ('mmap' or 'parquet').
+    """
+    global _default_archive
+    directory = os.environ.get("INCIDENT_ARCHIVE_DIR")
+    if not directory:
+        return None
+    with _default_archive_lock:
+        if _default_archive is None:
+            _default_archive = IncidentArchive(directory, columnar_format=os.environ.get("INCIDENT_ARCHIVE_FORMAT", "mmap"))
+            # Unlike atexit, multiprocessing finalizers also run when a pool worker exits
+            multiprocessing.util.Finalize(_default_archive, _default_archive.close, exitpriority=10)
+        return _default_archive
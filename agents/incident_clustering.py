@@ -0,0 +1,300 @@
+# incident_clustering.py
+
+import collections
+import hashlib
+import itertools
+import json
+import math
+import string
+import struct
+
+SEVERITY_ORDER = {"Low": 0, "Medium": 1, "High": 2, "Critical": 3}
+_UNKNOWN_LOCATION_PREFIX = "Location Unknown"
+_CITY_LEVEL_PARTS = ("bengaluru", "bangalore", "karnataka", "india")
+_PUNCTUATION_TO_SPACE = str.maketrans({char: " " for char in string.punctuation})
+
+
+# --- Text Signatures ---
+
+def shingles(text: str) -> set:
+    """
+    Returns the word unigrams and bigrams of the normalized text as UTF-8 bytes. Hashtags
+    and punctuation are treated as plain words ('#Stampede!' -> 'stampede').
+    """
+    words = text.casefold().translate(_PUNCTUATION_TO_SPACE).split()
+    grams = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+    return {gram.encode("utf-8") for gram in grams}
+
+
+class MinHasher:
+    """
+    MinHash signatures with 'bands' x 'rows' hash functions for LSH banding. Two texts land in
+    a shared bucket with high probability once their shingle Jaccard similarity is above
+    roughly (1 / bands) ** (1 / rows).
+    """
+
+    def __init__(self, bands: int = 12, rows: int = 3, seed: int = 1):
+        self.bands = bands
+        self.rows = rows
+        # One SHAKE-128 digest per shingle yields all bands * rows 32-bit hash values at once
+        self._seed = struct.pack("<Q", seed)
+        self._digest_format = f"<{bands * rows}I"
+        self._digest_size = struct.calcsize(self._digest_format)
+
+    def signature(self, text: str) -> tuple:
+        grams = shingles(text) or {b""}
+        digests = [
+            struct.unpack(self._digest_format, hashlib.shake_128(self._seed + gram).digest(self._digest_size))
+            for gram in grams
+        ]
+        # Column-wise minimum: the MinHash value for every hash function
+        return tuple(map(min, zip(*digests)))
+
+    def band_keys(self, signature: tuple) -> list:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    @staticmethod
+    def similarity(first: tuple, second: tuple) -> float:
+        """
+        Estimated Jaccard similarity of the texts behind two signatures.
+        """
+        return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+# --- Location Proximity ---
+
+def _location_parts(location):
+    """
+    Splits a resolved location into its specific components, dropping the shared
+    ', Bengaluru, Karnataka, India' tail. Returns None for unknown locations.
+    """
+    if not location or location.startswith(_UNKNOWN_LOCATION_PREFIX):
+        return None
+    parts = [part.strip().casefold() for part in location.split(",")]
+    return tuple(part for part in parts if part not in _CITY_LEVEL_PARTS)
+
+
+def _parts_compatible(first_parts, second_parts) -> bool:
+    if first_parts is None or second_parts is None:
+        return True
+    shorter, longer = sorted((first_parts, second_parts), key=len)
+    return longer[:len(shorter)] == shorter
+
+
+def locations_compatible(first, second) -> bool:
+    """
+    True if two resolved locations could be the same incident site: equal, one refining the
+    other ('Brigade Road' vs 'Brigade Road, 10th cross'), or either one unknown.
+    """
+    return _parts_compatible(_location_parts(first), _location_parts(second))
+
+
+def distance_meters(first: tuple, second: tuple) -> float:
+    """
+    Haversine distance between two (latitude, longitude) pairs.
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, (*first, *second))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6_371_000 * math.asin(math.sqrt(a))
+
+
+# --- Report Adapters ---
+
+def report_from_call_result(call_transcript: str, result: dict, timestamp: float) -> dict:
+    """
+    Builds a clusterer report from the output of the Emergency Call NLP Agent
+    (process_transcript_for_orchestration_and_user_followup).
+    """
+    incident = json.loads(result["orchestration_json"])
+    return {
+        "report_text": call_transcript,
+        "timestamp": timestamp,
+        "location": incident.get("location"),
+        "incident_type": incident.get("incident_type", "Unknown"),
+        "severity": incident.get("severity", "Medium"),
+        "description": incident.get("description"),
+        "anomalies": incident.get("anomalies", []),
+        "report_source": "Emergency Call",
+    }
+
+
+# --- Streaming Clusterer ---
+
+class IncidentClusterer:
+    """
+    Streaming near-duplicate clustering for call transcripts and social/citizen reports.
+
+    Each report is a dict with 'report_text' and 'timestamp' (seconds), and optionally
+    'location' (resolved location string), 'coordinates' ((lat, lon)), 'incident_type',
+    'severity', 'anomalies', 'report_source' and 'report_image' (an attachments.Attachment).
+    Incidents list the distinct images reported for them as 'image_digests'. A report joins an active incident when
+    their texts are similar (MinHash/LSH), their locations are compatible and the incident
+    was updated within 'window_seconds'. Otherwise it opens a new incident.
+
+    Candidate incidents come from LSH buckets and expired incidents are dropped in
+    timestamp order, so the cost per report does not grow with the number of active reports.
+
+    Tuning (bench_incident_clustering, 100k active reports located by name only; defaults give
+    precision 0.78 / recall 0.76 at ~370 us per report):
+      similarity_threshold  the main precision/recall trade-off: 0.5 gives 0.88 / 0.69, 0.3
+                            gives 0.65 / 0.78. Raise it when distinct incidents get merged.
+      max_bucket_size       LSH buckets shared by more incidents than this are skipped as
+                            boilerplate. 128 gives 0.77 / 0.78 at 1.7x the cost per report,
+                            512 gives 0.73 / 0.80 at 3.6x; raise it only for small windows.
+      window_seconds        fewer concurrent incidents per locality means fewer false merges;
+                            at 10k active reports the defaults give 0.97 / 0.84.
+      coordinates           reports with (lat, lon) are matched within max_distance_meters
+                            instead of by locality name, the best remedy for low precision in
+                            a busy city-wide window.
+      bands / rows          set the LSH candidate cut-off, about (1 / bands) ** (1 / rows) (0.44
+                            for 12 x 3); keep it near similarity_threshold. More bands
+                            find more candidates, at a higher cost per report.
+    """
+
+    def __init__(self, window_seconds: float = 900.0, similarity_threshold: float = 0.4,
+                 max_distance_meters: float = 1000.0, bands: int = 12, rows: int = 3,
+                 max_member_signatures: int = 4, max_bucket_size: int = 32):
+        self.window_seconds = window_seconds
+        self.similarity_threshold = similarity_threshold
+        self.max_distance_meters = max_distance_meters
+        self.max_member_signatures = max_member_signatures
+        self.max_bucket_size = max_bucket_size
+        self.hasher = MinHasher(bands=bands, rows=rows)
+        self._incidents = {}
+        self._buckets = collections.defaultdict(set) # (band, rows) -> incident ids
+        self._expiry_queue = collections.deque() # (last_seen, incident id), oldest first
+        self._incident_ids = itertools.count(1)
+        self._latest_timestamp = float("-inf")
+        self.counters = {"reports": 0, "incidents_opened": 0, "reports_merged": 0, "incidents_expired": 0}
+
+    def __len__(self) -> int:
+        return len(self._incidents)
+
+    def add_report(self, report: dict) -> tuple:
+        """
+        Adds a report to the stream. Returns (incident, is_new_incident), where incident is the
+        merged incident dict the report now belongs to.
+        """
+        timestamp = report["timestamp"]
+        self._latest_timestamp = max(self._latest_timestamp, timestamp)
+        self._expire(self._latest_timestamp - self.window_seconds)
+        self.counters["reports"] += 1
+
+        signature = self.hasher.signature(report["report_text"])
+        band_keys = self.hasher.band_keys(signature)
+        incident = self._best_match(report, signature, band_keys)
+
+        if incident is None:
+            incident = self._open_incident(report, signature)
+            is_new = True
+        else:
+            self._merge(incident, report)
+            if len(incident["_signatures"]) < self.max_member_signatures:
+                incident["_signatures"].append(signature)
+            self.counters["reports_merged"] += 1
+            is_new = False
+
+        # Index this report's bands too, so later variants close to it are found as well
+        for band_key in band_keys:
+            self._buckets[band_key].add(incident["incident_id"])
+        incident["_band_keys"].update(band_keys)
+        self._expiry_queue.append((incident["last_seen"], incident["incident_id"]))
+        return self.public_view(incident), is_new
+
+    def active_incidents(self) -> list:
+        return [self.public_view(incident) for incident in self._incidents.values()]
+
+    @staticmethod
+    def public_view(incident: dict) -> dict:
+        return {key: value for key, value in incident.items() if not key.startswith("_")}
+
+    def _best_match(self, report: dict, signature: tuple, band_keys: list):
+        location_parts = _location_parts(report.get("location"))
+        candidate_ids = set()
+        for band_key in band_keys:
+            bucket = self._buckets.get(band_key, ())
+            # A band shared by very many incidents comes from boilerplate wording and tells
+            # us nothing; skipping it keeps the candidate set (and cost per report) bounded.
+            if len(bucket) <= self.max_bucket_size:
+                candidate_ids.update(bucket)
+
+        best, best_similarity = None, self.similarity_threshold
+        for incident_id in candidate_ids:
+            incident = self._incidents[incident_id]
+            if report["timestamp"] - incident["last_seen"] > self.window_seconds:
+                continue
+            if not self._near(report, location_parts, incident):
+                continue
+            similarity = max(MinHasher.similarity(signature, member) for member in incident["_signatures"])
+            if similarity >= best_similarity:
+                best, best_similarity = incident, similarity
+        return best
+
+    def _near(self, report: dict, location_parts, incident: dict) -> bool:
+        coordinates = report.get("coordinates")
+        if coordinates and incident["coordinates"]:
+            return distance_meters(coordinates, incident["coordinates"]) <= self.max_distance_meters
+        return _parts_compatible(location_parts, incident["_location_parts"])
+
+    def _open_incident(self, report: dict, signature: tuple) -> dict:
+        incident = {
+            "incident_id": next(self._incident_ids),
+            "incident_type": report.get("incident_type", "Unknown"),
+            "location": report.get("location"),
+            "coordinates": report.get("coordinates"),
+            "_location_parts": _location_parts(report.get("location")),
+            "description": report.get("description") or report["report_text"],
+            "severity": report.get("severity", "Medium"),
+            "anomalies": list(report.get("anomalies", [])),
+            "image_digests": [report["report_image"].digest] if report.get("report_image") else [],
+            "report_count": 1,
+            "report_sources": collections.Counter([report.get("report_source", "Unknown")]),
+            "first_seen": report["timestamp"],
+            "last_seen": report["timestamp"],
+            "_signatures": [signature],
+            "_band_keys": set(),
+        }
+        self._incidents[incident["incident_id"]] = incident
+        self.counters["incidents_opened"] += 1
+        return incident
+
+    def _merge(self, incident: dict, report: dict) -> None:
+        incident["report_count"] += 1
+        incident["report_sources"][report.get("report_source", "Unknown")] += 1
+        incident["last_seen"] = max(incident["last_seen"], report["timestamp"])
+        for anomaly in report.get("anomalies", []):
+            if anomaly not in incident["anomalies"]:
+                incident["anomalies"].append(anomaly)
+        # The same photo forwarded by many reporters is one image of the incident
+        image = report.get("report_image")
+        if image and image.digest not in incident["image_digests"]:
+            incident["image_digests"].append(image.digest)
+
+        severity = report.get("severity")
+        if severity and SEVERITY_ORDER.get(severity, -1) > SEVERITY_ORDER.get(incident["severity"], -1):
+            incident["severity"] = severity
+        if incident["incident_type"] == "Unknown" and report.get("incident_type"):
+            incident["incident_type"] = report["incident_type"]
+
+        # Keep the most specific location reported so far
+        location_parts = _location_parts(report.get("location"))
+        current_parts = incident["_location_parts"]
+        if location_parts and (current_parts is None or len(location_parts) > len(current_parts)):
+            incident["location"] = report["location"]
+            incident["_location_parts"] = location_parts
+        if report.get("coordinates") and not incident["coordinates"]:
+            incident["coordinates"] = report["coordinates"]
+
+    def _expire(self, cutoff: float) -> None:
+        while self._expiry_queue and self._expiry_queue[0][0] < cutoff:
+            last_seen, incident_id = self._expiry_queue.popleft()
+            incident = self._incidents.get(incident_id)
+            if incident is None or incident["last_seen"] != last_seen:
+                continue # Stale queue entry; the incident was updated later
+            for band_key in incident["_band_keys"]:
+                bucket = self._buckets[band_key]
+                bucket.discard(incident_id)
+                if not bucket:
+                    del self._buckets[band_key]
+            del self._incidents[incident_id]
+            self.counters["incidents_expired"] += 1
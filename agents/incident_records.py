@@ -0,0 +1,254 @@
+# incident_records.py
+
+import json
+
+# Optional faster codecs; plain json is used when they are not installed
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+INCIDENT_SOURCE = "Emergency Call NLP Agent"
+ALERT_SOURCE = "Public Communication & Alert Dissemination Agent"
+
+# Wire format -> Content-Type. 'legacy' is what the tools have always returned: incidents as
+# {'orchestration_json': '<JSON string>', 'user_followup_message': ...} and alerts as a JSON
+# string, so HTTP clients decode twice. 'json' and 'msgpack' encode the record once.
+WIRE_CONTENT_TYPES = {
+    "legacy": "application/json",
+    "json": "application/vnd.sarvsuraksha.record+json",
+    "msgpack": "application/msgpack",
+}
+_WIRE_FORMATS_BY_CONTENT_TYPE = {content_type: wire_format for wire_format, content_type in WIRE_CONTENT_TYPES.items()}
+
+
+# --- Records ---
+
+class IncidentRecord:
+    """
+    A structured incident as produced by the Emergency Call NLP Agent. Records are shared
+    (e.g. by the transcript result cache) and must not be modified once built.
+    """
+
+    __slots__ = ("incident_type", "location", "description", "severity", "anomalies", "user_followup_message",
+                 "_orchestration_json")
+
+    def __init__(self, incident_type: str, location: str, description: str, severity: str, anomalies,
+                 user_followup_message: str):
+        self.incident_type = incident_type
+        self.location = location
+        self.description = description
+        self.severity = severity
+        self.anomalies = tuple(anomalies)
+        self.user_followup_message = user_followup_message
+        self._orchestration_json = None
+
+    def orchestration_fields(self) -> dict:
+        """
+        The incident as sent to the Central Orchestration Agent (a new dict on every call).
+        """
+        return {
+            "incident_type": self.incident_type,
+            "location": self.location,
+            "description": self.description,
+            "severity": self.severity,
+            "anomalies": list(self.anomalies),
+        }
+
+    @property
+    def orchestration_json(self) -> str:
+        # Built on first use: only legacy consumers need the nested JSON string
+        if self._orchestration_json is None:
+            self._orchestration_json = json.dumps(self.orchestration_fields())
+        return self._orchestration_json
+
+    def to_dict(self) -> dict:
+        data = self.orchestration_fields()
+        data["user_followup_message"] = self.user_followup_message
+        return data
+
+    def to_legacy(self) -> dict:
+        return {"orchestration_json": self.orchestration_json, "user_followup_message": self.user_followup_message}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IncidentRecord":
+        """
+        Builds a record from to_dict() output or from the legacy tool output.
+        """
+        fields = json.loads(data["orchestration_json"]) if "orchestration_json" in data else data
+        return cls(fields["incident_type"], fields["location"], fields["description"], fields["severity"],
+                   fields.get("anomalies", ()), data.get("user_followup_message", ""))
+
+    def _key(self) -> tuple:
+        return (self.incident_type, self.location, self.description, self.severity, self.anomalies,
+                self.user_followup_message)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, IncidentRecord) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return f"IncidentRecord({self.incident_type!r}, {self.location!r}, severity={self.severity!r})"
+
+
+class AlertRecord:
+    """
+    The outcome of one disseminate_public_alert call. 'alert_input' is the alert as received
+    (referenced, not copied). Alerts suppressed by coalescing or rate limiting have no
+    formatted message and carry 'coalesced_alert_count' and 'window_severity'; their dict has
+    every key of a sent alert's, empty, so legacy consumers can read both alike.
+    """
+
+    __slots__ = ("timestamp", "alert_input", "dissemination_status", "channels_used", "rate_limited_channels",
+                 "formatted_alert_message", "rendered_messages", "dissemination_details", "channel_latency_ms",
+                 "escalated", "target_audience_criteria", "coalesced_alert_count", "window_severity")
+
+    def __init__(self, timestamp: str, alert_input: dict, dissemination_status: str, channels_used: list,
+                 rate_limited_channels: list, formatted_alert_message: str = None, rendered_messages: dict = None,
+                 dissemination_details: list = None, channel_latency_ms: dict = None, escalated: bool = False,
+                 target_audience_criteria: dict = None, coalesced_alert_count: int = None, window_severity: str = None):
+        self.timestamp = timestamp
+        self.alert_input = alert_input
+        self.dissemination_status = dissemination_status
+        self.channels_used = channels_used
+        self.rate_limited_channels = rate_limited_channels
+        self.formatted_alert_message = formatted_alert_message
+        self.rendered_messages = rendered_messages
+        self.dissemination_details = dissemination_details
+        self.channel_latency_ms = channel_latency_ms
+        self.escalated = escalated
+        self.target_audience_criteria = target_audience_criteria
+        self.coalesced_alert_count = coalesced_alert_count
+        self.window_severity = window_severity
+
+    @property
+    def suppressed(self) -> bool:
+        return self.formatted_alert_message is None
+
+    def to_dict(self) -> dict:
+        """
+        The record as logged to 'dissemination_logs' (and, JSON-encoded, the legacy tool output).
+        """
+        record = {
+            "timestamp": self.timestamp,
+            "original_alert_input": self.alert_input,
+            "formatted_alert_message": self.formatted_alert_message or "",
+            # Per-language texts in the formats of the channels used, e.g. {"kn": {"sms": ...}}
+            "rendered_messages": self.rendered_messages or {},
+            "dissemination_status": self.dissemination_status,
+            "channels_used": self.channels_used,
+            "dissemination_details": self.dissemination_details or [],
+            "channel_latency_ms": self.channel_latency_ms or {},
+            "rate_limited_channels": self.rate_limited_channels,
+            "escalated": self.escalated,
+            "target_audience_criteria": self.target_audience_criteria or {},
+            "source_agent": ALERT_SOURCE
+        }
+        if self.suppressed:
+            record["coalesced_alert_count"] = self.coalesced_alert_count # Alerts merged into this (alert type, geofence) window
+            record["window_severity"] = self.window_severity
+        return record
+
+    def to_legacy(self) -> str:
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_dict(cls, data) -> "AlertRecord":
+        """
+        Builds a record from to_dict() output or from the legacy tool output (a JSON string).
+        """
+        if isinstance(data, (str, bytes)):
+            data = json.loads(data)
+        return cls(data["timestamp"], data["original_alert_input"], data["dissemination_status"],
+                   data["channels_used"], data["rate_limited_channels"], data.get("formatted_alert_message") or None,
+                   data.get("rendered_messages"), data.get("dissemination_details"), data.get("channel_latency_ms"),
+                   data.get("escalated", False), data.get("target_audience_criteria"),
+                   data.get("coalesced_alert_count"), data.get("window_severity"))
+
+    def __repr__(self) -> str:
+        return f"AlertRecord({self.alert_input.get('alert_type')!r}, {self.dissemination_status!r})"
+
+
+# --- Wire Formats ---
+
+def available_wire_formats() -> tuple:
+    return tuple(wire_format for wire_format in WIRE_CONTENT_TYPES if wire_format != "msgpack" or msgpack is not None)
+
+
+def negotiate(accept: str = None) -> str:
+    """
+    Picks the wire format for a consumer from its Accept header: the first media type listed
+    that names an available record format, else 'legacy' (what clients that do not ask get).
+    """
+    for media_range in (accept or "").split(","):
+        wire_format = _WIRE_FORMATS_BY_CONTENT_TYPE.get(media_range.split(";")[0].strip().lower())
+        if wire_format is not None and wire_format != "legacy" and wire_format in available_wire_formats():
+            return wire_format
+    return "legacy"
+
+
+def content_type(wire_format: str) -> str:
+    return WIRE_CONTENT_TYPES[wire_format]
+
+
+def wire_format_for(content_type_header: str = None) -> str:
+    """
+    The wire format of a body from its Content-Type; unknown or missing types are legacy JSON.
+    """
+    media_type = (content_type_header or "").split(";")[0].strip().lower()
+    return _WIRE_FORMATS_BY_CONTENT_TYPE.get(media_type, "legacy")
+
+
+def _dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=str)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def encode(value, wire_format: str = "json") -> bytes:
+    """
+    Encodes a record (or any JSON-compatible value) as one response or message body. 'legacy'
+    gives the bytes the JSON tool servers have always sent; 'json' and 'msgpack' encode a
+    record's fields once, with no JSON nested inside strings.
+    """
+    if wire_format == "legacy":
+        if hasattr(value, "to_legacy"):
+            value = value.to_legacy()
+        return json.dumps(value, default=str).encode("utf-8")
+    if hasattr(value, "to_dict"):
+        value = value.to_dict()
+    if wire_format == "json":
+        return _dumps(value)
+    if wire_format == "msgpack":
+        if msgpack is None:
+            raise ValueError("The 'msgpack' wire format needs the msgpack package.")
+        return msgpack.packb(value, use_bin_type=True, default=str)
+    raise ValueError(f"Unknown wire format: {wire_format!r} (expected one of {', '.join(WIRE_CONTENT_TYPES)}).")
+
+
+def decode(body, wire_format: str = "json"):
+    """
+    Decodes a body produced by encode(). A legacy body holding a JSON string (the alert
+    tool's output) is decoded a second time, as clients of the legacy format always had to.
+    """
+    if wire_format == "msgpack":
+        if msgpack is None:
+            raise ValueError("The 'msgpack' wire format needs the msgpack package.")
+        return msgpack.unpackb(body, raw=False)
+    if wire_format == "json":
+        return orjson.loads(body) if orjson is not None else json.loads(body)
+    if wire_format != "legacy":
+        raise ValueError(f"Unknown wire format: {wire_format!r} (expected one of {', '.join(WIRE_CONTENT_TYPES)}).")
+    value = json.loads(body)
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            pass
+    return value
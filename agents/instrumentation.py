@@ -0,0 +1,256 @@
+# instrumentation.py
+
+import bisect
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+# AGENT_LOG_LEVEL: DEBUG shows the per-call traces the agents used to print unconditionally;
+# the default INFO keeps the hot path free of formatting and stdout writes.
+LOG_LEVEL = os.environ.get("AGENT_LOG_LEVEL", "INFO").upper()
+# AGENT_TRACE_SAMPLE_RATE: fraction of requests whose stage timings are recorded (0 disables tracing)
+TRACE_SAMPLE_RATE = float(os.environ.get("AGENT_TRACE_SAMPLE_RATE", "0"))
+# Upper bounds (seconds) of the stage duration histogram buckets
+DURATION_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+# --- Structured Logging ---
+
+class StructuredFormatter(logging.Formatter):
+    """
+    One JSON object per line: ts, level, logger, event and the call's fields. Fields are only
+    serialized here, so a suppressed DEBUG call never pays for json.dumps of its arguments.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"ts": round(record.created, 6), "level": record.levelname, "logger": record.name, "event": record.msg}
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class StructuredLogger:
+    """
+    Leveled structured logging: log.debug("Classifying incident", severity="High"). The level
+    check comes first, so a disabled call costs one cached isEnabledFor() and no formatting.
+    """
+
+    __slots__ = ("_logger",)
+
+    def __init__(self, logger: logging.Logger):
+        self._logger = logger
+
+    def enabled(self, level: int = logging.DEBUG) -> bool:
+        return self._logger.isEnabledFor(level)
+
+    def log(self, level: int, event: str, **fields) -> None:
+        if self._logger.isEnabledFor(level):
+            self._logger.log(level, event, extra={"fields": fields})
+
+    def debug(self, event: str, **fields) -> None:
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.log(logging.DEBUG, event, extra={"fields": fields})
+
+    def info(self, event: str, **fields) -> None:
+        if self._logger.isEnabledFor(logging.INFO):
+            self._logger.log(logging.INFO, event, extra={"fields": fields})
+
+    def warning(self, event: str, **fields) -> None:
+        if self._logger.isEnabledFor(logging.WARNING):
+            self._logger.log(logging.WARNING, event, extra={"fields": fields})
+
+
+_root_logger = logging.getLogger("agents")
+if not _root_logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout) # Where the print statements used to go
+    _handler.setFormatter(StructuredFormatter())
+    _root_logger.addHandler(_handler)
+    _root_logger.setLevel(LOG_LEVEL)
+    _root_logger.propagate = False
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(_root_logger.getChild(name))
+
+
+def set_log_level(level) -> None:
+    _root_logger.setLevel(level)
+
+
+# --- Metrics ---
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(DURATION_BUCKETS) + 1) # Last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+
+class Metrics:
+    """
+    Counters and duration histograms keyed by (name, labels), exported in the Prometheus text
+    exposition format by export_prometheus().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        self.observe_key((name, tuple(sorted(labels.items()))), seconds)
+
+    def observe_key(self, key: tuple, seconds: float) -> None:
+        # 'key' is (name, sorted label pairs), built once by callers that observe it repeatedly
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.counts[bisect.bisect_left(DURATION_BUCKETS, seconds)] += 1
+            histogram.total += seconds
+            histogram.count += 1
+
+    def counter_value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def export_prometheus(self) -> str:
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, (list(h.counts), h.total, h.count)) for key, h in self._histograms.items())
+        lines, typed = [], set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        for (name, labels), (counts, total, count) in histograms:
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, bucket_count in zip(DURATION_BUCKETS + ("+Inf",), counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total:.9g}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for key, value in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+# --- Tracing ---
+
+_current_trace = contextvars.ContextVar("agent_trace", default=None)
+
+
+class _Span:
+    __slots__ = ("metrics", "key", "trace", "started")
+
+    def __init__(self, metrics, key: tuple, trace: str):
+        self.metrics = metrics
+        self.key = key
+        self.trace = trace
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.metrics.observe_key(self.key, time.perf_counter() - self.started)
+        return False
+
+
+class _Trace:
+    __slots__ = ("span", "token")
+
+    def __init__(self, span: _Span):
+        self.span = span
+
+    def __enter__(self):
+        self.token = _current_trace.set(self.span.trace)
+        self.span.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.span.__exit__(exc_type, exc, traceback)
+        _current_trace.reset(self.token)
+        return False
+
+
+_NOOP = contextlib.nullcontext()
+
+
+class Tracer:
+    """
+    Per-stage timings for the agents' hot paths. trace(name) opens a request (a sampled
+    fraction 'sample_rate' of them); span(stage) inside it records the stage's duration into
+    the 'agent_stage_duration_seconds' histogram labelled with the trace name and stage. The
+    trace itself is recorded as stage 'total'.
+
+    Unsampled requests and spans outside a sampled trace get a shared no-op context manager,
+    so with tracing off a stage costs one attribute check and a ContextVar lookup.
+    """
+
+    def __init__(self, metrics: Metrics, sample_rate: float = 0.0):
+        self.metrics = metrics
+        self._keys = {} # (trace, stage) -> histogram key
+        self.set_sample_rate(sample_rate)
+
+    def _key(self, trace: str, stage: str) -> tuple:
+        key = self._keys.get((trace, stage))
+        if key is None:
+            key = self._keys[(trace, stage)] = ("agent_stage_duration_seconds", (("stage", stage), ("trace", trace)))
+        return key
+
+    def set_sample_rate(self, sample_rate: float) -> None:
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1.")
+        self.sample_rate = sample_rate
+
+    def trace(self, name: str):
+        if self.sample_rate <= 0.0 or _current_trace.get() is not None:
+            return _NOOP # Disabled, or nested inside another agent's trace (its spans join it)
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return _NOOP
+        return _Trace(_Span(self.metrics, self._key(name, "total"), name))
+
+    def span(self, stage: str):
+        if self.sample_rate <= 0.0:
+            return _NOOP
+        trace = _current_trace.get()
+        if trace is None:
+            return _NOOP
+        return _Span(self.metrics, self._key(trace, stage), trace)
+
+
+METRICS = Metrics()
+TRACER = Tracer(METRICS, TRACE_SAMPLE_RATE)
+
+
+def export_prometheus() -> str:
+    return METRICS.export_prometheus()
@@ -0,0 +1,111 @@
+# keyword_matcher.py
+
+import re
+
+# Below this many phrases CPython's C substring search ('phrase in text') beats a single
+# regex pass over the text; above it the compiled single-pass automaton wins.
+# See benchmarks/bench_keyword_matcher.py for the crossover measurement.
+REGEX_STRATEGY_MIN_PHRASES = 200
+
+
+# --- Pattern Construction ---
+
+def _build_trie(phrases) -> dict:
+    """
+    Builds a character trie from the given phrases. The empty-string key marks
+    the end of a complete phrase.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = True
+    return trie
+
+
+def _trie_to_pattern(node: dict) -> str:
+    """
+    Turns a trie node into a prefix-factored regular expression. Children are tried
+    before the end-of-phrase marker so the regex always takes the longest phrase
+    starting at a given position.
+    """
+    is_terminal = "" in node
+    branches = [re.escape(char) + _trie_to_pattern(child) for char, child in sorted(node.items()) if char]
+
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if is_terminal:
+        return "(?:" + body + ")?"
+    return body
+
+
+def _has_chained_overlaps(phrases) -> bool:
+    """
+    True if some phrase ends with the beginning of another phrase (e.g. 'fire' / 'reach').
+    A non-overlapping scan would miss the second phrase, so the matcher has to look
+    for a match at every position instead.
+    """
+    proper_prefixes = {phrase[:i] for phrase in phrases for i in range(1, len(phrase))}
+    return any(phrase[i:] in proper_prefixes for phrase in phrases for i in range(1, len(phrase)))
+
+
+# --- Matcher ---
+
+class KeywordMatcher:
+    """
+    Precompiled multi-phrase matcher shared by the rule-based tools. A text is lowercased
+    once and every registered phrase is resolved in one call, no matter how many rules
+    consult the result. Results keep plain substring ('phrase in text') semantics,
+    including overlapping phrases such as 'conscious' inside 'unconscious'.
+
+    strategy:
+      'substring' - one C-level substring search per unique phrase (fastest for small tables)
+      'regex'     - one pass of a prefix-factored regex over the text (fastest for large tables)
+      'auto'      - picks based on REGEX_STRATEGY_MIN_PHRASES
+    """
+
+    def __init__(self, phrases, strategy: str = "auto"):
+        if strategy not in ("auto", "substring", "regex"):
+            raise ValueError(f"Unknown matcher strategy: {strategy}")
+        if strategy == "auto":
+            strategy = "regex" if len(set(phrases)) >= REGEX_STRATEGY_MIN_PHRASES else "substring"
+        self.strategy = strategy
+
+        self.phrases = tuple(sorted({phrase.lower() for phrase in phrases if phrase}))
+        # Any phrase contained in a found phrase is also present in the text.
+        phrase_set = frozenset(self.phrases)
+        self._implied = {
+            phrase: frozenset(
+                phrase[start:end]
+                for start in range(len(phrase))
+                for end in range(start + 1, len(phrase) + 1)
+                if phrase[start:end] in phrase_set
+            )
+            for phrase in self.phrases
+        }
+
+        self._pattern = None
+        if self.strategy == "regex" and self.phrases:
+            pattern = _trie_to_pattern(_build_trie(self.phrases))
+            if _has_chained_overlaps(self.phrases):
+                # A lookahead matches at every start position; the trie makes it the longest phrase there.
+                pattern = "(?=(" + pattern + "))"
+            self._pattern = re.compile(pattern)
+
+    def scan(self, text: str) -> frozenset:
+        """
+        Returns the set of registered phrases that occur anywhere in the text (case-insensitive).
+        """
+        if not text or not self.phrases:
+            return frozenset()
+        lower_text = text.lower()
+
+        if self._pattern is None:
+            return frozenset([phrase for phrase in self.phrases if phrase in lower_text])
+
+        hits = set()
+        for phrase in set(self._pattern.findall(lower_text)):
+            hits.update(self._implied[phrase])
+        return frozenset(hits)
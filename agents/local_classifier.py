@@ -0,0 +1,314 @@
+# local_classifier.py
+
+import concurrent.futures
+import importlib
+import os
+import threading
+import time
+
+from instrumentation import METRICS, get_logger
+
+LOG = get_logger("local_classifier")
+
+RUNTIMES = ("torch", "onnx")
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 5.0
+DEFAULT_MAX_LENGTH = 128 # Tokens; reports and transcripts past this are truncated
+# Label names of a freshly initialised head ('<head>:<value>'), for models without trained labels
+DEFAULT_LABELS = (
+    "incident_type:Unknown", "incident_type:Fire", "incident_type:Medical Emergency", "incident_type:Crime",
+    "severity:Low", "severity:Medium", "severity:High", "severity:Critical",
+    "signal:signal", "signal:noise",
+)
+
+
+# --- Model ---
+
+class TransformerIncidentClassifier:
+    """
+    Local CPU text classifier for call transcripts and citizen/social reports. The model is a
+    sequence classification model whose labels are named '<head>:<value>' (see DEFAULT_LABELS);
+    each head's prediction is the softmax argmax over its own labels, so one forward pass
+    yields incident type, severity and noise-vs-signal together. Labels without a head prefix
+    count as 'incident_type'.
+
+    runtime 'torch' runs the transformers model; quantize=True first applies dynamic int8
+    quantization to its Linear layers. runtime 'onnx' runs 'model.onnx' from the model
+    directory (e.g. exported with optimum) with onnxruntime, taking the tokenizer and label
+    names from the same directory. 'labels' overrides the label names, e.g. DEFAULT_LABELS
+    for a base model whose classification head is not trained yet.
+    """
+
+    def __init__(self, model: str, runtime: str = "torch", quantize: bool = False,
+                 max_length: int = DEFAULT_MAX_LENGTH, labels: tuple = None, threads: int = None):
+        if runtime not in RUNTIMES:
+            raise ValueError(f"Unknown classifier runtime: {runtime!r} (expected one of {', '.join(RUNTIMES)}).")
+        # Optional and slow to import, so only loaded with a model: transformers (tokenizer,
+        # model) plus torch or onnxruntime
+        transformers = _optional_import("transformers", "The local incident classifier")
+        self.model_name = model
+        self.runtime = runtime
+        self.max_length = max_length
+        started = time.perf_counter()
+        self.tokenizer = transformers.AutoTokenizer.from_pretrained(model)
+        if runtime == "onnx":
+            onnxruntime = _optional_import("onnxruntime", "The 'onnx' classifier runtime")
+            options = onnxruntime.SessionOptions()
+            if threads:
+                options.intra_op_num_threads = threads
+            self._session = onnxruntime.InferenceSession(os.path.join(model, "model.onnx"), options,
+                                                         providers=["CPUExecutionProvider"])
+            self._input_names = {model_input.name for model_input in self._session.get_inputs()}
+            label_names = labels or _config_labels(transformers.AutoConfig.from_pretrained(model))
+        else:
+            torch = _optional_import("torch", "The 'torch' classifier runtime")
+            if threads:
+                torch.set_num_threads(threads)
+            options = {}
+            if labels:
+                options = {"num_labels": len(labels), "id2label": dict(enumerate(labels)),
+                           "label2id": {label: index for index, label in enumerate(labels)},
+                           "ignore_mismatched_sizes": True}
+            self._model = transformers.AutoModelForSequenceClassification.from_pretrained(model, **options).eval()
+            if quantize:
+                self._model = torch.quantization.quantize_dynamic(self._model, {torch.nn.Linear}, dtype=torch.qint8)
+            label_names = labels or _config_labels(self._model.config)
+        self.quantized = quantize and runtime == "torch"
+        # head -> (label indices, label values)
+        self.heads = {}
+        for index, label in enumerate(label_names):
+            head, _, value = label.rpartition(":")
+            indices, values = self.heads.setdefault(head or "incident_type", ([], []))
+            indices.append(index)
+            values.append(value)
+        LOG.info("Local incident classifier loaded", model=model, runtime=runtime, quantized=self.quantized,
+                 heads=sorted(self.heads), seconds=round(time.perf_counter() - started, 3))
+
+    def logits(self, texts: list):
+        """
+        One forward pass over the whole batch (padded to its longest text), as a numpy array.
+        """
+        import numpy as np
+
+        if self.runtime == "onnx":
+            encoded = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np")
+            feeds = {name: value.astype(np.int64) for name, value in encoded.items() if name in self._input_names}
+            return self._session.run(None, feeds)[0]
+        import torch
+
+        encoded = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="pt")
+        with torch.inference_mode():
+            return self._model(**encoded).logits.float().numpy()
+
+    def predict_batch(self, texts: list) -> list:
+        """
+        Returns one {head: value, ..., 'confidence': {head: probability}} dict per text.
+        """
+        import numpy as np
+
+        logits = self.logits(list(texts))
+        predictions = [{"confidence": {}} for _ in texts]
+        for head, (indices, values) in self.heads.items():
+            head_logits = logits[:, indices]
+            probabilities = np.exp(head_logits - head_logits.max(axis=1, keepdims=True))
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            best = probabilities.argmax(axis=1)
+            for prediction, label_index, row in zip(predictions, best, probabilities):
+                prediction[head] = values[label_index]
+                prediction["confidence"][head] = round(float(row[label_index]), 4)
+        return predictions
+
+
+def _optional_import(module_name: str, needed_by: str):
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise ImportError(f"{needed_by} needs the {module_name} package.") from e
+
+
+def _config_labels(config) -> list:
+    return [config.id2label[index] for index in range(config.num_labels)]
+
+
+# --- Dynamic Micro-Batching ---
+
+class MicroBatcher:
+    """
+    Serves a batch function (e.g. TransformerIncidentClassifier.predict_batch) to concurrent
+    callers. Requests queue up while a batch runs; the worker takes up to 'max_batch_size' of
+    them at once, waiting at most 'max_wait_ms' after the first one arrived for a batch to
+    fill, and runs them as a single call. submit() returns a Future; __call__ waits for it and,
+    on timeout, cancels the request so a batch that has not taken it yet skips it.
+    """
+
+    def __init__(self, predict_batch, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS, name: str = "local-classifier"):
+        if max_batch_size < 1 or max_wait_ms < 0:
+            raise ValueError("max_batch_size must be at least 1 and max_wait_ms must not be negative.")
+        self._predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_ms / 1000.0
+        self.name = name
+        self._pending = [] # (item, future)
+        self._first_at = None
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._counters = {"requests": 0, "batches": 0, "failed_batches": 0, "largest_batch": 0}
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        with self._condition:
+            if self._stopping:
+                raise RuntimeError(f"{self.name} is closed.")
+            self._pending.append((item, future))
+            self._counters["requests"] += 1
+            if self._first_at is None:
+                self._first_at = time.monotonic()
+                self._condition.notify() # Start the wait timer for this batch
+            elif len(self._pending) >= self.max_batch_size:
+                self._condition.notify()
+        return future
+
+    def __call__(self, item, timeout: float = None):
+        future = self.submit(item)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel() # Nobody waits for it any more; no-op if its batch already runs
+            raise
+
+    def map(self, items, timeout: float = None) -> list:
+        futures = [self.submit(item) for item in items]
+        return [future.result(timeout) for future in futures]
+
+    def close(self) -> None:
+        """
+        Runs the requests already queued, then stops the worker.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join()
+
+    def stats(self) -> dict:
+        with self._condition:
+            stats = dict(self._counters)
+            stats["queued"] = len(self._pending)
+        stats["mean_batch_size"] = round(stats["requests"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopping:
+                    if len(self._pending) >= self.max_batch_size:
+                        break
+                    if self._first_at is not None:
+                        remaining = self._first_at + self.max_wait_seconds - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+                # Requests that queued behind this batch have waited long enough already
+                self._first_at = self._first_at if self._pending else None
+                done = self._stopping and not self._pending
+                if batch:
+                    self._counters["batches"] += 1
+                    self._counters["largest_batch"] = max(self._counters["largest_batch"], len(batch))
+            if batch:
+                self._run_batch(batch)
+            if done:
+                return
+
+    def _run_batch(self, batch: list) -> None:
+        batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        started = time.perf_counter()
+        try:
+            results = self._predict_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch function returned {len(results)} results for {len(batch)} inputs.")
+        except Exception as e: # Every caller in the batch sees the failure
+            with self._condition:
+                self._counters["failed_batches"] += 1
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        METRICS.observe("local_classifier_batch_seconds", time.perf_counter() - started)
+        METRICS.increment("local_classifier_batched_requests_total", len(batch))
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+# --- Service ---
+
+class ClassifierService(MicroBatcher):
+    """
+    MicroBatcher over the model load_model() returns, loaded on a background thread as soon
+    as the service is created, so the agent's import stays fast. 'ready' tells callers whether
+    a request would be served now: until the model is loaded, requests wait for it, and after a
+    failed load (not retried) they raise its error.
+    """
+
+    def __init__(self, load_model, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS, name: str = "local-classifier"):
+        self.model = None
+        self.load_error = None
+        self._loaded = threading.Event()
+        super().__init__(self._predict_batch, max_batch_size, max_wait_ms, name)
+        threading.Thread(target=self._load, args=(load_model,), name=f"{name}-loader", daemon=True).start()
+
+    @property
+    def ready(self) -> bool:
+        return self.model is not None
+
+    def _load(self, load_model) -> None:
+        try:
+            self.model = load_model()
+        except Exception as e:
+            LOG.warning("Local incident classifier unavailable", error=str(e))
+            self.load_error = e
+        finally:
+            self._loaded.set()
+
+    def _predict_batch(self, texts: list) -> list:
+        self._loaded.wait()
+        if self.model is None:
+            raise self.load_error
+        return self.model.predict_batch(texts)
+
+
+def build_classifier_service(model: str, runtime: str = "torch", quantize: bool = False,
+                             max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+                             labels: tuple = None) -> ClassifierService:
+    """
+    A ClassifierService over a TransformerIncidentClassifier, which starts loading now.
+    """
+    if runtime not in RUNTIMES:
+        raise ValueError(f"Unknown classifier runtime: {runtime!r} (expected one of {', '.join(RUNTIMES)}).")
+    return ClassifierService(lambda: TransformerIncidentClassifier(model, runtime, quantize, labels=labels),
+                             max_batch_size, max_wait_ms)
+
+
+def classifier_service_from_env():
+    """
+    The classifier service configured by INCIDENT_CLASSIFIER_MODEL (model directory or hub
+    name; unset disables the local classifier and returns None), INCIDENT_CLASSIFIER_RUNTIME
+    ('torch' or 'onnx'), INCIDENT_CLASSIFIER_QUANTIZE ('on' for int8), and
+    INCIDENT_CLASSIFIER_MAX_BATCH / INCIDENT_CLASSIFIER_MAX_WAIT_MS.
+    """
+    model = os.environ.get("INCIDENT_CLASSIFIER_MODEL")
+    if not model:
+        return None
+    return build_classifier_service(
+        model,
+        runtime=os.environ.get("INCIDENT_CLASSIFIER_RUNTIME", "torch"),
+        quantize=os.environ.get("INCIDENT_CLASSIFIER_QUANTIZE", "off").lower() == "on",
+        max_batch_size=int(os.environ.get("INCIDENT_CLASSIFIER_MAX_BATCH", DEFAULT_MAX_BATCH_SIZE)),
+        max_wait_ms=float(os.environ.get("INCIDENT_CLASSIFIER_MAX_WAIT_MS", DEFAULT_MAX_WAIT_MS)),
+    )
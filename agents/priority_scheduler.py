@@ -0,0 +1,150 @@
+# priority_scheduler.py
+
+import collections
+import itertools
+import threading
+import time
+
+# Highest priority first. Agents spell severities both ways ('Critical' / 'CRITICAL').
+SEVERITY_LEVELS = ("Critical", "High", "Medium", "Low")
+DEFAULT_LEVEL = "Medium" # For missing or unrecognised severities
+_WAIT_SAMPLES_PER_LEVEL = 1024
+
+
+class SchedulerClosed(Exception):
+    """Raised by get() once the scheduler is closed and fully drained."""
+
+
+class PriorityScheduler:
+    """
+    Multi-level queue keyed on incident severity, sitting between ingestion and processing
+    or dissemination. get() always serves the most urgent waiting item, so a Critical call does
+    not wait behind a backlog of traffic complaints.
+
+    Aging prevents starvation: every 'aging_seconds' an item has waited raises its effective
+    priority by one level, so a Low item that waited 3 * aging_seconds competes as Critical.
+    Within a level items are FIFO, so only the head of each level needs to be compared and
+    get() costs O(number of levels).
+
+    metrics() reports per-level queue depth, submitted/served counts, items served early
+    through aging, and wait-time percentiles over the last served items.
+    """
+
+    def __init__(self, levels: tuple = SEVERITY_LEVELS, aging_seconds: float = 5.0,
+                 max_queue_size: int = None, clock=time.monotonic):
+        if aging_seconds <= 0:
+            raise ValueError("aging_seconds must be positive.")
+        self.levels = tuple(levels)
+        self.aging_seconds = aging_seconds
+        self.max_queue_size = max_queue_size
+        self._clock = clock
+        self._rank = {level.casefold(): rank for rank, level in enumerate(self.levels)}
+        self._default_rank = self._rank.get(DEFAULT_LEVEL.casefold(), len(self.levels) - 1)
+        self._queues = [collections.deque() for _ in self.levels] # (enqueued_at, sequence, item)
+        self._sequence = itertools.count()
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._submitted = [0] * len(self.levels)
+        self._served = [0] * len(self.levels)
+        self._aged = [0] * len(self.levels)
+        self._waits = [collections.deque(maxlen=_WAIT_SAMPLES_PER_LEVEL) for _ in self.levels]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def rank_of(self, severity: str) -> int:
+        return self._rank.get((severity or "").casefold(), self._default_rank)
+
+    def submit(self, item, severity: str, timeout: float = None) -> None:
+        """
+        Queues an item at its severity level. With max_queue_size set, blocks while the
+        scheduler is full (up to 'timeout' seconds, then raises TimeoutError).
+        """
+        rank = self.rank_of(severity)
+        with self._condition:
+            if self._closed:
+                raise SchedulerClosed("Scheduler is closed.")
+            if self.max_queue_size is not None:
+                if not self._condition.wait_for(lambda: self._size < self.max_queue_size or self._closed, timeout):
+                    raise TimeoutError(f"Scheduler full ({self.max_queue_size} items).")
+                if self._closed:
+                    raise SchedulerClosed("Scheduler is closed.")
+            self._queues[rank].append((self._clock(), next(self._sequence), item))
+            self._size += 1
+            self._submitted[rank] += 1
+            self._condition.notify_all()
+
+    def get(self, timeout: float = None):
+        """
+        Removes and returns (item, severity, waited_seconds) for the most urgent item, blocking
+        up to 'timeout' seconds (TimeoutError) for one to arrive. Raises SchedulerClosed once
+        the scheduler is closed and empty.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._size or self._closed, timeout):
+                raise TimeoutError("No item became available.")
+            if not self._size:
+                raise SchedulerClosed("Scheduler is closed.")
+            now = self._clock()
+            rank = self._select(now)
+            enqueued_at, _, item = self._queues[rank].popleft()
+            self._size -= 1
+            waited = now - enqueued_at
+            self._served[rank] += 1
+            self._waits[rank].append(waited)
+            if self._aging_boost(rank, waited) and any(self._queues[better] for better in range(rank)):
+                self._aged[rank] += 1 # Served ahead of more urgent work thanks to aging
+            self._condition.notify_all()
+            return item, self.levels[rank], waited
+
+    def close(self) -> None:
+        """
+        Stops accepting items; get() keeps serving what is queued, then raises SchedulerClosed.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def _aging_boost(self, rank: int, waited: float) -> int:
+        return min(rank, int(waited / self.aging_seconds))
+
+    def _select(self, now: float) -> int:
+        # Lowest effective rank wins; ties go to the more urgent base level, then the older item
+        best_rank, best_key = None, None
+        for rank, queue in enumerate(self._queues):
+            if queue:
+                enqueued_at, sequence, _ = queue[0]
+                key = (rank - self._aging_boost(rank, now - enqueued_at), rank, sequence)
+                if best_key is None or key < best_key:
+                    best_rank, best_key = rank, key
+        return best_rank
+
+    def metrics(self) -> dict:
+        """
+        Per-level 'depth', 'submitted', 'served', 'served_by_aging', 'oldest_wait_seconds' and
+        'wait_p50_seconds' / 'wait_p99_seconds' / 'wait_max_seconds' over recent items.
+        """
+        with self._condition:
+            now = self._clock()
+            metrics = {}
+            for rank, level in enumerate(self.levels):
+                waits = sorted(self._waits[rank])
+                queue = self._queues[rank]
+                metrics[level] = {
+                    "depth": len(queue),
+                    "submitted": self._submitted[rank],
+                    "served": self._served[rank],
+                    "served_by_aging": self._aged[rank],
+                    "oldest_wait_seconds": round(now - queue[0][0], 6) if queue else 0.0,
+                    "wait_p50_seconds": round(_percentile(waits, 0.50), 6),
+                    "wait_p99_seconds": round(_percentile(waits, 0.99), 6),
+                    "wait_max_seconds": round(waits[-1], 6) if waits else 0.0,
+                }
+            return metrics
+
+
+def _percentile(sorted_samples: list, fraction: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    return sorted_samples[min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))]
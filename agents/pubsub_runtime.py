@@ -0,0 +1,648 @@
+# pubsub_runtime.py
+
+import argparse
+import collections
+import concurrent.futures
+import importlib
+import itertools
+import json
+import os
+import threading
+import time
+
+from incident_records import WIRE_CONTENT_TYPES, content_type, decode, encode, wire_format_for
+from instrumentation import get_logger
+from priority_scheduler import PriorityScheduler
+
+try:
+    from google.cloud import pubsub_v1
+except ImportError: # Optional: without it the runtime runs on the in-memory broker
+    pubsub_v1 = None
+
+LOG = get_logger("pubsub_runtime")
+PUBLISH_TIME_ATTRIBUTE = "published_at" # Wall-clock publish time, carried for end-to-end latency
+CONTENT_TYPE_ATTRIBUTE = "content_type" # Wire format of the message data (see incident_records); JSON if absent
+
+
+class ReceivedMessage:
+    """One pulled message: 'ack_id' identifies this delivery for ack/nack."""
+
+    __slots__ = ("ack_id", "message_id", "data", "attributes", "delivery_attempt")
+
+    def __init__(self, ack_id: str, message_id: str, data: bytes, attributes: dict, delivery_attempt: int = 1):
+        self.ack_id = ack_id
+        self.message_id = message_id
+        self.data = data
+        self.attributes = attributes
+        self.delivery_attempt = delivery_attempt
+
+
+# --- In-Memory Broker ---
+
+class InMemoryBroker:
+    """
+    In-process stand-in for Cloud Pub/Sub with the same delivery model: every subscription of
+    a topic gets its own copy of each message, and a pulled message is redelivered if it is
+    neither acked nor nacked within 'ack_deadline_seconds'.
+    """
+
+    def __init__(self, ack_deadline_seconds: float = 10.0):
+        self.ack_deadline_seconds = ack_deadline_seconds
+        self._subscriptions_by_topic = collections.defaultdict(list)
+        self._pending = {} # subscription -> deque of (message_id, data, attributes, delivery_attempt)
+        self._outstanding = {} # subscription -> {ack_id: (deadline, message tuple)}
+        self._ids = itertools.count(1)
+        self._condition = threading.Condition()
+        self.counters = {"published": 0, "publish_calls": 0, "delivered": 0, "acked": 0, "ack_calls": 0,
+                         "nacked": 0, "redelivered": 0, "deadlines_extended": 0}
+
+    def create_topic(self, topic: str) -> None:
+        with self._condition:
+            self._subscriptions_by_topic.setdefault(topic, [])
+
+    def create_subscription(self, subscription: str, topic: str) -> None:
+        with self._condition:
+            self._subscriptions_by_topic[topic].append(subscription)
+            self._pending[subscription] = collections.deque()
+            self._outstanding[subscription] = {}
+
+    def publish_batch(self, topic: str, messages: list) -> list:
+        """
+        Publishes [(data, attributes), ...] in one call and returns the message ids.
+        """
+        with self._condition:
+            message_ids = []
+            for data, attributes in messages:
+                message_id = str(next(self._ids))
+                message_ids.append(message_id)
+                for subscription in self._subscriptions_by_topic.get(topic, ()):
+                    self._pending[subscription].append((message_id, data, attributes, 1))
+            self.counters["published"] += len(messages)
+            self.counters["publish_calls"] += 1
+            self._condition.notify_all()
+        return message_ids
+
+    def pull(self, subscription: str, max_messages: int, timeout: float = 0.1) -> list:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._redeliver_expired(subscription)
+            pending = self._pending[subscription]
+            while not pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self._condition.wait(remaining)
+                self._redeliver_expired(subscription)
+
+            outstanding = self._outstanding[subscription]
+            ack_deadline = time.monotonic() + self.ack_deadline_seconds
+            received = []
+            while pending and len(received) < max_messages:
+                message = pending.popleft()
+                ack_id = f"{subscription}:{next(self._ids)}"
+                outstanding[ack_id] = (ack_deadline, message)
+                message_id, data, attributes, delivery_attempt = message
+                received.append(ReceivedMessage(ack_id, message_id, data, attributes, delivery_attempt))
+            self.counters["delivered"] += len(received)
+            return received
+
+    def acknowledge(self, subscription: str, ack_ids: list) -> None:
+        with self._condition:
+            outstanding = self._outstanding[subscription]
+            for ack_id in ack_ids:
+                if outstanding.pop(ack_id, None) is not None:
+                    self.counters["acked"] += 1
+            self.counters["ack_calls"] += 1
+
+    def nack(self, subscription: str, ack_ids: list) -> None:
+        with self._condition:
+            outstanding = self._outstanding[subscription]
+            for ack_id in ack_ids:
+                entry = outstanding.pop(ack_id, None)
+                if entry is not None:
+                    message_id, data, attributes, delivery_attempt = entry[1]
+                    self._pending[subscription].append((message_id, data, attributes, delivery_attempt + 1))
+                    self.counters["nacked"] += 1
+            self._condition.notify_all()
+
+    def modify_ack_deadline(self, subscription: str, ack_ids: list, ack_deadline_seconds: float) -> None:
+        """Resets the ack deadline of still-outstanding deliveries to 'ack_deadline_seconds' from now."""
+        with self._condition:
+            outstanding = self._outstanding[subscription]
+            deadline = time.monotonic() + ack_deadline_seconds
+            for ack_id in ack_ids:
+                entry = outstanding.get(ack_id)
+                if entry is not None:
+                    outstanding[ack_id] = (deadline, entry[1])
+                    self.counters["deadlines_extended"] += 1
+
+    def _redeliver_expired(self, subscription: str) -> None:
+        now = time.monotonic()
+        outstanding = self._outstanding[subscription]
+        expired = [ack_id for ack_id, (deadline, _) in outstanding.items() if deadline <= now]
+        for ack_id in expired:
+            message_id, data, attributes, delivery_attempt = outstanding.pop(ack_id)[1]
+            self._pending[subscription].append((message_id, data, attributes, delivery_attempt + 1))
+            self.counters["redelivered"] += 1
+
+
+# --- Cloud Pub/Sub Broker ---
+
+class CloudPubSubBroker:
+    """
+    Same interface as InMemoryBroker on top of google-cloud-pubsub (synchronous pull), so the
+    runtime can run against Cloud Pub/Sub or the local emulator (PUBSUB_EMULATOR_HOST is
+    picked up by the client library itself). Topic and subscription names are short names
+    inside 'project'.
+    """
+
+    def __init__(self, project: str):
+        if pubsub_v1 is None:
+            raise ImportError("google-cloud-pubsub is required for CloudPubSubBroker.")
+        self.project = project
+        self._publisher = pubsub_v1.PublisherClient()
+        self._subscriber = pubsub_v1.SubscriberClient()
+
+    def create_topic(self, topic: str) -> None:
+        self._publisher.create_topic(request={"name": self._publisher.topic_path(self.project, topic)})
+
+    def create_subscription(self, subscription: str, topic: str) -> None:
+        self._subscriber.create_subscription(request={
+            "name": self._subscriber.subscription_path(self.project, subscription),
+            "topic": self._publisher.topic_path(self.project, topic),
+        })
+
+    def publish_batch(self, topic: str, messages: list) -> list:
+        topic_path = self._publisher.topic_path(self.project, topic)
+        futures = [self._publisher.publish(topic_path, data, **attributes) for data, attributes in messages]
+        return [future.result() for future in futures]
+
+    def pull(self, subscription: str, max_messages: int, timeout: float = 0.1) -> list:
+        response = self._subscriber.pull(
+            request={"subscription": self._subscriber.subscription_path(self.project, subscription),
+                     "max_messages": max_messages},
+            timeout=max(timeout, 1.0),
+        )
+        return [
+            ReceivedMessage(received.ack_id, received.message.message_id, received.message.data,
+                            dict(received.message.attributes), received.delivery_attempt or 1)
+            for received in response.received_messages
+        ]
+
+    def acknowledge(self, subscription: str, ack_ids: list) -> None:
+        self._subscriber.acknowledge(request={
+            "subscription": self._subscriber.subscription_path(self.project, subscription), "ack_ids": ack_ids,
+        })
+
+    def nack(self, subscription: str, ack_ids: list) -> None:
+        self.modify_ack_deadline(subscription, ack_ids, 0)
+
+    def modify_ack_deadline(self, subscription: str, ack_ids: list, ack_deadline_seconds: float) -> None:
+        self._subscriber.modify_ack_deadline(request={
+            "subscription": self._subscriber.subscription_path(self.project, subscription),
+            "ack_ids": ack_ids, "ack_deadline_seconds": int(ack_deadline_seconds),
+        })
+
+
+def default_broker(project: str = None):
+    """
+    Returns a CloudPubSubBroker when google-cloud-pubsub is installed and a project or the
+    emulator is configured; otherwise an InMemoryBroker.
+    """
+    project = project or os.environ.get("GOOGLE_CLOUD_PROJECT")
+    if pubsub_v1 is not None and (project or os.environ.get("PUBSUB_EMULATOR_HOST")):
+        return CloudPubSubBroker(project or "local-emulator")
+    LOG.info("Pub/Sub not configured; using the in-memory broker")
+    return InMemoryBroker()
+
+
+# --- Batching Helpers ---
+
+class _Batcher:
+    """
+    Collects items and hands them to 'flush_fn' in lists of up to 'max_items', at the latest
+    'max_latency_seconds' after the first item of a batch arrived.
+    """
+
+    def __init__(self, flush_fn, max_items: int, max_latency_seconds: float, name: str):
+        self._flush_fn = flush_fn
+        self.max_items = max_items
+        self.max_latency_seconds = max_latency_seconds
+        self._items = []
+        self._first_at = None
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def add(self, item) -> None:
+        with self._condition:
+            self._items.append(item)
+            if self._first_at is None:
+                self._first_at = time.monotonic()
+                self._condition.notify() # Start the latency timer for this batch
+            elif len(self._items) >= self.max_items:
+                self._condition.notify()
+
+    def close(self) -> None:
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopping:
+                    if len(self._items) >= self.max_items:
+                        break
+                    if self._first_at is not None:
+                        remaining = self._first_at + self.max_latency_seconds - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                batch, self._items = self._items[:self.max_items], self._items[self.max_items:]
+                self._first_at = time.monotonic() if self._items else None
+                done = self._stopping and not self._items
+            if batch:
+                try:
+                    self._flush_fn(batch)
+                except Exception as e: # Keep the batcher alive; the failure is reported
+                    LOG.warning("Batch flush failed", batcher=self._thread.name, items=len(batch), error=str(e))
+            if done:
+                return
+
+
+class BatchPublisher:
+    """
+    Publishes outbound messages to the next agent's topic in batches of up to
+    'max_messages', waiting at most 'max_latency_seconds' to fill a batch. publish() returns a
+    future resolved with the message id once its batch is published, or with the error.
+    """
+
+    def __init__(self, broker, topic: str, max_messages: int = 100, max_latency_seconds: float = 0.01):
+        self.broker = broker
+        self.topic = topic
+        self._batcher = _Batcher(self._flush, max_messages, max_latency_seconds, name=f"publisher-{topic}")
+
+    def publish(self, data: bytes, **attributes) -> concurrent.futures.Future:
+        attributes.setdefault(PUBLISH_TIME_ATTRIBUTE, repr(time.time()))
+        future = concurrent.futures.Future()
+        self._batcher.add((data, attributes, future))
+        return future
+
+    def _flush(self, batch: list) -> None:
+        try:
+            message_ids = self.broker.publish_batch(self.topic, [(data, attributes) for data, attributes, _ in batch])
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            raise
+        for (_, _, future), message_id in zip(batch, message_ids):
+            future.set_result(message_id)
+
+    def close(self) -> None:
+        self._batcher.close()
+
+
+def encode_json(payload) -> bytes:
+    return json.dumps(payload).encode("utf-8")
+
+
+def _decode_message(message: ReceivedMessage):
+    return decode(message.data, wire_format_for(message.attributes.get(CONTENT_TYPE_ATTRIBUTE)))
+
+
+def field_priority(field: str):
+    """
+    Priority callable for StreamingConsumer reading the severity straight from the payload,
+    e.g. field_priority('severity') for disseminate_public_alert inputs.
+    """
+    return lambda payload: payload.get(field)
+
+
+def function_priority(function, argument: str = None):
+    """
+    Priority callable for StreamingConsumer computing the severity from the payload (or
+    payload[argument]), e.g. function_priority(triage_severity, 'call_transcript') to serve
+    transcripts that read as critical first, before their full analysis runs.
+    """
+    return lambda payload: function(payload[argument]) if argument else function(payload)
+
+
+def tool_handler(tool, argument: str = None):
+    """
+    Adapts an agent tool function to a consumer handler taking the decoded JSON payload.
+    With 'argument', the tool is called with payload[argument] (e.g. 'call_transcript' for
+    process_transcript_for_orchestration_and_user_followup); otherwise with the whole payload
+    (e.g. disseminate_public_alert). Tools returning a JSON string are decoded, so the
+    outbound message is plain JSON rather than a JSON-encoded string; tools returning an
+    IncidentRecord or AlertRecord (e.g. process_transcript_record) give its fields directly.
+    """
+    def handle(payload):
+        result = tool(payload[argument]) if argument else tool(payload)
+        if hasattr(result, "to_dict"):
+            return result.to_dict()
+        if isinstance(result, str):
+            try:
+                return json.loads(result)
+            except json.JSONDecodeError:
+                return result
+        return result
+    return handle
+
+
+# --- Streaming Consumer ---
+
+class StreamingConsumer:
+    """
+    Hosts one handler (typically an agent tool wrapped by tool_handler) as a streaming consumer
+    of a subscription.
+
+    A pull thread fetches messages while fewer than 'max_outstanding_messages' messages and
+    'max_outstanding_bytes' bytes are in flight (flow control), and hands each one to a pool of
+    'max_workers' threads. Each message is decoded as JSON and passed to the handler; the
+    result is published to 'output_topic' (batched), and the message is acked only once that
+    publish has succeeded. Acks are sent in batches of up to 'ack_batch_size' every
+    'ack_flush_seconds'. A handler exception or failed publish nacks the message for redelivery,
+    until its 'max_delivery_attempts'-th delivery fails; that message is then acked and dropped
+    with a warning so it cannot block the subscription.
+
+    While a message is held (queued for a worker, processing or publishing), a lease thread
+    extends its ack deadline to 'lease_seconds' (default: the broker's ack deadline) every
+    third of that, for up to 'max_lease_seconds', so slow or backed-up messages are not
+    redelivered mid-flight. Redeliveries are matched by message id: one arriving while the
+    message is still held is settled together with it, and one for a message settled in the
+    last 'dedup_cache_size' is acked without running the handler again.
+
+    With 'priority' (a callable mapping the decoded payload to a severity such as 'Critical'),
+    pulled messages wait in a PriorityScheduler instead of a FIFO, so workers always take the
+    most urgent message next; 'aging_seconds' keeps low-severity messages from starving.
+
+    Results are published in 'wire_format' ('legacy' JSON, or the 'json'/'msgpack' record
+    formats of incident_records), named in each message's content_type attribute; inbound
+    messages are decoded by theirs, so consumers can be chained whatever format each picks.
+    """
+
+    def __init__(self, broker, subscription: str, handler, output_topic: str = None,
+                 max_outstanding_messages: int = 1000, max_outstanding_bytes: int = 100 * 1024 * 1024,
+                 max_workers: int = 4, pull_batch_size: int = 100, ack_batch_size: int = 100,
+                 ack_flush_seconds: float = 0.05, publish_batch_size: int = 100,
+                 publish_flush_seconds: float = 0.01, max_delivery_attempts: int = 5,
+                 priority=None, aging_seconds: float = 5.0, wire_format: str = "legacy",
+                 lease_seconds: float = None, max_lease_seconds: float = 3600.0, dedup_cache_size: int = 10_000):
+        if max_outstanding_messages < 1 or max_workers < 1:
+            raise ValueError("max_outstanding_messages and max_workers must be at least 1.")
+        lease_seconds = getattr(broker, "ack_deadline_seconds", 10.0) if lease_seconds is None else lease_seconds
+        if lease_seconds <= 0:
+            raise ValueError("lease_seconds must be positive.")
+        if wire_format not in WIRE_CONTENT_TYPES:
+            raise ValueError(f"Unknown wire format: {wire_format!r} (expected one of {', '.join(WIRE_CONTENT_TYPES)}).")
+        self.broker = broker
+        self.subscription = subscription
+        self.handler = handler
+        self.max_outstanding_messages = max_outstanding_messages
+        self.max_outstanding_bytes = max_outstanding_bytes
+        self.pull_batch_size = pull_batch_size
+        self.max_delivery_attempts = max_delivery_attempts
+        self.priority = priority
+        self.wire_format = wire_format
+        self.lease_seconds = lease_seconds
+        self.max_lease_seconds = max_lease_seconds
+        self.dedup_cache_size = dedup_cache_size
+        self.scheduler = PriorityScheduler(aging_seconds=aging_seconds) if priority else None
+        self._publisher = BatchPublisher(broker, output_topic, publish_batch_size, publish_flush_seconds) if output_topic else None
+        self._acks = _Batcher(lambda ack_ids: broker.acknowledge(subscription, ack_ids), ack_batch_size,
+                              ack_flush_seconds, name=f"acks-{subscription}")
+        self._workers = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                              thread_name_prefix=f"consumer-{subscription}")
+        self._flow = threading.Condition()
+        self._outstanding_messages = 0
+        self._outstanding_bytes = 0
+        self._leases = {} # ack_id -> when it was pulled, for every delivery held
+        self._held = {} # message_id -> ack_ids of its redeliveries that arrived while it was held
+        self._settled = collections.OrderedDict() # message_ids recently acked, oldest first
+        self._running = False
+        self._puller = None
+        self._leaser = None
+        self._stop_leasing = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {"received": 0, "processed": 0, "failed": 0, "dropped": 0, "duplicates": 0,
+                       "flow_control_waits": 0, "lease_extensions": 0}
+
+    def start(self) -> "StreamingConsumer":
+        self._running = True
+        self._puller = threading.Thread(target=self._pull_loop, name=f"puller-{self.subscription}", daemon=True)
+        self._puller.start()
+        self._leaser = threading.Thread(target=self._lease_loop, name=f"leaser-{self.subscription}", daemon=True)
+        self._leaser.start()
+        return self
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """
+        Stops pulling, finishes in-flight messages and flushes pending acks and publishes.
+        """
+        self._running = False
+        if self._puller is not None:
+            self._puller.join(timeout)
+        with self._flow:
+            self._flow.wait_for(lambda: self._outstanding_messages == 0, timeout)
+        self._workers.shutdown(wait=True)
+        self._stop_leasing.set()
+        if self._leaser is not None:
+            self._leaser.join(timeout)
+        if self._publisher:
+            self._publisher.close() # Its last batch settles messages, so before the acks
+        self._acks.close()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        with self._flow:
+            stats["outstanding_messages"] = self._outstanding_messages
+            stats["outstanding_bytes"] = self._outstanding_bytes
+        if self.scheduler is not None:
+            stats["priority_levels"] = self.scheduler.metrics()
+        return stats
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def _pull_loop(self) -> None:
+        while self._running:
+            with self._flow:
+                if not self._has_capacity():
+                    self._count("flow_control_waits")
+                    self._flow.wait_for(lambda: self._has_capacity() or not self._running, 0.1)
+                    continue
+                capacity = self.max_outstanding_messages - self._outstanding_messages
+            try:
+                messages = self.broker.pull(self.subscription, min(self.pull_batch_size, capacity), timeout=0.1)
+            except Exception as e: # Transient pull errors: back off briefly and keep consuming
+                LOG.warning("Pull failed", subscription=self.subscription, error=str(e))
+                time.sleep(0.5)
+                continue
+            pulled_at = time.monotonic()
+            for message in messages:
+                with self._flow:
+                    duplicate = message.message_id in self._settled or message.message_id in self._held
+                    if message.message_id in self._held:
+                        self._held[message.message_id].append(message.ack_id) # Settled with the held delivery
+                        self._leases[message.ack_id] = pulled_at
+                    elif not duplicate:
+                        self._held[message.message_id] = []
+                        self._leases[message.ack_id] = pulled_at
+                        self._outstanding_messages += 1
+                        self._outstanding_bytes += len(message.data)
+                if duplicate:
+                    self._count("duplicates")
+                    if message.message_id in self._settled:
+                        self._acks.add(message.ack_id)
+                    continue
+                self._count("received")
+                if self.scheduler is None:
+                    self._workers.submit(self._process, message)
+                else:
+                    payload, severity = self._triage(message)
+                    self.scheduler.submit((message, payload), severity)
+                    self._workers.submit(self._process_next) # Takes the most urgent message, not this one
+
+    def _lease_loop(self) -> None:
+        while not self._stop_leasing.wait(self.lease_seconds / 3):
+            now = time.monotonic()
+            with self._flow:
+                ack_ids = [ack_id for ack_id, pulled_at in self._leases.items() if now - pulled_at < self.max_lease_seconds]
+            if not ack_ids:
+                continue
+            try:
+                self.broker.modify_ack_deadline(self.subscription, ack_ids, self.lease_seconds)
+                with self._stats_lock:
+                    self._stats["lease_extensions"] += len(ack_ids)
+            except Exception as e: # The deliveries may be redelivered; duplicates are still dropped by id
+                LOG.warning("Lease extension failed", subscription=self.subscription, messages=len(ack_ids), error=str(e))
+
+    def _has_capacity(self) -> bool:
+        return (self._outstanding_messages < self.max_outstanding_messages
+                and self._outstanding_bytes < self.max_outstanding_bytes)
+
+    def _triage(self, message: ReceivedMessage) -> tuple:
+        try:
+            payload = _decode_message(message)
+            return payload, self.priority(payload)
+        except Exception: # Undecodable or unclassifiable: default level; _process reports the error
+            return None, None
+
+    def _process_next(self) -> None:
+        (message, payload), _, _ = self.scheduler.get()
+        self._process(message, payload)
+
+    def _process(self, message: ReceivedMessage, payload=None) -> None:
+        try:
+            result = self.handler(_decode_message(message) if payload is None else payload)
+            if self._publisher is not None and result is not None:
+                # Keep the original publish time so latency is measured end to end
+                attributes = {PUBLISH_TIME_ATTRIBUTE: message.attributes.get(PUBLISH_TIME_ATTRIBUTE, repr(time.time())),
+                              CONTENT_TYPE_ATTRIBUTE: content_type(self.wire_format)}
+                published = self._publisher.publish(encode(result, self.wire_format), **attributes)
+                # Settled by the publisher thread once the batch is out; the message stays outstanding until then
+                published.add_done_callback(lambda future: self._settle(message, future.exception()))
+                return
+            error = None
+        except Exception as e:
+            error = e
+        self._settle(message, error)
+
+    def _settle(self, message: ReceivedMessage, error: Exception = None) -> None:
+        """
+        Acks a processed (and published) message; on 'error' nacks it for redelivery, since
+        the handler or the publish may succeed on another attempt. Redeliveries that arrived
+        while it was held are settled the same way.
+        """
+        dropped = error is not None and message.delivery_attempt >= self.max_delivery_attempts
+        with self._flow:
+            ack_ids = [message.ack_id] + self._held.pop(message.message_id, [])
+            for ack_id in ack_ids:
+                self._leases.pop(ack_id, None)
+            if error is None or dropped:
+                self._settled[message.message_id] = None
+                while len(self._settled) > self.dedup_cache_size:
+                    self._settled.popitem(last=False)
+        try:
+            if error is None:
+                for ack_id in ack_ids:
+                    self._acks.add(ack_id)
+                self._count("processed")
+            elif dropped:
+                self._count("failed")
+                LOG.warning("Dropping message after repeated failed deliveries", message_id=message.message_id,
+                            subscription=self.subscription, deliveries=message.delivery_attempt, error=str(error))
+                for ack_id in ack_ids:
+                    self._acks.add(ack_id)
+                self._count("dropped")
+            else:
+                self._count("failed")
+                LOG.warning("Processing failed", message_id=message.message_id, subscription=self.subscription, error=str(error))
+                self.broker.nack(self.subscription, ack_ids)
+        finally:
+            with self._flow:
+                self._outstanding_messages -= 1
+                self._outstanding_bytes -= len(message.data)
+                self._flow.notify_all()
+
+
+# --- Hosting an Agent Tool ---
+
+def load_function(spec: str):
+    """Imports 'module:function', e.g. 'emergency_call_nlp_agent:triage_severity'."""
+    module_name, function_name = spec.split(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def run_tool_consumer(tool_spec: str, subscription: str, output_topic: str = None, argument: str = None,
+                      broker=None, **consumer_options) -> None:
+    """
+    Hosts 'module:function' (e.g. 'googlemapsagent:disseminate_public_alert') as a consumer of
+    'subscription' until interrupted, then drains in-flight messages.
+    """
+    tool = load_function(tool_spec)
+    consumer = StreamingConsumer(broker or default_broker(), subscription, tool_handler(tool, argument),
+                                 output_topic=output_topic, **consumer_options).start()
+    LOG.info("Consuming", subscription=subscription, tool=tool_spec, output_topic=output_topic)
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        LOG.info("Stopping consumer; draining in-flight messages")
+    finally:
+        consumer.stop()
+        LOG.info("Consumer stopped", **consumer.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host an agent tool function as a Pub/Sub consumer.")
+    parser.add_argument("tool", help="module:function, e.g. emergency_call_nlp_agent:handle_transcript (fast path, LLM fallback)")
+    parser.add_argument("--subscription", required=True)
+    parser.add_argument("--output-topic")
+    parser.add_argument("--argument", help="Payload field passed to the tool (default: the whole payload)")
+    parser.add_argument("--max-workers", type=int, default=4)
+    parser.add_argument("--max-outstanding-messages", type=int, default=1000)
+    parser.add_argument("--max-outstanding-bytes", type=int, default=100 * 1024 * 1024)
+    priority = parser.add_mutually_exclusive_group()
+    priority.add_argument("--priority-field", help="Payload field holding the severity, to serve urgent messages first")
+    priority.add_argument("--priority-function",
+                          help="module:function computing the severity from the tool's argument (or payload), to serve "
+                               "urgent messages first, e.g. emergency_call_nlp_agent:triage_severity with --argument call_transcript")
+    parser.add_argument("--wire-format", choices=sorted(WIRE_CONTENT_TYPES), default="legacy",
+                        help="Encoding of published results (record formats pair with e.g. process_transcript_record)")
+    args = parser.parse_args()
+    if args.priority_function:
+        priority = function_priority(load_function(args.priority_function), args.argument)
+    else:
+        priority = field_priority(args.priority_field) if args.priority_field else None
+    run_tool_consumer(args.tool, args.subscription, args.output_topic, args.argument,
+                      max_workers=args.max_workers, max_outstanding_messages=args.max_outstanding_messages,
+                      max_outstanding_bytes=args.max_outstanding_bytes, wire_format=args.wire_format,
+                      priority=priority)
@@ -0,0 +1,276 @@
+# recipient_registry.py
+
+import array
+import math
+import threading
+
+EARTH_RADIUS_METERS = 6_371_000.0
+_METERS_PER_DEGREE = math.pi * EARTH_RADIUS_METERS / 180.0
+_UNSUBSCRIBED = -1
+# Cell keys pack (row, col) into one int: row * _KEY_STRIDE + (col + _COL_OFFSET)
+_KEY_STRIDE = 1 << 24
+_COL_OFFSET = 1 << 23
+
+
+# --- Geometry Helpers ---
+
+def _point_in_polygon(lat: float, lon: float, polygon: list) -> bool:
+    # Ray casting over (lat, lon) vertices; fine at city scale
+    inside = False
+    previous_lat, previous_lon = polygon[-1]
+    for vertex_lat, vertex_lon in polygon:
+        if (vertex_lat > lat) != (previous_lat > lat):
+            crossing_lon = vertex_lon + (lat - vertex_lat) * (previous_lon - vertex_lon) / (previous_lat - vertex_lat)
+            if lon < crossing_lon:
+                inside = not inside
+        previous_lat, previous_lon = vertex_lat, vertex_lon
+    return inside
+
+
+def _segment_intersects_box(lat1, lon1, lat2, lon2, min_lat, min_lon, max_lat, max_lon) -> bool:
+    # Liang-Barsky clipping of the segment against the box
+    start, end = 0.0, 1.0
+    delta_lat, delta_lon = lat2 - lat1, lon2 - lon1
+    for p, q in ((-delta_lon, lon1 - min_lon), (delta_lon, max_lon - lon1),
+                 (-delta_lat, lat1 - min_lat), (delta_lat, max_lat - lat1)):
+        if p == 0:
+            if q < 0:
+                return False
+        else:
+            t = q / p
+            if p < 0:
+                start = max(start, t)
+            else:
+                end = min(end, t)
+            if start > end:
+                return False
+    return True
+
+
+# --- Registry ---
+
+class RecipientRegistry:
+    """
+    Spatial index of alert subscribers (devices or phone numbers) on a uniform lat/lon grid.
+
+    Subscribers are identified by dense integer handles returned from subscribe(); callers
+    keep their own handle -> device token / phone number mapping. Per-subscriber state lives
+    in compact typed arrays (about 24 bytes per subscriber), and every grid cell holds an
+    array of the handles inside it, so a geofence query only touches the cells it overlaps.
+    Cells fully inside the geofence are streamed as-is; only boundary cells test individual
+    points. Queries are generators and never build the full recipient list.
+
+    Thread-safe: updates hold a lock, and queries copy each cell's matches under it before
+    yielding them, so a query streamed on another thread (e.g. from asyncio.to_thread) sees
+    every cell in a consistent state and never holds the lock while its consumer runs.
+    """
+
+    def __init__(self, cell_size_degrees: float = 0.005):
+        self.cell_size_degrees = cell_size_degrees
+        self._cells = {} # cell key -> array of handles
+        self._latitudes = array.array("f")
+        self._longitudes = array.array("f")
+        self._cell_of = array.array("q") # handle -> cell key, or _UNSUBSCRIBED
+        self._position = array.array("i") # handle -> index inside its cell array
+        self._free_handles = []
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _row_col(self, lat: float, lon: float) -> tuple:
+        return math.floor(lat / self.cell_size_degrees), math.floor(lon / self.cell_size_degrees)
+
+    def _cell_key(self, lat: float, lon: float) -> int:
+        row, col = self._row_col(lat, lon)
+        return row * _KEY_STRIDE + col + _COL_OFFSET
+
+    @staticmethod
+    def _key_row_col(cell: int) -> tuple:
+        row, shifted_col = divmod(cell, _KEY_STRIDE)
+        return row, shifted_col - _COL_OFFSET
+
+    # --- Subscription Management ---
+
+    def subscribe(self, lat: float, lon: float) -> int:
+        """
+        Registers a subscriber at (lat, lon) and returns its handle.
+        """
+        with self._lock:
+            if self._free_handles:
+                handle = self._free_handles.pop()
+                self._latitudes[handle], self._longitudes[handle] = lat, lon
+            else:
+                handle = len(self._cell_of)
+                self._latitudes.append(lat)
+                self._longitudes.append(lon)
+                self._cell_of.append(_UNSUBSCRIBED)
+                self._position.append(0)
+            self._add_to_cell(handle, self._cell_key(lat, lon))
+            self._count += 1
+        return handle
+
+    def unsubscribe(self, handle: int) -> bool:
+        """
+        Removes a subscriber. Returns False if the handle was not subscribed.
+        """
+        with self._lock:
+            if handle >= len(self._cell_of) or self._cell_of[handle] == _UNSUBSCRIBED:
+                return False
+            self._remove_from_cell(handle)
+            self._free_handles.append(handle)
+            self._count -= 1
+        return True
+
+    def move(self, handle: int, lat: float, lon: float) -> None:
+        """
+        Updates a subscriber's location (e.g. a Citizen App device reporting a new position).
+        """
+        new_cell = self._cell_key(lat, lon)
+        with self._lock:
+            if self._cell_of[handle] == _UNSUBSCRIBED:
+                raise KeyError(f"Recipient handle {handle} is not subscribed")
+            self._latitudes[handle], self._longitudes[handle] = lat, lon
+            if new_cell != self._cell_of[handle]:
+                self._remove_from_cell(handle)
+                self._add_to_cell(handle, new_cell)
+
+    def _add_to_cell(self, handle: int, cell: int) -> None:
+        members = self._cells.get(cell)
+        if members is None:
+            members = self._cells[cell] = array.array("i")
+        self._position[handle] = len(members)
+        members.append(handle)
+        self._cell_of[handle] = cell
+
+    def _remove_from_cell(self, handle: int) -> None:
+        cell = self._cell_of[handle]
+        members = self._cells[cell]
+        position = self._position[handle]
+        # Swap-remove: move the last member into the freed slot
+        last = members.pop()
+        if last != handle:
+            members[position] = last
+            self._position[last] = position
+        if not members:
+            del self._cells[cell]
+        self._cell_of[handle] = _UNSUBSCRIBED
+
+    # --- Geofence Queries ---
+
+    def iter_radius(self, center_lat: float, center_lon: float, radius_meters: float, batches: bool = False):
+        """
+        Streams the handles of subscribers within radius_meters of the center. With
+        batches=True, yields one array of handles per grid cell instead of single handles.
+        """
+        lat_scale = _METERS_PER_DEGREE
+        lon_scale = _METERS_PER_DEGREE * math.cos(math.radians(center_lat))
+        radius_squared = radius_meters ** 2
+
+        def distance_squared(lat, lon):
+            return ((lat - center_lat) * lat_scale) ** 2 + ((lon - center_lon) * lon_scale) ** 2
+
+        half_lat = radius_meters / lat_scale
+        half_lon = radius_meters / lon_scale
+        for cell in self._cells_in_box(center_lat - half_lat, center_lon - half_lon,
+                                       center_lat + half_lat, center_lon + half_lon):
+            row, col = self._key_row_col(cell)
+            min_lat, min_lon = row * self.cell_size_degrees, col * self.cell_size_degrees
+            max_lat, max_lon = min_lat + self.cell_size_degrees, min_lon + self.cell_size_degrees
+            nearest_lat = min(max(center_lat, min_lat), max_lat)
+            nearest_lon = min(max(center_lon, min_lon), max_lon)
+            if distance_squared(nearest_lat, nearest_lon) > radius_squared:
+                continue
+            farthest_lat = min_lat if abs(center_lat - min_lat) > abs(center_lat - max_lat) else max_lat
+            farthest_lon = min_lon if abs(center_lon - min_lon) > abs(center_lon - max_lon) else max_lon
+            whole_cell = distance_squared(farthest_lat, farthest_lon) <= radius_squared
+            with self._lock:
+                members = self._cells.get(cell, ())
+                if whole_cell:
+                    matched = members[:]
+                else:
+                    matched = [handle for handle in members
+                               if distance_squared(self._latitudes[handle], self._longitudes[handle]) <= radius_squared]
+            yield from self._emit(matched, batches)
+
+    def iter_polygon(self, polygon: list, batches: bool = False):
+        """
+        Streams the handles of subscribers inside a polygon given as [(lat, lon), ...].
+        With batches=True, yields one array of handles per grid cell instead of single handles.
+        """
+        if len(polygon) < 3:
+            raise ValueError("A polygon geofence needs at least 3 vertices.")
+        boundary_cells = self._polygon_boundary_cells(polygon)
+        latitudes, longitudes = zip(*polygon)
+        for cell in self._cells_in_box(min(latitudes), min(longitudes), max(latitudes), max(longitudes)):
+            row, col = self._key_row_col(cell)
+            if cell in boundary_cells:
+                with self._lock:
+                    matched = [handle for handle in self._cells.get(cell, ())
+                               if _point_in_polygon(self._latitudes[handle], self._longitudes[handle], polygon)]
+            elif _point_in_polygon((row + 0.5) * self.cell_size_degrees, (col + 0.5) * self.cell_size_degrees, polygon):
+                with self._lock:
+                    matched = self._cells.get(cell, ())[:] # No edge crosses the cell, so it is wholly inside
+            else:
+                continue
+            yield from self._emit(matched, batches)
+
+    def iter_geofence(self, geofence_area: dict, batches: bool = False):
+        """
+        Streams handles for a geofence description:
+        {"type": "radius", "center": [lat, lon], "radius_m": meters} or
+        {"type": "polygon", "vertices": [[lat, lon], ...]}.
+        """
+        if geofence_area.get("type") == "radius":
+            center_lat, center_lon = geofence_area["center"]
+            return self.iter_radius(center_lat, center_lon, geofence_area["radius_m"], batches)
+        if geofence_area.get("type") == "polygon":
+            return self.iter_polygon([tuple(vertex) for vertex in geofence_area["vertices"]], batches)
+        raise ValueError(f"Unsupported geofence type: {geofence_area.get('type')}")
+
+    def count_geofence(self, geofence_area: dict) -> int:
+        return sum(len(batch) for batch in self.iter_geofence(geofence_area, batches=True))
+
+    @staticmethod
+    def _emit(matched, batches: bool):
+        if not matched:
+            return
+        if batches:
+            yield matched if isinstance(matched, array.array) else array.array("i", matched)
+        else:
+            yield from matched
+
+    def _cells_in_box(self, min_lat, min_lon, max_lat, max_lon):
+        # Keys of the occupied cells in the box; callers read each cell's members under the lock
+        min_row, min_col = self._row_col(min_lat, min_lon)
+        max_row, max_col = self._row_col(max_lat, max_lon)
+        box_cells = (max_row - min_row + 1) * (max_col - min_col + 1)
+        if box_cells > len(self._cells):
+            # Sparse registry relative to the box: walk the occupied cells instead
+            with self._lock:
+                occupied = list(self._cells)
+            for cell in occupied:
+                row, col = self._key_row_col(cell)
+                if min_row <= row <= max_row and min_col <= col <= max_col:
+                    yield cell
+            return
+        for row in range(min_row, max_row + 1):
+            base = row * _KEY_STRIDE + _COL_OFFSET
+            for col in range(min_col, max_col + 1):
+                if base + col in self._cells:
+                    yield base + col
+
+    def _polygon_boundary_cells(self, polygon: list) -> set:
+        size = self.cell_size_degrees
+        boundary = set()
+        for (lat1, lon1), (lat2, lon2) in zip(polygon, polygon[1:] + polygon[:1]):
+            min_row, min_col = self._row_col(min(lat1, lat2), min(lon1, lon2))
+            max_row, max_col = self._row_col(max(lat1, lat2), max(lon1, lon2))
+            for row in range(min_row, max_row + 1):
+                for col in range(min_col, max_col + 1):
+                    cell = row * _KEY_STRIDE + col + _COL_OFFSET
+                    if cell in self._cells and _segment_intersects_box(
+                            lat1, lon1, lat2, lon2, row * size, col * size, (row + 1) * size, (col + 1) * size):
+                        boundary.add(cell)
+        return boundary
@@ -0,0 +1,111 @@
+# result_cache.py
+
+import collections
+import sys
+import threading
+import time
+
+
+def approximate_size(value) -> int:
+    """
+    Rough in-memory size of a cached value in bytes (strings, numbers, nested dicts/lists and
+    __slots__ records).
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approximate_size(key) + approximate_size(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(approximate_size(item) for item in value)
+    elif hasattr(value, "__slots__"): # Record objects
+        size += sum(approximate_size(getattr(value, slot, None)) for slot in value.__slots__)
+    return size
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a per-entry time-to-live and a memory bound.
+    Entries are evicted least-recently-used first once either 'max_entries' or
+    'max_bytes' (as estimated by 'sizeof') is exceeded, and are dropped on access
+    after 'ttl_seconds'. Hit/miss/eviction counters are available through stats().
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 16 * 1024 * 1024,
+                 ttl_seconds: float = 60.0, sizeof=approximate_size, clock=time.monotonic):
+        if max_entries < 1 or max_bytes < 1 or ttl_seconds <= 0:
+            raise ValueError("max_entries, max_bytes and ttl_seconds must be positive.")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._sizeof = sizeof
+        self._clock = clock
+        self._entries = collections.OrderedDict() # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value for key, or default if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                self._remove(key)
+                self._counters["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry[2]
+
+    def put(self, key, value) -> None:
+        size = self._sizeof(key) + self._sizeof(value)
+        if size > self.max_bytes:
+            return # Never cache a value that alone would blow the memory bound
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self._clock() + self.ttl_seconds, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._counters["evictions"] += 1
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached value for key, computing and caching it with compute() on a miss.
+        compute() runs outside the lock, so concurrent misses on one key may both compute.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _remove(self, key) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the counters plus current size and hit ratio.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,238 @@
+# risk_grid.py
+
+import math
+
+import numpy as np
+
+from instrumentation import get_logger
+
+LOG = get_logger("risk_grid")
+
+# --- Risk Model Parameters ---
+# Risk of a (location, time slot, day type) cell is
+#   base_risk[location] * hourly_profile[category][hour] * day_factor[category][day type]
+#   + sum over events of intensity * proximity(distance) * time window(slot) * (day type applies)
+# clipped to [0, 1]. The scalar path (risk_score) and the grid path (RiskGrid) share these tables.
+
+SLOTS_PER_DAY = 96 # 15-minute slots
+SLOTS_PER_HOUR = SLOTS_PER_DAY // 24
+DAY_TYPES = ("weekday", "weekend", "matchday")
+EARTH_RADIUS_METERS = 6_371_000.0
+
+# Relative risk per hour of day (0-23) by area category
+HOURLY_PROFILES = {
+    "commercial":  (0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.4, 0.5, 0.6, 0.7, 0.8, 0.8, 0.9, 0.9, 0.9, 0.9, 1.0, 1.1, 1.2, 1.3, 1.4, 1.4, 1.3, 1.1),
+    "residential": (0.8, 0.8, 0.7, 0.7, 0.6, 0.5, 0.4, 0.4, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.6, 0.6, 0.7, 0.8, 0.8, 0.9, 0.9, 1.0, 0.9),
+    "transit":     (0.6, 0.5, 0.4, 0.4, 0.4, 0.5, 0.7, 1.0, 1.3, 1.2, 0.9, 0.8, 0.8, 0.8, 0.8, 0.9, 1.1, 1.3, 1.4, 1.3, 1.1, 0.9, 0.8, 0.7),
+    "stadium":     (0.4, 0.3, 0.3, 0.3, 0.3, 0.3, 0.3, 0.4, 0.5, 0.5, 0.6, 0.6, 0.7, 0.7, 0.8, 0.9, 1.0, 1.1, 1.2, 1.2, 1.2, 1.1, 0.9, 0.6),
+    "industrial":  (0.7, 0.7, 0.6, 0.6, 0.5, 0.5, 0.5, 0.6, 0.6, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.6, 0.7, 0.8, 0.8, 0.9, 0.9, 0.9, 0.8),
+}
+# Relative risk per day type by area category
+DAY_FACTORS = {
+    "commercial":  {"weekday": 1.0, "weekend": 1.25, "matchday": 1.3},
+    "residential": {"weekday": 1.0, "weekend": 0.9, "matchday": 1.0},
+    "transit":     {"weekday": 1.1, "weekend": 0.9, "matchday": 1.4},
+    "stadium":     {"weekday": 0.8, "weekend": 1.0, "matchday": 1.6},
+    "industrial":  {"weekday": 1.0, "weekend": 0.8, "matchday": 0.9},
+}
+# Scenario labels used by the predictive policing agent's inputs -> hours they cover
+TIME_OF_DAY_HOURS = {
+    "morning": range(6, 12), "afternoon": range(12, 17), "evening": range(17, 21),
+    "night": range(21, 24), "late_night": range(0, 6),
+}
+RISK_LEVELS = ((0.75, "Critical"), (0.5, "High"), (0.25, "Medium"), (0.0, "Low"))
+
+DEFAULT_LOCATIONS = [
+    {"name": "MG Road, Bengaluru", "lat": 12.9756, "lon": 77.6066, "category": "commercial", "base_risk": 0.45},
+    {"name": "Brigade Road, Bengaluru", "lat": 12.9719, "lon": 77.6070, "category": "commercial", "base_risk": 0.45},
+    {"name": "M. Chinnaswamy Stadium, Bengaluru", "lat": 12.9788, "lon": 77.5996, "category": "stadium", "base_risk": 0.35},
+    {"name": "Majestic, Bengaluru", "lat": 12.9767, "lon": 77.5713, "category": "transit", "base_risk": 0.45},
+    {"name": "Koramangala, Bengaluru", "lat": 12.9352, "lon": 77.6245, "category": "commercial", "base_risk": 0.35},
+    {"name": "Indiranagar, Bengaluru", "lat": 12.9784, "lon": 77.6408, "category": "commercial", "base_risk": 0.35},
+    {"name": "JP Nagar, Bengaluru", "lat": 12.9063, "lon": 77.5857, "category": "residential", "base_risk": 0.25},
+    {"name": "Malleshwaram, Bengaluru", "lat": 13.0035, "lon": 77.5647, "category": "residential", "base_risk": 0.2},
+    {"name": "Whitefield, Bengaluru", "lat": 12.9698, "lon": 77.7500, "category": "commercial", "base_risk": 0.25},
+    {"name": "Peenya, Bengaluru", "lat": 13.0285, "lon": 77.5197, "category": "industrial", "base_risk": 0.3},
+]
+
+# Known event venues, so active_events like {"name": "RCB Match", "location": "M. Chinnaswamy Stadium"}
+# can be placed; event defaults cover an evening match with crowds building from the afternoon.
+EVENT_DEFAULTS = {"radius_m": 2000.0, "intensity": 0.35, "start_hour": 16.0, "end_hour": 23.5,
+                  "ramp_hours": 2.0, "day_types": ("matchday", "weekend", "weekday")}
+
+
+# --- Events ---
+
+def make_event(name: str, lat: float, lon: float, **overrides) -> dict:
+    """
+    Builds an event: a risk boost of 'intensity' at the venue falling off as a Gaussian of the
+    distance over 'radius_m', active from start_hour to end_hour with linear ramps of
+    'ramp_hours' either side, on the given day types.
+    """
+    event = dict(EVENT_DEFAULTS, name=name, lat=lat, lon=lon)
+    event.update(overrides)
+    return event
+
+
+def events_from_active_events(active_events: list, locations: list = DEFAULT_LOCATIONS) -> list:
+    """
+    Converts scenario-style active_events ({"name", "location"}) to events, placing each at the
+    known location whose name contains the event's location. Unplaceable events are skipped.
+    """
+    events = []
+    for active_event in active_events or []:
+        venue = active_event.get("location", "").casefold()
+        for location in locations:
+            if venue and venue in location["name"].casefold():
+                events.append(make_event(active_event.get("name", "Event"), location["lat"], location["lon"]))
+                break
+        else:
+            LOG.warning("Event venue not found; event ignored for risk scoring", location=active_event.get("location"))
+    return events
+
+
+def _event_time_weight(event: dict, slot: int) -> float:
+    hour = (slot + 0.5) / SLOTS_PER_HOUR # Slot midpoint
+    start, end, ramp = event["start_hour"], event["end_hour"], event["ramp_hours"]
+    if start <= hour <= end:
+        return 1.0
+    gap = start - hour if hour < start else hour - end
+    return max(0.0, 1.0 - gap / ramp) if ramp > 0 else 0.0
+
+
+def _distance_meters(lat1, lon1, lat2, lon2) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(a))
+
+
+# --- Scalar Path ---
+
+def risk_score(location: dict, slot: int, day_type: str, events: list = ()) -> float:
+    """
+    Risk in [0, 1] of one (location, 15-minute slot, day type) cell.
+    """
+    category = location["category"]
+    score = (location["base_risk"] * HOURLY_PROFILES[category][slot // SLOTS_PER_HOUR]
+             * DAY_FACTORS[category][day_type])
+    for event in events:
+        if day_type not in event["day_types"]:
+            continue
+        weight = _event_time_weight(event, slot)
+        if weight:
+            distance = _distance_meters(location["lat"], location["lon"], event["lat"], event["lon"])
+            score += event["intensity"] * math.exp(-(distance / event["radius_m"]) ** 2) * weight
+    return min(1.0, max(0.0, score))
+
+
+def risk_level(score: float) -> str:
+    for threshold, level in RISK_LEVELS:
+        if score >= threshold:
+            return level
+    return "Low"
+
+
+def score_scenario(prediction_data: dict, locations: list = DEFAULT_LOCATIONS) -> dict:
+    """
+    Scores one predictive policing scenario ({'location_context', 'time_of_day', 'day_of_week',
+    'active_events'}), averaging over the slots of the time-of-day label.
+    """
+    context = prediction_data.get("location_context", "").casefold()
+    location = next((loc for loc in locations if loc["name"].casefold().split(",")[0] in context), None)
+    if location is None:
+        return {"status": "error", "message": f"Unknown location: {prediction_data.get('location_context')}"}
+    day_type = prediction_data.get("day_of_week", "weekday")
+    if day_type not in DAY_TYPES:
+        day_type = "weekday"
+    hours = TIME_OF_DAY_HOURS.get(prediction_data.get("time_of_day"), range(24))
+    events = events_from_active_events(prediction_data.get("active_events"), locations)
+    slots = [hour * SLOTS_PER_HOUR + quarter for hour in hours for quarter in range(SLOTS_PER_HOUR)]
+    score = sum(risk_score(location, slot, day_type, events) for slot in slots) / len(slots)
+    return {"status": "success", "location": location["name"], "risk_score": round(score, 4), "risk_level": risk_level(score)}
+
+
+# --- Vectorized Grid ---
+
+class RiskGrid:
+    """
+    Batch risk scoring for the command center heatmap: evaluates every location x 15-minute
+    slot x day type at once as NumPy arrays, producing the same numbers as risk_score.
+
+    Per-location parameters are gathered into arrays once at construction; score() then costs
+    a few broadcast multiplies plus one (locations x events) distance matrix and an einsum for
+    the event boosts.
+    """
+
+    def __init__(self, locations: list, day_types: tuple = DAY_TYPES):
+        self.locations = locations
+        self.day_types = tuple(day_types)
+        categories = sorted(HOURLY_PROFILES)
+        category_index = {category: index for index, category in enumerate(categories)}
+        codes = np.fromiter((category_index[loc["category"]] for loc in locations), dtype=np.intp, count=len(locations))
+
+        hourly = np.array([HOURLY_PROFILES[category] for category in categories], dtype=np.float64)
+        slot_profiles = np.repeat(hourly, SLOTS_PER_HOUR, axis=1) # category x slot
+        day_factors = np.array([[DAY_FACTORS[category][day] for day in self.day_types] for category in categories])
+        self._base = np.fromiter((loc["base_risk"] for loc in locations), dtype=np.float64, count=len(locations))
+        self._slot_profile = slot_profiles[codes] # location x slot
+        self._day_factor = day_factors[codes] # location x day type
+        self._lat = np.radians(np.fromiter((loc["lat"] for loc in locations), dtype=np.float64, count=len(locations)))
+        self._lon = np.radians(np.fromiter((loc["lon"] for loc in locations), dtype=np.float64, count=len(locations)))
+
+    def score(self, events: list = ()) -> np.ndarray:
+        """
+        Returns the dense (locations, SLOTS_PER_DAY, day types) float32 risk tensor.
+        """
+        scores = (self._base[:, None, None] * self._slot_profile[:, :, None]) * self._day_factor[:, None, :]
+        if events:
+            scores += self._event_boost(events)
+        np.clip(scores, 0.0, 1.0, out=scores)
+        return scores.astype(np.float32)
+
+    def _event_boost(self, events: list) -> np.ndarray:
+        event_lat = np.radians([event["lat"] for event in events])
+        event_lon = np.radians([event["lon"] for event in events])
+        # Haversine distance matrix, locations x events
+        a = (np.sin((event_lat[None, :] - self._lat[:, None]) / 2) ** 2
+             + np.cos(self._lat)[:, None] * np.cos(event_lat)[None, :]
+             * np.sin((event_lon[None, :] - self._lon[:, None]) / 2) ** 2)
+        distance = 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(a))
+        radius = np.array([event["radius_m"] for event in events])
+        intensity = np.array([event["intensity"] for event in events])
+        proximity = intensity[None, :] * np.exp(-(distance / radius[None, :]) ** 2)
+
+        hours = (np.arange(SLOTS_PER_DAY) + 0.5) / SLOTS_PER_HOUR
+        windows = np.empty((len(events), SLOTS_PER_DAY))
+        for index, event in enumerate(events):
+            gap = np.maximum(event["start_hour"] - hours, hours - event["end_hour"])
+            if event["ramp_hours"] > 0:
+                windows[index] = np.clip(1.0 - gap / event["ramp_hours"], 0.0, 1.0)
+            else:
+                windows[index] = gap <= 0
+            windows[index][gap <= 0] = 1.0
+        day_mask = np.array([[day in event["day_types"] for day in self.day_types] for event in events], dtype=np.float64)
+        return np.einsum("ne,et,ed->ntd", proximity, windows, day_mask, optimize=True)
+
+    def top_hotspots(self, scores: np.ndarray, k: int = 10) -> list:
+        """
+        The k highest-risk cells of a score tensor, most risky first, as dicts with the
+        location name, slot start time ('HH:MM'), day type, score and risk level.
+        """
+        flat = scores.ravel()
+        k = min(k, flat.size)
+        if k < 1:
+            return []
+        candidates = np.argpartition(flat, -k)[-k:]
+        ordered = candidates[np.argsort(flat[candidates])[::-1]]
+        hotspots = []
+        for location_index, slot, day_index in zip(*np.unravel_index(ordered, scores.shape)):
+            score = float(scores[location_index, slot, day_index])
+            minutes = int(slot) * (60 // SLOTS_PER_HOUR)
+            hotspots.append({
+                "location": self.locations[location_index]["name"],
+                "time_slot": f"{minutes // 60:02d}:{minutes % 60:02d}",
+                "day_type": self.day_types[day_index],
+                "risk_score": round(score, 4),
+                "risk_level": risk_level(score),
+            })
+        return hotspots
@@ -0,0 +1,517 @@
+# road_router.py
+
+import array
+import bz2
+import gzip
+import heapq
+import math
+import re
+import threading
+import xml.etree.ElementTree as ET
+
+EARTH_RADIUS_METERS = 6_371_000.0
+_METERS_PER_DEGREE = math.pi * EARTH_RADIUS_METERS / 180.0
+INFINITY = math.inf
+
+# Free-flow speeds (km/h) by OSM highway type for ways without a usable maxspeed tag; city
+# traffic keeps Bengaluru well below posted limits. Highway types not listed are not drivable.
+HIGHWAY_SPEEDS_KMH = {
+    "motorway": 60, "motorway_link": 40, "trunk": 45, "trunk_link": 30, "primary": 35, "primary_link": 25,
+    "secondary": 30, "secondary_link": 20, "tertiary": 25, "tertiary_link": 20, "unclassified": 20,
+    "residential": 18, "living_street": 10, "service": 12, "road": 20,
+}
+_ONEWAY_FORWARD = {"yes", "true", "1"}
+_ONEWAY_HIGHWAYS = {"motorway", "motorway_link"} # One-way unless tagged otherwise
+_MAXSPEED = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(mph|km/h|kmh|kph)?\s*$")
+DEFAULT_LANDMARKS = 8
+SNAP_CELL_DEGREES = 0.005 # ~550 m grid cells for snapping points to the nearest intersection
+
+
+def _equirectangular_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    # Accurate to well under a percent across a city
+    x = (lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+    return math.hypot(x, lat2 - lat1) * _METERS_PER_DEGREE
+
+
+# --- OpenStreetMap Extracts ---
+
+def _open_extract(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+
+def _speed_kmh(tags: dict):
+    maxspeed = _MAXSPEED.match(tags.get("maxspeed", ""))
+    if maxspeed:
+        speed = float(maxspeed.group(1)) * (1.609 if maxspeed.group(2) == "mph" else 1.0)
+        # Posted limits are rarely reached in the city; never plan faster than the road type allows
+        return min(speed, HIGHWAY_SPEEDS_KMH.get(tags.get("highway"), speed)) or None
+    return HIGHWAY_SPEEDS_KMH.get(tags.get("highway"))
+
+
+def read_osm_roads(path: str) -> tuple:
+    """
+    Reads the drivable road network from an OSM XML extract (.osm, optionally .gz/.bz2).
+    Returns ({osm node id: (lat, lon)}, [(osm node ids, speed km/h, direction)]) where
+    direction is 0 for two-way roads, 1 for one-way along the node order and -1 against it.
+    The file is read twice, ways first, so only nodes on drivable roads are ever held.
+    """
+    ways, needed = [], set()
+    with _open_extract(path) as extract:
+        for _, element in ET.iterparse(extract):
+            if element.tag == "way":
+                tags = {tag.get("k"): tag.get("v") for tag in element.iter("tag")}
+                speed = _speed_kmh(tags)
+                if speed and tags.get("access") not in ("no", "private") and tags.get("area") != "yes":
+                    oneway = tags.get("oneway", "")
+                    if oneway == "-1":
+                        direction = -1
+                    elif oneway in _ONEWAY_FORWARD or tags.get("junction") in ("roundabout", "circular") or (
+                            oneway != "no" and tags["highway"] in _ONEWAY_HIGHWAYS):
+                        direction = 1
+                    else:
+                        direction = 0
+                    node_ids = [int(node.get("ref")) for node in element.iter("nd")]
+                    if len(node_ids) > 1:
+                        ways.append((node_ids, speed, direction))
+                        needed.update(node_ids)
+            if element.tag in ("node", "way", "relation"):
+                element.clear()
+    nodes = {}
+    with _open_extract(path) as extract:
+        for _, element in ET.iterparse(extract):
+            if element.tag == "node":
+                node_id = int(element.get("id"))
+                if node_id in needed:
+                    nodes[node_id] = (float(element.get("lat")), float(element.get("lon")))
+            if element.tag in ("node", "way", "relation"):
+                element.clear()
+    return nodes, ways
+
+
+# --- Road Graph ---
+
+class RoadGraph:
+    """
+    Static, directed road graph with free-flow travel times in seconds, stored as compressed
+    adjacency arrays in both directions (outgoing edges for routing from a point, incoming
+    edges for searches towards one). Edges are numbered by their position in the outgoing
+    arrays; incoming entries refer back to that number.
+
+    Preprocessing selects 'landmarks' nodes spread over the network (farthest-first) and
+    stores free-flow travel times from and to each of them, which give ALT lower bounds for
+    goal-directed A* searches. The graph never changes after construction (traffic goes into
+    a RoutingEngine), so it can be pickled and reused as a snapshot.
+    """
+
+    def __init__(self, latitudes, longitudes, edges, osm_ids=None, landmarks: int = DEFAULT_LANDMARKS):
+        self.latitudes = array.array("d", latitudes)
+        self.longitudes = array.array("d", longitudes)
+        self.osm_ids = array.array("q", osm_ids if osm_ids is not None else range(len(self.latitudes)))
+        node_count = len(self.latitudes)
+        edges = sorted(edges) # (tail, head, seconds, meters)
+        self.first_out = array.array("i", [0] * (node_count + 1))
+        for tail, _, _, _ in edges:
+            self.first_out[tail + 1] += 1
+        for node in range(node_count):
+            self.first_out[node + 1] += self.first_out[node]
+        self.heads = array.array("i", (head for _, head, _, _ in edges))
+        self.free_flow_seconds = array.array("d", (seconds for _, _, seconds, _ in edges))
+        self.lengths = array.array("f", (meters for _, _, _, meters in edges))
+
+        incoming = sorted((head, tail, edge) for edge, (tail, head, _, _) in enumerate(edges))
+        self.first_in = array.array("i", [0] * (node_count + 1))
+        for head, _, _ in incoming:
+            self.first_in[head + 1] += 1
+        for node in range(node_count):
+            self.first_in[node + 1] += self.first_in[node]
+        self.tails = array.array("i", (tail for _, tail, _ in incoming))
+        self.in_edges = array.array("i", (edge for _, _, edge in incoming))
+
+        self._cells = {}
+        for node in range(node_count):
+            self._cells.setdefault(self._cell(self.latitudes[node], self.longitudes[node]), []).append(node)
+        self._cells = {cell: array.array("i", nodes) for cell, nodes in self._cells.items()}
+        self.landmarks = []
+        self.landmark_from = [] # d(landmark, v) per landmark
+        self.landmark_to = [] # d(v, landmark) per landmark
+        self._select_landmarks(landmarks)
+
+    @classmethod
+    def from_osm(cls, path: str, landmarks: int = DEFAULT_LANDMARKS) -> "RoadGraph":
+        nodes, ways = read_osm_roads(path)
+        index = {}
+        latitudes, longitudes, osm_ids, edges = [], [], [], []
+        for node_ids, speed_kmh, direction in ways:
+            meters_per_second = speed_kmh / 3.6
+            for first, second in zip(node_ids, node_ids[1:]):
+                if first not in nodes or second not in nodes or first == second:
+                    continue # Clipped at the extract's boundary
+                endpoints = []
+                for node_id in (first, second):
+                    if node_id not in index:
+                        index[node_id] = len(osm_ids)
+                        osm_ids.append(node_id)
+                        latitudes.append(nodes[node_id][0])
+                        longitudes.append(nodes[node_id][1])
+                    endpoints.append(index[node_id])
+                meters = _equirectangular_meters(*nodes[first], *nodes[second])
+                seconds = meters / meters_per_second
+                if direction >= 0:
+                    edges.append((endpoints[0], endpoints[1], seconds, meters))
+                if direction <= 0:
+                    edges.append((endpoints[1], endpoints[0], seconds, meters))
+        if not edges:
+            raise ValueError(f"No drivable roads found in {path}.")
+        return cls(latitudes, longitudes, edges, osm_ids, landmarks)
+
+    def __len__(self) -> int:
+        return len(self.latitudes)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.heads)
+
+    def edge_tail(self, edge: int) -> int:
+        # Binary search over first_out: the node whose outgoing range holds the edge
+        low, high = 0, len(self.latitudes) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.first_out[middle] <= edge:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    # --- Snapping ---
+
+    @staticmethod
+    def _cell(lat: float, lon: float) -> tuple:
+        return math.floor(lat / SNAP_CELL_DEGREES), math.floor(lon / SNAP_CELL_DEGREES)
+
+    def nearest_node(self, lat: float, lon: float, max_meters: float = 2_000.0):
+        """
+        The road node closest to (lat, lon), or None when there is none within max_meters.
+        """
+        row, col = self._cell(lat, lon)
+        best, best_meters = None, max_meters
+        cell_meters = SNAP_CELL_DEGREES * _METERS_PER_DEGREE * math.cos(math.radians(lat))
+        ring = 0
+        # Ring r only holds points at least (r - 1) cells away
+        while (ring - 1) * cell_meters <= best_meters:
+            for cell_row in range(row - ring, row + ring + 1):
+                for cell_col in range(col - ring, col + ring + 1):
+                    if max(abs(cell_row - row), abs(cell_col - col)) != ring:
+                        continue
+                    for node in self._cells.get((cell_row, cell_col), ()):
+                        meters = _equirectangular_meters(lat, lon, self.latitudes[node], self.longitudes[node])
+                        if meters <= best_meters:
+                            best, best_meters = node, meters
+            ring += 1
+        return best
+
+    def nodes_within(self, lat: float, lon: float, radius_meters: float) -> list:
+        row, col = self._cell(lat, lon)
+        reach = int(radius_meters / (SNAP_CELL_DEGREES * _METERS_PER_DEGREE * math.cos(math.radians(lat)))) + 1
+        nodes = []
+        for cell_row in range(row - reach, row + reach + 1):
+            for cell_col in range(col - reach, col + reach + 1):
+                for node in self._cells.get((cell_row, cell_col), ()):
+                    if _equirectangular_meters(lat, lon, self.latitudes[node], self.longitudes[node]) <= radius_meters:
+                        nodes.append(node)
+        return nodes
+
+    # --- Landmarks (ALT) ---
+
+    def full_search(self, source: int, weights=None, reverse: bool = False) -> array.array:
+        """
+        Travel times from 'source' to every node (to 'source' from every node with reverse=True).
+        """
+        weights = self.free_flow_seconds if weights is None else weights
+        first, targets = (self.first_in, self.tails) if reverse else (self.first_out, self.heads)
+        in_edges = self.in_edges
+        distances = array.array("d", [INFINITY]) * len(self.latitudes)
+        distances[source] = 0.0
+        heap = [(0.0, source)]
+        heappop, heappush = heapq.heappop, heapq.heappush
+        while heap:
+            distance, node = heappop(heap)
+            if distance > distances[node]:
+                continue
+            for position in range(first[node], first[node + 1]):
+                candidate = distance + weights[in_edges[position] if reverse else position]
+                neighbour = targets[position]
+                if candidate < distances[neighbour]:
+                    distances[neighbour] = candidate
+                    heappush(heap, (candidate, neighbour))
+        return distances
+
+    def _select_landmarks(self, count: int) -> None:
+        if not count or not len(self.latitudes):
+            return
+        # Farthest-first: start from the node farthest from an arbitrary one, then repeatedly add
+        # the node farthest (by its closest landmark) from those chosen so far
+        closest = self.full_search(0)
+        while len(self.landmarks) < min(count, len(self.latitudes)):
+            landmark = max(range(len(closest)), key=lambda node: closest[node] if closest[node] < INFINITY else -1.0)
+            if self.landmarks and closest[landmark] <= 0.0:
+                break # Every reachable node is a landmark already
+            from_landmark = self.full_search(landmark)
+            self.landmarks.append(landmark)
+            # float32 halves the memory; bounds are scaled down slightly to stay admissible
+            self.landmark_from.append(array.array("f", from_landmark))
+            self.landmark_to.append(array.array("f", self.full_search(landmark, reverse=True)))
+            if len(self.landmarks) == 1:
+                closest = from_landmark
+            else:
+                closest = array.array("d", map(min, closest, from_landmark))
+
+    def lower_bound_function(self, target: int):
+        """
+        A function giving an ALT lower bound on the free-flow travel time from a node to 'target'.
+        """
+        terms = []
+        for from_landmark, to_landmark in zip(self.landmark_from, self.landmark_to):
+            if from_landmark[target] < INFINITY:
+                terms.append((from_landmark, from_landmark[target], 1.0)) # d(L,t) - d(L,v)
+            if to_landmark[target] < INFINITY:
+                terms.append((to_landmark, to_landmark[target], -1.0)) # d(v,L) - d(t,L)
+
+        def lower_bound(node: int) -> float:
+            bound = 0.0
+            for table, target_value, sign in terms:
+                value = table[node]
+                if value < INFINITY:
+                    estimate = (target_value - value) * sign
+                    if estimate > bound:
+                        bound = estimate
+            return bound * 0.999 # float32 rounding must never overestimate
+        return lower_bound
+
+
+# --- Routing Engine ---
+
+class RoutingEngine:
+    """
+    Live routing over a RoadGraph: current travel times (free flow times a per-edge factor for
+    reported blockages and congestion) and the positions of response units (ambulances,
+    patrol cars, fire engines).
+
+    nearest_units() answers "which k available units reach this incident first" with one
+    search backwards from the incident over incoming edges, which stops as soon as k units
+    are settled, so its cost depends on how far the k-th unit is, not on the fleet size.
+    route() is an A* search guided by the graph's landmark bounds. Edge factors are never
+    below 1, so the free-flow landmark bounds stay valid through every update and
+    set_edge_factor()/block_area() take effect immediately without any recomputation.
+
+    Updates never modify the weights or unit tables in place: they build a copy and swap it in
+    under the lock. A query takes references to the current tables and searches them without
+    holding the lock, so it does not delay GPS updates, blockage reports or other queries.
+    """
+
+    def __init__(self, graph: RoadGraph):
+        self.graph = graph
+        self._weights = array.array("d", graph.free_flow_seconds)
+        self._factors = {} # edge -> factor, for edges not at free flow
+        self._units = {} # unit_id -> (node, available, kind)
+        self._units_at = {} # node -> frozenset of unit_ids
+        self._lock = threading.Lock()
+        self._counters = {"queries": 0, "routes": 0, "nodes_settled": 0, "edge_updates": 0}
+
+    # --- Units ---
+
+    def update_unit(self, unit_id, lat: float, lon: float, available: bool = True, kind: str = None) -> bool:
+        """
+        Places a unit at the road node nearest its position. Returns False (and forgets the
+        unit) when it is nowhere near the road network.
+        """
+        node = self.graph.nearest_node(lat, lon)
+        with self._lock:
+            units, units_at = dict(self._units), dict(self._units_at)
+            self._remove_unit(units, units_at, unit_id)
+            if node is not None:
+                units[unit_id] = (node, available, kind)
+                units_at[node] = units_at.get(node, frozenset()) | {unit_id}
+            self._units, self._units_at = units, units_at
+        return node is not None
+
+    def set_unit_available(self, unit_id, available: bool) -> None:
+        with self._lock:
+            node, _, kind = self._units[unit_id]
+            units = dict(self._units)
+            units[unit_id] = (node, available, kind)
+            self._units = units
+
+    def remove_unit(self, unit_id) -> None:
+        with self._lock:
+            units, units_at = dict(self._units), dict(self._units_at)
+            self._remove_unit(units, units_at, unit_id)
+            self._units, self._units_at = units, units_at
+
+    @staticmethod
+    def _remove_unit(units: dict, units_at: dict, unit_id) -> None:
+        previous = units.pop(unit_id, None)
+        if previous is not None:
+            at_node = units_at[previous[0]] - {unit_id}
+            if at_node:
+                units_at[previous[0]] = at_node
+            else:
+                del units_at[previous[0]]
+
+    # --- Traffic ---
+
+    def set_edge_factor(self, edge: int, factor: float) -> None:
+        """
+        Multiplies an edge's free-flow travel time by 'factor' (>= 1; math.inf closes it, 1
+        restores free flow).
+        """
+        self._set_edge_factors((edge,), factor)
+
+    def _set_edge_factors(self, edges, factor: float) -> None:
+        if not factor >= 1.0:
+            raise ValueError("Edge factors must be at least 1 (free flow); use math.inf to close a road.")
+        free_flow_seconds = self.graph.free_flow_seconds
+        with self._lock:
+            weights = array.array("d", self._weights)
+            for edge in edges:
+                weights[edge] = free_flow_seconds[edge] * factor
+                if factor == 1.0:
+                    self._factors.pop(edge, None)
+                else:
+                    self._factors[edge] = factor
+            self._weights = weights
+            self._counters["edge_updates"] += len(edges)
+
+    def edges_near(self, lat: float, lon: float, radius_meters: float) -> set:
+        """
+        Edges (in either direction) with an end within radius_meters of the point.
+        """
+        graph = self.graph
+        edges = set()
+        for node in graph.nodes_within(lat, lon, radius_meters):
+            edges.update(range(graph.first_out[node], graph.first_out[node + 1]))
+            edges.update(graph.in_edges[position] for position in range(graph.first_in[node], graph.first_in[node + 1]))
+        return edges
+
+    def block_area(self, lat: float, lon: float, radius_meters: float = 50.0, factor: float = INFINITY) -> int:
+        """
+        Applies 'factor' to the roads around a reported blockage (closed by default, e.g. 3.0
+        for heavy congestion) and returns how many edges changed. factor=1 clears them.
+        """
+        edges = self.edges_near(lat, lon, radius_meters)
+        self._set_edge_factors(edges, factor) # One copy of the weights for the whole area
+        return len(edges)
+
+    def clear_traffic(self) -> None:
+        with self._lock:
+            self._weights = array.array("d", self.graph.free_flow_seconds)
+            self._counters["edge_updates"] += len(self._factors)
+            self._factors.clear()
+
+    # --- Queries ---
+
+    def nearest_units(self, lat: float, lon: float, k: int = 3, kind: str = None, max_seconds: float = INFINITY) -> list:
+        """
+        The k available units (of 'kind', if given) with the shortest current drive time to
+        (lat, lon), as [{'unit_id', 'kind', 'eta_seconds'}] sorted by ETA. Units farther than
+        max_seconds, or cut off by closed roads, are left out.
+        """
+        target = self.graph.nearest_node(lat, lon)
+        if target is None or k < 1:
+            return []
+        graph = self.graph
+        first_in, tails, in_edges = graph.first_in, graph.tails, graph.in_edges
+        heappop, heappush = heapq.heappop, heapq.heappush
+        with self._lock: # Tables are replaced, never modified, so these stay consistent
+            weights, units, units_at = self._weights, self._units, self._units_at
+        found = []
+        distances = {target: 0.0}
+        settled = set()
+        heap = [(0.0, target)]
+        while heap and len(found) < k:
+            distance, node = heappop(heap)
+            if node in settled:
+                continue
+            if distance > max_seconds:
+                break
+            settled.add(node)
+            for unit_id in units_at.get(node, ()):
+                _, available, unit_kind = units[unit_id]
+                if available and (kind is None or unit_kind == kind):
+                    found.append({"unit_id": unit_id, "kind": unit_kind, "eta_seconds": round(distance, 1)})
+            for position in range(first_in[node], first_in[node + 1]):
+                candidate = distance + weights[in_edges[position]]
+                neighbour = tails[position]
+                if candidate < distances.get(neighbour, INFINITY):
+                    distances[neighbour] = candidate
+                    heappush(heap, (candidate, neighbour))
+        with self._lock:
+            self._counters["queries"] += 1
+            self._counters["nodes_settled"] += len(settled)
+        # Several units can share the node where the search stopped
+        return sorted(found, key=lambda unit: unit["eta_seconds"])[:k]
+
+    def route(self, from_lat: float, from_lon: float, to_lat: float, to_lon: float, with_path: bool = True):
+        """
+        Fastest route under current traffic, as {'eta_seconds', 'distance_meters', 'path':
+        [(lat, lon), ...]}, or None when the destination cannot be reached.
+        """
+        graph = self.graph
+        source, target = graph.nearest_node(from_lat, from_lon), graph.nearest_node(to_lat, to_lon)
+        if source is None or target is None:
+            return None
+        lower_bound = graph.lower_bound_function(target)
+        first_out, heads = graph.first_out, graph.heads
+        heappop, heappush = heapq.heappop, heapq.heappush
+        with self._lock:
+            weights = self._weights
+        distances = {source: 0.0}
+        parents = {source: -1} # node -> edge it was reached by
+        settled = set()
+        heap = [(lower_bound(source), source)]
+        while heap:
+            _, node = heappop(heap)
+            if node == target:
+                break
+            if node in settled:
+                continue
+            settled.add(node)
+            distance = distances[node]
+            for edge in range(first_out[node], first_out[node + 1]):
+                candidate = distance + weights[edge]
+                neighbour = heads[edge]
+                if candidate < distances.get(neighbour, INFINITY):
+                    distances[neighbour] = candidate
+                    parents[neighbour] = edge
+                    heappush(heap, (candidate + lower_bound(neighbour), neighbour))
+        with self._lock:
+            self._counters["routes"] += 1
+            self._counters["nodes_settled"] += len(settled)
+        if target not in distances or distances[target] == INFINITY:
+            return None
+        edges = []
+        node = target
+        while parents[node] >= 0:
+            edges.append(parents[node])
+            node = graph.edge_tail(parents[node])
+        edges.reverse()
+        result = {"eta_seconds": round(distances[target], 1),
+                  "distance_meters": round(sum(graph.lengths[edge] for edge in edges), 1)}
+        if with_path:
+            path_nodes = [source] + [heads[edge] for edge in edges]
+            result["path"] = [(graph.latitudes[node], graph.longitudes[node]) for node in path_nodes]
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["units"] = len(self._units)
+            stats["available_units"] = sum(1 for _, available, _ in self._units.values() if available)
+            stats["edges_off_free_flow"] = len(self._factors)
+        stats["nodes"] = len(self.graph)
+        stats["edges"] = self.graph.edge_count
+        stats["landmarks"] = len(self.graph.landmarks)
+        return stats
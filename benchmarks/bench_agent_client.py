@@ -0,0 +1,162 @@
+# bench_agent_client.py
+#
+# Requests/sec against a local Flask stand-in agent (run in its own process): the current
+# one-`requests.post`-per-scenario loop vs AgentClient sequential, concurrent and pipelined
+# batches. Also checks deadlines and the in-process fallback. The stand-in is served by
+# waitress (keep-alive and pipelining, like gunicorn on Cloud Run) when it is installed;
+# the Flask dev server closes every connection, which hides the benefit of pooling.
+#
+# Usage: python benchmarks/bench_agent_client.py [--requests 2000] [--service-ms 0]
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from agent_client import AgentClient
+from load_test import generate_corpus
+
+
+def run_stand_in(port: int, service_seconds: float) -> None:
+    from flask import Flask, jsonify, request
+
+    app = Flask("agent-stand-in")
+
+    @app.post("/")
+    def predict():
+        scenario = request.get_json()
+        if service_seconds:
+            time.sleep(service_seconds)
+        # Same shape as an ADK tool returning a JSON string
+        return jsonify(json.dumps({"location": scenario["location_context"], "risk_level": "Medium", "status": "success"}))
+
+    try:
+        import waitress
+        logging.getLogger("waitress").setLevel(logging.ERROR) # Queue-depth warnings are expected under load
+        waitress.serve(app, host="127.0.0.1", port=port, threads=8, _quiet=True)
+    except ImportError:
+        from werkzeug.serving import make_server
+        make_server("127.0.0.1", port, app, threaded=True).serve_forever()
+
+
+def stand_in_server_name() -> str:
+    try:
+        import waitress # noqa: F401
+        return "waitress"
+    except ImportError:
+        return "Flask dev server, no keep-alive"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("Stand-in agent did not start.")
+
+
+def requests_post_loop(url: str, scenarios: list) -> float:
+    import requests
+
+    start = time.perf_counter()
+    for scenario in scenarios:
+        response = requests.post(url, data=json.dumps(scenario), headers={"Content-Type": "application/json"})
+        response.raise_for_status()
+        response.json()
+    return time.perf_counter() - start
+
+
+async def client_sequential(client: AgentClient, scenarios: list) -> float:
+    start = time.perf_counter()
+    for scenario in scenarios:
+        await client.call(scenario)
+    return time.perf_counter() - start
+
+
+async def client_concurrent(client: AgentClient, scenarios: list) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(client.call(scenario) for scenario in scenarios))
+    return time.perf_counter() - start
+
+
+async def client_batch(client: AgentClient, scenarios: list) -> float:
+    start = time.perf_counter()
+    results = await client.call_many(scenarios)
+    assert len(results) == len(scenarios) and results[0]["status"] == "success"
+    return time.perf_counter() - start
+
+
+def measure(label: str, count: int, elapsed: float, connections: int = None) -> None:
+    print(f"{label:<44} {count / elapsed:>10,.0f} {connections if connections is not None else count:>12,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--service-ms", type=float, default=0.0, help="Simulated agent work per request")
+    args = parser.parse_args()
+    scenarios = generate_corpus("predictions", args.requests)
+
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/"
+    server = multiprocessing.Process(target=run_stand_in, args=(port, args.service_ms / 1000), daemon=True)
+    server.start()
+    wait_for_port(port)
+
+    print(f"{args.requests:,} prediction scenarios against a Flask stand-in "
+          f"({stand_in_server_name()}, {args.service_ms:g} ms service time)\n")
+    print(f"{'client':<44} {'requests/s':>10} {'connections':>12}")
+    measure("requests.post loop (current)", args.requests, requests_post_loop(url, scenarios))
+
+    async def run_client_variants():
+        for label, variant, options in (
+            ("AgentClient sequential, keep-alive", client_sequential, {"max_connections_per_host": 1}),
+            ("AgentClient concurrent, 8 connections", client_concurrent, {"max_connections_per_host": 8}),
+            ("AgentClient call_many, 8 conns x pipeline 8", client_batch, {"max_connections_per_host": 8, "pipeline_depth": 8}),
+            ("AgentClient call_many, 4 conns x pipeline 32", client_batch, {"max_connections_per_host": 4, "pipeline_depth": 32}),
+        ):
+            client = AgentClient(url, **options)
+            elapsed = await variant(client, scenarios)
+            measure(label, args.requests, elapsed, client.connections_opened)
+            await client.close()
+
+        # Deadline: a 1 ms deadline on a slow agent must fail fast rather than hang
+        client = AgentClient(url, deadline_seconds=0.001)
+        try:
+            await client.call({"location_context": "MG Road"} if args.service_ms else scenarios[0])
+            print("\ndeadline: request finished inside 1 ms")
+        except asyncio.TimeoutError:
+            print("\ndeadline: 1 ms deadline raised TimeoutError as expected")
+        await client.close()
+
+    asyncio.run(run_client_variants())
+    server.terminate()
+    server.join()
+
+    # Fallback: with the agent down, the importable tool answers in-process
+    client = AgentClient(url, fallback_tool="emergency_call_nlp_agent:process_transcript_for_orchestration_and_user_followup",
+                         fallback_argument="call_transcript")
+    with open(os.devnull, "w") as devnull:
+        saved_stdout, sys.stdout = sys.stdout, devnull
+        try:
+            result = client.call_sync({"call_transcript": "There is a fire near MG Road, people trapped"})
+        finally:
+            sys.stdout = saved_stdout
+    print(f"fallback with the agent down: {client.counters['fallbacks']} in-process call(s), "
+          f"incident_type={json.loads(result['orchestration_json'])['incident_type']}")
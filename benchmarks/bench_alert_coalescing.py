@@ -0,0 +1,122 @@
+# bench_alert_coalescing.py
+#
+# Replays a dissemination storm: a stampede at one stadium reported by 300 social posts over
+# ten minutes (each turned into an alert, mostly HIGH, some CRITICAL), mixed with ordinary
+# alerts from the load-test corpus elsewhere in the city. Counts channel blasts (one alert on
+# one channel) sent with and without the AlertCoalescer, replayed on a simulated clock, and
+# times the coalescing decision itself. Then the same burst through disseminate_public_alert
+# end to end.
+#
+# Usage: python benchmarks/bench_alert_coalescing.py [--burst 300] [--background 300] [--minutes 10]
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from bench_batch_processing import silenced_stdout
+from bench_fast_path import percentile
+from load_test import generate_corpus
+
+STAMPEDE = {"alert_type": "EMERGENCY", "location": "M. Chinnaswamy Stadium",
+            "description": "Stampede near gate 12, several people injured",
+            "recommended_action": "Do not approach the stadium and follow police instructions"}
+
+
+def storm(burst: int, background: int, minutes: float, seed: int = 20) -> list:
+    """(seconds since start, alert) pairs in arrival order."""
+    rng = random.Random(seed)
+    events = [(rng.uniform(0, minutes * 60), dict(STAMPEDE, severity=rng.choices(["HIGH", "CRITICAL", "MEDIUM"], [6, 3, 1])[0]))
+              for _ in range(burst)]
+    events += [(rng.uniform(0, minutes * 60), alert) for alert in generate_corpus("alerts", background, seed=seed)]
+    return sorted(events, key=lambda event: event[0])
+
+
+def is_stampede(alert: dict) -> bool:
+    return alert["alert_type"] == STAMPEDE["alert_type"] and alert["location"] == STAMPEDE["location"]
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--burst", type=int, default=300)
+    parser.add_argument("--background", type=int, default=300)
+    parser.add_argument("--minutes", type=float, default=10.0)
+    args = parser.parse_args()
+    events = storm(args.burst, args.background, args.minutes)
+
+    with silenced_stdout():
+        import googlemapsagent
+        from alert_coalescer import AlertCoalescer
+
+        def channels_for(alert: dict) -> list:
+            return googlemapsagent.determine_channels_and_audience(alert["alert_type"], alert["severity"], alert["location"])["channels"]
+
+        # Channel blasts on a simulated clock, so the window and token buckets see ten real minutes
+        uncoalesced = {"all": 0, "stampede": 0}
+        for _, alert in events:
+            blasts = len(channels_for(alert))
+            uncoalesced["all"] += blasts
+            uncoalesced["stampede"] += blasts if is_stampede(alert) else 0
+
+        clock = SimulatedClock()
+        coalescer = AlertCoalescer(clock=clock)
+        coalesced = {"all": 0, "stampede": 0}
+        decisions = []
+        stampede_severities = []
+        for at, alert in events:
+            clock.now = at
+            started = time.perf_counter()
+            geofence = googlemapsagent.geofence_key(alert)
+            decision = coalescer.admit(alert["alert_type"], alert["severity"], geofence)
+            channels = []
+            if decision["action"] == "send":
+                channels, _ = coalescer.allow_channels(channels_for(dict(alert, severity=decision["severity"])))
+                if not channels:
+                    coalescer.release(alert["alert_type"], geofence)
+            decisions.append(time.perf_counter() - started)
+            coalesced["all"] += len(channels)
+            if is_stampede(alert):
+                coalesced["stampede"] += len(channels)
+                if channels:
+                    stampede_severities.append(decision["severity"])
+        stats = coalescer.stats()
+
+        # End to end through the tool (real clock: the whole burst falls inside one window)
+        tool_timings = {}
+        for mode in ("off", "on"):
+            googlemapsagent.ALERT_COALESCING = mode == "on"
+            googlemapsagent.ALERT_COALESCER = AlertCoalescer()
+            latencies, statuses = [], {}
+            for _, alert in events:
+                started = time.perf_counter()
+                status = json.loads(googlemapsagent.disseminate_public_alert(alert))["dissemination_status"]
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+            tool_timings[mode] = (latencies, statuses)
+
+    print(f"{len(events)} alerts over {args.minutes:g} min: {args.burst} about one stampede, {args.background} elsewhere\n")
+    print(f"{'channel blasts':<24} {'stampede':>9} {'all':>7}")
+    print(f"{'without coalescing':<24} {uncoalesced['stampede']:>9,} {uncoalesced['all']:>7,}")
+    print(f"{'with coalescing':<24} {coalesced['stampede']:>9,} {coalesced['all']:>7,}")
+    print(f"\nstampede alerts sent at severities {stampede_severities}")
+    print(f"suppressed {stats['suppressed']} of {len(events)} alerts: {stats['coalesced']} coalesced, "
+          f"{stats['rate_limited_geofence']} geofence rate limited, {stats['rate_limited_channel']} with every channel "
+          f"rate limited; {stats['channels_dropped']} channel blasts dropped by channel limits")
+    print(f"decision latency p50 {percentile(decisions, 0.5) * 1e6:.1f} us, p99 {percentile(decisions, 0.99) * 1e6:.1f} us "
+          f"(incl. channel selection)")
+    print(f"\n{'disseminate_public_alert':<26} {'p50 us':>8} {'p99 us':>8} {'total s':>8}  statuses")
+    for mode, (latencies, statuses) in tool_timings.items():
+        print(f"coalescing {mode:<15} {percentile(latencies, 0.5) * 1e6:>8.0f} {percentile(latencies, 0.99) * 1e6:>8.0f} "
+              f"{sum(latencies):>8.2f}  {statuses}")
@@ -0,0 +1,107 @@
+# bench_alert_templates.py
+#
+# Renders/sec and bytes retained per render for alert messages: the original f-string
+# format_alert_message (kept below as the baseline), compiled templates without memoization,
+# and the memoized AlertTemplateRegistry. Then one CRITICAL alert fanned out to a million
+# recipients split over English, Kannada and Hindi in every channel format, rendering per
+# recipient vs once per variant.
+#
+# Usage: python benchmarks/bench_alert_templates.py [--alerts 20000] [--recipients 1000000]
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from alert_templates import CHANNEL_LIMITS, LANGUAGES, AlertTemplateRegistry
+from load_test import generate_corpus
+
+
+def original_format_alert_message(alert_data: dict) -> str:
+    alert_type = alert_data.get("alert_type", "Public Safety Alert").upper()
+    severity = alert_data.get("severity", "Medium").upper()
+    location = alert_data.get("location", "Bengaluru").upper()
+    description = alert_data.get("description", "An incident has occurred.").capitalize()
+    recommended_action = alert_data.get("recommended_action", "Please stay informed.").capitalize()
+    message = f"[{alert_type} - {severity} ALERT] "
+    if alert_type == "TRAFFIC ADVISORY":
+        message += f"Traffic congestion in {location}. {description}. {recommended_action}."
+    elif alert_type == "EMERGENCY":
+        message += f"Immediate emergency in {location}. {description}. {recommended_action}."
+    elif alert_type == "EVENT UPDATE":
+        message += f"Important update for {location} event. {description}. {recommended_action}."
+    elif alert_type == "CRIME ALERT":
+        message += f"Crime alert in {location}. {description}. {recommended_action}."
+    else:
+        message += f"{description} in {location}. {recommended_action}."
+    return message
+
+
+def measure(render, alerts: list) -> tuple:
+    """(renders/s, bytes retained per render) over the alerts."""
+    started = time.perf_counter()
+    for alert in alerts:
+        render(alert)
+    elapsed = time.perf_counter() - started
+    # Keep every rendered message, as a fan-out holding one per recipient would
+    sample = alerts[:5000]
+    tracemalloc.start()
+    kept = [render(alert) for alert in sample]
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return len(alerts) / elapsed, retained / len(sample)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--alerts", type=int, default=20_000)
+    parser.add_argument("--recipients", type=int, default=1_000_000)
+    args = parser.parse_args()
+    alerts = generate_corpus("alerts", args.alerts)
+
+    registry = AlertTemplateRegistry()
+    assert all(registry.render(alert) == original_format_alert_message(alert) for alert in alerts[:500])
+    unmemoized = AlertTemplateRegistry(max_cached_renders=0)
+
+    print(f"{args.alerts:,} alerts from the load-test corpus ({len({tuple(sorted(a.items())) for a in alerts}):,} distinct)\n")
+    print(f"{'renderer':<40} {'renders/s':>12} {'bytes/render':>13}")
+    for label, render in (
+        ("original f-string format_alert_message", original_format_alert_message),
+        ("compiled templates, no memo", lambda alert: unmemoized.render(alert)),
+        ("compiled templates, memoized", lambda alert: registry.render(alert)),
+        ("memoized, Kannada SMS", lambda alert: registry.render(alert, "sms", "kn")),
+    ):
+        rate, retained = measure(render, alerts)
+        print(f"{label:<40} {rate:>12,.0f} {retained:>13,.1f}")
+
+    # Fan-out: one alert, recipients spread over languages; every channel format per recipient
+    alert = {"alert_type": "EMERGENCY", "severity": "CRITICAL", "location": "M. Chinnaswamy Stadium",
+             "description": "Stampede near gate 12, several people injured",
+             "recommended_action": "Do not approach the stadium and follow police instructions"}
+    formats = list(CHANNEL_LIMITS)
+    per_recipient = 20_000 # Rendering for every recipient is too slow to run to a million
+    fresh = AlertTemplateRegistry(max_cached_renders=0)
+    started = time.perf_counter()
+    for index in range(per_recipient):
+        language = LANGUAGES[index % len(LANGUAGES)]
+        for channel_format in formats:
+            fresh.render(alert, channel_format, language)
+    per_recipient_seconds = (time.perf_counter() - started) * args.recipients / per_recipient
+
+    shared = AlertTemplateRegistry()
+    started = time.perf_counter()
+    messages = []
+    for index in range(args.recipients):
+        language = LANGUAGES[index % len(LANGUAGES)]
+        messages.append([shared.render(alert, channel_format, language) for channel_format in formats])
+    memo_seconds = time.perf_counter() - started
+    distinct_objects = len({id(message) for variants in messages for message in variants})
+    stats = shared.stats()
+    print(f"\n{args.recipients:,} recipients x {len(formats)} formats, 3 languages:")
+    print(f"  render per recipient (est. from {per_recipient:,})  {per_recipient_seconds:>7.2f} s")
+    print(f"  memoized                                 {memo_seconds:>7.2f} s; {distinct_objects} distinct string "
+          f"objects shared by {len(messages):,} recipients; {stats['misses']} renders, {stats['hits']:,} cache hits")
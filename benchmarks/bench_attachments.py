@@ -0,0 +1,158 @@
+# bench_attachments.py
+#
+# Peak RSS and throughput of a report-intake server receiving concurrent citizen reports
+# with multi-MB report_image_b64 photos (several reporters share each photo). 'buffered'
+# reads the whole body, json.loads it and base64-decodes the image before analysing it, as
+# the JSON tool servers do; 'streaming' parses the body with attachments.parse_report_stream,
+# which decodes and hashes the image while it is read, spools it to disk and analyses each
+# distinct photo once through a memoryview. The server runs in its own process so its RSS is
+# not mixed with the client's.
+#
+# Usage: python benchmarks/bench_attachments.py [--reports 100] [--image-mb 5] [--distinct-images 10]
+
+import argparse
+import base64
+import concurrent.futures
+import hashlib
+import http.client
+import http.server
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from attachments import AttachmentStore, parse_report_stream
+
+
+def analyze_image(image) -> str:
+    # Stand-in for image analysis: one pass over every byte
+    return hashlib.sha1(image).hexdigest()
+
+
+def max_rss_mb() -> float:
+    # VmHWM starts over at exec; ru_maxrss would still include the forking parent's memory
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 # KiB on Linux
+
+
+# --- Server (child process) ---
+
+def serve(mode: str) -> None:
+    store = AttachmentStore() if mode == "streaming" else None
+    analyses = [0]
+    lock = threading.Lock()
+    startup_rss = max_rss_mb()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers["Content-Length"])
+            if store is None:
+                report = json.loads(self.rfile.read(length))
+                image = base64.b64decode(report.pop("report_image_b64"))
+                digest = analyze_image(image)
+                with lock:
+                    analyses[0] += 1
+            else:
+                report = parse_report_stream(self.rfile, store, length)
+                digest = store.analyze(report.pop("report_image"), analyze_image)
+            self._reply({"report_source": report.get("report_source"), "image_sha1": digest})
+
+        def do_GET(self):
+            stats = store.stats() if store is not None else {"analyses": analyses[0]}
+            self._reply(dict(stats, startup_rss_mb=startup_rss, max_rss_mb=max_rss_mb()))
+
+        def _reply(self, payload: dict) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    class Server(http.server.ThreadingHTTPServer):
+        request_queue_size = 256 # Every client connects at once
+        daemon_threads = True
+
+    server = Server(("127.0.0.1", 0), Handler)
+    print(server.server_address[1], flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        if store is not None:
+            store.close()
+
+
+# --- Client ---
+
+def request(port: int, method: str, body: bytes = None) -> dict:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+    try:
+        connection.request(method, "/", body=body, headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        payload = response.read()
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}: {payload[:200]!r}")
+        return json.loads(payload)
+    finally:
+        connection.close()
+
+
+def run(mode: str, bodies: list, reports: int) -> dict:
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", mode], stdout=subprocess.PIPE, text=True)
+    try:
+        port = int(server.stdout.readline())
+        started = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=reports) as pool:
+            results = list(pool.map(lambda index: request(port, "POST", bodies[index % len(bodies)]), range(reports)))
+        elapsed = time.perf_counter() - started
+        stats = request(port, "GET")
+    finally:
+        server.terminate()
+        server.wait()
+    assert len({result["image_sha1"] for result in results}) == len(bodies)
+    return dict(stats, elapsed=elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reports", type=int, default=100, help="Concurrent reports")
+    parser.add_argument("--image-mb", type=float, default=5.0)
+    parser.add_argument("--distinct-images", type=int, default=10, help="Distinct photos shared by the reporters")
+    parser.add_argument("--serve", choices=("buffered", "streaming"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve)
+        sys.exit(0)
+
+    rng = random.Random(21)
+    bodies = [json.dumps({
+        "report_text": f"Stampede near gate {index}, people are injured. Attaching a photo.",
+        "report_source": "Citizen App",
+        "report_image_b64": base64.b64encode(rng.randbytes(int(args.image_mb * 1024 * 1024))).decode("ascii"),
+    }).encode("utf-8") for index in range(args.distinct_images)]
+
+    print(f"{args.reports} concurrent reports, {args.image_mb:g} MB photos ({len(bodies[0]) / 2 ** 20:.1f} MB bodies), "
+          f"{args.distinct_images} distinct photos\n")
+    print(f"{'server':<10} {'peak RSS MB':>12} {'over idle':>10} {'reports/s':>10} {'MB/s':>8} {'analyses':>9}")
+    for mode in ("buffered", "streaming"):
+        stats = run(mode, bodies, args.reports)
+        body_mb = args.reports * len(bodies[0]) / 2 ** 20
+        print(f"{mode:<10} {stats['max_rss_mb']:>12.0f} {stats['max_rss_mb'] - stats['startup_rss_mb']:>10.0f} "
+              f"{args.reports / stats['elapsed']:>10.1f} {body_mb / stats['elapsed']:>8.0f} {stats['analyses']:>9}")
@@ -0,0 +1,81 @@
+# bench_batch_processing.py
+#
+# Compares calls/sec of process_transcripts_batch across executor types on a synthetic
+# corpus of Bengaluru emergency calls, and checks results match the single-call path.
+#
+# Usage: python benchmarks/bench_batch_processing.py [corpus_size]
+
+import contextlib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+import emergency_call_nlp_agent as nlp_agent
+
+LOCATIONS = [
+    "Brigade Road", "Brigade Road 10th cross", "Brigade Road 10th cross, house no 36", "MG Road",
+    "Koramangala", "Indiranagar", "Peenya", "Majestic", "Whitefield", "JP Nagar",
+]
+INCIDENTS = [
+    "my friend collapsed and is breathing heavily",
+    "there is a fire and people are trapped",
+    "a car accident, traffic blocked",
+    "someone robbed a shop, it was a theft",
+    "a loud blast, it looks serious",
+    "a man is unconscious on the footpath",
+]
+URGENCY = ["", "Please send an ambulance right now!", "Come quickly!", "Stop asking questions.", "Thank you."]
+CORPUS_SIZE = 2000
+CONFIGURATIONS = [
+    ("inline", 16, 8),
+    ("thread", 16, 8),
+    ("process", 16, 8),
+    ("process", 64, 4),
+]
+
+
+def synthetic_corpus(size: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    return [
+        f"Hello, near {rng.choice(LOCATIONS)} {rng.choice(INCIDENTS)}. {rng.choice(URGENCY)}"
+        for _ in range(size)
+    ]
+
+
+@contextlib.contextmanager
+def silenced_stdout():
+    # Redirect at the file-descriptor level so pool workers inherit it as well
+    sys.stdout.flush()
+    saved_fd = os.dup(1)
+    with open(os.devnull, "w") as devnull:
+        os.dup2(devnull.fileno(), 1)
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            os.dup2(saved_fd, 1)
+            os.close(saved_fd)
+
+
+if __name__ == "__main__":
+    corpus_size = int(sys.argv[1]) if len(sys.argv) > 1 else CORPUS_SIZE
+    corpus = synthetic_corpus(corpus_size)
+
+    with silenced_stdout():
+        expected = [nlp_agent.process_transcript_for_orchestration_and_user_followup(t) for t in corpus]
+
+    print(f"Corpus: {corpus_size} synthetic calls, {os.cpu_count()} CPUs\n")
+    print(f"{'executor':>9} {'chunk':>6} {'window':>7} {'seconds':>8} {'calls/sec':>10} {'identical':>10}")
+    for executor, chunk_size, max_in_flight in CONFIGURATIONS:
+        nlp_agent.TRANSCRIPT_RESULT_CACHE.clear() # Measure the analysis, not repeat cache hits
+        with silenced_stdout():
+            start = time.perf_counter()
+            results = nlp_agent.process_transcripts_batch(
+                corpus, executor=executor, chunk_size=chunk_size, max_in_flight=max_in_flight
+            )
+            elapsed = time.perf_counter() - start
+        identical = results == expected
+        print(f"{executor:>9} {chunk_size:>6} {max_in_flight:>7} {elapsed:>8.3f} {corpus_size / elapsed:>10.0f} {str(identical):>10}")
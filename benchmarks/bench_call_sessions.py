@@ -0,0 +1,105 @@
+# bench_call_sessions.py
+#
+# Cumulative processing cost of multi-turn calls: re-sending the whole transcript on every
+# turn (process_transcript_for_orchestration_and_user_followup on the transcript so far) vs
+# process_call_turn, which analyzes only the new utterance and merges it into the call's
+# session. Both the analysis alone and the full tools (with persistence) are timed, per turn
+# number, and every incremental result is checked against the whole-transcript analysis.
+#
+# Usage: python benchmarks/bench_call_sessions.py [--calls 200] [--turns 20]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from bench_batch_processing import silenced_stdout
+
+# Utterances of a caller answering follow-up questions
+UTTERANCES = [
+    "Hello, please help, my friend collapsed on the street",
+    "we are near Brigade Road, next to the big bookshop",
+    "it is the 10th cross, home no 36, the blue gate",
+    "he is breathing heavily and sweating a lot",
+    "I think he is conscious, he opened his eyes for a moment",
+    "no, he does not have any medical conditions that I know of",
+    "he is about forty five years old",
+    "there was a small fire in the kitchen earlier but it is out now",
+    "people are gathering around, traffic blocked on the main road",
+    "please come quickly, he is not responding anymore",
+    "I already told you the address, just send the ambulance right now",
+    "yes, I can see the ambulance lights from here",
+    "someone says a bike was stolen near MG Road at the same time",
+    "okay, I will stay on the line",
+]
+
+
+def make_call(rng: random.Random, turns: int) -> list:
+    return [rng.choice(UTTERANCES) for _ in range(turns)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+    rng = random.Random(19)
+    calls = [make_call(rng, args.turns) for _ in range(args.calls)]
+    marks = sorted({1, 5, 10, args.turns // 2, args.turns} - {0})
+
+    with silenced_stdout():
+        import emergency_call_nlp_agent as agent
+        from call_sessions import CallSession
+
+        agent.process_call_turn("warm-up", UTTERANCES[0])
+        agent.end_call("warm-up")
+        agent.TRANSCRIPT_RESULT_CACHE.clear()
+
+        def per_turn(run_turn) -> list:
+            totals = [0.0] * args.turns
+            for call_index, call in enumerate(calls):
+                state = {}
+                for turn, utterance in enumerate(call):
+                    started = time.perf_counter()
+                    run_turn(call_index, state, call[:turn + 1], utterance)
+                    totals[turn] += time.perf_counter() - started
+            return [total / len(calls) for total in totals]
+
+        def full_analysis(call_index, state, turns, utterance):
+            agent._analyze_transcript(" ".join(turns))
+
+        def incremental_analysis(call_index, state, turns, utterance):
+            session = state.setdefault("session", CallSession(f"call-{call_index}"))
+            state["result"] = agent.advance_call_session(session, utterance)
+            if len(turns) == args.turns:
+                final_results.append(state["result"])
+
+        def resend_tool(call_index, state, turns, utterance):
+            agent.process_transcript_for_orchestration_and_user_followup(" ".join(turns))
+
+        def session_tool(call_index, state, turns, utterance):
+            agent.process_call_turn(f"call-{call_index}", utterance)
+            if len(turns) == args.turns:
+                agent.end_call(f"call-{call_index}")
+
+        final_results = []
+        results = {}
+        for label, run_turn in (("analysis, whole transcript", full_analysis),
+                                ("analysis, incremental", incremental_analysis),
+                                ("tool, re-send transcript", resend_tool),
+                                ("tool, process_call_turn", session_tool)):
+            results[label] = per_turn(run_turn)
+        # Incremental analysis gives the same output as re-analyzing the whole call
+        assert final_results == [agent._analyze_transcript(" ".join(call)) for call in calls]
+
+    print(f"{args.calls} calls of {args.turns} turns, mean per call\n")
+    print(f"{'mode':<28} " + " ".join(f"{'turn ' + str(mark):>9}" for mark in marks) + f" {'all turns':>10}   (us)")
+    for label, timings in results.items():
+        print(f"{label:<28} " + " ".join(f"{timings[mark - 1] * 1e6:>9.1f}" for mark in marks)
+              + f" {sum(timings) * 1e6:>10.1f}")
+    for kind in ("analysis", "tool"):
+        whole, incremental = [sum(timings) for label, timings in results.items() if label.startswith(kind)]
+        print(f"{kind}: incremental is {whole / incremental:.1f}x cheaper over the whole call")
@@ -0,0 +1,111 @@
+# bench_dissemination.py
+#
+# Time-to-all-channels for a 5-channel CRITICAL alert against local stub channel servers
+# that inject 0-2s of latency (and failures), sequential vs concurrent DisseminationEngine.
+#
+# Usage: python benchmarks/bench_dissemination.py
+
+import asyncio
+import contextlib
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from dissemination_engine import DisseminationEngine, HttpChannelSender
+
+CHANNELS = [
+    "SMS", "Push Notification (Citizen App)", "Social Media (Twitter/Facebook)",
+    "Public Display Boards", "Traffic Management Center Display",
+]
+INJECTED_LATENCIES = (0.0, 0.5, 1.0, 2.0)
+AUDIENCE = {"geofence": "M. Chinnaswamy Stadium, Bengaluru", "demographics": "all_citizens"}
+MESSAGE = "[CROWD DISORDER - CRITICAL ALERT] Stampede risk near Gate 3. Avoid the area."
+
+
+# --- Stub Channel Servers ---
+
+class StubChannelServer:
+    """
+    Minimal HTTP endpoint that answers every request after 'delay_seconds' and fails with
+    HTTP 503 with probability 'failure_rate'. Runs on a shared background event loop.
+    """
+
+    def __init__(self, delay_seconds: float = 0.0, failure_rate: float = 0.0, seed: int = 0):
+        self.delay_seconds = delay_seconds
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self.port = None
+
+    async def start(self) -> None:
+        server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = server.sockets[0].getsockname()[1]
+
+    async def _handle(self, reader, writer) -> None:
+        content_length = 0
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            if line.lower().startswith(b"content-length:"):
+                content_length = int(line.split(b":")[1])
+        await reader.readexactly(content_length)
+        self.requests += 1
+        await asyncio.sleep(self.delay_seconds)
+        status = "503 Service Unavailable" if self._rng.random() < self.failure_rate else "200 OK"
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode("ascii"))
+        await writer.drain()
+        writer.close()
+
+
+class StubServerLoop:
+    """Runs the stub servers on an event loop in a background thread."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def start(self, server: StubChannelServer) -> StubChannelServer:
+        asyncio.run_coroutine_threadsafe(server.start(), self.loop).result()
+        return server
+
+
+def engine_for(servers: list, max_concurrency: int, **options) -> DisseminationEngine:
+    senders = {
+        channel: (channel, HttpChannelSender("127.0.0.1", server.port, channel_name=channel))
+        for channel, server in zip(CHANNELS, servers)
+    }
+    return DisseminationEngine(senders, max_concurrency=max_concurrency, **options)
+
+
+def time_to_all_channels(engine: DisseminationEngine) -> tuple:
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        status = engine.disseminate(MESSAGE, CHANNELS, AUDIENCE)
+    return time.perf_counter() - start, status
+
+
+if __name__ == "__main__":
+    stub_loop = StubServerLoop()
+
+    print(f"{'latency/channel':>16} {'sequential (s)':>15} {'concurrent (s)':>15} {'speedup':>8}")
+    for latency in INJECTED_LATENCIES:
+        servers = [stub_loop.start(StubChannelServer(delay_seconds=latency)) for _ in CHANNELS]
+        sequential, _ = time_to_all_channels(engine_for(servers, max_concurrency=1))
+        concurrent, status = time_to_all_channels(engine_for(servers, max_concurrency=len(CHANNELS)))
+        assert status["status"] == "success", status
+        print(f"{latency:>15.1f}s {sequential:>15.3f} {concurrent:>15.3f} {sequential / concurrent:>7.1f}x")
+
+    print("\nMixed 0-2s latency, 30% injected failures, 3 attempts, 2.5s per-attempt timeout:")
+    rng = random.Random(1)
+    servers = [
+        stub_loop.start(StubChannelServer(delay_seconds=rng.uniform(0, 2), failure_rate=0.3, seed=index))
+        for index in range(len(CHANNELS))
+    ]
+    engine = engine_for(servers, max_concurrency=len(CHANNELS), timeout_seconds=2.5, max_attempts=3)
+    elapsed, status = time_to_all_channels(engine)
+    print(f"  time to all channels: {elapsed:.3f}s, status: {status['status']}")
+    for channel, server in zip(CHANNELS, servers):
+        print(f"  {channel:<36} injected {server.delay_seconds:.2f}s  requests {server.requests}  "
+              f"latency {status['channel_latency_ms'][channel]:>8.1f} ms")
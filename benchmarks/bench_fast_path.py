@@ -0,0 +1,103 @@
+# bench_fast_path.py
+#
+# End-to-end latency for a mixed corpus of call transcripts and alert inputs sent through the
+# agents' FastPathRouter, vs sending everything through the LLM. The LLM is a StubLLM with a
+# fixed round trip (no network or model needed), so the numbers show the routing effect
+# rather than Gemini's variance. Requests are served by a small thread pool, like concurrent
+# sessions on one agent instance.
+#
+# Usage: python benchmarks/bench_fast_path.py [--requests 400] [--llm-ms 800] [--concurrency 16]
+
+import argparse
+import concurrent.futures
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+os.environ.setdefault("ALERT_COALESCING", "off") # Every alert should take the full dissemination path
+
+from bench_batch_processing import silenced_stdout
+from load_test import generate_corpus
+
+# Alerts the rules cannot handle as-is: wrong-case severity, missing fields, free text
+MALFORMED_ALERTS = [
+    {"alert_type": "EMERGENCY", "severity": "High", "location": "MG Road", "description": "Fire reported",
+     "recommended_action": "Avoid the area"},
+    {"alert_type": "CRIME ALERT", "severity": "HIGH", "location": "Koramangala", "description": "Chain snatching reported"},
+    {"text": "Heavy rain, waterlogging near Silk Board, ask commuters to avoid it"},
+]
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def mixed_corpus(size: int, seed: int = 9) -> list:
+    rng = random.Random(seed)
+    transcripts = [payload["call_transcript"] for payload in generate_corpus("transcripts", size // 2, seed=seed)]
+    alerts = generate_corpus("alerts", size - size // 2, seed=seed)
+    # About one alert in ten arrives malformed
+    alerts = [rng.choice(MALFORMED_ALERTS) if rng.random() < 0.1 else alert for alert in alerts]
+    corpus = [("transcript", transcript) for transcript in transcripts] + [("alert", alert) for alert in alerts]
+    rng.shuffle(corpus)
+    return corpus
+
+
+def run(routers: dict, corpus: list, concurrency: int) -> tuple:
+    latencies = {"transcript": [], "alert": []}
+
+    def serve(kind, payload):
+        started = time.perf_counter()
+        routers[kind].route(payload)
+        return kind, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for kind, elapsed in pool.map(lambda item: serve(*item), corpus):
+            latencies[kind].append(elapsed)
+    return latencies, time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--llm-ms", type=float, default=800.0, help="Simulated LLM round trip per escalated request")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    with silenced_stdout():
+        import emergency_call_nlp_agent
+        import googlemapsagent
+        from fast_path import FastPathRouter, StubLLM
+
+        tools = {"transcript": emergency_call_nlp_agent.process_transcript_for_orchestration_and_user_followup,
+                 "alert": googlemapsagent.disseminate_public_alert}
+        corpus = mixed_corpus(args.requests)
+        for kind, payload in corpus[:20]: # Warm up imports, caches and the Firestore writer
+            tools[kind](payload)
+
+        llm_only = {kind: FastPathRouter(kind, tool, lambda payload: 0.0, StubLLM(tool, args.llm_ms / 1000))
+                    for kind, tool in tools.items()}
+        baseline, baseline_wall = run(llm_only, corpus, args.concurrency)
+        routed_routers = {
+            "transcript": emergency_call_nlp_agent.build_fast_path_router(StubLLM(tools["transcript"], args.llm_ms / 1000)),
+            "alert": googlemapsagent.build_fast_path_router(StubLLM(tools["alert"], args.llm_ms / 1000)),
+        }
+        routed, routed_wall = run(routed_routers, corpus, args.concurrency)
+
+    print(f"{args.requests} mixed requests, stub LLM {args.llm_ms:g} ms, {args.concurrency} concurrent\n")
+    print(f"{'kind':<11} {'fast path':>9} {'LLM-only p50':>13} {'p99':>7} {'routed p50':>11} {'p99':>7}   (ms)")
+    for kind, router in routed_routers.items():
+        stats = router.stats()
+        print(f"{kind:<11} {stats['fast_path_ratio']:>9.0%} {percentile(baseline[kind], 0.5) * 1000:>13.1f} "
+              f"{percentile(baseline[kind], 0.99) * 1000:>7.1f} {percentile(routed[kind], 0.5) * 1000:>11.1f} "
+              f"{percentile(routed[kind], 0.99) * 1000:>7.1f}")
+    print(f"\nwall time: LLM-only {baseline_wall:.2f}s, routed {routed_wall:.2f}s")
+    for kind, router in routed_routers.items():
+        stats = router.stats()
+        print(f"{kind:<11} fast p50 {stats['fast_p50_seconds'] * 1000:.2f} ms / p99 {stats['fast_p99_seconds'] * 1000:.2f} ms, "
+              f"llm p50 {stats['llm_p50_seconds'] * 1000:.0f} ms; {stats['fast']} fast, {stats['llm']} escalated, "
+              f"{stats['fast_path_errors']} fast-path errors")
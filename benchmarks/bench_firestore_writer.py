@@ -0,0 +1,105 @@
+# bench_firestore_writer.py
+#
+# One synchronous Firestore add() per dissemination log vs the write-behind
+# FirestoreBatchWriter: sustained writes/sec and p50/p99 latency seen by the caller.
+# Runs against the in-process fake with a simulated commit round trip, or against the local
+# emulator when FIRESTORE_EMULATOR_HOST is set (and google-cloud-firestore is installed).
+#
+# Usage: python benchmarks/bench_firestore_writer.py [--records 20000] [--commit-latency-ms 5]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from firestore_writer import FirestoreBatchWriter, InMemoryFirestore, WriterBackpressure, default_firestore_client
+
+
+def dissemination_log(index: int) -> dict:
+    return {
+        "timestamp": f"2025-01-01T00:00:{index % 60:02d}",
+        "formatted_alert_message": f"[EMERGENCY - CRITICAL ALERT] Immediate emergency in MG ROAD. Incident {index}.",
+        "dissemination_status": "success",
+        "channels_used": ["SMS", "Push Notification", "Social Media", "Public Display Boards"],
+        "target_audience_criteria": {"geofence": "MG Road", "demographics": "all_citizens"},
+        "source_agent": "Public Communication & Alert Dissemination Agent",
+    }
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def make_client(commit_latency_seconds: float):
+    if os.environ.get("FIRESTORE_EMULATOR_HOST"):
+        return default_firestore_client(project=os.environ.get("GOOGLE_CLOUD_PROJECT", "demo-bench"))
+    return InMemoryFirestore(commit_latency_seconds=commit_latency_seconds)
+
+
+def one_by_one(records: list, client) -> tuple:
+    latencies = []
+    collection = client.collection("dissemination_logs")
+    start = time.perf_counter()
+    for record in records:
+        call_start = time.perf_counter()
+        collection.add(record)
+        latencies.append(time.perf_counter() - call_start)
+    return time.perf_counter() - start, latencies
+
+
+def write_behind(records: list, client, **options) -> tuple:
+    writer = FirestoreBatchWriter(client, **options)
+    latencies = []
+    start = time.perf_counter()
+    for record in records:
+        call_start = time.perf_counter()
+        writer.write("dissemination_logs", record)
+        latencies.append(time.perf_counter() - call_start)
+    writer.close() # Throughput counts the full drain
+    return time.perf_counter() - start, latencies, writer.stats()
+
+
+def report(label: str, records: int, elapsed: float, latencies: list) -> None:
+    print(f"{label:<34} {records / elapsed:>12,.0f} {percentile(latencies, 0.5) * 1e6:>10.1f} "
+          f"{percentile(latencies, 0.99) * 1e6:>10.1f} {max(latencies) * 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--commit-latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    commit_latency = args.commit_latency_ms / 1000
+    records = [dissemination_log(index) for index in range(args.records)]
+
+    target = "emulator" if os.environ.get("FIRESTORE_EMULATOR_HOST") else f"in-process fake, {args.commit_latency_ms:g} ms/commit"
+    print(f"{args.records:,} dissemination logs against the {target}\n")
+    print(f"{'path':<34} {'writes/sec':>12} {'p50 (us)':>10} {'p99 (us)':>10} {'max (us)':>11}")
+
+    # The one-by-one path is slow by design; time a slice of it
+    sample = records[:max(1, min(len(records), int(2.0 / max(commit_latency, 1e-4))))]
+    elapsed, latencies = one_by_one(sample, make_client(commit_latency))
+    report("one-by-one add()", len(sample), elapsed, latencies)
+
+    for batch_size in (50, 500):
+        elapsed, latencies, stats = write_behind(records, make_client(commit_latency), max_batch_size=batch_size)
+        assert stats["written"] == len(records), stats
+        report(f"write-behind, batches of {batch_size}", len(records), elapsed, latencies)
+
+    # Backpressure: a small queue in front of a slow store makes producers wait, then reject
+    print("\nBackpressure (queue of 1,000, 200 ms commits, 50 ms enqueue timeout):")
+    writer = FirestoreBatchWriter(InMemoryFirestore(commit_latency_seconds=0.2), max_batch_size=100,
+                                  max_queue_size=1_000, enqueue_timeout_seconds=0.05)
+    rejected = 0
+    for record in records[:5_000]:
+        try:
+            writer.write("dissemination_logs", record)
+        except WriterBackpressure:
+            rejected += 1
+    drained = writer.close()
+    stats = writer.stats()
+    print(f"  enqueued {stats['enqueued']:,}, rejected {rejected:,}, written after drain {stats['written']:,}, "
+          f"drained: {drained}")
@@ -0,0 +1,88 @@
+# bench_gazetteer.py
+#
+# Shows that Gazetteer lookup latency stays flat as the gazetteer grows to 50k entries,
+# compared with a linear 'alias in transcript' ladder over the same entries.
+#
+# Usage: python benchmarks/bench_gazetteer.py
+
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from gazetteer import Gazetteer
+
+GAZETTEER_SIZES = (1_000, 10_000, 50_000)
+TRANSCRIPTS = [
+    "My friend collapsed near Brigade Road 10th cross, house no 36. Please send an ambulance right now!",
+    "There is a fire at a factory in Peenya, people are trapped inside, please come quickly.",
+    "Hello, I want to report something but I am not sure where I am exactly.",
+]
+LOOKUP_ROUNDS = 2000
+LADDER_ROUNDS = 20
+
+
+def synthetic_entries(size: int, seed: int = 11) -> list:
+    """
+    Builds localities with cross streets and house numbers below them (roughly 1 : 3 : 6),
+    followed by the real Bengaluru entries the sample transcripts refer to.
+    """
+    rng = random.Random(seed)
+    entries = []
+    while len(entries) < size:
+        locality = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(6, 12)))
+        locality_id = f"loc_{len(entries)}"
+        entries.append({"id": locality_id, "parent": None, "aliases": [f"{locality} road", f"{locality} layout"],
+                        "location": f"{locality.title()} Road, Bengaluru, Karnataka, India"})
+        for cross in rng.sample(range(1, 40), 3):
+            cross_id = f"{locality_id}_cross_{cross}"
+            entries.append({"id": cross_id, "parent": locality_id, "aliases": [f"{cross}th cross"],
+                            "location": f"{locality.title()} Road, {cross}th cross, Bengaluru, Karnataka, India"})
+            for house in rng.sample(range(1, 200), 2):
+                entries.append({"id": f"{cross_id}_house_{house}", "parent": cross_id,
+                                "aliases": [f"house no {house}", f"home no {house}"],
+                                "location": f"{locality.title()} Road, {cross}th cross, house no {house}, Bengaluru, Karnataka, India"})
+    entries = entries[:size]
+    entries += [
+        {"id": "brigade_road", "parent": None, "aliases": ["brigade road"], "location": "Brigade Road, Bengaluru, Karnataka, India"},
+        {"id": "brigade_road_10th_cross", "parent": "brigade_road", "aliases": ["10th cross"],
+         "location": "Brigade Road, 10th cross, Bengaluru, Karnataka, India"},
+        {"id": "brigade_road_10th_cross_home_36", "parent": "brigade_road_10th_cross", "aliases": ["home no 36", "house no 36"],
+         "location": "Brigade Road, 10th cross, home no 36, Bengaluru, Karnataka, India"},
+        {"id": "peenya", "parent": None, "aliases": ["peenya"], "location": "Peenya, Bengaluru, Karnataka, India"},
+    ]
+    return entries
+
+
+def linear_ladder_lookup(entries: list, transcript: str):
+    # Equivalent of growing the old if/elif chain: test every alias of every entry
+    lower_transcript = transcript.lower()
+    return [entry["id"] for entry in entries if any(alias in lower_transcript for alias in entry["aliases"])]
+
+
+def time_per_lookup(function, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for transcript in TRANSCRIPTS:
+            function(transcript)
+    return (time.perf_counter() - start) / (rounds * len(TRANSCRIPTS))
+
+
+if __name__ == "__main__":
+    print(f"{'entries':>8} {'build (s)':>10} {'trie lookup (us)':>17} {'linear ladder (us)':>19}")
+    for size in GAZETTEER_SIZES:
+        entries = synthetic_entries(size)
+
+        start = time.perf_counter()
+        gazetteer = Gazetteer(entries)
+        build_seconds = time.perf_counter() - start
+
+        assert gazetteer.resolve(TRANSCRIPTS[0]) == "Brigade Road, 10th cross, home no 36, Bengaluru, Karnataka, India"
+        assert gazetteer.resolve(TRANSCRIPTS[1]) == "Peenya, Bengaluru, Karnataka, India"
+
+        trie = time_per_lookup(gazetteer.resolve, LOOKUP_ROUNDS)
+        ladder = time_per_lookup(lambda transcript: linear_ladder_lookup(entries, transcript), LADDER_ROUNDS)
+        print(f"{len(gazetteer):>8} {build_seconds:>10.2f} {trie * 1e6:>17.1f} {ladder * 1e6:>19.1f}")
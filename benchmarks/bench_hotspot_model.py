@@ -0,0 +1,101 @@
+# bench_hotspot_model.py
+#
+# Feeds 1M synthetic incidents (clustered around Bengaluru localities, spread over 8 weeks)
+# into HotspotModel one at a time and in batches, then measures top-k query latency, snapshot
+# size/time and how long a restarted model takes to answer its first query from the
+# memory-mapped snapshot. Also checks the decayed counts against a brute-force rescan.
+#
+# Usage: python benchmarks/bench_hotspot_model.py [--incidents 1000000] [--k 10]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+import numpy as np
+
+from hotspot_model import INCIDENT_TYPES, HotspotModel, hour_of_week
+from risk_grid import DEFAULT_LOCATIONS
+
+WEEKS = 8
+
+
+def synthetic_incidents(count: int, start: float, seed: int = 17) -> tuple:
+    rng = np.random.default_rng(seed)
+    centers = np.array([(location["lat"], location["lon"]) for location in DEFAULT_LOCATIONS])
+    picks = rng.integers(0, len(centers), count)
+    lats = centers[picks, 0] + rng.normal(0, 0.01, count)
+    lons = centers[picks, 1] + rng.normal(0, 0.01, count)
+    types = rng.choice(len(INCIDENT_TYPES), count, p=(0.15, 0.35, 0.4, 0.1))
+    timestamps = np.sort(start + rng.uniform(0, WEEKS * 7 * 86400, count))
+    return lats, lons, types, timestamps
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--incidents", type=int, default=1_000_000)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    start = 1_760_000_000.0
+    lats, lons, types, timestamps = synthetic_incidents(args.incidents, start)
+    now = float(timestamps[-1])
+    model = HotspotModel(epoch=start)
+    print(f"{args.incidents:,} incidents over {WEEKS} weeks; {model.rows}x{model.cols} cells x "
+          f"{len(INCIDENT_TYPES)} types x 168 hours ({(model._counts.nbytes + model._totals.nbytes) / 2**20:.0f} MiB)\n")
+
+    type_names = [INCIDENT_TYPES[index] for index in types.tolist()]
+    lat_list, lon_list, time_list = lats.tolist(), lons.tolist(), timestamps.tolist()
+    began = time.perf_counter()
+    for lat, lon, incident_type, timestamp in zip(lat_list, lon_list, type_names, time_list):
+        model.update(lat, lon, incident_type, timestamp)
+    single = time.perf_counter() - began
+
+    batched = HotspotModel(epoch=start)
+    began = time.perf_counter()
+    for offset in range(0, args.incidents, 10_000):
+        batched.update_batch(lats[offset:offset + 10_000], lons[offset:offset + 10_000],
+                             types[offset:offset + 10_000], timestamps[offset:offset + 10_000])
+    batch = time.perf_counter() - began
+    print(f"{'update path':<28} {'seconds':>8} {'incidents/s':>12}")
+    print(f"{'update() one at a time':<28} {single:>8.2f} {args.incidents / single:>12,.0f}")
+    print(f"{'update_batch() x 10,000':<28} {batch:>8.2f} {args.incidents / batch:>12,.0f}")
+
+    # Query latency across different hours of the week
+    latencies = []
+    for hour in range(500):
+        began = time.perf_counter()
+        model.top_cells(args.k, at=now - hour * 3600)
+        latencies.append(time.perf_counter() - began)
+    print(f"\ntop_cells(k={args.k}) over 500 hours: p50 {percentile(latencies, 0.5) * 1e6:.0f} us, "
+          f"p99 {percentile(latencies, 0.99) * 1e6:.0f} us")
+
+    # Brute-force check: rescan every incident for the top cell's hour of week
+    top = model.top_cells(args.k, at=now)
+    how = hour_of_week(now)
+    cells = np.array([model.cell_of(lat, lon) for lat, lon in zip(lat_list, lon_list)])
+    hows = np.array([hour_of_week(timestamp) for timestamp in time_list])
+    mask = (cells == top[0]["cell"]) & (hows == how)
+    rescan = float(np.sum(np.exp2(-(now - timestamps[mask]) / model.half_life_seconds)))
+    print(f"top cell {top[0]['cell']} ({top[0]['lat']}, {top[0]['lon']}): score {top[0]['score']:.3f}, "
+          f"rescan {rescan:.3f}, batched model {batched.cell_score(top[0]['lat'], top[0]['lon'], at=now):.3f}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        began = time.perf_counter()
+        model.snapshot(directory)
+        written = time.perf_counter() - began
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        began = time.perf_counter()
+        restored = HotspotModel.load(directory)
+        first = restored.top_cells(args.k, at=now)
+        warm = time.perf_counter() - began
+        print(f"\nsnapshot {size / 2**20:.0f} MiB written in {written * 1000:.0f} ms; restart to first answer "
+              f"{warm * 1000:.1f} ms, same top {args.k} as before the restart: {first == top}")
@@ -0,0 +1,170 @@
+# bench_incident_archive.py
+#
+# Post-event analysis over a month of incident reports and dissemination logs: the local
+# incident archive (segmented binary log compacted into day/location-cell partitioned
+# columns, see incident_archive) vs the same records as JSON lines scanned in full, which is
+# what a full-collection export/scan amounts to. Measures ingest rate, sequential replay
+# rate, compaction time, and the time of typical analyst queries with their predicates
+# pushed down (time range, severity, incident type, area) against a full JSON-lines scan.
+#
+# Usage: python benchmarks/bench_incident_archive.py [--records 10000000] [--format mmap|parquet]
+#            [--directory /tmp] [--jsonl-queries 3]
+
+import argparse
+import datetime
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from incident_archive import COLUMNAR_FORMATS, IncidentArchive, iter_segment
+from risk_grid import DEFAULT_LOCATIONS
+
+START = datetime.datetime(2026, 4, 1, tzinfo=datetime.timezone(datetime.timedelta(hours=5, minutes=30)))
+DAYS = 30
+INCIDENT_TYPES = ("Fire", "Medical Emergency", "Crime", "Unknown")
+SEVERITIES = ("Low", "Medium", "High", "Critical")
+ALERT_TYPES = ("TRAFFIC ADVISORY", "EMERGENCY", "EVENT UPDATE", "CRIME ALERT")
+CHINNASWAMY = (12.9788, 77.5996)
+MATCH_NIGHT = (START + datetime.timedelta(days=17, hours=19), START + datetime.timedelta(days=17, hours=23, minutes=30))
+
+
+def generate_records(count: int, seed: int):
+    """Yields (kind, record, timestamp, (lat, lon)) in time order; 1 in 10 records is an alert."""
+    rng = random.Random(seed)
+    start = START.timestamp()
+    step = DAYS * 86400.0 / count
+    for index in range(count):
+        timestamp = start + index * step
+        hub = rng.choice(DEFAULT_LOCATIONS)
+        lat, lon = hub["lat"] + rng.gauss(0, 0.03), hub["lon"] + rng.gauss(0, 0.03)
+        iso = datetime.datetime.fromtimestamp(timestamp, START.tzinfo).isoformat()
+        if index % 10 == 9:
+            alert_input = {"alert_type": rng.choice(ALERT_TYPES), "severity": rng.choice(SEVERITIES).upper(),
+                           "location": hub["name"], "description": "Incident reported nearby",
+                           "recommended_action": "Avoid the area"}
+            yield "alert", {"timestamp": iso, "original_alert_input": alert_input, "dissemination_status": "Sent",
+                            "channels_used": ["Push Notification", "Social Media"]}, timestamp, (lat, lon)
+        else:
+            yield "incident", {"incident_type": rng.choice(INCIDENT_TYPES), "location": hub["name"] + ", Karnataka, India",
+                               "description": "Caller reports an emergency", "severity": rng.choice(SEVERITIES),
+                               "anomalies": [], "timestamp": iso, "incident_source": "Emergency Call NLP Agent"}, timestamp, (lat, lon)
+
+
+def jsonl_matches(record: dict, query: dict) -> bool:
+    """The same predicates as IncidentArchive.query(), applied to a decoded JSON line."""
+    source = record.get("original_alert_input", record)
+    kind = "alert" if "original_alert_input" in record else "incident"
+    if query.get("kinds") and kind not in query["kinds"]:
+        return False
+    if query.get("start") is not None and not query["start"] <= record["_ts"] < query["end"]:
+        return False
+    if query.get("severities") and source["severity"].title() not in query["severities"]:
+        return False
+    if query.get("incident_types") and source.get("incident_type", source.get("alert_type")) not in query["incident_types"]:
+        return False
+    if query.get("near"):
+        lat, lon, radius_meters = query["near"]
+        x = math.radians(record["_lon"] - lon) * math.cos(math.radians(lat))
+        if math.hypot(x, math.radians(record["_lat"] - lat)) * 6_371_000.0 > radius_meters:
+            return False
+    return True
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=10_000_000)
+    parser.add_argument("--format", choices=COLUMNAR_FORMATS, default="mmap")
+    parser.add_argument("--directory", help="Where to write the archive and JSON lines (default: a temporary directory)")
+    parser.add_argument("--jsonl-queries", type=int, default=3, help="Queries also answered by a full JSON-lines scan")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(dir=args.directory)
+    try:
+        _, generation = timed(lambda: sum(1 for _ in generate_records(args.records, seed=25)))
+
+        jsonl_path = os.path.join(root, "records.jsonl")
+
+        def write_jsonl():
+            with open(jsonl_path, "w", encoding="utf-8") as jsonl_file:
+                for _, record, timestamp, (lat, lon) in generate_records(args.records, seed=25):
+                    jsonl_file.write(json.dumps(dict(record, _ts=timestamp, _lat=lat, _lon=lon), separators=(",", ":")) + "\n")
+        _, jsonl_ingest = timed(write_jsonl)
+
+        archive = IncidentArchive(os.path.join(root, "archive"), columnar_format=args.format)
+
+        def write_archive():
+            for kind, record, timestamp, coordinates in generate_records(args.records, seed=25):
+                archive.append(record, kind, timestamp=timestamp, coordinates=coordinates)
+            archive.roll()
+        _, archive_ingest = timed(write_archive)
+
+        # Sequential pass reading each record's kind and time (a replay filter's inputs)
+        def replay_log():
+            alerts = 0
+            for path in archive._log_segments():
+                for kind, _, _, _, _, _, _ in iter_segment(path):
+                    alerts += kind
+            return alerts
+        _, replay = timed(replay_log)
+
+        def read_jsonl():
+            with open(jsonl_path, encoding="utf-8") as jsonl_file:
+                return sum("original_alert_input" in json.loads(line) for line in jsonl_file)
+        _, jsonl_read = timed(read_jsonl)
+        _, compaction = timed(archive.compact)
+        stats = archive.stats()
+
+        def rate(seconds: float) -> str:
+            return f"{args.records / max(seconds, 1e-9) / 1e3:,.0f}k rec/s"
+
+        log_bytes = sum(os.path.getsize(os.path.join(dirpath, name))
+                        for dirpath, _, names in os.walk(os.path.join(root, "archive", "columns")) for name in names)
+        print(f"{args.records:,} records over {DAYS} days ({stats['parts']} partition parts, {args.format}); "
+              f"ingest rates exclude {generation:.1f} s of record generation\n")
+        print(f"{'':<28} {'JSON lines':>18} {'archive':>18}")
+        print(f"{'ingest':<28} {rate(jsonl_ingest - generation):>18} {rate(archive_ingest - generation):>18}")
+        print(f"{'sequential read':<28} {rate(jsonl_read):>18} {rate(replay):>18}  (decoded lines vs mmap log headers)")
+        print(f"{'on disk':<28} {os.path.getsize(jsonl_path) / 2**20:>15,.0f} MB {log_bytes / 2**20:>15,.0f} MB  (columns)")
+        print(f"{'compaction':<28} {'':>18} {compaction:>16.1f} s\n")
+
+        queries = {
+            "Critical within 1.5 km of Chinnaswamy, match night": {
+                "start": MATCH_NIGHT[0].timestamp(), "end": MATCH_NIGHT[1].timestamp(),
+                "severities": ["Critical"], "near": (*CHINNASWAMY, 1500.0)},
+            "Fire incidents, last 7 days": {
+                "start": (START + datetime.timedelta(days=DAYS - 7)).timestamp(),
+                "end": (START + datetime.timedelta(days=DAYS)).timestamp(),
+                "incident_types": ["Fire"], "kinds": ["incident"]},
+            "Critical/High crime alerts, whole month": {
+                "incident_types": ["CRIME ALERT"], "severities": ["Critical", "High"], "kinds": ["alert"]},
+        }
+        print(f"{'query':<52} {'rows':>9} {'scan ms':>9} {'query ms':>9} {'JSONL s':>9}")
+        for number, (name, query) in enumerate(queries.items()):
+            columns, scan_seconds = timed(lambda: archive.scan(**query))
+            records, query_seconds = timed(lambda: archive.query(**query))
+            assert len(records) == len(columns["timestamp"])
+            jsonl_column = "-"
+            if number < args.jsonl_queries:
+                def scan_jsonl():
+                    with open(jsonl_path, encoding="utf-8") as jsonl_file:
+                        return sum(1 for line in jsonl_file if jsonl_matches(json.loads(line), query))
+                matched, jsonl_seconds = timed(scan_jsonl)
+                assert matched == len(records), (matched, len(records))
+                jsonl_column = f"{jsonl_seconds:.1f}"
+            print(f"{name:<52} {len(records):>9,} {scan_seconds * 1e3:>9.1f} {query_seconds * 1e3:>9.1f} {jsonl_column:>9}")
+        print("\nscan: matching columns only; query: matching records decoded from their JSON payloads")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
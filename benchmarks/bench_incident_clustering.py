@@ -0,0 +1,138 @@
+# bench_incident_clustering.py
+#
+# Streams synthetic duplicate-heavy call/social reports through IncidentClusterer and reports:
+#   - insertion rate as the active window grows (1k -> 100k reports in the window)
+#   - pairwise precision/recall of the clusters against the ground-truth incidents
+# The clusterer's tuning parameters can be overridden to compare settings (see IncidentClusterer).
+#
+# Usage: python benchmarks/bench_incident_clustering.py [--windows 1000 10000 100000]
+#            [--similarity-threshold 0.4] [--max-bucket-size 32] [--bands 12] [--rows 3]
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from incident_clustering import IncidentClusterer
+
+LOCALITIES = [
+    "Brigade Road", "MG Road", "Koramangala", "Indiranagar", "Peenya", "Majestic", "Whitefield",
+    "JP Nagar", "Malleshwaram", "Hebbal", "Jayanagar", "Yelahanka", "Banashankari", "Marathahalli",
+]
+INCIDENT_TEMPLATES = [
+    ("Fire", "Critical", "fire at a {place} in {locality}, people trapped inside, smoke everywhere"),
+    ("Medical Emergency", "High", "man collapsed near the {place} in {locality}, he is not breathing properly"),
+    ("Crime", "High", "chain snatching near {place} {locality}, two men on a black bike fled"),
+    ("Crowd Disorder", "Critical", "stampede near gate {number} of the {place} at {locality}, people falling"),
+    ("Traffic", "Medium", "car accident at {place} junction {locality}, traffic blocked both sides"),
+]
+PLACES = ["market", "metro station", "bus stand", "temple", "mall", "stadium", "school", "hospital", "factory", "park"]
+SYLLABLES = ["ka", "ra", "ma", "na", "la", "sha", "va", "ga", "pa", "ha", "ya", "da", "ti", "ru", "ni", "lu", "ke", "bo"]
+FILLERS = ["please help", "need help fast", "#Bengaluru", "#emergency", "send police", "hurry", "omg", "anyone there?"]
+WINDOW_SIZES = (1_000, 10_000, 100_000)
+REPORTS_PER_INCIDENT = 8
+
+
+def _variant(text: str, rng: random.Random) -> str:
+    words = text.split()
+    # Callers drop words and add their own filler
+    words = [word for word in words if rng.random() > 0.1]
+    words.insert(rng.randrange(len(words) + 1), rng.choice(FILLERS))
+    if rng.random() < 0.3:
+        words = [word.upper() for word in words]
+    return " ".join(words)
+
+
+def _name(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def synthetic_reports(incident_count: int, reports_per_incident: int, seconds_per_incident: float, seed: int = 5) -> list:
+    """
+    Returns (report, true_incident_id) pairs ordered by timestamp. Reports of one incident
+    arrive within a few minutes of each other.
+    """
+    rng = random.Random(seed)
+    reports = []
+    for incident_id in range(incident_count):
+        incident_type, severity, template = rng.choice(INCIDENT_TEMPLATES)
+        # Real localities plus synthetic ward names, so concurrent incidents spread over the city
+        locality = rng.choice(LOCALITIES) if rng.random() < 0.05 else f"{_name(rng)} Nagar"
+        place = f"{_name(rng)} {rng.choice(PLACES)}"
+        text = template.format(place=place, locality=locality, number=rng.randint(1, 20))
+        text += f", opposite {_name(rng)} {rng.choice(['circle', 'bakery', 'apartments', 'signal'])}"
+        start = incident_id * seconds_per_incident
+        for _ in range(rng.randint(1, 2 * reports_per_incident - 1)):
+            reports.append(({
+                "report_text": _variant(text, rng),
+                "timestamp": start + rng.uniform(0, 300),
+                "location": f"{locality}, Bengaluru, Karnataka, India",
+                "incident_type": incident_type,
+                "severity": rng.choice([severity, "Medium", "High"]),
+                "anomalies": rng.sample(["caller stressed", "crowd panic", "repeated caller"], rng.randint(0, 1)),
+                "report_source": rng.choice(["Emergency Call", "Social Media", "Citizen App"]),
+            }, incident_id))
+    reports.sort(key=lambda pair: pair[0]["timestamp"])
+    return reports
+
+
+def pairwise_precision_recall(assignments: list) -> tuple:
+    """
+    assignments: (predicted cluster, true incident) per report.
+    """
+    def pairs(counts):
+        return sum(count * (count - 1) // 2 for count in counts.values())
+
+    joint, predicted, truth = {}, {}, {}
+    for predicted_id, true_id in assignments:
+        joint[(predicted_id, true_id)] = joint.get((predicted_id, true_id), 0) + 1
+        predicted[predicted_id] = predicted.get(predicted_id, 0) + 1
+        truth[true_id] = truth.get(true_id, 0) + 1
+    true_positive_pairs = pairs(joint)
+    precision = true_positive_pairs / pairs(predicted) if pairs(predicted) else 1.0
+    recall = true_positive_pairs / pairs(truth) if pairs(truth) else 1.0
+    return precision, recall
+
+
+def run(window_reports: int, **options) -> None:
+    # Pick the time window so that roughly 'window_reports' reports are active at once
+    seconds_per_incident = 10.0
+    window_seconds = math.ceil(window_reports / REPORTS_PER_INCIDENT) * seconds_per_incident
+    incident_count = 2 * window_reports // REPORTS_PER_INCIDENT
+    reports = synthetic_reports(incident_count, REPORTS_PER_INCIDENT, seconds_per_incident)
+    clusterer = IncidentClusterer(window_seconds=window_seconds, **options)
+
+    assignments = []
+    measured_reports, measured_seconds = 0, 0.0
+    for index, (report, true_id) in enumerate(reports):
+        start = time.perf_counter()
+        incident, _ = clusterer.add_report(report)
+        elapsed = time.perf_counter() - start
+        if index >= len(reports) // 2: # Only time the steady state, once the window is full
+            measured_reports += 1
+            measured_seconds += elapsed
+        assignments.append((incident["incident_id"], true_id))
+
+    precision, recall = pairwise_precision_recall(assignments)
+    print(f"{window_reports:>8} {len(reports):>8} {len(clusterer):>9} "
+          f"{measured_reports / measured_seconds:>12.0f} {measured_seconds / measured_reports * 1e6:>10.1f} "
+          f"{precision:>10.3f} {recall:>7.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--windows", type=int, nargs="+", default=WINDOW_SIZES, help="Active reports in the window")
+    parser.add_argument("--similarity-threshold", type=float, default=0.4)
+    parser.add_argument("--max-bucket-size", type=int, default=32)
+    parser.add_argument("--bands", type=int, default=12)
+    parser.add_argument("--rows", type=int, default=3)
+    args = parser.parse_args()
+    options = {"similarity_threshold": args.similarity_threshold, "max_bucket_size": args.max_bucket_size,
+               "bands": args.bands, "rows": args.rows}
+    print(f"{'window':>8} {'reports':>8} {'active':>9} {'reports/sec':>12} {'us/report':>10} {'precision':>10} {'recall':>7}")
+    for window_reports in args.windows:
+        run(window_reports, **options)
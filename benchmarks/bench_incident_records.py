@@ -0,0 +1,97 @@
+# bench_incident_records.py
+#
+# Wire cost of agent results: today's nested-JSON path (incidents as a dict holding the
+# orchestration fields as a JSON string, alerts as a JSON string that HTTP servers encode a
+# second time, so clients decode twice) vs the single-encoded record formats of
+# incident_records ('json', and 'msgpack' when installed). Measures bytes per response,
+# server-side encode and client-side decode time per record (down to the incident fields),
+# and the memory a consumer holds per decoded record: today's decoded dicts (both levels, for
+# incidents) vs IncidentRecord/AlertRecord objects.
+#
+# Usage: python benchmarks/bench_incident_records.py [--records 2000] [--repeats 5]
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("ALERT_COALESCING", "off") # Every alert is disseminated in full
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from bench_batch_processing import silenced_stdout
+from load_test import generate_corpus
+
+
+def best_microseconds(function, items: list, repeats: int, fresh=None) -> float:
+    """Best mean time per item over 'repeats' rounds; 'fresh' prepares the items outside the timer."""
+    best = float("inf")
+    for _ in range(repeats):
+        batch = fresh(items) if fresh else items
+        started = time.perf_counter()
+        for item in batch:
+            function(item)
+        best = min(best, (time.perf_counter() - started) / len(batch))
+    return best * 1e6
+
+
+def held_bytes(build) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del held
+    return size
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    with silenced_stdout():
+        import emergency_call_nlp_agent
+        import googlemapsagent
+        from incident_records import AlertRecord, IncidentRecord, available_wire_formats, decode, encode
+
+        transcripts = [payload["call_transcript"] for payload in
+                       generate_corpus("transcripts", args.records, skew=0.0, distinct=args.records, seed=22)]
+        alerts = generate_corpus("alerts", args.records, skew=0.0, distinct=args.records, seed=22)
+        records = {
+            # Records never legacy-encoded, so each round pays for the nested JSON string again
+            "incident": ([emergency_call_nlp_agent._analyze_transcript(transcript) for transcript in transcripts],
+                         IncidentRecord),
+            "alert": ([googlemapsagent.disseminate_alert_record(alert) for alert in alerts], AlertRecord),
+        }
+
+    def fresh(items: list) -> list:
+        return [copy.copy(record) for record in items]
+
+    def read_legacy(kind: str):
+        if kind == "incident": # The orchestration fields are a JSON string inside the decoded body
+            return lambda body: json.loads(decode(body, "legacy")["orchestration_json"])
+        return lambda body: decode(body, "legacy")
+
+    wire_formats = available_wire_formats()
+    print(f"{args.records} distinct records per kind; wire formats: {', '.join(wire_formats)} "
+          f"(msgpack {'installed' if 'msgpack' in wire_formats else 'not installed'})\n")
+    print(f"{'kind':<9} {'format':<8} {'bytes':>7} {'encode us':>10} {'decode us':>10} {'held B/rec':>11}")
+    for kind, (items, record_class) in records.items():
+        for wire_format in wire_formats:
+            bodies = [encode(record, wire_format) for record in fresh(items)]
+            encode_us = best_microseconds(lambda record: encode(record, wire_format), items, args.repeats, fresh)
+            reader = read_legacy(kind) if wire_format == "legacy" else (lambda body, wire_format=wire_format: decode(body, wire_format))
+            decode_us = best_microseconds(reader, bodies, args.repeats)
+            if wire_format == "legacy":
+                held = held_bytes(lambda: [(decode(body, "legacy"), reader(body)) if kind == "incident" else reader(body)
+                                           for body in bodies])
+            else:
+                held = held_bytes(lambda: [record_class.from_dict(decode(body, wire_format)) for body in bodies])
+            mean_bytes = sum(map(len, bodies)) / len(bodies)
+            print(f"{kind:<9} {wire_format:<8} {mean_bytes:>7.0f} {encode_us:>10.1f} {decode_us:>10.1f} "
+                  f"{held / len(bodies):>11.0f}")
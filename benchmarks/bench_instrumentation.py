@@ -0,0 +1,101 @@
+# bench_instrumentation.py
+#
+# Per-call cost of the agents' instrumentation on the transcript and alert tools, and on
+# uncached transcript analysis (extract -> classify -> follow-up, where most DEBUG lines are): DEBUG
+# logging (every stage logged to stdout, roughly what the unconditional DEBUG prints cost),
+# the default INFO level with tracing off, and INFO with stage tracing on every request and on
+# a 10% sample. stdout goes to /dev/null, as it would to a log collector, so the numbers show
+# formatting and serialization rather than terminal speed. Ends with a sample of the
+# Prometheus export. The alert tool's time is dominated by the dissemination engine's event
+# loop, so its column moves less than the analysis one.
+#
+# Usage: python benchmarks/bench_instrumentation.py [--requests 4000] [--repeats 3]
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+os.environ.setdefault("ALERT_COALESCING", "off") # Every alert should take the full dissemination path
+
+from bench_batch_processing import silenced_stdout
+from load_test import generate_corpus
+
+MODES = (
+    ("DEBUG logs, tracing off", logging.DEBUG, 0.0),
+    ("INFO, tracing off", logging.INFO, 0.0),
+    ("INFO, tracing sampled 10%", logging.INFO, 0.1),
+    ("INFO, tracing every request", logging.INFO, 1.0),
+)
+
+
+def per_call_microseconds(tool, payloads: list) -> float:
+    started = time.perf_counter()
+    for payload in payloads:
+        tool(payload)
+    return (time.perf_counter() - started) / len(payloads) * 1e6
+
+
+def nanoseconds_per_call(call, calls: int = 200_000) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        call()
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {}
+    with silenced_stdout():
+        import emergency_call_nlp_agent
+        import googlemapsagent
+        from instrumentation import METRICS, TRACER, get_logger, set_log_level
+
+        def analyze(call_transcript):
+            with TRACER.trace("emergency_call"):
+                return emergency_call_nlp_agent._analyze_transcript(call_transcript)
+
+        transcripts = [payload["call_transcript"] for payload in generate_corpus("transcripts", args.requests)]
+        tools = {
+            "analysis": (analyze, transcripts),
+            "transcript": (emergency_call_nlp_agent.process_transcript_for_orchestration_and_user_followup, transcripts),
+            "alert": (googlemapsagent.disseminate_public_alert, generate_corpus("alerts", args.requests)),
+        }
+        for tool, payloads in tools.values(): # Warm up imports, caches and the Firestore writer
+            for payload in payloads[:50]:
+                tool(payload)
+        # Modes are interleaved and the best round kept, so drift on a shared machine hits them alike
+        for _ in range(args.repeats):
+            for label, level, sample_rate in MODES:
+                set_log_level(level)
+                TRACER.set_sample_rate(sample_rate)
+                timings = results.setdefault(label, {})
+                for kind, (tool, payloads) in tools.items():
+                    timings[kind] = min(timings.get(kind, float("inf")), per_call_microseconds(tool, payloads))
+        exported = METRICS.export_prometheus()
+
+        log = get_logger("bench")
+        set_log_level(logging.INFO)
+        TRACER.set_sample_rate(0.0)
+        disabled_debug = nanoseconds_per_call(lambda: log.debug("Classifying incident", transcript="fire at MG Road"))
+        disabled_span = nanoseconds_per_call(lambda: TRACER.span("classify").__enter__())
+        empty_call = nanoseconds_per_call(lambda: None)
+
+    baseline = results["INFO, tracing off"]
+    print(f"{args.requests:,} transcripts and {args.requests:,} alerts, best of {args.repeats}\n")
+    print(f"{'mode':<30} " + " ".join(f"{kind + ' us':>14} {'vs off':>7}" for kind in tools))
+    for label, timings in results.items():
+        print(f"{label:<30} " + " ".join(f"{timings[kind]:>14.1f} {timings[kind] / baseline[kind]:>6.2f}x" for kind in tools))
+    print(f"\ndisabled LOG.debug {disabled_debug - empty_call:.0f} ns, span with tracing off "
+          f"{disabled_span - empty_call:.0f} ns (over an empty call)")
+
+    lines = exported.splitlines()
+    print(f"\nPrometheus export after the last run ({len(lines)} lines), sample:")
+    for line in [line for line in lines if not line.startswith("agent_stage_duration_seconds_bucket")][:12]:
+        print(f"  {line}")
@@ -0,0 +1,175 @@
+# bench_keyword_matcher.py
+#
+# Compares per-transcript latency of the current extract_entities/classify_incident (shared
+# KeywordMatcher plus gazetteer lookup) against the legacy chained 'if ... in lower_transcript'
+# implementation at 1x, 10x and 100x lengths, then shows how the two matcher strategies
+# scale as the phrase table grows.
+#
+# Usage: python benchmarks/bench_keyword_matcher.py
+
+import contextlib
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+import emergency_call_nlp_agent as nlp_agent
+from keyword_matcher import REGEX_STRATEGY_MIN_PHRASES, KeywordMatcher
+
+SAMPLE_TRANSCRIPTS = [
+    "My friend collapsed near Brigade Road 10th cross, house no 36. He is breathing heavily, send an ambulance right now!",
+    "There is a fire at a factory in Peenya, people are trapped inside, please come quickly.",
+    "Someone robbed my phone on MG Road, it was a theft by two men on a bike.",
+    "Car accident near Koramangala, traffic blocked, one person is unconscious.",
+    "Loud blast heard in Indiranagar, not sure what happened, it sounds serious.",
+    "Hello, I want to report something but I am not sure it is an emergency.",
+]
+LENGTH_MULTIPLIERS = (1, 10, 100)
+TABLE_SIZES = (40, 200, 1000, 5000)
+ROUNDS = 200
+
+
+# --- Legacy reference implementation (pre single-pass matcher) ---
+
+def legacy_classify_incident(call_transcript: str, current_severity: str = "Medium") -> dict:
+    print(f"DEBUG: Classifying incident from transcript: '{call_transcript}' with current_severity: {current_severity}")
+    incident_type = "Unknown"
+    urgency = current_severity
+    lower_transcript = call_transcript.lower()
+    keywords = []
+    if "fire" in lower_transcript or "burning" in lower_transcript:
+        incident_type = "Fire"
+        urgency = "High"
+        keywords.append("fire")
+    if "medical" in lower_transcript or "ambulance" in lower_transcript or "collapsed" in lower_transcript:
+        incident_type = "Medical Emergency"
+        urgency = "High"
+        keywords.append("medical")
+    if "crime" in lower_transcript or "theft" in lower_transcript or "robbery" in lower_transcript or "assault" in lower_transcript:
+        incident_type = "Crime"
+        urgency = "High"
+        keywords.append("crime")
+    if "critical" in lower_transcript or "major" in lower_transcript or "quickly" in lower_transcript or "trapped" in lower_transcript or "serious" in lower_transcript:
+        if urgency in ["High", "Medium"]:
+            urgency = "Critical"
+    return {"incident_type": incident_type, "urgency": urgency, "keywords": list(set(keywords))}
+
+
+def legacy_extract_entities(call_transcript: str) -> dict:
+    print(f"DEBUG: Extracting entities from transcript: '{call_transcript}'")
+    entities = {
+        "location": "Location Unknown (within Bengaluru, Karnataka, India)",
+        "description": "Emergency reported",
+        "anomalies": []
+    }
+    lower_transcript = call_transcript.lower()
+    if "brigade road" in lower_transcript:
+        entities["location"] = "Brigade Road, Bengaluru, Karnataka, India"
+        if "10th cross" in lower_transcript:
+            entities["location"] = "Brigade Road, 10th cross, Bengaluru, Karnataka, India"
+            if "home no 36" in lower_transcript or "house no 36" in lower_transcript:
+                entities["location"] = "Brigade Road, 10th cross, home no 36, Bengaluru, Karnataka, India"
+    elif "mg road" in lower_transcript:
+        entities["location"] = "MG Road, Bengaluru, Karnataka, India"
+    elif "koramangala" in lower_transcript:
+        entities["location"] = "Koramangala, Bengaluru, Karnataka, India"
+    elif "indiranagar" in lower_transcript:
+        entities["location"] = "Indiranagar, Bengaluru, Karnataka, India"
+    elif "peenya" in lower_transcript:
+        entities["location"] = "Peenya, Bengaluru, Karnataka, India"
+
+    incident_description_parts = []
+    anomalies_detected = []
+    if "collapsed" in lower_transcript:
+        incident_description_parts.append("Friend collapsed")
+    if "breathing heavily" in lower_transcript:
+        incident_description_parts.append("breathing heavily")
+    if "conscious" in lower_transcript:
+        incident_description_parts.append("conscious")
+    if "unconscious" in lower_transcript:
+        incident_description_parts.append("unconscious")
+    if "car accident" in lower_transcript:
+        incident_description_parts.append("Car accident")
+    if "traffic blocked" in lower_transcript:
+        incident_description_parts.append("Traffic blocked")
+    if "fire" in lower_transcript:
+        incident_description_parts.append("Fire incident")
+    if "blast" in lower_transcript:
+        incident_description_parts.append("Blast occurred")
+    if "robbed" in lower_transcript or "theft" in lower_transcript:
+        incident_description_parts.append("Crime/Robbery reported")
+    entities["description"] = ", ".join(incident_description_parts) if incident_description_parts else "Emergency reported"
+    if "not the right time" in lower_transcript or "right now" in lower_transcript or \
+       "stop asking" in lower_transcript or "ambulance right now" in lower_transcript:
+        anomalies_detected.append("caller stressed and unwilling to provide further information")
+    entities["anomalies"] = anomalies_detected
+    return entities
+
+
+# --- Harness ---
+
+def _normalize(classification: dict) -> dict:
+    return dict(classification, keywords=sorted(classification["keywords"]))
+
+
+def check_equivalence(transcripts) -> None:
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for transcript in transcripts:
+            assert nlp_agent.extract_entities(transcript) == legacy_extract_entities(transcript), transcript
+            for severity in ("Medium", "High", "Critical"):
+                assert _normalize(nlp_agent.classify_incident(transcript, severity)) == \
+                    _normalize(legacy_classify_incident(transcript, severity)), transcript
+
+
+def time_per_transcript(transcripts, extract, classify, clear_cache=None) -> float:
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            for transcript in transcripts:
+                if clear_cache:
+                    clear_cache() # Every call sees a fresh transcript, as in production
+                extract(transcript)
+                classify(transcript, "High")
+        elapsed = time.perf_counter() - start
+    return elapsed / (ROUNDS * len(transcripts))
+
+
+def time_scan(matcher: KeywordMatcher, text: str, rounds: int = 50) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        matcher.scan(text)
+    return (time.perf_counter() - start) / rounds
+
+
+def synthetic_phrases(count: int, rng: random.Random) -> list:
+    return ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 14))) for _ in range(count)]
+
+
+if __name__ == "__main__":
+    check_equivalence(SAMPLE_TRANSCRIPTS + [" ".join(SAMPLE_TRANSCRIPTS), "Unconscious FIREFIGHTER", ""])
+    print("Equivalence check passed against legacy implementation.\n")
+
+    print(f"{'length':>8} {'avg chars':>10} {'legacy (us)':>12} {'current (us)':>13} {'speedup':>8}")
+    for multiplier in LENGTH_MULTIPLIERS:
+        transcripts = [" ".join([transcript] * multiplier) for transcript in SAMPLE_TRANSCRIPTS]
+        avg_chars = sum(len(transcript) for transcript in transcripts) / len(transcripts)
+        legacy = time_per_transcript(transcripts, legacy_extract_entities, legacy_classify_incident)
+        matcher = time_per_transcript(
+            transcripts, nlp_agent.extract_entities, nlp_agent.classify_incident,
+            clear_cache=nlp_agent._scan_transcript.cache_clear,
+        )
+        print(f"{str(multiplier) + 'x':>8} {avg_chars:>10.0f} {legacy * 1e6:>12.2f} {matcher * 1e6:>13.2f} {legacy / matcher:>7.2f}x")
+
+    print(f"\nScan latency vs phrase table size (10x transcript; 'auto' switches to 'regex' at {REGEX_STRATEGY_MIN_PHRASES} phrases)")
+    print(f"{'phrases':>8} {'substring (us)':>15} {'regex (us)':>11}")
+    rng = random.Random(7)
+    text = " ".join(SAMPLE_TRANSCRIPTS * 10)
+    for size in TABLE_SIZES:
+        phrases = list(nlp_agent.TRANSCRIPT_MATCHER.phrases) + synthetic_phrases(size, rng)
+        substring = KeywordMatcher(phrases, strategy="substring")
+        regex = KeywordMatcher(phrases, strategy="regex")
+        assert substring.scan(text) == regex.scan(text)
+        print(f"{size:>8} {time_scan(substring, text) * 1e6:>15.1f} {time_scan(regex, text) * 1e6:>11.1f}")
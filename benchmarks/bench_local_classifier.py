@@ -0,0 +1,90 @@
+# bench_local_classifier.py
+#
+# Throughput and latency of the local incident classifier on CPU against the micro-batch
+# size. 'concurrency' closed-loop clients each classify report texts and call transcripts
+# back to back through a MicroBatcher; batch size 1 is one forward pass per request (how
+# reports are triaged today), larger sizes share a forward pass between the requests that
+# arrived within --max-wait-ms. Needs transformers plus torch (or onnxruntime with
+# --runtime onnx and a directory holding model.onnx).
+#
+# Usage: python benchmarks/bench_local_classifier.py [--model distilbert-base-uncased] [--default-labels]
+#            [--runtime torch|onnx] [--quantize] [--requests 2000] [--concurrency 64]
+#            [--batch-sizes 1,4,8,16,32,64] [--max-wait-ms 5]
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from bench_fast_path import percentile
+from load_test import generate_corpus
+from local_classifier import DEFAULT_LABELS, DEFAULT_MAX_WAIT_MS, RUNTIMES, MicroBatcher, TransformerIncidentClassifier
+
+
+def closed_loop(classify, texts: list, concurrency: int) -> tuple:
+    """(requests per second, per-request latencies) with 'concurrency' clients sharing the texts."""
+    latencies = []
+    lock = threading.Lock()
+    next_index = [0]
+
+    def client():
+        while True:
+            with lock:
+                index = next_index[0]
+                next_index[0] += 1
+            if index >= len(texts):
+                return
+            started = time.perf_counter()
+            classify(texts[index])
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(texts) / (time.perf_counter() - started), latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=os.environ.get("INCIDENT_CLASSIFIER_MODEL", "distilbert-base-uncased"))
+    parser.add_argument("--default-labels", action="store_true",
+                        help="Give the model a fresh head with local_classifier.DEFAULT_LABELS (throughput only)")
+    parser.add_argument("--runtime", choices=RUNTIMES, default="torch")
+    parser.add_argument("--quantize", action="store_true", help="Dynamic int8 quantization (torch runtime)")
+    parser.add_argument("--threads", type=int, help="Intra-op threads for the forward pass")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--batch-sizes", default="1,4,8,16,32,64")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    try:
+        model = TransformerIncidentClassifier(args.model, args.runtime, args.quantize,
+                                              labels=DEFAULT_LABELS if args.default_labels else None,
+                                              threads=args.threads)
+    except ImportError as e:
+        print(f"Cannot run the local classifier here: {e}")
+        sys.exit(1)
+
+    texts = [report["report_text"] for report in generate_corpus("reports", args.requests // 2, skew=0.0, seed=23)]
+    texts += [payload["call_transcript"] for payload in generate_corpus("transcripts", args.requests - len(texts), skew=0.0, seed=23)]
+    model.predict_batch(texts[:16]) # Warm-up
+
+    print(f"{args.model} ({args.runtime}{', int8' if model.quantized else ''}), {os.cpu_count()} CPUs, "
+          f"{len(texts)} requests from {args.concurrency} clients, max wait {args.max_wait_ms:g} ms\n")
+    print(f"{'max batch':>9} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'mean batch':>11}")
+    for batch_size in [int(size) for size in args.batch_sizes.split(",")]:
+        batcher = MicroBatcher(model.predict_batch, max_batch_size=batch_size, max_wait_ms=args.max_wait_ms)
+        throughput, latencies = closed_loop(batcher, texts, args.concurrency)
+        stats = batcher.stats()
+        batcher.close()
+        print(f"{batch_size:>9} {throughput:>8.1f} {percentile(latencies, 0.5) * 1e3:>8.1f} "
+              f"{percentile(latencies, 0.99) * 1e3:>8.1f} {stats['mean_batch_size']:>11.1f}")
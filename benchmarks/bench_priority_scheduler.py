@@ -0,0 +1,107 @@
+# bench_priority_scheduler.py
+#
+# Pushes mixed-severity bursts through a worker pool fed either by a plain FIFO queue or by
+# PriorityScheduler, and reports per-severity p50/p99 latency (submit -> done). Bursts exceed
+# the pool's capacity, so a backlog builds up the way it does during a festival surge.
+#
+# Usage: python benchmarks/bench_priority_scheduler.py
+
+import collections
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from priority_scheduler import SEVERITY_LEVELS, PriorityScheduler
+
+SEVERITY_MIX = {"Critical": 0.1, "High": 0.3, "Medium": 0.4, "Low": 0.2}
+WORKERS = 4
+SERVICE_SECONDS = 0.002 # Per item, I/O bound (e.g. a dissemination call); pool capacity ~2,000/s
+BURSTS = 5
+BURST_SIZE = 1_500 # Arrives at once; takes ~0.75s to clear
+BURST_GAP_SECONDS = 0.5 # Shorter than the clear time, so the backlog keeps growing
+AGING_SECONDS = 1.0
+
+
+class FifoScheduler:
+    """Baseline: one FIFO queue, the order items arrive in."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def submit(self, item, severity: str) -> None:
+        self._queue.put((item, severity))
+
+    def get(self, timeout: float = None):
+        item, severity = self._queue.get(timeout=timeout)
+        return item, severity, None
+
+
+def workload(seed: int = 3) -> list:
+    rng = random.Random(seed)
+    levels, weights = zip(*SEVERITY_MIX.items())
+    return [[rng.choices(levels, weights)[0] for _ in range(BURST_SIZE)] for _ in range(BURSTS)]
+
+
+def run(scheduler, bursts: list) -> dict:
+    latencies = collections.defaultdict(list)
+    remaining = sum(len(burst) for burst in bursts)
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def worker():
+        nonlocal remaining
+        while not done.is_set():
+            try:
+                (severity, submitted_at), _, _ = scheduler.get(timeout=0.1)
+            except (queue.Empty, TimeoutError):
+                continue
+            time.sleep(SERVICE_SECONDS)
+            with lock:
+                latencies[severity].append(time.perf_counter() - submitted_at)
+                remaining -= 1
+                if remaining == 0:
+                    done.set()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(WORKERS)]
+    for thread in threads:
+        thread.start()
+    for burst in bursts:
+        for severity in burst:
+            scheduler.submit((severity, time.perf_counter()), severity)
+        time.sleep(BURST_GAP_SECONDS)
+    done.wait()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+if __name__ == "__main__":
+    bursts = workload()
+    print(f"{BURSTS} bursts of {BURST_SIZE:,} items every {BURST_GAP_SECONDS}s, {WORKERS} workers x "
+          f"{SERVICE_SECONDS * 1000:g} ms/item, aging every {AGING_SECONDS}s\n")
+
+    fifo = run(FifoScheduler(), bursts)
+    scheduler = PriorityScheduler(aging_seconds=AGING_SECONDS)
+    prioritized = run(scheduler, bursts)
+
+    print(f"{'severity':<9} {'items':>6} {'FIFO p50':>9} {'FIFO p99':>9} {'prio p50':>9} {'prio p99':>9}  (ms)")
+    for level in SEVERITY_LEVELS:
+        print(f"{level:<9} {len(fifo[level]):>6} "
+              f"{percentile(fifo[level], 0.5) * 1000:>9.1f} {percentile(fifo[level], 0.99) * 1000:>9.1f} "
+              f"{percentile(prioritized[level], 0.5) * 1000:>9.1f} {percentile(prioritized[level], 0.99) * 1000:>9.1f}")
+
+    print("\nScheduler metrics after the run:")
+    for level, metrics in scheduler.metrics().items():
+        print(f"  {level:<9} served {metrics['served']:>5}  by aging {metrics['served_by_aging']:>4}  "
+              f"wait p50 {metrics['wait_p50_seconds'] * 1000:>7.1f} ms  p99 {metrics['wait_p99_seconds'] * 1000:>7.1f} ms  "
+              f"max {metrics['wait_max_seconds'] * 1000:>7.1f} ms  depth {metrics['depth']}")
@@ -0,0 +1,122 @@
+# bench_pubsub_runtime.py
+#
+# Load test of the Emergency Call NLP Agent hosted as a StreamingConsumer on the in-memory
+# broker: transcripts are published to 'emergency-calls', the consumer publishes structured
+# incidents to 'incident-reports', and a downstream subscriber measures end-to-end latency.
+# Reports sustained messages/sec for a burst, and latency percentiles at fixed offered loads.
+#
+# Usage: python benchmarks/bench_pubsub_runtime.py [--messages 20000]
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+import emergency_call_nlp_agent as nlp_agent
+from bench_batch_processing import silenced_stdout, synthetic_corpus
+from pubsub_runtime import (PUBLISH_TIME_ATTRIBUTE, BatchPublisher, InMemoryBroker, StreamingConsumer,
+                            encode_json, tool_handler)
+
+OFFERED_LOADS = (500, 2_000, 5_000) # messages/sec
+WORKER_COUNTS = (1, 4)
+
+
+class LatencyCollector:
+    """Downstream subscriber standing in for the Central Orchestration Agent."""
+
+    def __init__(self, broker: InMemoryBroker, subscription: str, expected: int):
+        self.broker = broker
+        self.subscription = subscription
+        self.expected = expected
+        self.latencies = []
+        self.done = threading.Event()
+        self.finished_at = None
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self) -> None:
+        while len(self.latencies) < self.expected:
+            messages = self.broker.pull(self.subscription, 500, timeout=0.5)
+            now = time.time()
+            for message in messages:
+                self.latencies.append(now - float(message.attributes[PUBLISH_TIME_ATTRIBUTE]))
+            if messages:
+                self.broker.acknowledge(self.subscription, [message.ack_id for message in messages])
+        self.finished_at = time.perf_counter()
+        self.done.set()
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(corpus: list, max_workers: int, rate: float = None) -> dict:
+    """
+    Publishes the corpus (as fast as possible, or paced at 'rate' messages/sec) through the
+    NLP consumer and returns throughput, latency percentiles and broker counters.
+    """
+    nlp_agent.TRANSCRIPT_RESULT_CACHE.clear()
+    broker = InMemoryBroker()
+    for topic, subscription in (("emergency-calls", "nlp-agent"), ("incident-reports", "orchestrator")):
+        broker.create_topic(topic)
+        broker.create_subscription(subscription, topic)
+
+    consumer = StreamingConsumer(
+        broker, "nlp-agent",
+        tool_handler(nlp_agent.process_transcript_for_orchestration_and_user_followup, "call_transcript"),
+        output_topic="incident-reports", max_outstanding_messages=1000, max_workers=max_workers,
+    ).start()
+    collector = LatencyCollector(broker, "orchestrator", len(corpus))
+    publisher = BatchPublisher(broker, "emergency-calls", max_messages=100, max_latency_seconds=0.005)
+
+    start = time.perf_counter()
+    for index, transcript in enumerate(corpus):
+        if rate:
+            delay = start + index / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        publisher.publish(encode_json({"call_transcript": transcript}))
+    publisher.close()
+    collector.done.wait()
+    elapsed = collector.finished_at - start
+    consumer.stop()
+
+    latencies = collector.latencies
+    return {
+        "messages_per_sec": len(corpus) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "ack_calls": broker.counters["ack_calls"],
+        "publish_calls": broker.counters["publish_calls"],
+        "flow_control_waits": consumer.stats()["flow_control_waits"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20_000)
+    args = parser.parse_args()
+    corpus = synthetic_corpus(args.messages)
+
+    with silenced_stdout():
+        sequential_start = time.perf_counter()
+        for transcript in corpus[:2000]:
+            nlp_agent.process_transcript_for_orchestration_and_user_followup(transcript)
+        sequential_rate = 2000 / (time.perf_counter() - sequential_start)
+    print(f"{args.messages:,} synthetic calls; one-at-a-time tool calls: {sequential_rate:,.0f} calls/sec\n")
+
+    print(f"{'offered load':>13} {'workers':>8} {'msgs/sec':>10} {'p50 (ms)':>9} {'p95 (ms)':>9} "
+          f"{'p99 (ms)':>9} {'ack calls':>10} {'publishes':>10} {'fc waits':>9}")
+    for rate in (None,) + OFFERED_LOADS:
+        for max_workers in WORKER_COUNTS:
+            count = args.messages if rate is None else min(args.messages, int(rate * 4)) # ~4s per paced run
+            with silenced_stdout():
+                result = run(corpus[:count], max_workers, rate)
+            label = "burst" if rate is None else f"{rate:,}/s"
+            print(f"{label:>13} {max_workers:>8} {result['messages_per_sec']:>10,.0f} {result['p50_ms']:>9.1f} "
+                  f"{result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['ack_calls']:>10,} "
+                  f"{result['publish_calls']:>10,} {result['flow_control_waits']:>9,}")
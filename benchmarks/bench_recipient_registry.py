@@ -0,0 +1,124 @@
+# bench_recipient_registry.py
+#
+# Geofence query latency and memory of RecipientRegistry at 1M and 10M synthetic subscribers
+# spread over greater Bengaluru, against a linear scan over all subscribers (1M only).
+#
+# Usage: python benchmarks/bench_recipient_registry.py [--max-subscribers 10000000]
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from recipient_registry import RecipientRegistry, _point_in_polygon
+
+CITY_CENTER = (12.9716, 77.5946)
+SUBSCRIBER_COUNTS = (1_000_000, 10_000_000)
+GEOFENCES = [
+    ("radius 500m (stadium)", {"type": "radius", "center": [12.9788, 77.5996], "radius_m": 500}),
+    ("radius 2km (Koramangala)", {"type": "radius", "center": [12.9352, 77.6245], "radius_m": 2_000}),
+    ("radius 5km (city core)", {"type": "radius", "center": list(CITY_CENTER), "radius_m": 5_000}),
+    ("polygon 6 vertices (ward)", {"type": "polygon", "vertices": [
+        [12.960, 77.580], [12.975, 77.575], [12.990, 77.590],
+        [12.985, 77.610], [12.965, 77.615], [12.955, 77.600],
+    ]}),
+]
+REPEATS = 5
+
+
+def load_registry(count: int, seed: int = 7) -> tuple:
+    """
+    Subscribes 'count' points: a dense core around the city center plus a wider sprawl.
+    """
+    rng = random.Random(seed)
+    registry = RecipientRegistry()
+    subscribe, gauss = registry.subscribe, rng.gauss
+    start = time.perf_counter()
+    for index in range(count):
+        spread = 0.04 if index % 3 else 0.12
+        subscribe(gauss(CITY_CENTER[0], spread), gauss(CITY_CENTER[1], spread))
+    return registry, time.perf_counter() - start
+
+
+def registry_bytes(registry: RecipientRegistry) -> int:
+    total = sum(sys.getsizeof(column) for column in (
+        registry._latitudes, registry._longitudes, registry._cell_of, registry._position))
+    total += sys.getsizeof(registry._cells)
+    total += sum(sys.getsizeof(key) + sys.getsizeof(members) for key, members in registry._cells.items())
+    return total
+
+
+def time_query(registry: RecipientRegistry, geofence_area: dict) -> tuple:
+    """
+    Returns (time to first recipient, time to stream all recipients, recipient count), best of REPEATS.
+    """
+    best_first, best_total, count = math.inf, math.inf, 0
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        first = None
+        count = 0
+        for batch in registry.iter_geofence(geofence_area, batches=True):
+            if first is None:
+                first = time.perf_counter() - start
+            count += len(batch)
+        best_total = min(best_total, time.perf_counter() - start)
+        best_first = min(best_first, first if first is not None else best_total)
+    return best_first, best_total, count
+
+
+def linear_scan(registry: RecipientRegistry, geofence_area: dict) -> tuple:
+    latitudes, longitudes = registry._latitudes, registry._longitudes
+    start = time.perf_counter()
+    if geofence_area["type"] == "radius":
+        center_lat, center_lon = geofence_area["center"]
+        lat_scale = math.pi * 6_371_000.0 / 180.0
+        lon_scale = lat_scale * math.cos(math.radians(center_lat))
+        radius_squared = geofence_area["radius_m"] ** 2
+        count = sum(1 for lat, lon in zip(latitudes, longitudes)
+                    if ((lat - center_lat) * lat_scale) ** 2 + ((lon - center_lon) * lon_scale) ** 2 <= radius_squared)
+    else:
+        polygon = [tuple(vertex) for vertex in geofence_area["vertices"]]
+        count = sum(1 for lat, lon in zip(latitudes, longitudes) if _point_in_polygon(lat, lon, polygon))
+    return time.perf_counter() - start, count
+
+
+def run(count: int) -> None:
+    registry, load_seconds = load_registry(count)
+    print(f"\n{count:,} subscribers: loaded in {load_seconds:.1f}s "
+          f"({count / load_seconds:,.0f} subscribes/sec), {len(registry._cells):,} occupied cells, "
+          f"{registry_bytes(registry) / 2**20:,.1f} MiB ({registry_bytes(registry) / count:.1f} bytes/subscriber)")
+    print(f"{'geofence':<28} {'recipients':>11} {'first (ms)':>11} {'all (ms)':>10} {'linear scan (ms)':>17}")
+    for label, geofence_area in GEOFENCES:
+        first, total, matched = time_query(registry, geofence_area)
+        scan = ""
+        if count <= 1_000_000:
+            scan_seconds, scan_count = linear_scan(registry, geofence_area)
+            assert scan_count == matched, (label, scan_count, matched)
+            scan = f"{scan_seconds * 1000:.1f}"
+        print(f"{label:<28} {matched:>11,} {first * 1000:>11.3f} {total * 1000:>10.2f} {scan:>17}")
+
+    # Incremental updates on the loaded registry
+    rng = random.Random(3)
+    handles = rng.sample(range(count), 10_000)
+    start = time.perf_counter()
+    for handle in handles:
+        registry.move(handle, rng.gauss(CITY_CENTER[0], 0.04), rng.gauss(CITY_CENTER[1], 0.04))
+    move_us = (time.perf_counter() - start) / len(handles) * 1e6
+    start = time.perf_counter()
+    for handle in handles:
+        registry.unsubscribe(handle)
+    unsubscribe_us = (time.perf_counter() - start) / len(handles) * 1e6
+    print(f"move: {move_us:.2f} us, unsubscribe: {unsubscribe_us:.2f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-subscribers", type=int, default=max(SUBSCRIBER_COUNTS))
+    args = parser.parse_args()
+    for count in SUBSCRIBER_COUNTS:
+        if count <= args.max_subscribers:
+            run(count)
@@ -0,0 +1,73 @@
+# bench_result_cache.py
+#
+# Replays a Zipf-skewed stream of duplicate emergency calls (the same incident reported by
+# many callers with different casing/punctuation) through the transcript pipeline with and
+# without the result cache, and confirms cached outputs equal the raw transcripts analyzed
+# afresh, including for variants whose punctuation changes what the analyzer sees ("M.G. Road"
+# vs "mg road", "right, now" vs "right now").
+#
+# Usage: python benchmarks/bench_result_cache.py [stream_length]
+
+import contextlib
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+import emergency_call_nlp_agent as nlp_agent
+from bench_batch_processing import synthetic_corpus
+
+DISTINCT_INCIDENTS = 500
+STREAM_LENGTH = 20000
+ZIPF_EXPONENT = 1.1
+# Differ only in punctuation, but resolve differently ('m g road' vs 'mg road' tokens, the
+# stressed-caller phrase), so they must not share a cache entry
+PUNCTUATION_VARIANT_CALLS = ["Someone fainted near M.G. Road", "someone fainted near mg road",
+                             "Fire at Peenya, come right, now", "fire at peenya come right now"]
+
+
+def caller_variant(transcript: str, rng: random.Random) -> str:
+    # Same report from a different caller: casing, spacing and punctuation differ
+    variant = transcript.upper() if rng.random() < 0.2 else transcript
+    if rng.random() < 0.5:
+        variant = variant.replace(", ", " ,  ")
+    return variant + rng.choice(["", "!", "!!", " ...", "?"])
+
+
+def zipf_stream(incidents: list, length: int, seed: int = 3) -> list:
+    rng = random.Random(seed)
+    weights = [1.0 / (rank ** ZIPF_EXPONENT) for rank in range(1, len(incidents) + 1)]
+    cumulative = list(itertools.accumulate(weights))
+    picks = rng.choices(incidents, cum_weights=cumulative, k=length)
+    return [caller_variant(transcript, rng) for transcript in picks]
+
+
+if __name__ == "__main__":
+    stream_length = int(sys.argv[1]) if len(sys.argv) > 1 else STREAM_LENGTH
+    incidents = list(dict.fromkeys(synthetic_corpus(DISTINCT_INCIDENTS * 4)))[:DISTINCT_INCIDENTS]
+    stream = PUNCTUATION_VARIANT_CALLS + zipf_stream(incidents, stream_length) + PUNCTUATION_VARIANT_CALLS[::-1]
+    nlp_agent.TRANSCRIPT_RESULT_CACHE.clear()
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        fresh = [nlp_agent._analyze_transcript(transcript).to_legacy()
+                 for transcript in stream]
+        uncached_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cached = [nlp_agent.process_transcript_for_orchestration_and_user_followup(transcript) for transcript in stream]
+        cached_seconds = time.perf_counter() - start
+
+    stats = nlp_agent.get_transcript_cache_stats()
+    stream_length = len(stream)
+    print(f"Stream: {stream_length} calls over {len(incidents)} distinct incidents (Zipf s={ZIPF_EXPONENT})\n")
+    print(f"{'mode':>9} {'seconds':>8} {'calls/sec':>10}")
+    print(f"{'uncached':>9} {uncached_seconds:>8.3f} {stream_length / uncached_seconds:>10.0f}")
+    print(f"{'cached':>9} {cached_seconds:>8.3f} {stream_length / cached_seconds:>10.0f}")
+    print(f"\nSpeedup: {uncached_seconds / cached_seconds:.1f}x")
+    print(f"Cache: hits={stats['hits']} misses={stats['misses']} evictions={stats['evictions']} "
+          f"hit_ratio={stats['hit_ratio']:.2%} entries={stats['entries']} bytes={stats['bytes']}")
+    print(f"Cached outputs equal fresh outputs: {cached == fresh}")
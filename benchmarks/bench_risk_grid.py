@@ -0,0 +1,69 @@
+# bench_risk_grid.py
+#
+# Scores a synthetic city of grid cells x 96 fifteen-minute slots x 3 day types with an RCB
+# match and a few other events active: RiskGrid.score() in one call vs calling risk_score()
+# per cell. The scalar loop is timed on a random sample of cells and extrapolated, and the
+# sample is checked against the tensor.
+#
+# Usage: python benchmarks/bench_risk_grid.py [--cells 10000] [--sample 200]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+import numpy as np
+
+from risk_grid import DAY_TYPES, DEFAULT_LOCATIONS, HOURLY_PROFILES, SLOTS_PER_DAY, RiskGrid, events_from_active_events, make_event, risk_score
+
+
+def synthetic_cells(count: int, seed: int = 11) -> list:
+    # Roughly Bengaluru's extent: 12.85-13.10 N, 77.45-77.75 E
+    rng = random.Random(seed)
+    categories = sorted(HOURLY_PROFILES)
+    return [{"name": f"cell-{index}", "lat": rng.uniform(12.85, 13.10), "lon": rng.uniform(77.45, 77.75),
+             "category": rng.choice(categories), "base_risk": rng.uniform(0.1, 0.5)} for index in range(count)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cells", type=int, default=10_000)
+    parser.add_argument("--sample", type=int, default=200, help="Cells scored with the scalar loop")
+    args = parser.parse_args()
+
+    cells = synthetic_cells(args.cells)
+    events = events_from_active_events([{"name": "RCB Match", "location": "M. Chinnaswamy Stadium"}], DEFAULT_LOCATIONS)
+    events += [make_event("Karaga Festival", 12.9634, 77.5770, radius_m=1500.0, intensity=0.25, start_hour=20.0, end_hour=24.0),
+               make_event("Tech Summit", 13.0621, 77.5940, radius_m=1000.0, intensity=0.1, start_hour=9.0, end_hour=18.0,
+                          day_types=("weekday",))]
+    total = args.cells * SLOTS_PER_DAY * len(DAY_TYPES)
+    print(f"{args.cells:,} cells x {SLOTS_PER_DAY} slots x {len(DAY_TYPES)} day types = {total:,} scores, {len(events)} events\n")
+
+    start = time.perf_counter()
+    grid = RiskGrid(cells)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    scores = grid.score(events)
+    vectorized = time.perf_counter() - start
+    start = time.perf_counter()
+    hotspots = grid.top_hotspots(scores, k=10)
+    top_k = time.perf_counter() - start
+
+    sample = random.Random(5).sample(range(args.cells), min(args.sample, args.cells))
+    start = time.perf_counter()
+    reference = np.array([[[risk_score(cells[index], slot, day, events) for day in DAY_TYPES]
+                           for slot in range(SLOTS_PER_DAY)] for index in sample])
+    scalar = (time.perf_counter() - start) * args.cells / len(sample)
+    max_error = float(np.abs(scores[sample] - reference).max())
+
+    print(f"{'path':<34} {'seconds':>9} {'scores/s':>14}")
+    print(f"{'scalar risk_score loop (est.)':<34} {scalar:>9.3f} {total / scalar:>14,.0f}")
+    print(f"{'RiskGrid.score':<34} {vectorized:>9.3f} {total / vectorized:>14,.0f}")
+    print(f"\nspeedup {scalar / vectorized:,.0f}x; grid build {build * 1000:.1f} ms, top-10 {top_k * 1000:.1f} ms, "
+          f"tensor {scores.nbytes / 2**20:.1f} MiB, max |grid - scalar| on {len(sample)} sampled cells {max_error:.1e}")
+    print("\nTop hotspots:")
+    for hotspot in hotspots[:5]:
+        print(f"  {hotspot['location']:<12} {hotspot['day_type']:<9} {hotspot['time_slot']}  {hotspot['risk_score']:.3f} {hotspot['risk_level']}")
@@ -0,0 +1,85 @@
+# bench_startup.py
+#
+# Cold-start cost per agent module, each measured in a fresh interpreter: import time, time to
+# the first tool response and time until root_agent is usable, with AGENT_STARTUP=eager (the
+# previous behaviour: google.adk imported and the Agent built at import) vs lazy. Then the
+# same for the emergency call agent serving a large GAZETTEER_PATH file, with and without a
+# precompiled table snapshot (AGENT_TABLE_SNAPSHOT_DIR).
+#
+# Usage: python benchmarks/bench_startup.py [--runs 3] [--gazetteer-entries 50000]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+AGENTS_DIR = os.path.join(BENCHMARKS_DIR, "..", "agents")
+sys.path.insert(0, AGENTS_DIR)
+
+from bench_gazetteer import synthetic_entries
+
+MODULES = (("emergency_call_nlp_agent", "transcripts"), ("googlemapsagent", "alerts"))
+
+CHILD = """
+import time
+started = time.perf_counter()
+import contextlib, importlib, io, json, sys
+sys.path[:0] = [{agents!r}, {benchmarks!r}]
+with contextlib.redirect_stdout(io.StringIO()):
+    module = importlib.import_module({module!r})
+    imported = time.perf_counter()
+    from load_test import generate_corpus, in_process_target
+    send = in_process_target({kind!r})
+    send(generate_corpus({kind!r}, 1)[0])
+    responded = time.perf_counter()
+    module.root_agent
+    agent_ready = time.perf_counter()
+print("TIMINGS", json.dumps({{"import": imported - started, "first_response": responded - started, "agent_ready": agent_ready - started}}))
+"""
+
+
+def measure(module: str, kind: str, env: dict, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        code = CHILD.format(agents=AGENTS_DIR, benchmarks=BENCHMARKS_DIR, module=module, kind=kind)
+        output = subprocess.run([sys.executable, "-c", code], env=dict(os.environ, **env),
+                                capture_output=True, text=True, check=True).stdout
+        # Writers flushing at exit may print after the timings line
+        timings = next(line for line in output.splitlines() if line.startswith("TIMINGS "))
+        samples.append(json.loads(timings.split(" ", 1)[1]))
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def report(label: str, timings: dict) -> None:
+    print(f"{label:<52} {timings['import'] * 1000:>8.0f} {timings['first_response'] * 1000:>10.0f} "
+          f"{timings['agent_ready'] * 1000:>11.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per configuration (median reported)")
+    parser.add_argument("--gazetteer-entries", type=int, default=50_000)
+    args = parser.parse_args()
+
+    print(f"Median of {args.runs} fresh interpreters; milliseconds from the start of the import\n")
+    header = f"{'module / startup mode':<52} {'import':>8} {'1st reply':>10} {'root_agent':>11}"
+    print(header)
+    for module, kind in MODULES:
+        for mode in ("eager", "lazy"):
+            report(f"{module} ({mode})", measure(module, kind, {"AGENT_STARTUP": mode}, args.runs))
+
+    with tempfile.TemporaryDirectory() as directory:
+        gazetteer_path = os.path.join(directory, "gazetteer.json")
+        with open(gazetteer_path, "w", encoding="utf-8") as f:
+            json.dump(synthetic_entries(args.gazetteer_entries), f)
+        snapshot_dir = os.path.join(directory, "tables")
+        print(f"\nemergency_call_nlp_agent (lazy) with a {args.gazetteer_entries:,}-entry GAZETTEER_PATH\n{header}")
+        env = {"AGENT_STARTUP": "lazy", "GAZETTEER_PATH": gazetteer_path}
+        report("no table snapshot (parse + build index)", measure("emergency_call_nlp_agent", "transcripts", env, args.runs))
+        env["AGENT_TABLE_SNAPSHOT_DIR"] = snapshot_dir
+        report("first start, writes the snapshot", measure("emergency_call_nlp_agent", "transcripts", env, 1))
+        report("snapshot present", measure("emergency_call_nlp_agent", "transcripts", env, args.runs))
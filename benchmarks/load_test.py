@@ -0,0 +1,399 @@
+# load_test.py
+#
+# Replayable load tests for the agents. Generates synthetic transcript, citizen/social report,
+# alert and prediction-scenario corpora (controllable size and popularity skew, seeded so a
+# run can be replayed exactly), replays them at a target open-loop rate against the
+# in-process tool functions or a local HTTP agent, and records latency histograms
+# (p50/p95/p99/max), throughput and error rate. Results are written as JSON; pass a previous
+# result file as --baseline to flag regressions.
+#
+# Usage:
+#   python benchmarks/load_test.py --corpus transcripts --size 5000 --rate 2000
+#   python benchmarks/load_test.py --corpus predictions --url http://localhost:5000/ --rate 50
+#   python benchmarks/load_test.py --corpus alerts --serve --rate 500    # tool behind a local HTTP server
+#   python benchmarks/load_test.py --corpus alerts --serve --wire-format json    # single-encoded records
+#   python benchmarks/load_test.py --corpus transcripts --output new.json --baseline old.json
+
+import argparse
+import base64
+import concurrent.futures
+import contextlib
+import datetime
+import http.server
+import itertools
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from attachments import AttachmentStore, parse_report_stream
+from bench_batch_processing import INCIDENTS, LOCATIONS, URGENCY, silenced_stdout
+from incident_records import WIRE_CONTENT_TYPES, content_type, encode, negotiate
+
+REGRESSION_THRESHOLD = 0.10 # 10% worse latency/throughput/error rate than the baseline
+LATENCY_NOISE_FLOOR_MS = 1.0 # Smaller latency changes are run-to-run jitter, not regressions
+
+
+# --- Synthetic Corpora ---
+# Each generator builds a pool of distinct payloads and draws 'size' of them with Zipf
+# popularity: skew 0 is uniform, skew ~1 is a few hot incidents reported over and over.
+
+LOCALITIES = ["MG Road", "Koramangala", "Indiranagar", "JP Nagar", "Malleshwaram", "Majestic", "Town Hall",
+              "Outer Ring Road", "Whitefield", "M. Chinnaswamy Stadium", "Peenya", "Hebbal"]
+REPORT_TEMPLATES = [
+    ("Social Media", "Massive crowd blocking traffic near {place}, things are getting heated! #BengaluruProtest", False),
+    ("Citizen App", "My friend collapsed near the park entrance at {place}, he's not moving. I've attached a picture.", True),
+    ("Social Media", "Traffic is really bad on {place} today. So frustrating!", False),
+    ("Citizen App", "Power has been out in our apartment in {place} for over 5 hours. When will it be restored?", False),
+    ("Citizen App", "There's a suspicious looking person loitering around the school gate in {place}. Attaching a photo.", True),
+    ("Social Media", "Absolute chaos at {place}, stampede near gate {number}! Need help! #Bengaluru #Stampede", False),
+    ("Citizen App", "There's a fire near {place}, it looks bad! See the smoke in the picture.", True),
+    ("Social Media", "Huge mob gathering at {place}, police not here yet!", True),
+]
+ALERT_TYPES = [
+    ("EMERGENCY", "Fire reported, people trapped", "Avoid the area and follow fire service instructions"),
+    ("TRAFFIC ADVISORY", "Heavy congestion after an accident", "Use alternate routes"),
+    ("EVENT UPDATE", "Crowd building up near the gates", "Use the metro and arrive early"),
+    ("CRIME ALERT", "Chain snatching reported", "Stay alert and report suspicious activity"),
+]
+SEVERITIES = ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+TIMES_OF_DAY = ["morning", "afternoon", "evening", "night", "late_night"]
+DAYS = ["weekday", "weekend", "matchday"]
+
+
+def _transcript(rng: random.Random) -> dict:
+    return {"call_transcript": f"Hello, near {rng.choice(LOCATIONS)} {rng.choice(INCIDENTS)}. {rng.choice(URGENCY)}"}
+
+
+def _report(rng: random.Random) -> dict:
+    source, template, with_image = rng.choice(REPORT_TEMPLATES)
+    report = {"report_text": template.format(place=rng.choice(LOCALITIES), number=rng.randint(1, 20)),
+              "report_source": source}
+    if with_image:
+        report["report_image_b64"] = base64.b64encode(rng.randbytes(rng.choice((256, 4096)))).decode("ascii")
+    return report
+
+
+def _alert(rng: random.Random) -> dict:
+    alert_type, description, action = rng.choice(ALERT_TYPES)
+    return {"alert_type": alert_type, "severity": rng.choice(SEVERITIES), "location": rng.choice(LOCALITIES),
+            "description": description, "recommended_action": action}
+
+
+def _prediction(rng: random.Random) -> dict:
+    location = rng.choice(LOCALITIES)
+    day = rng.choice(DAYS)
+    events = [{"name": "RCB Match", "location": "M. Chinnaswamy Stadium"}] if day == "matchday" else []
+    return {"location_context": f"{location}, Bengaluru", "time_of_day": rng.choice(TIMES_OF_DAY),
+            "day_of_week": day, "active_events": events}
+
+
+CORPUS_GENERATORS = {
+    "transcripts": _transcript,
+    "reports": _report,
+    "alerts": _alert,
+    "predictions": _prediction,
+}
+
+
+def generate_corpus(kind: str, size: int, skew: float = 1.0, distinct: int = None, seed: int = 42) -> list:
+    """
+    Returns 'size' payloads drawn from 'distinct' unique ones (default size // 10) with Zipf
+    popularity exponent 'skew'. The same arguments always produce the same corpus.
+    """
+    rng = random.Random(seed)
+    distinct = max(1, distinct or size // 10)
+    pool = [CORPUS_GENERATORS[kind](rng) for _ in range(distinct)]
+    cumulative = list(itertools.accumulate(1.0 / (rank ** skew) for rank in range(1, distinct + 1)))
+    return [pool[index] for index in rng.choices(range(distinct), cum_weights=cumulative, k=size)]
+
+
+# --- In-Process Targets ---
+
+def in_process_target(kind: str, records: bool = False):
+    """
+    Returns a callable(payload) that invokes the agent tool for this corpus in-process. With
+    records=True, transcripts and alerts go through the record-returning variants of the
+    tools (for serve_tool, which encodes them in the wire format each client negotiates).
+    """
+    if kind == "transcripts":
+        import emergency_call_nlp_agent
+        tool = (emergency_call_nlp_agent.process_transcript_record if records
+                else emergency_call_nlp_agent.process_transcript_for_orchestration_and_user_followup)
+        return lambda payload: tool(payload["call_transcript"])
+    if kind == "alerts":
+        import googlemapsagent
+        return googlemapsagent.disseminate_alert_record if records else googlemapsagent.disseminate_public_alert
+    if kind == "reports":
+        from incident_clustering import IncidentClusterer
+        clusterer = IncidentClusterer()
+        lock = threading.Lock()
+
+        def add_report(payload):
+            with lock:
+                return clusterer.add_report(dict(payload, timestamp=time.time()))[0]
+        return add_report
+    raise ValueError(f"No in-process agent for '{kind}' corpora; replay them against --url instead.")
+
+
+def http_target(url: str, timeout: float = 10.0, wire_format: str = "legacy"):
+    """
+    Returns a callable(payload) POSTing the payload as JSON, like the manual agent test scripts,
+    and asking for responses in 'wire_format' (see incident_records). Each worker thread keeps
+    its own keep-alive session. Non-2xx responses raise.
+    """
+    import requests
+
+    local = threading.local()
+
+    def post(payload):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        response = session.post(url, data=json.dumps(payload), timeout=timeout,
+                                headers={"Content-Type": "application/json", "Accept": content_type(wire_format)})
+        response.raise_for_status()
+        return response.content
+    return post
+
+
+class _ToolRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    tool = None
+    attachment_store = None
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if self.attachment_store is not None:
+            # Image attachments are decoded into the store as the body streams in
+            payload = parse_report_stream(self.rfile, self.attachment_store, length)
+        else:
+            payload = json.loads(self.rfile.read(length))
+        wire_format = negotiate(self.headers.get("Accept"))
+        try:
+            body, status = encode(self.tool(payload), wire_format), 200
+        except Exception as e:
+            body, status, wire_format = json.dumps({"status": "error", "message": str(e)}).encode("utf-8"), 500, "legacy"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type(wire_format))
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # One line per request would dominate the run
+
+
+def serve_tool(tool, port: int = 0, attachment_store=None) -> http.server.ThreadingHTTPServer:
+    """
+    Serves an in-process tool over HTTP on localhost (in a background thread), so the HTTP
+    replay path can be exercised without running the ADK server. With an
+    attachments.AttachmentStore, report bodies are parsed with parse_report_stream. Results
+    are encoded in the wire format negotiated from each request's Accept header (legacy JSON
+    unless the client asks for a record format).
+    """
+    handler = type("ToolRequestHandler", (_ToolRequestHandler,),
+                   {"tool": staticmethod(tool), "attachment_store": attachment_store})
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# --- Recording ---
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram (each bucket is 'growth' times wider than the previous,
+    so percentiles carry at most ~growth/2 relative error) with exact count, sum and max.
+    """
+
+    def __init__(self, growth: float = 1.02, min_seconds: float = 1e-6):
+        self.growth = growth
+        self.min_seconds = min_seconds
+        self._log_growth = math.log(growth)
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        index = int(math.log(max(seconds, self.min_seconds) / self.min_seconds) / self._log_growth)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                # Upper edge of the bucket, capped by the true maximum
+                return min(self.max, self.min_seconds * self.growth ** (index + 1))
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+# --- Open-Loop Replay ---
+
+def replay(send, payloads: list, rate: float = None, concurrency: int = 16) -> dict:
+    """
+    Sends every payload through 'send' on a pool of 'concurrency' threads. Requests are issued
+    on a fixed open-loop schedule ('rate' per second, or all at once when rate is None) that
+    does not wait for earlier responses, and latency is measured from each request's scheduled
+    time, so a stalled agent shows up as queueing delay instead of silently lowering the load.
+    """
+    histogram = LatencyHistogram()
+    errors = {}
+    lock = threading.Lock()
+    last_completion = [0.0]
+
+    def timed(payload, scheduled):
+        error = None
+        try:
+            send(payload)
+        except Exception as e:
+            error = e.__class__.__name__
+        finished = time.perf_counter()
+        with lock:
+            histogram.record(finished - scheduled)
+            last_completion[0] = max(last_completion[0], finished)
+            if error:
+                errors[error] = errors.get(error, 0) + 1
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+        for index, payload in enumerate(payloads):
+            scheduled = start + index / rate if rate else start
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(timed, payload, scheduled)
+        issue_seconds = time.perf_counter() - start
+
+    elapsed = last_completion[0] - start
+    error_count = sum(errors.values())
+    return {
+        "requests": len(payloads),
+        "offered_rate": rate,
+        "achieved_issue_rate": round(len(payloads) / issue_seconds, 1) if issue_seconds > 0 else None,
+        "throughput_per_sec": round(len(payloads) / elapsed, 1) if elapsed > 0 else None,
+        "error_rate": round(error_count / len(payloads), 6) if payloads else 0.0,
+        "errors": errors,
+        "latency": histogram.summary(),
+    }
+
+
+# --- Results & Regression Check ---
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(result: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD) -> list:
+    """
+    Returns a description of every metric that got worse than the baseline by more than 'threshold'.
+    """
+    regressions = []
+    for key in ("p50_ms", "p95_ms", "p99_ms"):
+        old, new = baseline["latency"][key], result["latency"][key]
+        if old and new > old * (1 + threshold) and new - old > LATENCY_NOISE_FLOOR_MS:
+            regressions.append(f"{key}: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    old, new = baseline.get("throughput_per_sec"), result.get("throughput_per_sec")
+    if old and new and new < old * (1 - threshold):
+        regressions.append(f"throughput_per_sec: {old} -> {new} ({(new / old - 1) * 100:.0f}%)")
+    if result["error_rate"] > baseline["error_rate"] + 0.001:
+        regressions.append(f"error_rate: {baseline['error_rate']} -> {result['error_rate']}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replayable open-loop load test for the agents.")
+    parser.add_argument("--corpus", choices=sorted(CORPUS_GENERATORS), default="transcripts")
+    parser.add_argument("--size", type=int, default=5_000)
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent of payload popularity (0 = uniform)")
+    parser.add_argument("--distinct", type=int, help="Distinct payloads in the pool (default size // 10)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rate", type=float, help="Open-loop requests/sec (default: everything at once)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--url", help="Replay against an HTTP agent instead of the in-process tool")
+    parser.add_argument("--serve", action="store_true", help="Serve the in-process tool over local HTTP and replay against it")
+    parser.add_argument("--stream-attachments", action="store_true",
+                        help="With --serve, decode report images into an attachment store as bodies stream in")
+    parser.add_argument("--wire-format", choices=sorted(WIRE_CONTENT_TYPES), default="legacy",
+                        help="Response encoding to ask HTTP agents for")
+    parser.add_argument("--output", help="Write the result JSON here")
+    parser.add_argument("--baseline", help="Previous result JSON to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Keep the agents' DEBUG/INFO output")
+    args = parser.parse_args()
+
+    payloads = generate_corpus(args.corpus, args.size, args.skew, args.distinct, args.seed)
+    server = None
+    if args.url:
+        target_name, send = args.url, http_target(args.url, wire_format=args.wire_format)
+    elif args.serve:
+        server = serve_tool(in_process_target(args.corpus, records=True),
+                            attachment_store=AttachmentStore() if args.stream_attachments else None)
+        target_name = f"http://127.0.0.1:{server.server_address[1]}/ (served in-process)"
+        send = http_target(target_name.split()[0], wire_format=args.wire_format)
+    else:
+        target_name, send = "in-process", in_process_target(args.corpus)
+
+    print(f"Replaying {args.size:,} {args.corpus} (skew {args.skew}, seed {args.seed}) against {target_name} "
+          f"at {f'{args.rate:g}/s' if args.rate else 'max rate'}, concurrency {args.concurrency}")
+    with (contextlib.nullcontext() if args.verbose else silenced_stdout()):
+        result = replay(send, payloads, args.rate, args.concurrency)
+    if server:
+        server.shutdown()
+
+    latency = result["latency"]
+    print(f"  throughput {result['throughput_per_sec']}/s, errors {result['error_rate'] * 100:.2f}% {result['errors'] or ''}")
+    print(f"  latency ms: p50 {latency['p50_ms']}  p95 {latency['p95_ms']}  p99 {latency['p99_ms']}  max {latency['max_ms']}")
+
+    document = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "verbose")},
+        "target": target_name,
+        "result": result,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"  results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline["result"])
+        print(f"  vs baseline {baseline.get('git_commit')} ({baseline.get('timestamp')}): "
+              + ("; ".join(regressions) if regressions else "no regressions"))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+# conftest.py
+#
+# The agents are flat modules imported by name, as the benchmarks do.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
@@ -0,0 +1,57 @@
+# test_alert_coalescer.py
+
+import json
+
+import pytest
+
+from alert_coalescer import AlertCoalescer
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_geofence_bucket_limits_alerts_of_equal_severity():
+    coalescer = AlertCoalescer(clock=SimulatedClock())
+    actions = [coalescer.admit(alert_type, "LOW", "MG Road")["action"]
+               for alert_type in ("EVENT UPDATE", "TRAFFIC ADVISORY", "WEATHER WARNING", "PUBLIC SAFETY")]
+    assert actions == ["send", "send", "send", "rate_limited"]
+
+
+def test_critical_alert_bypasses_exhausted_geofence_bucket():
+    coalescer = AlertCoalescer(clock=SimulatedClock())
+    coalescer.admit("EVENT UPDATE", "LOW", "MG Road")
+    coalescer.admit("TRAFFIC ADVISORY", "LOW", "MG Road")
+    coalescer.admit("CRIME ALERT", "MEDIUM", "MG Road")
+    assert coalescer.admit("EMERGENCY", "CRITICAL", "MG Road")["action"] == "send"
+
+
+def test_more_severe_alert_than_last_sent_bypasses_geofence_bucket():
+    coalescer = AlertCoalescer(clock=SimulatedClock())
+    for alert_type in ("EVENT UPDATE", "TRAFFIC ADVISORY", "WEATHER WARNING"):
+        coalescer.admit(alert_type, "LOW", "MG Road")
+    assert coalescer.admit("PUBLIC SAFETY", "LOW", "MG Road")["action"] == "rate_limited"
+    assert coalescer.admit("CRIME ALERT", "HIGH", "MG Road")["action"] == "send"
+    assert coalescer.admit("FIRE", "MEDIUM", "MG Road")["action"] == "rate_limited"
+
+
+def test_critical_alert_is_disseminated_after_lower_alerts_for_the_geofence(monkeypatch):
+    googlemapsagent = pytest.importorskip("googlemapsagent")
+    monkeypatch.setattr(googlemapsagent, "ALERT_COALESCING", True)
+    monkeypatch.setattr(googlemapsagent, "ALERT_COALESCER", AlertCoalescer())
+
+    def disseminate(alert_type: str, severity: str) -> dict:
+        return json.loads(googlemapsagent.disseminate_public_alert({
+            "alert_type": alert_type, "severity": severity, "location": "MG Road",
+            "description": f"{alert_type.title()} on MG Road", "recommended_action": "Follow police instructions"}))
+
+    disseminate("EVENT UPDATE", "LOW")
+    disseminate("TRAFFIC ADVISORY", "LOW")
+    disseminate("CRIME ALERT", "MEDIUM")
+    result = disseminate("EMERGENCY", "CRITICAL")
+    assert result["dissemination_status"] != "rate_limited"
+    assert result["channels_used"]
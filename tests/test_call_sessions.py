@@ -0,0 +1,71 @@
+# test_call_sessions.py
+
+import random
+
+import pytest
+
+import emergency_call_nlp_agent as nlp_agent
+from call_sessions import CallSession
+
+STRESSED = "caller stressed and unwilling to provide further information"
+CALLS = [
+    ["Hello, there is a fire at M.G. Road", "people are trapped", "please come right, now"],
+    ["Hello, there is a fire at MG Road", "people are trapped", "please come right now"],
+    ["Fire,Peenya.", "People trapped"],
+    ["fire near peenya,", "koramangala side"],
+    ["we are near Brigade Road, next to the big bookshop", "it is the 10th cross, home no 36, the blue gate"],
+    ["someone is", "not breathing", "come right", "now"],
+]
+
+
+def analyze_turns(turns: list):
+    session = CallSession("test-call")
+    for utterance in turns:
+        result = nlp_agent.advance_call_session(session, utterance)
+    return result
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    nlp_agent.TRANSCRIPT_RESULT_CACHE.clear()
+    yield
+    nlp_agent.TRANSCRIPT_RESULT_CACHE.clear()
+
+
+@pytest.mark.parametrize("turns", CALLS)
+def test_turns_match_whole_transcript(turns):
+    assert analyze_turns(turns) == nlp_agent.process_transcript_record(" ".join(turns))
+
+
+def test_turns_read_punctuation_like_the_transcript_tool():
+    separated = analyze_turns(CALLS[0])
+    assert not separated.anomalies
+    joined = analyze_turns(CALLS[1])
+    assert joined.location.startswith("MG Road")
+    assert list(joined.anomalies) == [STRESSED]
+
+
+def test_random_splits_match_whole_transcript():
+    rng = random.Random(19)
+    words = " ".join(" ".join(turns) for turns in CALLS).split(" ")
+    for _ in range(200):
+        picked = [rng.choice(words) for _ in range(rng.randint(1, 12))]
+        cuts = sorted(rng.sample(range(1, len(picked)), rng.randint(0, len(picked) - 1)))
+        turns = [" ".join(picked[start:end]) for start, end in zip([0] + cuts, cuts + [len(picked)])]
+        assert analyze_turns(turns) == nlp_agent.process_transcript_record(" ".join(turns)), turns
+
+
+def test_model_sees_the_same_text_turn_by_turn(monkeypatch):
+    seen = []
+
+    def classifier(text, timeout=None):
+        seen.append(text)
+        return {"incident_type": "Fire", "severity": "High", "signal": "incident",
+                "confidence": {"incident_type": 0.9, "severity": 0.9, "signal": 0.9}}
+
+    classifier.ready, classifier.load_error = True, None
+    monkeypatch.setattr(nlp_agent, "LOCAL_CLASSIFIER", classifier)
+    turns = CALLS[0] + ["x" * nlp_agent.LOCAL_CLASSIFIER_MAX_CALL_CHARS]
+    analyze_turns(turns)
+    nlp_agent.process_transcript_record(" ".join(turns))
+    assert seen[-1] == seen[-2]
@@ -0,0 +1,69 @@
+# test_dissemination_engine.py
+
+import asyncio
+import threading
+
+from dissemination_engine import DisseminationEngine
+
+
+class CountingSender:
+    """Async sender recording how many sends it started and how many ran at once."""
+
+    def __init__(self, delay_seconds: float = 0.0):
+        self.delay_seconds = delay_seconds
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    async def __call__(self, formatted_message: str, audience_criteria: dict) -> str:
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay_seconds)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        return "sent"
+
+
+def test_concurrency_limit_spans_alerts_and_threads():
+    sender = CountingSender(delay_seconds=0.05)
+    engine = DisseminationEngine({"SMS": ("SMS", sender), "Push": ("Push", sender)}, max_concurrency=2)
+    statuses = []
+    threads = [threading.Thread(target=lambda: statuses.append(engine.disseminate("alert", ["SMS", "Push"], {})))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.close()
+    assert [status["status"] for status in statuses] == ["success"] * 5
+    assert sender.calls == 10
+    assert sender.max_in_flight == 2
+
+
+def test_concurrency_limit_spans_callers_event_loops():
+    sender = CountingSender(delay_seconds=0.05)
+    engine = DisseminationEngine({"SMS": ("SMS", sender)}, max_concurrency=1)
+
+    async def burst():
+        return await asyncio.gather(*(engine.disseminate_async("alert", ["SMS"], {}) for _ in range(4)))
+
+    statuses = asyncio.run(burst())
+    engine.close()
+    assert [status["status"] for status in statuses] == ["success"] * 4
+    assert sender.max_in_flight == 1
+
+
+def test_timed_out_send_is_only_retried_on_idempotent_channels():
+    sms, board = CountingSender(delay_seconds=1.0), CountingSender(delay_seconds=1.0)
+    engine = DisseminationEngine({"SMS": ("SMS", sms), "Board": ("Board", board)}, timeout_seconds=0.05,
+                                 max_attempts=3, backoff_base_seconds=0.0, idempotent_channels={"Board"})
+    status = engine.disseminate("alert", ["SMS", "Board"], {})
+    engine.close()
+    assert status["status"] == "failure"
+    assert sms.calls == 1
+    assert board.calls == 3
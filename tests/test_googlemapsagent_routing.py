@@ -0,0 +1,55 @@
+# test_googlemapsagent_routing.py
+#
+# ROAD_GRAPH_PATH is read at import, so each case imports the agent in a fresh interpreter.
+
+import json
+import os
+import subprocess
+import sys
+
+AGENTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents")
+# Four junctions on a square of two-way streets around MG Road
+EXTRACT = """<?xml version="1.0" encoding="UTF-8"?>
+<osm version="0.6">
+  <node id="1" lat="12.9750" lon="77.6050"/>
+  <node id="2" lat="12.9750" lon="77.6100"/>
+  <node id="3" lat="12.9800" lon="77.6100"/>
+  <node id="4" lat="12.9800" lon="77.6050"/>
+  <way id="1"><nd ref="1"/><nd ref="2"/><nd ref="3"/><nd ref="4"/><nd ref="1"/><tag k="highway" v="primary"/></way>
+</osm>
+"""
+
+
+def run_agent(script: str, road_graph_path: str = None) -> dict:
+    environment = {key: value for key, value in os.environ.items() if key != "ROAD_GRAPH_PATH"}
+    if road_graph_path:
+        environment["ROAD_GRAPH_PATH"] = road_graph_path
+    completed = subprocess.run([sys.executable, "-c", script], cwd=AGENTS_DIR, env=environment,
+                               capture_output=True, text=True, timeout=120, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_road_graph_is_built_at_startup(tmp_path):
+    extract = tmp_path / "roads.osm"
+    extract.write_text(EXTRACT)
+    result = run_agent(
+        "import json, googlemapsagent as agent\n"
+        "from agent_startup import readiness_probe\n"
+        "agent._routing_engine_ready.wait(60)\n"
+        "built = agent.ROUTING_ENGINE is not None\n" # Before any tool call
+        "agent.update_unit_position('ambulance-1', 12.9752, 77.6052, kind='ambulance')\n"
+        "units = agent.find_nearest_units(12.9798, 77.6098, k=1)\n"
+        "print(json.dumps({'built': built, 'ready': readiness_probe()['components']['road_graph']['ready'],\n"
+        "                  'units': [unit['unit_id'] for unit in units]}))\n",
+        str(extract))
+    assert result == {"built": True, "ready": True, "units": ["ambulance-1"]}
+
+
+def test_routing_tools_are_only_registered_with_a_road_graph(tmp_path):
+    extract = tmp_path / "roads.osm"
+    extract.write_text(EXTRACT)
+    script = ("import json, googlemapsagent as agent\n"
+              "print(json.dumps(sorted(tool.__name__ for tool in agent.root_agent.tools)))\n")
+    assert run_agent(script) == ["disseminate_public_alert"]
+    assert run_agent(script, str(extract)) == ["disseminate_public_alert", "find_nearest_units", "plan_route",
+                                               "report_road_blockage", "update_unit_position"]
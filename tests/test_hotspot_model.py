@@ -0,0 +1,28 @@
+# test_hotspot_model.py
+
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from hotspot_model import HotspotModel
+
+
+@pytest.fixture
+def model():
+    now = time.time()
+    model = HotspotModel(epoch=now)
+    for lat, lon in ((12.97, 77.59), (12.93, 77.62), (13.03, 77.52)):
+        model.update(lat, lon, "Fire", timestamp=now)
+    return model
+
+
+@pytest.mark.parametrize("k", [0, -1, -5])
+def test_top_cells_is_empty_for_k_below_one(model, k):
+    assert model.top_cells(k) == []
+
+
+def test_top_cells_returns_at_most_k_cells(model):
+    assert len(model.top_cells(2)) == 2
+    assert len(model.top_cells(10)) == 3
@@ -0,0 +1,42 @@
+# test_incident_records.py
+
+import json
+
+import pytest
+
+from alert_coalescer import AlertCoalescer
+from incident_records import AlertRecord, decode, encode
+
+ALERT = {"alert_type": "EMERGENCY", "severity": "HIGH", "location": "MG Road",
+         "description": "Fire in a building on MG Road", "recommended_action": "Avoid the area"}
+# Keys the alert tool has always returned
+LEGACY_KEYS = {"timestamp", "original_alert_input", "formatted_alert_message", "dissemination_status",
+               "channels_used", "dissemination_details", "target_audience_criteria", "source_agent"}
+
+
+def suppressed_record() -> AlertRecord:
+    return AlertRecord("2026-10-17T10:00:00", ALERT, "coalesced", [], [], coalesced_alert_count=4, window_severity="HIGH")
+
+
+def test_suppressed_alert_keeps_every_legacy_key_empty():
+    output = json.loads(suppressed_record().to_legacy())
+    assert LEGACY_KEYS <= set(output)
+    assert (output["formatted_alert_message"], output["dissemination_details"], output["target_audience_criteria"]) == ("", [], {})
+    assert (output["coalesced_alert_count"], output["window_severity"]) == (4, "HIGH")
+
+
+def test_suppressed_alert_round_trips():
+    record = AlertRecord.from_dict(suppressed_record().to_legacy())
+    assert record.suppressed
+    assert record.to_dict() == suppressed_record().to_dict()
+    assert decode(encode(suppressed_record(), "json"), "json") == suppressed_record().to_dict()
+
+
+def test_coalesced_alert_from_the_tool_has_the_sent_alerts_keys(monkeypatch):
+    googlemapsagent = pytest.importorskip("googlemapsagent")
+    monkeypatch.setattr(googlemapsagent, "ALERT_COALESCING", True)
+    monkeypatch.setattr(googlemapsagent, "ALERT_COALESCER", AlertCoalescer())
+    sent = json.loads(googlemapsagent.disseminate_public_alert(ALERT))
+    coalesced = json.loads(googlemapsagent.disseminate_public_alert(ALERT))
+    assert coalesced["dissemination_status"] == "coalesced"
+    assert set(sent) <= set(coalesced)
@@ -0,0 +1,79 @@
+# test_local_classifier.py
+
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+import emergency_call_nlp_agent as nlp_agent
+from local_classifier import ClassifierService, MicroBatcher
+
+FIRE_CALL = "There is a fire at Peenya, people trapped"
+
+
+class FakeModel:
+    def predict_batch(self, texts: list) -> list:
+        return [{"incident_type": "Medical Emergency", "severity": "High", "signal": "signal",
+                 "confidence": {"incident_type": 0.99, "severity": 0.9, "signal": 0.9}} for _ in texts]
+
+
+def slow_load(seconds: float, error: Exception = None):
+    def load():
+        time.sleep(seconds)
+        if error is not None:
+            raise error
+        return FakeModel()
+    return load
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    nlp_agent.TRANSCRIPT_RESULT_CACHE.clear()
+    yield
+    nlp_agent.TRANSCRIPT_RESULT_CACHE.clear()
+
+
+def test_rules_answer_at_once_while_the_model_loads(monkeypatch):
+    service = ClassifierService(slow_load(0.5))
+    monkeypatch.setattr(nlp_agent, "LOCAL_CLASSIFIER", service)
+    started = time.perf_counter()
+    assert nlp_agent.classify_incident(FIRE_CALL)["incident_type"] == "Fire"
+    assert time.perf_counter() - started < 0.2
+    assert service.stats()["requests"] == 0 # Nothing queued behind the load
+
+    service._loaded.wait(5)
+    assert service.ready
+    assert nlp_agent.classify_incident(FIRE_CALL)["incident_type"] == "Medical Emergency"
+    service.close()
+
+
+def test_rules_answer_at_once_after_a_failed_load(monkeypatch):
+    service = ClassifierService(slow_load(0.0, ImportError("no torch")))
+    service._loaded.wait(5)
+    monkeypatch.setattr(nlp_agent, "LOCAL_CLASSIFIER", service)
+    assert not service.ready and isinstance(service.load_error, ImportError)
+    assert nlp_agent.classify_incident(FIRE_CALL)["incident_type"] == "Fire"
+    with pytest.raises(ImportError):
+        service("direct callers still see the load error", timeout=5)
+    service.close()
+
+
+def test_timed_out_request_is_not_run():
+    release = threading.Event()
+    seen = []
+
+    def predict_batch(texts):
+        release.wait(5)
+        seen.extend(texts)
+        return texts
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=1, max_wait_ms=0)
+    first = batcher.submit("first")
+    time.sleep(0.05) # The first batch is running
+    with pytest.raises(concurrent.futures.TimeoutError):
+        batcher("second", timeout=0.05)
+    release.set()
+    assert first.result(5) == "first"
+    batcher.close()
+    assert seen == ["first"]
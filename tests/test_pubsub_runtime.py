@@ -0,0 +1,57 @@
+# test_pubsub_runtime.py
+
+import threading
+import time
+
+from pubsub_runtime import BatchPublisher, InMemoryBroker, StreamingConsumer, encode_json
+
+
+def consume(broker: InMemoryBroker, handler, inputs: int, **consumer_options) -> StreamingConsumer:
+    for topic, subscription in (("requests", "worker"), ("results", "sink")):
+        broker.create_topic(topic)
+        broker.create_subscription(subscription, topic)
+    consumer = StreamingConsumer(broker, "worker", handler, output_topic="results", **consumer_options).start()
+    publisher = BatchPublisher(broker, "requests")
+    for index in range(inputs):
+        publisher.publish(encode_json({"index": index}))
+    publisher.close()
+    deadline = time.monotonic() + 30
+    while consumer.stats()["processed"] < inputs and time.monotonic() < deadline:
+        time.sleep(0.05)
+    consumer.stop()
+    return consumer
+
+
+def test_backlog_longer_than_the_ack_deadline_is_processed_once():
+    broker = InMemoryBroker(ack_deadline_seconds=1.0)
+    calls = []
+    lock = threading.Lock()
+
+    def handler(payload):
+        time.sleep(0.02)
+        with lock:
+            calls.append(payload["index"])
+        return payload
+
+    consumer = consume(broker, handler, 400, max_workers=4)
+    assert sorted(calls) == list(range(400))
+    assert broker.counters["redelivered"] == 0
+    assert broker.counters["published"] == 800 # 400 inputs and 400 results
+    assert consumer.stats()["lease_extensions"] > 0
+
+
+def test_redelivered_message_is_not_handled_again():
+    broker = InMemoryBroker(ack_deadline_seconds=0.2)
+    calls = []
+
+    def handler(payload):
+        calls.append(payload["index"])
+        if len(calls) == 1:
+            time.sleep(0.6) # Held past the deadline with no lease: the broker redelivers it
+        return payload
+
+    consumer = consume(broker, handler, 1, max_workers=2, lease_seconds=0.2, max_lease_seconds=0.0)
+    assert calls == [0]
+    assert broker.counters["redelivered"] >= 1
+    assert consumer.stats()["duplicates"] >= 1
+    assert broker.counters["published"] == 2
@@ -0,0 +1,66 @@
+# test_recipient_registry.py
+
+import random
+import sys
+import threading
+
+import pytest
+
+from recipient_registry import RecipientRegistry
+
+CITY = {"type": "radius", "center": [12.97, 77.59], "radius_m": 20_000}
+WARD = {"type": "polygon", "vertices": [[12.9, 77.5], [13.05, 77.5], [13.05, 77.7], [12.9, 77.7]]}
+
+
+@pytest.fixture
+def fast_thread_switching():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_queries_see_every_stationary_subscriber_while_others_move(fast_thread_switching):
+    registry = RecipientRegistry(cell_size_degrees=0.05)
+    rng = random.Random(7)
+
+    def somewhere():
+        return 12.97 + rng.uniform(-0.05, 0.05), 77.59 + rng.uniform(-0.05, 0.05)
+
+    stationary = {registry.subscribe(*somewhere()) for _ in range(5_000)}
+    moving = [registry.subscribe(*somewhere()) for _ in range(5_000)]
+    stop = threading.Event()
+    errors = []
+
+    def churn():
+        churn_rng = random.Random(8)
+        try:
+            while not stop.is_set():
+                handle = churn_rng.choice(moving)
+                registry.move(handle, 12.97 + churn_rng.uniform(-0.05, 0.05), 77.59 + churn_rng.uniform(-0.05, 0.05))
+        except Exception as e:
+            errors.append(e)
+
+    updater = threading.Thread(target=churn)
+    updater.start()
+    try:
+        for _ in range(20):
+            for geofence in (CITY, WARD):
+                # A subscriber moving mid-query may be seen in both cells or neither; the rest exactly once
+                seen = [handle for handle in registry.iter_geofence(geofence) if handle in stationary]
+                assert len(seen) == len(stationary) == len(set(seen))
+    finally:
+        stop.set()
+        updater.join()
+    assert not errors
+    assert registry.count_geofence(CITY) == len(registry) == 10_000
+
+
+def test_query_in_progress_is_unaffected_by_updates():
+    # Moving a subscriber out swap-removes it: the cell's last member takes its slot
+    registry = RecipientRegistry()
+    handles = [registry.subscribe(12.97, 77.59) for _ in range(10)]
+    query = registry.iter_radius(12.97, 77.59, 5_000) # The whole cell is inside
+    first = next(query)
+    registry.move(first, 13.5, 78.0)
+    assert sorted([first] + list(query)) == handles
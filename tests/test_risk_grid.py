@@ -0,0 +1,26 @@
+# test_risk_grid.py
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from risk_grid import DEFAULT_LOCATIONS, RiskGrid
+
+
+@pytest.fixture
+def grid_and_scores():
+    grid = RiskGrid(DEFAULT_LOCATIONS)
+    return grid, grid.score()
+
+
+@pytest.mark.parametrize("k", [0, -1, -5])
+def test_top_hotspots_is_empty_for_k_below_one(grid_and_scores, k):
+    grid, scores = grid_and_scores
+    assert grid.top_hotspots(scores, k=k) == []
+
+
+def test_top_hotspots_returns_k_most_risky_first(grid_and_scores):
+    grid, scores = grid_and_scores
+    hotspots = grid.top_hotspots(scores, k=3)
+    assert len(hotspots) == 3
+    assert [hotspot["risk_score"] for hotspot in hotspots] == sorted((hotspot["risk_score"] for hotspot in hotspots), reverse=True)
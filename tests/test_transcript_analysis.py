@@ -0,0 +1,56 @@
+# test_transcript_analysis.py
+
+import json
+
+import pytest
+
+import emergency_call_nlp_agent as nlp_agent
+
+UNKNOWN_LOCATION = "Location Unknown (within Bengaluru, Karnataka, India)"
+STRESSED = "caller stressed and unwilling to provide further information"
+
+# Results of the original rule-based tool, which analyzed the raw transcript
+BASELINE = [
+    ("Fire,Peenya. People trapped",
+     {"incident_type": "Fire", "location": "Peenya, Bengaluru, Karnataka, India", "severity": "Critical", "anomalies": []}),
+    ("fire near peenya,koramangala side",
+     {"incident_type": "Fire", "location": "Koramangala, Bengaluru, Karnataka, India", "severity": "High", "anomalies": []}),
+    ("right, now",
+     {"incident_type": "Unknown", "location": UNKNOWN_LOCATION, "severity": "High", "anomalies": []}),
+    ("There is a fire at Peenya, come right now",
+     {"incident_type": "Fire", "location": "Peenya, Bengaluru, Karnataka, India", "severity": "High", "anomalies": [STRESSED]}),
+    ("Someone fainted near M.G. Road",
+     {"incident_type": "Unknown", "location": UNKNOWN_LOCATION, "severity": "High", "anomalies": []}),
+]
+
+
+def analyze(call_transcript: str) -> dict:
+    result = nlp_agent.process_transcript_for_orchestration_and_user_followup(call_transcript)
+    return json.loads(result["orchestration_json"])
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    nlp_agent.TRANSCRIPT_RESULT_CACHE.clear()
+    yield
+    nlp_agent.TRANSCRIPT_RESULT_CACHE.clear()
+
+
+@pytest.mark.parametrize("call_transcript, expected", BASELINE)
+def test_matches_baseline_analysis(call_transcript, expected):
+    result = analyze(call_transcript)
+    assert {key: result[key] for key in expected} == expected
+
+
+@pytest.mark.parametrize("call_transcript, expected", BASELINE)
+def test_cached_variant_matches_baseline_analysis(call_transcript, expected):
+    analyze(call_transcript.upper() + "!!") # Same fingerprint, so it fills the entry reused below
+    result = analyze(call_transcript)
+    assert {key: result[key] for key in expected} == expected
+
+
+def test_punctuation_variants_do_not_share_a_cache_entry():
+    assert analyze("Fire at Peenya, come right, now")["anomalies"] == []
+    assert analyze("fire at peenya come right now")["anomalies"] == [STRESSED]
+    assert analyze("Someone fainted near mg road")["location"] != UNKNOWN_LOCATION
+    assert analyze("Someone fainted near M.G. Road")["location"] == UNKNOWN_LOCATION